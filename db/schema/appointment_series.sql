@@ -0,0 +1,513 @@
+-- ============================================================================
+-- SÉRIES RECORRENTES DE AGENDAMENTOS - IDEMPOTENT MIGRATIONS
+-- Schema: cedro
+-- Purpose: Criar, deslocar e cancelar séries semanais inteiras (ex.: plano de
+--          40 sessões) em um único comando, com UMA entrada na fila do Google
+--          Calendar por série (evento recorrente) em vez de N entradas.
+-- Depende de: add_google_calendar_sync.sql
+-- ============================================================================
+-- BLOCO 1: Tabela de séries
+-- Guarda a regra da série; as ocorrências continuam em cedro.appointments
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS cedro.appointment_series (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  therapist_id   uuid NOT NULL REFERENCES cedro.users(id) ON DELETE CASCADE,
+  patient_id     uuid REFERENCES cedro.patients(id) ON DELETE SET NULL,
+  service_id     uuid REFERENCES cedro.services(id) ON DELETE SET NULL,
+  care_plan_id   uuid REFERENCES cedro.care_plans(id) ON DELETE SET NULL,
+  first_start_at timestamptz NOT NULL,
+  duration_minutes int NOT NULL CHECK (duration_minutes > 0),
+  interval_weeks int NOT NULL DEFAULT 1 CHECK (interval_weeks BETWEEN 1 AND 52),
+  occurrences    int NOT NULL CHECK (occurrences BETWEEN 1 AND 520),
+  status         text NOT NULL DEFAULT 'active' CHECK (status IN ('active', 'cancelled')),
+  summary        text,
+  notes          text,
+  external_event_id    text,
+  external_calendar_id text,
+  created_at     timestamptz DEFAULT now(),
+  updated_at     timestamptz DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_series_therapist ON cedro.appointment_series(therapist_id, status);
+CREATE INDEX IF NOT EXISTS idx_series_care_plan ON cedro.appointment_series(care_plan_id) WHERE care_plan_id IS NOT NULL;
+
+ALTER TABLE cedro.appointments
+  ADD COLUMN IF NOT EXISTS series_id uuid REFERENCES cedro.appointment_series(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_appointments_series
+  ON cedro.appointments(series_id, start_at)
+  WHERE series_id IS NOT NULL;
+
+COMMENT ON TABLE cedro.appointment_series IS 'Regra de recorrência semanal; ocorrências ficam em appointments.series_id';
+COMMENT ON COLUMN cedro.appointment_series.first_start_at IS 'Início da primeira ocorrência (horário local America/Sao_Paulo é preservado entre semanas)';
+COMMENT ON COLUMN cedro.appointment_series.external_event_id IS 'ID do evento recorrente (master) atual no Google Calendar';
+COMMENT ON COLUMN cedro.appointments.series_id IS 'Série recorrente à qual a ocorrência pertence (NULL = avulso)';
+
+-- ============================================================================
+-- BLOCO 2: Fila do GCal aceita jobs por série
+-- appointment_id passa a ser opcional quando o job é da série inteira
+-- ============================================================================
+ALTER TABLE cedro.gcal_sync_queue
+  ADD COLUMN IF NOT EXISTS series_id uuid REFERENCES cedro.appointment_series(id) ON DELETE CASCADE,
+  ADD COLUMN IF NOT EXISTS series_from timestamptz;
+
+ALTER TABLE cedro.gcal_sync_queue ALTER COLUMN appointment_id DROP NOT NULL;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_constraint
+    WHERE conname = 'gcal_sync_queue_target_check'
+      AND conrelid = 'cedro.gcal_sync_queue'::regclass
+  ) THEN
+    ALTER TABLE cedro.gcal_sync_queue
+      ADD CONSTRAINT gcal_sync_queue_target_check
+      CHECK (appointment_id IS NOT NULL OR series_id IS NOT NULL);
+
+    RAISE NOTICE 'Constraint gcal_sync_queue_target_check criada com sucesso';
+  ELSE
+    RAISE NOTICE 'Constraint gcal_sync_queue_target_check já existe';
+  END IF;
+END$$;
+
+CREATE INDEX IF NOT EXISTS idx_sync_queue_series
+  ON cedro.gcal_sync_queue(series_id, status)
+  WHERE series_id IS NOT NULL;
+
+COMMENT ON COLUMN cedro.gcal_sync_queue.series_id IS 'Job consolidado da série inteira (um evento recorrente no Google)';
+COMMENT ON COLUMN cedro.gcal_sync_queue.series_from IS 'Ocorrências a partir deste instante foram alteradas (corte para truncar o evento recorrente)';
+
+-- ============================================================================
+-- BLOCO 3: Triggers por linha respeitam escrita em lote
+-- As RPCs de série ligam cedro.series_bulk_write (escopo da transação) e
+-- enfileiram um único job; os triggers por linha não enfileiram nada.
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.trg_enqueue_gcal_sync()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_has_gcal_enabled boolean;
+BEGIN
+  -- Escrita em lote de série: o job consolidado é enfileirado pela RPC
+  IF current_setting('cedro.series_bulk_write', true) = 'on' THEN
+    RETURN NEW;
+  END IF;
+
+  -- Não enfileirar mudanças vindas do Google Calendar
+  IF NEW.origin = 'google' THEN
+    RAISE DEBUG 'Evento origem=google, não enfileirando para sincronização';
+    RETURN NEW;
+  END IF;
+
+  -- Verificar se o terapeuta tem Google Calendar configurado
+  SELECT (u.google_calendar_id IS NOT NULL) INTO v_has_gcal_enabled
+  FROM cedro.users u
+  WHERE u.id = NEW.therapist_id;
+
+  -- Se tem Google Calendar, enfileirar para sincronização
+  IF v_has_gcal_enabled THEN
+    INSERT INTO cedro.gcal_sync_queue (appointment_id, action, status, created_at)
+    VALUES (
+      NEW.id,
+      CASE
+        WHEN TG_OP='INSERT' THEN 'create'
+        WHEN TG_OP='UPDATE' THEN 'update'
+        ELSE 'update'
+      END,
+      'pending',
+      now()
+    );
+
+    RAISE DEBUG 'Agendamento % enfileirado para sincronização com Google Calendar', NEW.id;
+  END IF;
+
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION cedro.trg_enqueue_gcal_sync_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF current_setting('cedro.series_bulk_write', true) = 'on' THEN
+    RETURN OLD;
+  END IF;
+
+  -- Só enfileirar se o evento foi sincronizado com o Google (tem external_event_id)
+  IF OLD.external_event_id IS NOT NULL AND OLD.origin <> 'google' THEN
+    INSERT INTO cedro.gcal_sync_queue (appointment_id, action, status, created_at)
+    VALUES (
+      OLD.id,
+      'delete',
+      'pending',
+      now()
+    );
+
+    RAISE DEBUG 'Agendamento % enfileirado para DELEÇÃO no Google Calendar', OLD.id;
+  END IF;
+
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- BLOCO 4: Propagação de paciente por comando (FOR EACH STATEMENT)
+-- Substitui o trigger por linha: um único UPDATE por comando, usando as
+-- tabelas de transição. Transition tables não aceitam lista de colunas,
+-- por isso o filtro de patient_id é feito no JOIN.
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.trg_propagate_patient_for_series()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_propagated int;
+BEGIN
+  -- O próprio UPDATE de propagação dispara o trigger de novo; ignorar
+  IF pg_trigger_depth() > 1 THEN
+    RETURN NULL;
+  END IF;
+
+  WITH linked AS (
+    SELECT DISTINCT ON (n.therapist_id, n.external_calendar_id, n.recurring_event_id)
+           n.therapist_id, n.external_calendar_id, n.recurring_event_id, n.patient_id
+      FROM new_rows n
+      JOIN old_rows o ON o.id = n.id
+     WHERE o.patient_id IS NULL
+       AND n.patient_id IS NOT NULL
+       AND n.recurring_event_id IS NOT NULL
+       AND n.origin = 'google'
+     ORDER BY n.therapist_id, n.external_calendar_id, n.recurring_event_id, n.start_at
+  )
+  UPDATE cedro.appointments a
+     SET patient_id = l.patient_id,
+         updated_at = now()
+    FROM linked l
+   WHERE a.therapist_id = l.therapist_id
+     AND a.external_calendar_id = l.external_calendar_id
+     AND a.recurring_event_id = l.recurring_event_id
+     AND a.origin = 'google'
+     AND a.status <> 'cancelled'
+     AND a.patient_id IS NULL
+     AND a.start_at >= date_trunc('day', now());
+
+  GET DIAGNOSTICS v_propagated = ROW_COUNT;
+
+  IF v_propagated > 0 THEN
+    RAISE NOTICE 'Propagado paciente para % ocorrências de séries recorrentes', v_propagated;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_propagate_patient_for_series ON cedro.appointments;
+
+CREATE TRIGGER trg_propagate_patient_for_series
+AFTER UPDATE ON cedro.appointments
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION cedro.trg_propagate_patient_for_series();
+
+COMMENT ON FUNCTION cedro.trg_propagate_patient_for_series()
+  IS 'Propaga vinculação de paciente para futuras ocorrências da mesma série recorrente (um UPDATE por comando)';
+
+-- ============================================================================
+-- BLOCO 5: Enfileiramento consolidado por série
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.enqueue_series_gcal_sync(
+  p_series_id uuid,
+  p_action text,
+  p_from timestamptz DEFAULT NULL
+)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_has_gcal_enabled boolean;
+BEGIN
+  SELECT (u.google_calendar_id IS NOT NULL) INTO v_has_gcal_enabled
+    FROM cedro.appointment_series s
+    JOIN cedro.users u ON u.id = s.therapist_id
+   WHERE s.id = p_series_id;
+
+  IF NOT COALESCE(v_has_gcal_enabled, false) THEN
+    RETURN;
+  END IF;
+
+  -- Um 'create' ainda pendente já vai ler o estado atual da série
+  IF p_action <> 'create' AND EXISTS (
+    SELECT 1 FROM cedro.gcal_sync_queue q
+     WHERE q.series_id = p_series_id
+       AND q.action = 'create'
+       AND q.status = 'pending'
+  ) THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO cedro.gcal_sync_queue (series_id, series_from, action, status, created_at)
+  VALUES (p_series_id, p_from, p_action, 'pending', now());
+
+  RAISE DEBUG 'Série % enfileirada (%) para sincronização com Google Calendar', p_series_id, p_action;
+END;
+$$;
+
+-- ============================================================================
+-- BLOCO 6: RPCs de série (um comando por operação)
+-- ============================================================================
+
+-- Cria a série e todas as ocorrências com um único INSERT ... SELECT.
+-- Sem p_occurrences, usa as sessões restantes do plano de cuidado.
+CREATE OR REPLACE FUNCTION cedro.create_appointment_series(
+  p_therapist_id uuid,
+  p_first_start_at timestamptz,
+  p_duration_minutes int,
+  p_occurrences int DEFAULT NULL,
+  p_interval_weeks int DEFAULT 1,
+  p_patient_id uuid DEFAULT NULL,
+  p_service_id uuid DEFAULT NULL,
+  p_care_plan_id uuid DEFAULT NULL,
+  p_summary text DEFAULT NULL,
+  p_notes text DEFAULT NULL
+)
+RETURNS uuid
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_series_id uuid;
+  v_occurrences int;
+BEGIN
+  v_occurrences := p_occurrences;
+
+  IF v_occurrences IS NULL AND p_care_plan_id IS NOT NULL THEN
+    SELECT cp.total_sessions - cp.used_sessions INTO v_occurrences
+      FROM cedro.care_plans cp
+     WHERE cp.id = p_care_plan_id;
+  END IF;
+
+  IF v_occurrences IS NULL OR v_occurrences < 1 THEN
+    RAISE EXCEPTION 'Número de ocorrências inválido para a série (%)', v_occurrences
+      USING ERRCODE = '22023';
+  END IF;
+
+  INSERT INTO cedro.appointment_series (
+    therapist_id, patient_id, service_id, care_plan_id,
+    first_start_at, duration_minutes, interval_weeks, occurrences,
+    summary, notes
+  )
+  VALUES (
+    p_therapist_id, p_patient_id, p_service_id, p_care_plan_id,
+    p_first_start_at, p_duration_minutes, p_interval_weeks, v_occurrences,
+    p_summary, p_notes
+  )
+  RETURNING id INTO v_series_id;
+
+  PERFORM set_config('cedro.series_bulk_write', 'on', true);
+
+  -- Soma semanas no horário local para manter o "relógio de parede" fixo
+  INSERT INTO cedro.appointments (
+    therapist_id, patient_id, service_id, care_plan_id, series_id,
+    status, start_at, end_at, summary, notes, origin
+  )
+  SELECT
+    p_therapist_id, p_patient_id, p_service_id, p_care_plan_id, v_series_id,
+    'scheduled',
+    occ.start_at,
+    occ.start_at + make_interval(mins => p_duration_minutes),
+    p_summary, p_notes, 'system'
+  FROM (
+    SELECT ((p_first_start_at AT TIME ZONE 'America/Sao_Paulo')
+              + make_interval(weeks => n * p_interval_weeks))
+             AT TIME ZONE 'America/Sao_Paulo' AS start_at
+      FROM generate_series(0, v_occurrences - 1) AS n
+  ) occ;
+
+  PERFORM set_config('cedro.series_bulk_write', 'off', true);
+
+  PERFORM cedro.enqueue_series_gcal_sync(v_series_id, 'create');
+
+  RETURN v_series_id;
+END;
+$$;
+
+-- Desloca as ocorrências ativas a partir de p_from com um único UPDATE.
+-- As ocorrências deslocadas são desvinculadas do evento recorrente atual;
+-- o worker trunca o evento antigo em p_from e cria um novo para elas.
+CREATE OR REPLACE FUNCTION cedro.shift_appointment_series(
+  p_series_id uuid,
+  p_offset interval,
+  p_from timestamptz DEFAULT now()
+)
+RETURNS int
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_shifted int;
+BEGIN
+  PERFORM set_config('cedro.series_bulk_write', 'on', true);
+
+  UPDATE cedro.appointments
+     SET start_at = start_at + p_offset,
+         end_at = end_at + p_offset,
+         external_event_id = NULL,
+         recurring_event_id = NULL,
+         gcal_etag = NULL,
+         html_link = NULL,
+         updated_at = now()
+   WHERE series_id = p_series_id
+     AND start_at >= p_from
+     AND status IN ('scheduled', 'confirmed');
+
+  GET DIAGNOSTICS v_shifted = ROW_COUNT;
+
+  PERFORM set_config('cedro.series_bulk_write', 'off', true);
+
+  IF v_shifted = 0 THEN
+    RETURN 0;
+  END IF;
+
+  UPDATE cedro.appointment_series
+     SET first_start_at = CASE
+           WHEN first_start_at >= p_from THEN first_start_at + p_offset
+           ELSE first_start_at
+         END,
+         updated_at = now()
+   WHERE id = p_series_id;
+
+  PERFORM cedro.enqueue_series_gcal_sync(p_series_id, 'update', p_from);
+
+  RETURN v_shifted;
+END;
+$$;
+
+-- Cancela as ocorrências ativas a partir de p_from com um único UPDATE.
+CREATE OR REPLACE FUNCTION cedro.cancel_appointment_series(
+  p_series_id uuid,
+  p_from timestamptz DEFAULT now()
+)
+RETURNS int
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_cancelled int;
+BEGIN
+  PERFORM set_config('cedro.series_bulk_write', 'on', true);
+
+  UPDATE cedro.appointments
+     SET status = 'cancelled',
+         updated_at = now()
+   WHERE series_id = p_series_id
+     AND start_at >= p_from
+     AND status IN ('scheduled', 'confirmed');
+
+  GET DIAGNOSTICS v_cancelled = ROW_COUNT;
+
+  PERFORM set_config('cedro.series_bulk_write', 'off', true);
+
+  UPDATE cedro.appointment_series s
+     SET status = 'cancelled',
+         updated_at = now()
+   WHERE s.id = p_series_id
+     AND NOT EXISTS (
+       SELECT 1 FROM cedro.appointments a
+        WHERE a.series_id = s.id
+          AND a.status IN ('scheduled', 'confirmed')
+     );
+
+  IF v_cancelled > 0 THEN
+    PERFORM cedro.enqueue_series_gcal_sync(p_series_id, 'delete', p_from);
+  END IF;
+
+  RETURN v_cancelled;
+END;
+$$;
+
+-- Chamada pelo worker após criar o evento recorrente no Google.
+-- IDs de instância do Google são determinísticos: <eventId>_<início em UTC>,
+-- então as ocorrências são vinculadas em um único UPDATE e o eco do
+-- webhook encontra as linhas existentes em vez de criar duplicatas.
+-- p_appointment_ids: ocorrências que caem em instâncias do evento (o worker
+-- confere o espaçamento). As demais pendentes (movidas individualmente) ganham
+-- um job de create por ocorrência na mesma transação. NULL vincula todas.
+DROP FUNCTION IF EXISTS cedro.link_appointment_series_event(uuid, text, text);
+
+CREATE OR REPLACE FUNCTION cedro.link_appointment_series_event(
+  p_series_id uuid,
+  p_event_id text,
+  p_calendar_id text,
+  p_appointment_ids uuid[] DEFAULT NULL
+)
+RETURNS int
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_linked int;
+BEGIN
+  PERFORM set_config('cedro.series_bulk_write', 'on', true);
+
+  UPDATE cedro.appointments
+     SET recurring_event_id = p_event_id,
+         external_event_id = p_event_id || '_' ||
+           to_char(start_at AT TIME ZONE 'UTC', 'YYYYMMDD"T"HH24MISS"Z"'),
+         external_calendar_id = p_calendar_id,
+         updated_at = now()
+   WHERE series_id = p_series_id
+     AND recurring_event_id IS NULL
+     AND external_event_id IS NULL
+     AND status IN ('scheduled', 'confirmed')
+     AND (p_appointment_ids IS NULL OR id = ANY(p_appointment_ids));
+
+  GET DIAGNOSTICS v_linked = ROW_COUNT;
+
+  PERFORM set_config('cedro.series_bulk_write', 'off', true);
+
+  -- Fora da regra semanal: sincronizar uma a uma
+  IF p_appointment_ids IS NOT NULL THEN
+    INSERT INTO cedro.gcal_sync_queue (appointment_id, action, status, created_at)
+    SELECT a.id, 'create', 'pending', now()
+      FROM cedro.appointments a
+     WHERE a.series_id = p_series_id
+       AND a.recurring_event_id IS NULL
+       AND a.external_event_id IS NULL
+       AND a.status IN ('scheduled', 'confirmed')
+       AND NOT (a.id = ANY(p_appointment_ids))
+       AND NOT EXISTS (
+         SELECT 1 FROM cedro.gcal_sync_queue q
+          WHERE q.appointment_id = a.id
+            AND q.status IN ('pending', 'processing')
+       );
+  END IF;
+
+  UPDATE cedro.appointment_series
+     SET external_event_id = p_event_id,
+         external_calendar_id = p_calendar_id,
+         updated_at = now()
+   WHERE id = p_series_id;
+
+  RETURN v_linked;
+END;
+$$;
+
+COMMENT ON FUNCTION cedro.create_appointment_series(uuid, timestamptz, int, int, int, uuid, uuid, uuid, text, text)
+  IS 'Cria série semanal e todas as ocorrências em um comando; enfileira um único job de GCal';
+COMMENT ON FUNCTION cedro.shift_appointment_series(uuid, interval, timestamptz)
+  IS 'Desloca ocorrências ativas a partir de p_from; enfileira um único job de GCal';
+COMMENT ON FUNCTION cedro.cancel_appointment_series(uuid, timestamptz)
+  IS 'Cancela ocorrências ativas a partir de p_from; enfileira um único job de GCal';
+COMMENT ON FUNCTION cedro.link_appointment_series_event(uuid, text, text, uuid[])
+  IS 'Vincula ocorrências da série às instâncias do evento recorrente do Google';
+
+GRANT EXECUTE ON FUNCTION cedro.create_appointment_series(uuid, timestamptz, int, int, int, uuid, uuid, uuid, text, text) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION cedro.shift_appointment_series(uuid, interval, timestamptz) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION cedro.cancel_appointment_series(uuid, timestamptz) TO authenticated, service_role;
+
+-- ============================================================================
+-- VERIFICAÇÃO
+-- ============================================================================
+/*
+-- Série de 40 sessões às segundas 14h, um único job na fila:
+SELECT cedro.create_appointment_series(
+  '<therapist_id>'::uuid, '2025-03-03 14:00-03'::timestamptz, 50, 40
+);
+
+SELECT series_id, action, status FROM cedro.gcal_sync_queue
+ WHERE series_id IS NOT NULL ORDER BY created_at DESC LIMIT 5;
+*/
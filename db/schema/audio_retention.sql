@@ -0,0 +1,46 @@
+-- ============================================================================
+-- RETENÇÃO DE ÁUDIO - IDEMPOTENT MIGRATIONS
+-- Schema: cedro
+-- Purpose: Manter o armazenamento de áudio limitado (/api/cron/audio-retention):
+--          áudio de prontuários finalizados é recodificado em Opus de baixa
+--          taxa após N dias e objetos sem recording_job são removidos.
+-- ============================================================================
+-- BLOCO 1: Estado de arquivamento no job
+-- ============================================================================
+ALTER TABLE cedro.recording_jobs
+  ADD COLUMN IF NOT EXISTS audio_archived_at timestamptz,
+  ADD COLUMN IF NOT EXISTS audio_original_bytes bigint,
+  ADD COLUMN IF NOT EXISTS audio_archived_bytes bigint;
+
+COMMENT ON COLUMN cedro.recording_jobs.audio_archived_at IS 'Quando o áudio foi recodificado para o formato de arquivo (Opus 16 kbps mono)';
+COMMENT ON COLUMN cedro.recording_jobs.audio_original_bytes IS 'Tamanho do objeto antes do arquivamento';
+COMMENT ON COLUMN cedro.recording_jobs.audio_archived_bytes IS 'Tamanho do objeto depois do arquivamento';
+
+-- Candidatos ao arquivamento: prontuário gerado e áudio ainda não arquivado
+CREATE INDEX IF NOT EXISTS idx_recording_jobs_archive_candidates
+  ON cedro.recording_jobs(created_at)
+  WHERE record_id IS NOT NULL
+    AND audio_archived_at IS NULL
+    AND audio_storage_url IS NOT NULL;
+
+-- ============================================================================
+-- BLOCO 2: Histórico das execuções
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS cedro.audio_retention_runs (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  started_at timestamptz NOT NULL DEFAULT now(),
+  finished_at timestamptz,
+  dry_run boolean NOT NULL DEFAULT false,
+  archived_objects int NOT NULL DEFAULT 0,
+  deleted_orphans int NOT NULL DEFAULT 0,
+  reclaimed_bytes bigint NOT NULL DEFAULT 0,
+  errors jsonb NOT NULL DEFAULT '[]'::jsonb
+);
+
+CREATE INDEX IF NOT EXISTS idx_audio_retention_runs_started
+  ON cedro.audio_retention_runs(started_at DESC);
+
+COMMENT ON TABLE cedro.audio_retention_runs IS 'Uma linha por execução do cron de retenção de áudio, com os bytes recuperados';
+
+GRANT SELECT ON cedro.audio_retention_runs TO authenticated;
+GRANT SELECT, INSERT, UPDATE, DELETE ON cedro.audio_retention_runs TO service_role;
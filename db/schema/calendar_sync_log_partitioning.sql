@@ -0,0 +1,149 @@
+-- ============================================================================
+-- PARTICIONAMENTO E RETENÇÃO DO calendar_sync_log - IDEMPOTENT MIGRATIONS
+-- Schema: cedro
+-- Purpose: calendar_sync_log cresce sem limite. Particionar por mês
+--          (created_at) permite descartar histórico antigo com DROP de
+--          partição, sem DELETE em massa nem inchaço dos índices.
+--          Executado pelo cron /api/cron/sync-log-retention.
+-- ============================================================================
+-- BLOCO 1: Criação de partições mensais
+-- Partições nomeadas calendar_sync_log_pYYYYMM
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.ensure_calendar_sync_log_partitions(
+  p_from date DEFAULT current_date,
+  p_months_ahead int DEFAULT 3
+)
+RETURNS int
+LANGUAGE plpgsql
+SET search_path = cedro, public
+AS $$
+DECLARE
+  v_month date := date_trunc('month', p_from)::date;
+  v_last date := (date_trunc('month', current_date) + make_interval(months => p_months_ahead))::date;
+  v_name text;
+  v_created int := 0;
+BEGIN
+  WHILE v_month <= v_last LOOP
+    v_name := 'calendar_sync_log_p' || to_char(v_month, 'YYYYMM');
+
+    IF to_regclass('cedro.' || v_name) IS NULL THEN
+      EXECUTE format(
+        'CREATE TABLE cedro.%I PARTITION OF cedro.calendar_sync_log FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_month, (v_month + interval '1 month')::date
+      );
+      v_created := v_created + 1;
+    END IF;
+
+    v_month := (v_month + interval '1 month')::date;
+  END LOOP;
+
+  RETURN v_created;
+END;
+$$;
+
+COMMENT ON FUNCTION cedro.ensure_calendar_sync_log_partitions IS 'Cria as partições mensais de calendar_sync_log desde p_from até p_months_ahead meses à frente';
+
+-- ============================================================================
+-- BLOCO 2: Conversão da tabela existente em tabela particionada
+-- Só roda uma vez: renomeia a tabela antiga, cria a particionada, copia os
+-- dados e remove a antiga.
+-- ============================================================================
+DO $$
+DECLARE
+  v_oldest date;
+BEGIN
+  IF EXISTS (
+    SELECT 1
+      FROM pg_partitioned_table pt
+      JOIN pg_class c ON c.oid = pt.partrelid
+      JOIN pg_namespace n ON n.oid = c.relnamespace
+     WHERE n.nspname = 'cedro' AND c.relname = 'calendar_sync_log'
+  ) THEN
+    RETURN;
+  END IF;
+
+  ALTER TABLE cedro.calendar_sync_log RENAME TO calendar_sync_log_legacy;
+  ALTER INDEX IF EXISTS cedro.calendar_sync_log_pkey RENAME TO calendar_sync_log_legacy_pkey;
+  DROP INDEX IF EXISTS cedro.idx_sync_log_event;
+  DROP INDEX IF EXISTS cedro.idx_sync_log_created;
+  DROP INDEX IF EXISTS cedro.idx_sync_log_calendar;
+
+  CREATE TABLE cedro.calendar_sync_log (
+    id uuid NOT NULL DEFAULT gen_random_uuid(),
+    event_id    text,
+    calendar_id text,
+    action      text NOT NULL,
+    direction   text NOT NULL CHECK (direction IN ('cedro_to_google', 'google_to_cedro')),
+    status      text NOT NULL CHECK (status IN ('success', 'error', 'skipped')),
+    error_message text,
+    payload     jsonb,
+    created_at  timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, created_at)
+  ) PARTITION BY RANGE (created_at);
+
+  SELECT coalesce(min(created_at), now())::date INTO v_oldest FROM cedro.calendar_sync_log_legacy;
+  PERFORM cedro.ensure_calendar_sync_log_partitions(v_oldest, 3);
+
+  INSERT INTO cedro.calendar_sync_log
+    (id, event_id, calendar_id, action, direction, status, error_message, payload, created_at)
+  SELECT id, event_id, calendar_id, action, direction, status, error_message, payload,
+         coalesce(created_at, now())
+    FROM cedro.calendar_sync_log_legacy;
+
+  DROP TABLE cedro.calendar_sync_log_legacy;
+END $$;
+
+-- Índices no pai são criados em cada partição (consultas de getSyncHistory)
+CREATE INDEX IF NOT EXISTS idx_sync_log_event ON cedro.calendar_sync_log(event_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_sync_log_calendar ON cedro.calendar_sync_log(calendar_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_sync_log_created ON cedro.calendar_sync_log(created_at DESC);
+
+COMMENT ON TABLE cedro.calendar_sync_log IS 'Log de auditoria para todas as operações de sincronização (particionado por mês em created_at)';
+COMMENT ON COLUMN cedro.calendar_sync_log.direction IS 'cedro_to_google (Cedro enviando para GCal) ou google_to_cedro (GCal enviando para Cedro)';
+COMMENT ON COLUMN cedro.calendar_sync_log.payload IS 'Payload JSON da operação (request/response sanitizado)';
+
+-- Garante as partições do mês corrente em diante mesmo se a conversão já tinha rodado
+SELECT cedro.ensure_calendar_sync_log_partitions();
+
+-- ============================================================================
+-- BLOCO 3: Retenção
+-- Remove partições inteiras anteriores a p_retention_months meses
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.drop_calendar_sync_log_partitions(
+  p_retention_months int DEFAULT 6
+)
+RETURNS TABLE (partition_name text)
+LANGUAGE plpgsql
+SET search_path = cedro, public
+AS $$
+DECLARE
+  v_cutoff text := to_char(date_trunc('month', current_date) - make_interval(months => greatest(p_retention_months, 1)), 'YYYYMM');
+  v_partition record;
+BEGIN
+  FOR v_partition IN
+    SELECT c.relname
+      FROM pg_inherits i
+      JOIN pg_class c ON c.oid = i.inhrelid
+      JOIN pg_class p ON p.oid = i.inhparent
+      JOIN pg_namespace n ON n.oid = p.relnamespace
+     WHERE n.nspname = 'cedro'
+       AND p.relname = 'calendar_sync_log'
+       AND c.relname ~ '^calendar_sync_log_p[0-9]{6}$'
+       AND substring(c.relname FROM '[0-9]{6}$') < v_cutoff
+     ORDER BY c.relname
+  LOOP
+    EXECUTE format('DROP TABLE cedro.%I', v_partition.relname);
+    partition_name := v_partition.relname;
+    RETURN NEXT;
+  END LOOP;
+END;
+$$;
+
+COMMENT ON FUNCTION cedro.drop_calendar_sync_log_partitions IS 'Remove partições de calendar_sync_log mais antigas que p_retention_months meses (o mês corrente nunca é removido)';
+
+GRANT SELECT ON cedro.calendar_sync_log TO authenticated;
+GRANT SELECT, INSERT, UPDATE, DELETE ON cedro.calendar_sync_log TO service_role;
+REVOKE ALL ON FUNCTION cedro.ensure_calendar_sync_log_partitions(date, int) FROM PUBLIC;
+REVOKE ALL ON FUNCTION cedro.drop_calendar_sync_log_partitions(int) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION cedro.ensure_calendar_sync_log_partitions(date, int) TO service_role;
+GRANT EXECUTE ON FUNCTION cedro.drop_calendar_sync_log_partitions(int) TO service_role;
@@ -0,0 +1,120 @@
+-- ============================================================================
+-- CONSUMO ATÔMICO DE SESSÕES DOS PLANOS DE CUIDADO - IDEMPOTENT MIGRATIONS
+-- Schema: cedro
+-- Purpose: Concluir atendimentos e descontar as sessões dos planos numa única
+--          transação (sem ler-e-depois-gravar used_sessions no cliente, que
+--          perdia incrementos concorrentes) e indexar os planos com sessões
+--          restantes.
+-- ============================================================================
+-- BLOCO 1: Sessões restantes
+-- Coluna gerada (total - usadas) + índice parcial para getCarePlansNeedingSessions
+-- ============================================================================
+ALTER TABLE cedro.care_plans
+  ADD COLUMN IF NOT EXISTS remaining_sessions int
+  GENERATED ALWAYS AS (total_sessions - used_sessions) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_care_plans_needing_sessions
+  ON cedro.care_plans(updated_at)
+  WHERE status = 'active' AND remaining_sessions > 0;
+
+COMMENT ON COLUMN cedro.care_plans.remaining_sessions IS 'Sessões ainda disponíveis no plano (total_sessions - used_sessions), calculada pelo banco';
+
+-- ============================================================================
+-- BLOCO 2: Consumo de uma sessão
+-- UPDATE condicional: o próprio lock da linha serializa chamadas concorrentes
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.consume_care_plan_session(p_care_plan_id uuid)
+RETURNS SETOF cedro.care_plans
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  RETURN QUERY
+  UPDATE cedro.care_plans
+     SET used_sessions = used_sessions + 1,
+         updated_at = now()
+   WHERE id = p_care_plan_id
+     AND used_sessions < total_sessions
+  RETURNING *;
+
+  IF NOT FOUND THEN
+    IF EXISTS (SELECT 1 FROM cedro.care_plans WHERE id = p_care_plan_id) THEN
+      RAISE EXCEPTION 'All sessions have been used' USING ERRCODE = 'P0001';
+    END IF;
+    RAISE EXCEPTION 'Care plan not found' USING ERRCODE = 'P0002';
+  END IF;
+END;
+$$;
+
+-- ============================================================================
+-- BLOCO 3: Conclusão em lote
+-- Marca como concluídos os atendimentos ainda não concluídos e desconta, por
+-- plano, uma sessão por atendimento (limitado às sessões restantes).
+-- Idempotente: repetir a chamada não desconta de novo.
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.complete_appointments(p_appointment_ids uuid[])
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_completed int := 0;
+  v_plan_ids uuid[];
+  v_plans jsonb := '[]'::jsonb;
+  v_plan record;
+  v_used int;
+  v_total int;
+  v_consumed int;
+BEGIN
+  WITH completed AS (
+    UPDATE cedro.appointments a
+       SET status = 'completed',
+           updated_at = now()
+     WHERE a.id = ANY(p_appointment_ids)
+       AND a.status <> 'completed'
+    RETURNING a.care_plan_id
+  )
+  SELECT count(*)::int,
+         coalesce(array_agg(care_plan_id) FILTER (WHERE care_plan_id IS NOT NULL), '{}')
+    INTO v_completed, v_plan_ids
+    FROM completed;
+
+  -- Ordem fixa de plano evita deadlock entre conclusões concorrentes
+  FOR v_plan IN
+    SELECT plan_id AS care_plan_id, count(*)::int AS sessions
+      FROM unnest(v_plan_ids) AS plan_id
+     GROUP BY plan_id
+     ORDER BY plan_id
+  LOOP
+    SELECT used_sessions, total_sessions
+      INTO v_used, v_total
+      FROM cedro.care_plans
+     WHERE id = v_plan.care_plan_id
+       FOR UPDATE;
+
+    CONTINUE WHEN NOT FOUND;
+
+    v_consumed := least(v_plan.sessions, greatest(v_total - v_used, 0));
+
+    IF v_consumed > 0 THEN
+      UPDATE cedro.care_plans
+         SET used_sessions = used_sessions + v_consumed,
+             updated_at = now()
+       WHERE id = v_plan.care_plan_id;
+    END IF;
+
+    v_plans := v_plans || jsonb_build_object(
+      'care_plan_id', v_plan.care_plan_id,
+      'consumed_sessions', v_consumed,
+      -- Atendimentos concluídos além do saldo do plano
+      'over_limit', v_plan.sessions - v_consumed,
+      'remaining_sessions', v_total - v_used - v_consumed
+    );
+  END LOOP;
+
+  RETURN jsonb_build_object('completed', v_completed, 'care_plans', v_plans);
+END;
+$$;
+
+COMMENT ON FUNCTION cedro.complete_appointments IS 'Conclui os atendimentos informados e desconta as sessões dos planos de cuidado na mesma transação';
+
+GRANT EXECUTE ON FUNCTION cedro.consume_care_plan_session(uuid) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION cedro.complete_appointments(uuid[]) TO authenticated, service_role;
@@ -0,0 +1,76 @@
+-- ============================================================================
+-- KANBAN DO CRM PAGINADO - IDEMPOTENT MIGRATIONS
+-- Schema: cedro
+-- Purpose: Carregar o kanban por etapa (páginas por cursor em vez da lista
+--          inteira de leads), contar os leads de cada etapa no banco e gravar
+--          as mudanças de etapa/posição em lote (uma chamada para vários
+--          arrastes, em vez de um updateLead por movimento).
+-- ============================================================================
+-- BLOCO 1: Posição no quadro
+-- Maior posição = topo da coluna. O valor inicial é o epoch de criação, o que
+-- mantém a ordem atual (mais recentes primeiro) e põe leads novos no topo.
+-- Entre dois cards a posição é a média dos vizinhos (sem renumerar a coluna).
+-- ============================================================================
+ALTER TABLE cedro.crm_leads
+  ADD COLUMN IF NOT EXISTS board_position double precision;
+
+UPDATE cedro.crm_leads
+   SET board_position = extract(epoch FROM created_at)
+ WHERE board_position IS NULL;
+
+ALTER TABLE cedro.crm_leads
+  ALTER COLUMN board_position SET DEFAULT extract(epoch FROM now()),
+  ALTER COLUMN board_position SET NOT NULL;
+
+-- Página de uma coluna: WHERE stage = ? AND (board_position, id) < cursor
+CREATE INDEX IF NOT EXISTS idx_crm_leads_stage_position
+  ON cedro.crm_leads(stage, board_position DESC, id DESC);
+
+COMMENT ON COLUMN cedro.crm_leads.board_position IS 'Ordem do lead na coluna do kanban (maior = topo)';
+
+-- ============================================================================
+-- BLOCO 2: Contagem por etapa
+-- Mesmos filtros do quadro (busca em nome/e-mail/telefone e fontes)
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.crm_lead_stage_counts(
+  p_search text DEFAULT NULL,
+  p_sources text[] DEFAULT NULL
+)
+RETURNS TABLE (stage text, total bigint)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT l.stage::text, count(*)
+    FROM cedro.crm_leads l
+   WHERE (p_search IS NULL OR p_search = ''
+          OR l.name ILIKE '%' || p_search || '%'
+          OR l.email ILIKE '%' || p_search || '%'
+          OR l.phone ILIKE '%' || p_search || '%')
+     AND (p_sources IS NULL OR cardinality(p_sources) = 0 OR l.source = ANY(p_sources))
+   GROUP BY l.stage;
+$$;
+
+-- ============================================================================
+-- BLOCO 3: Movimentos em lote
+-- p_moves: [{ "id": uuid, "stage": text, "board_position": number }]
+-- Aplica todos os movimentos num único UPDATE e devolve as linhas alteradas.
+-- jsonb_populate_recordset usa os tipos da própria tabela (stage inclusive).
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.move_crm_leads(p_moves jsonb)
+RETURNS SETOF cedro.crm_leads
+LANGUAGE sql
+AS $$
+  UPDATE cedro.crm_leads l
+     SET stage = m.stage,
+         board_position = coalesce(m.board_position, l.board_position),
+         updated_at = now()
+    FROM jsonb_populate_recordset(NULL::cedro.crm_leads, p_moves) AS m
+   WHERE l.id = m.id
+     AND m.stage IS NOT NULL
+  RETURNING l.*;
+$$;
+
+COMMENT ON FUNCTION cedro.move_crm_leads IS 'Aplica em lote as mudanças de etapa/posição feitas no kanban do CRM';
+
+GRANT EXECUTE ON FUNCTION cedro.crm_lead_stage_counts(text, text[]) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION cedro.move_crm_leads(jsonb) TO authenticated, service_role;
@@ -0,0 +1,144 @@
+-- ============================================================================
+-- COALESCÊNCIA DE NOTIFICAÇÕES DO GOOGLE CALENDAR - IDEMPOTENT MIGRATIONS
+-- Schema: cedro
+-- Purpose: O webhook (/api/gcal/webhook) só registra a notificação; o worker
+--          /api/cron/process-gcal-notifications roda no máximo um sync
+--          incremental por calendário por janela curta, com lock por calendário.
+-- ============================================================================
+-- BLOCO 1: Estado de notificação pendente e lock no sync_state
+-- ============================================================================
+ALTER TABLE cedro.google_calendar_sync_state
+  ADD COLUMN IF NOT EXISTS pending_since timestamptz,
+  ADD COLUMN IF NOT EXISTS last_notified_at timestamptz,
+  ADD COLUMN IF NOT EXISTS pending_full_sync boolean NOT NULL DEFAULT false,
+  ADD COLUMN IF NOT EXISTS notification_count int NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS sync_locked_until timestamptz,
+  ADD COLUMN IF NOT EXISTS sync_lock_owner uuid;
+
+COMMENT ON COLUMN cedro.google_calendar_sync_state.pending_since IS 'Primeira notificação ainda não sincronizada (NULL = nada pendente)';
+COMMENT ON COLUMN cedro.google_calendar_sync_state.last_notified_at IS 'Última notificação recebida; o sync espera o calendário ficar quieto (debounce)';
+COMMENT ON COLUMN cedro.google_calendar_sync_state.pending_full_sync IS 'Alguma notificação pendente exige full sync (resource_state=sync ou token expirado)';
+COMMENT ON COLUMN cedro.google_calendar_sync_state.notification_count IS 'Notificações coalescidas no sync pendente';
+COMMENT ON COLUMN cedro.google_calendar_sync_state.sync_locked_until IS 'Lease do worker que está sincronizando o calendário';
+COMMENT ON COLUMN cedro.google_calendar_sync_state.sync_lock_owner IS 'Dono do lease (só ele pode liberar o lock)';
+
+-- Calendários com notificação pendente (o worker varre só estes)
+CREATE INDEX IF NOT EXISTS idx_sync_state_pending
+  ON cedro.google_calendar_sync_state(pending_since)
+  WHERE pending_since IS NOT NULL;
+
+-- ============================================================================
+-- BLOCO 2: Registrar notificação (chamado pelo webhook)
+-- Um único UPDATE atômico: rajadas de notificações viram um só sync pendente
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.record_gcal_notification(
+  p_calendar_id text,
+  p_full_sync boolean DEFAULT false
+)
+RETURNS boolean
+LANGUAGE sql
+AS $$
+  UPDATE cedro.google_calendar_sync_state
+     SET pending_since = coalesce(pending_since, now()),
+         last_notified_at = now(),
+         pending_full_sync = pending_full_sync OR coalesce(p_full_sync, false),
+         notification_count = notification_count + 1,
+         updated_at = now()
+   WHERE calendar_id = p_calendar_id
+  RETURNING true;
+$$;
+
+COMMENT ON FUNCTION cedro.record_gcal_notification(text, boolean) IS 'Marca o calendário como pendente de sync; retorna NULL se não houver sync_state';
+
+-- ============================================================================
+-- BLOCO 3: Reservar calendários prontos para sync (chamado pelo worker)
+-- Pronto = pendente, sem lease válido e quieto há p_debounce (ou pendente há
+-- mais de p_max_wait, para rajadas contínuas não adiarem o sync para sempre).
+-- As marcas pendentes são limpas na reserva: notificações que chegarem durante
+-- o sync geram um novo pendente e um novo sync na janela seguinte.
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.claim_gcal_syncs(
+  p_debounce interval DEFAULT interval '10 seconds',
+  p_max_wait interval DEFAULT interval '60 seconds',
+  p_lease interval DEFAULT interval '5 minutes',
+  p_limit int DEFAULT 10
+)
+RETURNS TABLE (
+  calendar_id text,
+  sync_token text,
+  full_sync boolean,
+  notification_count int,
+  lock_owner uuid
+)
+LANGUAGE sql
+AS $$
+  WITH due AS (
+    SELECT s.calendar_id, s.pending_full_sync, s.notification_count
+      FROM cedro.google_calendar_sync_state s
+     WHERE s.pending_since IS NOT NULL
+       AND (s.sync_locked_until IS NULL OR s.sync_locked_until < now())
+       AND (s.last_notified_at <= now() - p_debounce
+            OR s.pending_since <= now() - p_max_wait)
+     ORDER BY s.pending_since
+     LIMIT p_limit
+     FOR UPDATE SKIP LOCKED
+  )
+  UPDATE cedro.google_calendar_sync_state s
+     SET sync_locked_until = now() + p_lease,
+         sync_lock_owner = gen_random_uuid(),
+         pending_since = NULL,
+         pending_full_sync = false,
+         notification_count = 0,
+         updated_at = now()
+    FROM due d
+   WHERE s.calendar_id = d.calendar_id
+  RETURNING s.calendar_id,
+            s.sync_token,
+            d.pending_full_sync OR s.sync_token IS NULL,
+            d.notification_count,
+            s.sync_lock_owner;
+$$;
+
+COMMENT ON FUNCTION cedro.claim_gcal_syncs(interval, interval, interval, int) IS 'Reserva (lease) até p_limit calendários com notificações pendentes e já quietos';
+
+-- ============================================================================
+-- BLOCO 4: Liberar o lock ao fim do sync
+-- Só o dono do lease libera. Em sucesso grava o novo sync_token; em falha o
+-- calendário volta a ficar pendente (com full sync se pedido) para nova tentativa.
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.release_gcal_sync(
+  p_calendar_id text,
+  p_lock_owner uuid,
+  p_success boolean,
+  p_sync_token text DEFAULT NULL,
+  p_retry_full_sync boolean DEFAULT false
+)
+RETURNS boolean
+LANGUAGE sql
+AS $$
+  UPDATE cedro.google_calendar_sync_state
+     SET sync_locked_until = NULL,
+         sync_lock_owner = NULL,
+         sync_token = CASE WHEN p_success THEN coalesce(p_sync_token, sync_token) ELSE sync_token END,
+         last_sync_at = CASE WHEN p_success THEN now() ELSE last_sync_at END,
+         pending_since = CASE WHEN p_success THEN pending_since ELSE coalesce(pending_since, now()) END,
+         last_notified_at = CASE WHEN p_success THEN last_notified_at ELSE now() END,
+         pending_full_sync = pending_full_sync OR (NOT p_success AND coalesce(p_retry_full_sync, false)),
+         updated_at = now()
+   WHERE calendar_id = p_calendar_id
+     AND sync_lock_owner = p_lock_owner
+  RETURNING true;
+$$;
+
+COMMENT ON FUNCTION cedro.release_gcal_sync(text, uuid, boolean, text, boolean) IS 'Libera o lease de sync do calendário; retorna NULL se o lease já não pertence ao chamador';
+
+-- ============================================================================
+-- BLOCO 5: Permissões
+-- ============================================================================
+-- Só o webhook e o worker (service_role) chamam estas funções
+REVOKE ALL ON FUNCTION cedro.record_gcal_notification(text, boolean) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION cedro.claim_gcal_syncs(interval, interval, interval, int) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION cedro.release_gcal_sync(text, uuid, boolean, text, boolean) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION cedro.record_gcal_notification(text, boolean) TO service_role;
+GRANT EXECUTE ON FUNCTION cedro.claim_gcal_syncs(interval, interval, interval, int) TO service_role;
+GRANT EXECUTE ON FUNCTION cedro.release_gcal_sync(text, uuid, boolean, text, boolean) TO service_role;
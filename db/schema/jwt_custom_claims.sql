@@ -0,0 +1,70 @@
+-- ============================================================================
+-- CLAIMS CUSTOMIZADAS NO JWT (CUSTOM ACCESS TOKEN HOOK) - IDEMPOTENT MIGRATIONS
+-- Schema: cedro
+-- Purpose: Embutir o id e o papel do usuário em cedro.users no access token,
+--          para que checagens de identidade/papel (getCurrentCedroUser,
+--          hasRole, rotas de API) não precisem consultar o banco.
+--
+-- Ativação (uma vez, no painel do Supabase):
+--   Authentication > Hooks > Custom Access Token > cedro.custom_access_token_hook
+--
+-- Invalidação: o hook roda a cada emissão/refresh de token, então uma troca
+-- de papel vale a partir do próximo refresh (no máximo a validade do JWT).
+-- O cliente força o refresh com refreshCedroClaims() (src/lib/auth.ts).
+-- ============================================================================
+-- BLOCO 1: Hook
+-- Busca pelo id do auth (caso normal) ou pelo email (usuário legado ainda não
+-- migrado por sync_user_id). Sem registro em cedro.users, o token sai sem as
+-- claims e o cliente cai no caminho antigo (mapAuthUserToCedroUser).
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.custom_access_token_hook(event jsonb)
+RETURNS jsonb
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+  v_claims jsonb := coalesce(event->'claims', '{}'::jsonb);
+  v_user record;
+BEGIN
+  SELECT u.id, u.role
+    INTO v_user
+    FROM cedro.users u
+   WHERE u.id = (event->>'user_id')::uuid;
+
+  IF NOT FOUND AND v_claims->>'email' IS NOT NULL THEN
+    SELECT u.id, u.role
+      INTO v_user
+      FROM cedro.users u
+     WHERE u.email = v_claims->>'email';
+  END IF;
+
+  IF v_user.id IS NOT NULL THEN
+    v_claims := v_claims
+      || jsonb_build_object('cedro_user_id', v_user.id, 'cedro_role', v_user.role::text);
+  ELSE
+    v_claims := v_claims - 'cedro_user_id' - 'cedro_role';
+  END IF;
+
+  RETURN jsonb_set(event, '{claims}', v_claims);
+END;
+$$;
+
+COMMENT ON FUNCTION cedro.custom_access_token_hook IS 'Custom Access Token Hook do Supabase Auth: adiciona cedro_user_id e cedro_role às claims do JWT';
+
+-- ============================================================================
+-- BLOCO 2: Permissões
+-- O hook é executado pelo papel supabase_auth_admin e não deve ser chamável
+-- pela API (authenticated/anon)
+-- ============================================================================
+GRANT USAGE ON SCHEMA cedro TO supabase_auth_admin;
+GRANT SELECT (id, email, role) ON cedro.users TO supabase_auth_admin;
+GRANT EXECUTE ON FUNCTION cedro.custom_access_token_hook(jsonb) TO supabase_auth_admin;
+REVOKE EXECUTE ON FUNCTION cedro.custom_access_token_hook(jsonb) FROM authenticated, anon, PUBLIC;
+
+-- Com RLS ativo em cedro.users, o papel do Auth precisa de uma policy própria
+DROP POLICY IF EXISTS "Auth admin can read users for token claims" ON cedro.users;
+CREATE POLICY "Auth admin can read users for token claims"
+  ON cedro.users
+  AS PERMISSIVE FOR SELECT
+  TO supabase_auth_admin
+  USING (true);
@@ -0,0 +1,67 @@
+-- ============================================================================
+-- TRANSCRIÇÃO AO VIVO DE TELECONSULTAS - IDEMPOTENT MIGRATIONS
+-- Schema: cedro
+-- Purpose: Transcrever a gravação em janelas enquanto a sessão acontece
+--          (/api/audio/live/*), para que a transcrição esteja pronta
+--          segundos depois de a gravação terminar.
+-- ============================================================================
+-- BLOCO 1: Estado da gravação ao vivo no job
+-- ============================================================================
+ALTER TABLE cedro.recording_jobs
+  ADD COLUMN IF NOT EXISTS live_transcription boolean NOT NULL DEFAULT false,
+  ADD COLUMN IF NOT EXISTS live_chunks_received int NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS live_audio_seconds numeric NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS live_transcribed_until numeric NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN cedro.recording_jobs.live_transcription IS 'Job criado pela gravação ao vivo (chunks enviados durante a sessão)';
+COMMENT ON COLUMN cedro.recording_jobs.live_chunks_received IS 'Próximo chunk_index esperado; reenvios com índice menor são ignorados';
+COMMENT ON COLUMN cedro.recording_jobs.live_audio_seconds IS 'Segundos de áudio recebidos até agora';
+COMMENT ON COLUMN cedro.recording_jobs.live_transcribed_until IS 'Segundos de áudio já transcritos';
+
+-- ============================================================================
+-- BLOCO 2: Segmentos transcritos
+-- Janelas com ~2s de sobreposição; o texto final é costurado em ordem
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS cedro.recording_job_segments (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  recording_job_id uuid NOT NULL REFERENCES cedro.recording_jobs(id) ON DELETE CASCADE,
+  segment_index int NOT NULL,
+  start_seconds numeric NOT NULL,
+  end_seconds numeric NOT NULL,
+  text text NOT NULL DEFAULT '',
+  created_at timestamptz DEFAULT now(),
+  UNIQUE (recording_job_id, segment_index)
+);
+
+CREATE INDEX IF NOT EXISTS idx_recording_job_segments_job
+  ON cedro.recording_job_segments(recording_job_id, segment_index);
+
+COMMENT ON TABLE cedro.recording_job_segments IS 'Transcrição incremental por janela de áudio da gravação ao vivo';
+
+-- Transcrição de sessão: só o terapeuta do job (e admins) lê ou escreve
+ALTER TABLE cedro.recording_job_segments ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Therapists manage segments of their recording jobs" ON cedro.recording_job_segments;
+CREATE POLICY "Therapists manage segments of their recording jobs"
+  ON cedro.recording_job_segments
+  AS PERMISSIVE FOR ALL
+  TO authenticated
+  USING (EXISTS (
+    SELECT 1 FROM cedro.recording_jobs rj
+    WHERE rj.id = recording_job_segments.recording_job_id
+      AND (
+        rj.therapist_id = auth.uid()
+        OR EXISTS (SELECT 1 FROM cedro.users u WHERE u.id = auth.uid() AND u.role = 'admin')
+      )
+  ))
+  WITH CHECK (EXISTS (
+    SELECT 1 FROM cedro.recording_jobs rj
+    WHERE rj.id = recording_job_segments.recording_job_id
+      AND (
+        rj.therapist_id = auth.uid()
+        OR EXISTS (SELECT 1 FROM cedro.users u WHERE u.id = auth.uid() AND u.role = 'admin')
+      )
+  ));
+
+REVOKE ALL ON cedro.recording_job_segments FROM anon;
+GRANT SELECT, INSERT, UPDATE, DELETE ON cedro.recording_job_segments TO authenticated, service_role;
@@ -0,0 +1,187 @@
+-- ============================================================================
+-- BUSCA TEXTUAL EM PRONTUÁRIOS - IDEMPOTENT MIGRATIONS
+-- Schema: cedro
+-- Purpose: Encontrar "a sessão em que X foi discutido" sem abrir prontuário
+--          por prontuário: tsvector em português (título, notas e transcrição)
+--          com índice GIN e uma RPC ranqueada com trechos destacados.
+-- ============================================================================
+-- BLOCO 1: Texto pesquisável extraído de content_json
+-- Mesmas fontes lidas no cliente por getMedicalRecordContent/Transcription
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.medical_record_notes_text(p_content jsonb)
+RETURNS text
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT CASE
+    WHEN p_content IS NULL THEN ''
+    WHEN jsonb_typeof(p_content) = 'string' THEN p_content #>> '{}'
+    ELSE concat_ws(E'\n',
+      p_content->>'markdown_content',
+      p_content->>'content',
+      -- Estrutura SOAP (subjetivo/objetivo/avaliacao/plano): só os valores texto
+      CASE WHEN jsonb_typeof(p_content->'conteudo') = 'object' THEN (
+        SELECT string_agg(value #>> '{}', E'\n')
+          FROM jsonb_path_query(p_content->'conteudo', 'strict $.**') AS value
+         WHERE jsonb_typeof(value) = 'string'
+      ) END
+    )
+  END
+$$;
+
+CREATE OR REPLACE FUNCTION cedro.medical_record_transcript_text(p_content jsonb)
+RETURNS text
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT CASE
+    WHEN p_content IS NULL OR jsonb_typeof(p_content) <> 'object' THEN ''
+    ELSE coalesce(p_content->>'raw_transcript', p_content->>'transcription', '')
+  END
+$$;
+
+-- ============================================================================
+-- BLOCO 2: Coluna tsvector + índice GIN
+-- Pesos: título (A), notas (B), transcrição (C)
+-- ============================================================================
+ALTER TABLE cedro.medical_records
+  ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+CREATE OR REPLACE FUNCTION cedro.trg_medical_records_search_vector()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.search_vector :=
+    setweight(to_tsvector('portuguese', coalesce(NEW.content_json->>'title', '')), 'A') ||
+    setweight(to_tsvector('portuguese', cedro.medical_record_notes_text(NEW.content_json)), 'B') ||
+    setweight(to_tsvector('portuguese', cedro.medical_record_transcript_text(NEW.content_json)), 'C');
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Cobre o INSERT do /api/n8n/callback e o UPDATE de updateMedicalRecord
+DROP TRIGGER IF EXISTS trg_medical_records_search_vector ON cedro.medical_records;
+CREATE TRIGGER trg_medical_records_search_vector
+  BEFORE INSERT OR UPDATE OF content_json ON cedro.medical_records
+  FOR EACH ROW
+  EXECUTE FUNCTION cedro.trg_medical_records_search_vector();
+
+-- Backfill dos registros existentes (o trigger calcula o vetor)
+UPDATE cedro.medical_records
+   SET content_json = content_json
+ WHERE search_vector IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_medical_records_search
+  ON cedro.medical_records USING GIN (search_vector);
+
+COMMENT ON COLUMN cedro.medical_records.search_vector IS 'tsvector (portuguese) de título, notas e transcrição; mantido por trigger';
+
+-- ============================================================================
+-- BLOCO 3: RPC de busca
+-- Terapeutas só enxergam prontuários dos próprios pacientes; admin pode
+-- filtrar por terapeuta ou buscar em todos. O ts_headline roda apenas nas
+-- linhas da página (é o passo caro em transcrições longas).
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.search_medical_records(
+  p_query text,
+  p_therapist_id uuid DEFAULT NULL,
+  p_limit int DEFAULT 20,
+  p_offset int DEFAULT 0
+)
+RETURNS TABLE (
+  id uuid,
+  patient_id uuid,
+  patient_name text,
+  appointment_id uuid,
+  note_type text,
+  title text,
+  created_at timestamptz,
+  rank real,
+  snippet text
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = cedro, public
+AS $$
+#variable_conflict use_column
+DECLARE
+  v_caller uuid := auth.uid();
+  v_role text;
+  v_query tsquery;
+BEGIN
+  IF coalesce(trim(p_query), '') = '' THEN
+    RETURN;
+  END IF;
+
+  -- SECURITY DEFINER: sem usuário na sessão só o service_role passa (sem escopo)
+  IF v_caller IS NULL THEN
+    IF auth.role() IS DISTINCT FROM 'service_role' THEN
+      RAISE EXCEPTION 'search_medical_records requer usuário autenticado'
+        USING ERRCODE = '42501';
+    END IF;
+  ELSE
+    -- Não-admin fica restrito aos próprios pacientes
+    SELECT u.role INTO v_role FROM cedro.users u WHERE u.id = v_caller;
+    IF v_role IS DISTINCT FROM 'admin' THEN
+      p_therapist_id := v_caller;
+    END IF;
+  END IF;
+
+  v_query := websearch_to_tsquery('portuguese', p_query);
+
+  RETURN QUERY
+  WITH ranked AS (
+    SELECT mr.id,
+           mr.patient_id,
+           mr.appointment_id,
+           mr.note_type::text AS note_type,
+           mr.content_json,
+           mr.created_at,
+           ts_rank_cd(mr.search_vector, v_query) AS rank
+      FROM cedro.medical_records mr
+     WHERE mr.search_vector @@ v_query
+       AND (
+         p_therapist_id IS NULL
+         OR EXISTS (
+           SELECT 1 FROM cedro.patient_therapist_links l
+            WHERE l.patient_id = mr.patient_id
+              AND l.therapist_id = p_therapist_id
+         )
+         OR EXISTS (
+           SELECT 1 FROM cedro.patients p
+            WHERE p.id = mr.patient_id
+              AND p.therapist_id = p_therapist_id
+         )
+       )
+     ORDER BY 7 DESC, mr.created_at DESC
+     LIMIT least(greatest(p_limit, 1), 100)
+    OFFSET greatest(p_offset, 0)
+  )
+  SELECT r.id,
+         r.patient_id,
+         p.full_name::text,
+         r.appointment_id,
+         r.note_type,
+         coalesce(r.content_json->>'title', ''),
+         r.created_at,
+         r.rank,
+         -- Texto escapado antes do destaque: o snippet pode ser renderizado como HTML
+         ts_headline(
+           'portuguese',
+           replace(replace(replace(
+             concat_ws(E'\n', cedro.medical_record_notes_text(r.content_json),
+                              cedro.medical_record_transcript_text(r.content_json)),
+             '&', '&amp;'), '<', '&lt;'), '>', '&gt;'),
+           v_query,
+           'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10, FragmentDelimiter=" … "'
+         )
+    FROM ranked r
+    LEFT JOIN cedro.patients p ON p.id = r.patient_id
+   ORDER BY r.rank DESC, r.created_at DESC;
+END;
+$$;
+
+COMMENT ON FUNCTION cedro.search_medical_records IS 'Busca textual ranqueada em prontuários com trechos destacados (<mark>), restrita aos pacientes do terapeuta';
+
+REVOKE ALL ON FUNCTION cedro.search_medical_records(text, uuid, int, int) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION cedro.search_medical_records(text, uuid, int, int) TO authenticated, service_role;
@@ -0,0 +1,211 @@
+-- ============================================================================
+-- FATURAMENTO MENSAL EM LOTE - IDEMPOTENT MIGRATIONS
+-- Schema: cedro
+-- Purpose: Gerar as faturas do mês de todos os pacientes num único
+--          INSERT ... SELECT a partir dos atendimentos concluídos, em vez de
+--          uma fatura por vez pela interface. Idempotente (uma fatura por
+--          paciente/período) e com prévia (dry run).
+--          Chamado por POST /api/billing/run.
+-- ============================================================================
+-- BLOCO 1: Período de cobrança nas faturas
+-- ============================================================================
+ALTER TABLE cedro.invoices
+  ADD COLUMN IF NOT EXISTS billing_period date;
+
+COMMENT ON COLUMN cedro.invoices.billing_period IS 'Primeiro dia do mês faturado pelo run_monthly_billing (NULL para faturas avulsas)';
+
+-- Chave de idempotência: rodar o mesmo mês de novo não duplica faturas
+CREATE UNIQUE INDEX IF NOT EXISTS uq_invoices_patient_billing_period
+  ON cedro.invoices(patient_id, billing_period)
+  WHERE billing_period IS NOT NULL;
+
+-- Planos já faturados como pacote (excluídos do faturamento por sessão)
+CREATE INDEX IF NOT EXISTS idx_invoices_care_plan
+  ON cedro.invoices(care_plan_id)
+  WHERE care_plan_id IS NOT NULL;
+
+-- Varredura dos atendimentos concluídos do mês
+CREATE INDEX IF NOT EXISTS idx_appointments_completed_start
+  ON cedro.appointments(start_at)
+  WHERE status = 'completed';
+
+-- ============================================================================
+-- BLOCO 2: Histórico das execuções
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS cedro.billing_runs (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  billing_period date NOT NULL,
+  invoices_created int NOT NULL DEFAULT 0,
+  sessions_billed int NOT NULL DEFAULT 0,
+  total_cents bigint NOT NULL DEFAULT 0,
+  created_by uuid DEFAULT auth.uid(),
+  created_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_billing_runs_period ON cedro.billing_runs(billing_period, created_at DESC);
+
+COMMENT ON TABLE cedro.billing_runs IS 'Execuções (não dry run) do faturamento mensal';
+
+-- Gravado só por run_monthly_billing (SECURITY DEFINER); leitura só para admins
+ALTER TABLE cedro.billing_runs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Admins can read billing runs" ON cedro.billing_runs;
+CREATE POLICY "Admins can read billing runs"
+  ON cedro.billing_runs
+  AS PERMISSIVE FOR SELECT
+  TO authenticated
+  USING (EXISTS (SELECT 1 FROM cedro.users u WHERE u.id = auth.uid() AND u.role = 'admin'));
+
+REVOKE INSERT, UPDATE, DELETE ON cedro.billing_runs FROM authenticated, anon;
+GRANT SELECT ON cedro.billing_runs TO authenticated;
+GRANT SELECT, INSERT ON cedro.billing_runs TO service_role;
+
+-- ============================================================================
+-- BLOCO 3: Execução
+-- Preço por sessão:
+--   - com plano de cuidado: price_cents do plano dividido por total_sessions,
+--     com discount_percent aplicado
+--   - sem plano: base_price_cents do serviço
+-- Atendimentos que já têm fatura própria (invoices.appointment_id) ficam de
+-- fora, assim como sessões de planos já faturados como pacote
+-- (invoices.care_plan_id). Pacientes que já têm fatura do período aparecem
+-- como 'exists' e não são alterados (a fatura pode já ter sido enviada).
+-- SECURITY DEFINER: restrito a administradores (ou service_role) dentro da
+-- função, não só na rota.
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.run_monthly_billing(
+  p_period date,
+  p_due_date date DEFAULT NULL,
+  p_dry_run boolean DEFAULT true
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = cedro, public
+AS $$
+DECLARE
+  v_period date := date_trunc('month', p_period)::date;
+  v_from timestamptz := (date_trunc('month', p_period)::timestamp) AT TIME ZONE 'America/Sao_Paulo';
+  v_to timestamptz := ((date_trunc('month', p_period) + interval '1 month')::timestamp) AT TIME ZONE 'America/Sao_Paulo';
+  v_due date := coalesce(p_due_date, (date_trunc('month', p_period) + interval '1 month' + interval '9 days')::date);
+  v_result jsonb;
+  v_created int := 0;
+BEGIN
+  IF auth.uid() IS NULL THEN
+    IF auth.role() IS DISTINCT FROM 'service_role' THEN
+      RAISE EXCEPTION 'run_monthly_billing requer usuário autenticado'
+        USING ERRCODE = '42501';
+    END IF;
+  ELSIF NOT EXISTS (
+    SELECT 1 FROM cedro.users u WHERE u.id = auth.uid() AND u.role = 'admin'
+  ) THEN
+    RAISE EXCEPTION 'Apenas administradores podem gerar o faturamento'
+      USING ERRCODE = '42501';
+  END IF;
+
+  CREATE TEMP TABLE billing_preview ON COMMIT DROP AS
+  WITH sessions AS (
+    SELECT a.id AS appointment_id,
+           a.patient_id,
+           a.therapist_id,
+           a.care_plan_id,
+           a.start_at,
+           s.name AS service_name,
+           CASE
+             WHEN cp.id IS NOT NULL THEN round(cp.price_cents::numeric / nullif(cp.total_sessions, 0))
+             ELSE coalesce(s.base_price_cents, 0)
+           END AS unit_cents,
+           CASE WHEN cp.id IS NOT NULL THEN coalesce(cp.discount_percent, 0) ELSE 0 END AS discount_percent
+      FROM cedro.appointments a
+      LEFT JOIN cedro.care_plans cp ON cp.id = a.care_plan_id
+      LEFT JOIN cedro.services s ON s.id = a.service_id
+     WHERE a.status = 'completed'
+       AND a.start_at >= v_from
+       AND a.start_at < v_to
+       AND a.patient_id IS NOT NULL
+       AND NOT EXISTS (SELECT 1 FROM cedro.invoices i WHERE i.appointment_id = a.id)
+       -- Plano já faturado como pacote: a sessão já está paga
+       AND NOT (
+         a.care_plan_id IS NOT NULL
+         AND EXISTS (SELECT 1 FROM cedro.invoices i WHERE i.care_plan_id = a.care_plan_id)
+       )
+  ),
+  priced AS (
+    SELECT *,
+           round(coalesce(unit_cents, 0) * (100 - discount_percent) / 100)::int AS amount_cents
+      FROM sessions
+  )
+  SELECT p.patient_id,
+         -- Terapeuta só quando todas as sessões do mês são do mesmo
+         CASE WHEN count(DISTINCT p.therapist_id) = 1 THEN min(p.therapist_id::text)::uuid END AS therapist_id,
+         count(*)::int AS sessions,
+         sum(p.amount_cents)::int AS amount_cents,
+         jsonb_build_object(
+           'billing_period', v_period,
+           'sessions', jsonb_agg(jsonb_build_object(
+             'appointment_id', p.appointment_id,
+             'care_plan_id', p.care_plan_id,
+             'date', p.start_at,
+             'service', p.service_name,
+             'unit_cents', p.unit_cents,
+             'discount_percent', p.discount_percent,
+             'amount_cents', p.amount_cents
+           ) ORDER BY p.start_at)
+         ) AS breakdown_json,
+         EXISTS (
+           SELECT 1 FROM cedro.invoices i
+            WHERE i.patient_id = p.patient_id AND i.billing_period = v_period
+         ) AS already_billed
+    FROM priced p
+   GROUP BY p.patient_id;
+
+  IF NOT p_dry_run THEN
+    INSERT INTO cedro.invoices (
+      patient_id, therapist_id, status, amount_cents, currency, due_date,
+      breakdown_json, billing_period
+    )
+    SELECT patient_id, therapist_id, 'draft', amount_cents, 'BRL', v_due,
+           breakdown_json, v_period
+      FROM billing_preview
+     WHERE NOT already_billed
+    ON CONFLICT (patient_id, billing_period) WHERE billing_period IS NOT NULL DO NOTHING;
+
+    GET DIAGNOSTICS v_created = ROW_COUNT;
+
+    INSERT INTO cedro.billing_runs (billing_period, invoices_created, sessions_billed, total_cents)
+    SELECT v_period, v_created,
+           coalesce(sum(sessions) FILTER (WHERE NOT already_billed), 0),
+           coalesce(sum(amount_cents) FILTER (WHERE NOT already_billed), 0)
+      FROM billing_preview;
+  END IF;
+
+  SELECT jsonb_build_object(
+           'billing_period', v_period,
+           'due_date', v_due,
+           'dry_run', p_dry_run,
+           'invoices_created', v_created,
+           'patients', count(*),
+           'sessions', coalesce(sum(sessions) FILTER (WHERE NOT already_billed), 0),
+           'total_cents', coalesce(sum(amount_cents) FILTER (WHERE NOT already_billed), 0),
+           'invoices', coalesce(jsonb_agg(jsonb_build_object(
+             'patient_id', patient_id,
+             'patient_name', (SELECT full_name FROM cedro.patients WHERE id = patient_id),
+             'therapist_id', therapist_id,
+             'sessions', sessions,
+             'amount_cents', amount_cents,
+             'status', CASE WHEN already_billed THEN 'exists' ELSE 'new' END
+           ) ORDER BY amount_cents DESC), '[]'::jsonb)
+         )
+    INTO v_result
+    FROM billing_preview;
+
+  DROP TABLE billing_preview;
+
+  RETURN v_result;
+END;
+$$;
+
+COMMENT ON FUNCTION cedro.run_monthly_billing IS 'Gera (ou pré-visualiza com p_dry_run) as faturas do mês a partir dos atendimentos concluídos; uma fatura por paciente/período';
+
+REVOKE ALL ON FUNCTION cedro.run_monthly_billing(date, date, boolean) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION cedro.run_monthly_billing(date, date, boolean) TO authenticated, service_role;
@@ -0,0 +1,165 @@
+-- ============================================================================
+-- MÉTRICAS DOS PIPELINES (SYNC GOOGLE E ÁUDIO) - IDEMPOTENT MIGRATIONS
+-- Schema: cedro
+-- Purpose: Agregados calculados com GROUP BY no banco para o endpoint
+--          /api/metrics (formato Prometheus), em vez de trazer as linhas
+--          e contar em JavaScript.
+-- ============================================================================
+-- BLOCO 1: Durações por etapa (ffmpeg e afins)
+-- Gravadas pelo servidor (src/lib/metrics.ts); o n8n é medido pelas colunas
+-- processing_started_at / processing_completed_at de recording_jobs
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS cedro.pipeline_stage_timings (
+  id bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+  stage text NOT NULL,
+  duration_ms int NOT NULL,
+  success boolean NOT NULL DEFAULT true,
+  recorded_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_stage_timings_recent
+  ON cedro.pipeline_stage_timings(recorded_at DESC, stage);
+
+COMMENT ON TABLE cedro.pipeline_stage_timings IS 'Duração de cada execução de etapa do pipeline de áudio (ffmpeg_*), para histogramas em /api/metrics';
+
+GRANT SELECT, INSERT, DELETE ON cedro.pipeline_stage_timings TO service_role;
+
+CREATE OR REPLACE FUNCTION cedro.prune_pipeline_stage_timings(p_days int DEFAULT 30)
+RETURNS int
+LANGUAGE sql
+AS $$
+  WITH deleted AS (
+    DELETE FROM cedro.pipeline_stage_timings
+     WHERE recorded_at < now() - make_interval(days => greatest(p_days, 1))
+    RETURNING 1
+  )
+  SELECT count(*)::int FROM deleted
+$$;
+
+-- ============================================================================
+-- BLOCO 2: Fila gcal_sync_queue agrupada por status
+-- Usada pelo GET de /api/cron/process-gcal-sync e pelas métricas
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.gcal_sync_queue_counts()
+RETURNS TABLE (status text, jobs bigint, retries bigint, oldest_created_at timestamptz)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT q.status, count(*), coalesce(sum(q.retry_count), 0), min(q.created_at)
+    FROM cedro.gcal_sync_queue q
+   GROUP BY q.status
+$$;
+
+-- ============================================================================
+-- BLOCO 3: Histograma (buckets cumulativos, como no Prometheus)
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.metrics_histogram(p_values numeric[], p_buckets numeric[])
+RETURNS jsonb
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT jsonb_build_object(
+    'buckets', coalesce((
+      SELECT jsonb_agg(jsonb_build_object(
+               'le', b,
+               'count', (SELECT count(*) FROM unnest(p_values) AS v WHERE v <= b)
+             ) ORDER BY b)
+        FROM unnest(p_buckets) AS b
+    ), '[]'::jsonb),
+    'sum', coalesce((SELECT sum(v) FROM unnest(p_values) AS v), 0),
+    'count', coalesce(cardinality(p_values), 0)
+  )
+$$;
+
+-- ============================================================================
+-- BLOCO 4: Snapshot completo para /api/metrics
+-- Janelas de 24h para durações e erros (mantém a consulta barata)
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.pipeline_metrics()
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT jsonb_build_object(
+    'gcal_queue', coalesce((
+      SELECT jsonb_agg(jsonb_build_object(
+               'status', c.status,
+               'jobs', c.jobs,
+               'retries', c.retries,
+               'oldest_age_seconds', extract(epoch FROM now() - c.oldest_created_at)
+             ))
+        FROM cedro.gcal_sync_queue_counts() c
+    ), '[]'::jsonb),
+
+    -- Da criação do job até o processamento (sucesso ou falha final)
+    'gcal_queue_duration_seconds', cedro.metrics_histogram(
+      ARRAY(
+        SELECT extract(epoch FROM q.processed_at - q.created_at)::numeric
+          FROM cedro.gcal_sync_queue q
+         WHERE q.processed_at >= now() - interval '24 hours'
+      ),
+      ARRAY[1, 5, 15, 60, 300, 900, 3600]::numeric[]
+    ),
+
+    'gcal_sync_log_24h', coalesce((
+      SELECT jsonb_agg(jsonb_build_object(
+               'direction', l.direction,
+               'action', l.action,
+               'status', l.status,
+               'events', l.events
+             ))
+        FROM (
+          SELECT direction, action, status, count(*) AS events
+            FROM cedro.calendar_sync_log
+           WHERE created_at >= now() - interval '24 hours'
+           GROUP BY direction, action, status
+        ) l
+    ), '[]'::jsonb),
+
+    'recording_jobs', coalesce((
+      SELECT jsonb_agg(jsonb_build_object('status', r.status, 'jobs', r.jobs))
+        FROM (
+          SELECT coalesce(status::text, 'unknown') AS status, count(*) AS jobs
+            FROM cedro.recording_jobs
+           GROUP BY 1
+        ) r
+    ), '[]'::jsonb),
+
+    -- Do envio ao n8n até o callback
+    'n8n_duration_seconds', cedro.metrics_histogram(
+      ARRAY(
+        SELECT extract(epoch FROM r.processing_completed_at - r.processing_started_at)::numeric
+          FROM cedro.recording_jobs r
+         WHERE r.processing_completed_at >= now() - interval '24 hours'
+           AND r.processing_started_at IS NOT NULL
+           AND r.processing_completed_at >= r.processing_started_at
+      ),
+      ARRAY[30, 60, 120, 300, 600, 1200, 1800, 3600]::numeric[]
+    ),
+
+    'stage_duration_seconds', coalesce((
+      SELECT jsonb_agg(jsonb_build_object(
+               'stage', s.stage,
+               'failures', s.failures,
+               'histogram', cedro.metrics_histogram(s.durations, ARRAY[0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]::numeric[])
+             ))
+        FROM (
+          SELECT stage,
+                 count(*) FILTER (WHERE NOT success) AS failures,
+                 array_agg(duration_ms / 1000.0) AS durations
+            FROM cedro.pipeline_stage_timings
+           WHERE recorded_at >= now() - interval '24 hours'
+           GROUP BY stage
+        ) s
+    ), '[]'::jsonb)
+  )
+$$;
+
+COMMENT ON FUNCTION cedro.pipeline_metrics IS 'Snapshot agregado (fila do Google, erros de sync, recording_jobs, durações n8n/ffmpeg) para /api/metrics';
+
+REVOKE ALL ON FUNCTION cedro.pipeline_metrics() FROM PUBLIC;
+REVOKE ALL ON FUNCTION cedro.gcal_sync_queue_counts() FROM PUBLIC;
+REVOKE ALL ON FUNCTION cedro.prune_pipeline_stage_timings(int) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION cedro.pipeline_metrics() TO service_role;
+GRANT EXECUTE ON FUNCTION cedro.gcal_sync_queue_counts() TO service_role;
+GRANT EXECUTE ON FUNCTION cedro.prune_pipeline_stage_timings(int) TO service_role;
@@ -0,0 +1,110 @@
+-- ============================================================================
+-- DADOS DE REFERÊNCIA VERSIONADOS (TERAPEUTAS E SERVIÇOS) - IDEMPOTENT MIGRATIONS
+-- Schema: cedro
+-- Purpose: Listas de terapeutas e serviços usadas em filtros e formulários
+--          (agenda, pacientes, financeiro, CRM) servidas por um único
+--          endpoint (/api/reference-data) com ETag. Triggers incrementam a
+--          versão a cada mudança, então o cliente revalida com 304 sem
+--          baixar as listas de novo.
+-- ============================================================================
+-- BLOCO 1: Versões por conjunto de dados
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS cedro.reference_data_versions (
+  dataset text PRIMARY KEY,
+  version bigint NOT NULL DEFAULT 1,
+  updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+INSERT INTO cedro.reference_data_versions (dataset)
+VALUES ('therapists'), ('services')
+ON CONFLICT (dataset) DO NOTHING;
+
+COMMENT ON TABLE cedro.reference_data_versions IS 'Versão de cada conjunto de dados de referência; incrementada por trigger em users/services';
+
+GRANT SELECT ON cedro.reference_data_versions TO authenticated, service_role;
+
+-- ============================================================================
+-- BLOCO 2: Triggers de versão (por statement: um UPDATE em massa = +1)
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.bump_reference_data_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = cedro, public
+AS $$
+BEGIN
+  UPDATE cedro.reference_data_versions
+     SET version = version + 1,
+         updated_at = now()
+   WHERE dataset = TG_ARGV[0];
+  RETURN NULL;
+END;
+$$;
+
+-- Só colunas que aparecem nas listas: last_login etc. não invalidam o cache
+DROP TRIGGER IF EXISTS trg_reference_data_users ON cedro.users;
+CREATE TRIGGER trg_reference_data_users
+  AFTER INSERT OR DELETE OR UPDATE OF name, email, role, is_active ON cedro.users
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION cedro.bump_reference_data_version('therapists');
+
+DROP TRIGGER IF EXISTS trg_reference_data_services ON cedro.services;
+CREATE TRIGGER trg_reference_data_services
+  AFTER INSERT OR UPDATE OR DELETE ON cedro.services
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION cedro.bump_reference_data_version('services');
+
+-- ============================================================================
+-- BLOCO 3: Snapshot
+-- Versão combinada "<terapeutas>.<serviços>"; se o cliente já tem essa versão
+-- devolve só {version, not_modified}. SECURITY INVOKER: o RLS do usuário vale.
+-- ============================================================================
+CREATE OR REPLACE FUNCTION cedro.reference_data(p_known_version text DEFAULT NULL)
+RETURNS jsonb
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+  v_version text;
+BEGIN
+  SELECT coalesce(max(version) FILTER (WHERE dataset = 'therapists'), 0)
+         || '.' ||
+         coalesce(max(version) FILTER (WHERE dataset = 'services'), 0)
+    INTO v_version
+    FROM cedro.reference_data_versions;
+
+  IF p_known_version IS NOT NULL AND p_known_version = v_version THEN
+    RETURN jsonb_build_object('version', v_version, 'not_modified', true);
+  END IF;
+
+  RETURN jsonb_build_object(
+    'version', v_version,
+    'therapists', coalesce((
+      SELECT jsonb_agg(jsonb_build_object(
+               'id', u.id,
+               'name', u.name,
+               'email', u.email,
+               'role', u.role,
+               'is_active', coalesce(u.is_active, true)
+             ) ORDER BY u.name)
+        FROM cedro.users u
+       WHERE u.role IN ('therapist', 'admin')
+    ), '[]'::jsonb),
+    'services', coalesce((
+      SELECT jsonb_agg(jsonb_build_object(
+               'id', s.id,
+               'name', s.name,
+               'description', s.description,
+               'default_duration_min', s.default_duration_min,
+               'base_price_cents', s.base_price_cents,
+               'active', s.active
+             ) ORDER BY s.name)
+        FROM cedro.services s
+    ), '[]'::jsonb)
+  );
+END;
+$$;
+
+COMMENT ON FUNCTION cedro.reference_data IS 'Terapeutas (therapist/admin) e serviços com versão para ETag; not_modified quando p_known_version é a versão atual';
+
+GRANT EXECUTE ON FUNCTION cedro.reference_data(text) TO authenticated, service_role;
@@ -0,0 +1,124 @@
+#!/usr/bin/env node
+/**
+ * Per-route JS budget check (run after `next build`)
+ *
+ * For every App Router page, sums the gzipped size of the JS loaded on first
+ * visit: the page entry, its layouts and the shared runtime chunks. Chunks
+ * behind React.lazy / next/dynamic are not counted; they only load on
+ * interaction.
+ *
+ * - Budgets (kB, gzip) come from bundle-budget.json: `default` plus per-route
+ *   overrides
+ * - Writes the report to .next/bundle-report.json (or --out <file>)
+ * - Exits with 1 when any route is over its budget
+ *
+ * Usage: npm run build:budget   or   node scripts/bundle-budget.js [--out file]
+ */
+
+const fs = require('fs')
+const path = require('path')
+const zlib = require('zlib')
+
+const ROOT = path.resolve(__dirname, '..')
+const NEXT_DIR = path.join(ROOT, '.next')
+const BUDGET_FILE = path.join(ROOT, 'bundle-budget.json')
+
+function readJson(file) {
+  if (!fs.existsSync(file)) {
+    console.error(`❌ ${path.relative(ROOT, file)} não encontrado. Rode \`next build\` antes.`)
+    process.exit(2)
+  }
+  return JSON.parse(fs.readFileSync(file, 'utf8'))
+}
+
+/** "/(grupo)/crm/page" -> "/crm" */
+function routeFromEntry(entry) {
+  const segments = entry
+    .replace(/\/page$/, '')
+    .split('/')
+    .filter((segment) => segment && !/^\(.*\)$/.test(segment))
+  return '/' + segments.join('/')
+}
+
+/** Layout entries that wrap a page entry ("/layout", "/crm/layout", ...) */
+function layoutEntries(entry) {
+  const parts = entry.replace(/\/page$/, '').split('/').filter(Boolean)
+  const layouts = ['/layout']
+  for (let index = 1; index <= parts.length; index++) {
+    layouts.push('/' + parts.slice(0, index).join('/') + '/layout')
+  }
+  return layouts
+}
+
+const sizeCache = new Map()
+
+function fileSizes(file) {
+  if (!sizeCache.has(file)) {
+    const content = fs.readFileSync(path.join(NEXT_DIR, file))
+    sizeCache.set(file, { raw: content.length, gzip: zlib.gzipSync(content, { level: 9 }).length })
+  }
+  return sizeCache.get(file)
+}
+
+function main() {
+  const outIndex = process.argv.indexOf('--out')
+  const outFile = outIndex > 0 ? path.resolve(process.argv[outIndex + 1]) : path.join(NEXT_DIR, 'bundle-report.json')
+
+  const appManifest = readJson(path.join(NEXT_DIR, 'app-build-manifest.json'))
+  const buildManifest = readJson(path.join(NEXT_DIR, 'build-manifest.json'))
+  const budgets = readJson(BUDGET_FILE)
+  const defaultBudget = budgets.default
+
+  const shared = (buildManifest.rootMainFiles || []).concat(buildManifest.polyfillFiles || [])
+  const entries = Object.keys(appManifest.pages).filter((entry) => entry.endsWith('/page'))
+
+  const routes = entries.map((entry) => {
+    const files = new Set(shared)
+    layoutEntries(entry)
+      .concat(entry)
+      .forEach((name) => (appManifest.pages[name] || []).forEach((file) => files.add(file)))
+
+    const js = Array.from(files).filter((file) => file.endsWith('.js'))
+    const totals = js.reduce(
+      (sum, file) => {
+        const size = fileSizes(file)
+        return { raw: sum.raw + size.raw, gzip: sum.gzip + size.gzip }
+      },
+      { raw: 0, gzip: 0 }
+    )
+
+    const route = routeFromEntry(entry)
+    const budgetKb = (budgets.routes && budgets.routes[route]) || defaultBudget
+    return {
+      route,
+      files: js.length,
+      rawBytes: totals.raw,
+      gzipBytes: totals.gzip,
+      budgetKb,
+      overBudget: totals.gzip > budgetKb * 1024
+    }
+  }).sort((a, b) => b.gzipBytes - a.gzipBytes)
+
+  fs.writeFileSync(outFile, JSON.stringify({ generatedAt: new Date().toISOString(), routes }, null, 2))
+
+  const kb = (bytes) => (bytes / 1024).toFixed(1)
+  console.log('\n📦 JS por rota (primeira visita)\n')
+  console.table(routes.map((item) => ({
+    rota: item.route,
+    arquivos: item.files,
+    'kB': kb(item.rawBytes),
+    'kB gzip': kb(item.gzipBytes),
+    'orçamento kB': item.budgetKb,
+    status: item.overBudget ? '❌ acima' : '✅'
+  })))
+  console.log(`Relatório: ${path.relative(ROOT, outFile)}`)
+
+  const over = routes.filter((item) => item.overBudget)
+  if (over.length > 0) {
+    console.error(`\n❌ ${over.length} rota(s) acima do orçamento: ${over.map((item) => item.route).join(', ')}`)
+    process.exit(1)
+  }
+  console.log('\n✅ Todas as rotas dentro do orçamento')
+}
+
+main()
@@ -5,10 +5,8 @@ import { AppShell } from '@/components/layout/app-shell'
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card'
 import { Button } from '@/components/ui/button'
 import { Badge } from '@/components/ui/badge'
-import { Calendar } from '@/components/ui/calendar'
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs'
 
-import { ScrollArea } from '@/components/ui/scroll-area'
 import { Separator } from '@/components/ui/separator'
 import { 
   CalendarIcon, 
@@ -31,17 +29,32 @@ import {
   useTherapists,
   usePatientsForAppointments,
   useServices,
+  usePrefetchAdjacentAppointments,
+  getAgendaDateRange,
+  shiftAgendaDate,
+  type AgendaViewMode,
   type Appointment
 } from '@/hooks/use-appointments-adapter'
 import { useDebounce } from '@/hooks/use-debounce'
+import { useRealtimeAppointments } from '@/hooks/use-realtime-appointments'
 import { AppointmentListSkeleton } from '@/components/skeletons/appointment-skeleton'
-import { format, startOfWeek, endOfWeek, startOfMonth, endOfMonth, addDays, addWeeks, addMonths, subDays, subWeeks, subMonths, isSameDay, parseISO } from 'date-fns'
+import { format, startOfWeek, endOfWeek, startOfMonth, endOfMonth, addDays, isSameDay, parseISO } from 'date-fns'
 import { ptBR } from 'date-fns/locale'
 import { useToast } from '@/hooks/use-toast'
 import { Suspense } from 'react'
-import { LazyAppointmentModal } from '@/components/lazy'
+import { LazyAppointmentModal, LazyCalendar, preloadAppointmentModal } from '@/components/lazy'
+import { useLazyMount } from '@/hooks/use-lazy-mount'
+import { Skeleton } from '@/components/ui/skeleton'
+import { AgendaWeekGrid } from '@/components/agenda/agenda-week-grid'
+import { useVariableVirtualList } from '@/hooks/use-variable-virtual-list'
+import { buildAgendaIndex, dayKey } from '@/lib/agenda-index'
 
-type ViewMode = 'day' | 'week' | 'month'
+type ViewMode = AgendaViewMode
+
+const EMPTY_APPOINTMENTS: Appointment[] = []
+const DAY_LIST_HEIGHT = 600
+// AppointmentCard (p-4, três linhas de texto) + pb-3; as linhas são medidas
+const DAY_LIST_ITEM_ESTIMATE = 112
 
 export default function AgendaPage() {
   const { user, cedroUser } = useSupabase()
@@ -52,6 +65,8 @@ export default function AgendaPage() {
   const [searchTerm, setSearchTerm] = useState('')
   const [selectedTherapist, setSelectedTherapist] = useState<string>('')
   const [isNewAppointmentOpen, setIsNewAppointmentOpen] = useState(false)
+  // Modal só é baixado na primeira abertura
+  const appointmentModalMounted = useLazyMount(isNewAppointmentOpen)
   const [selectedAppointment, setSelectedAppointment] = useState<Appointment | null>(null)
   const [modalMode, setModalMode] = useState<'create' | 'edit' | 'view'>('create')
   const [defaultDate, setDefaultDate] = useState<Date | undefined>(undefined)
@@ -60,32 +75,10 @@ export default function AgendaPage() {
   // Debounce search term
   const debouncedSearchTerm = useDebounce(searchTerm, 300)
 
-  const getDateRange = () => {
-    switch (viewMode) {
-      case 'day':
-        return {
-          startDate: format(currentDate, 'yyyy-MM-dd'),
-          endDate: format(currentDate, 'yyyy-MM-dd')
-        }
-      case 'week':
-        return {
-          startDate: format(startOfWeek(currentDate, { locale: ptBR }), 'yyyy-MM-dd'),
-          endDate: format(endOfWeek(currentDate, { locale: ptBR }), 'yyyy-MM-dd')
-        }
-      case 'month':
-        return {
-          startDate: format(startOfMonth(currentDate), 'yyyy-MM-dd'),
-          endDate: format(endOfMonth(currentDate), 'yyyy-MM-dd')
-        }
-    }
-  }
-
   // React Query hooks
-  const { startDate, endDate } = getDateRange()
+  const { startDate, endDate } = getAgendaDateRange(viewMode, currentDate)
   const therapistId = cedroUser?.role === 'therapist' ? cedroUser.id : undefined
 
-  console.log('🔍 AgendaPage - Date range:', { startDate, endDate, currentDate })
-
   const appointmentsQuery = useAppointments(
     new Date(startDate),
     new Date(endDate),
@@ -94,6 +87,16 @@ export default function AgendaPage() {
   const appointments = (appointmentsQuery.data || []) as Appointment[]
   const appointmentsLoading = appointmentsQuery.isLoading
 
+  // Pré-carrega o período anterior/seguinte para navegação instantânea
+  usePrefetchAdjacentAppointments(viewMode, currentDate, therapistId)
+
+  // Realtime: aplica INSERT/UPDATE/DELETE direto no cache da lista em tela
+  useRealtimeAppointments({
+    therapistId,
+    startDate: new Date(startDate),
+    endDate: new Date(endDate)
+  })
+
   const { data: therapistsData = [] } = useTherapists()
   const { data: patientsData = [] } = usePatientsForAppointments()
   const { data: servicesData = [] } = useServices()
@@ -148,57 +151,27 @@ export default function AgendaPage() {
   }, [])
 
   const navigateDate = (direction: 'prev' | 'next') => {
-    switch (viewMode) {
-      case 'day':
-        setCurrentDate(direction === 'next' ? addDays(currentDate, 1) : subDays(currentDate, 1))
-        break
-      case 'week':
-        setCurrentDate(direction === 'next' ? addWeeks(currentDate, 1) : subWeeks(currentDate, 1))
-        break
-      case 'month':
-        setCurrentDate(direction === 'next' ? addMonths(currentDate, 1) : subMonths(currentDate, 1))
-        break
-    }
+    setCurrentDate(shiftAgendaDate(viewMode, currentDate, direction === 'next' ? 1 : -1))
   }
 
-  const getFilteredAppointments = useMemo(() => {
-    return appointments.filter(appointment => {
-      const matchesSearch = !debouncedSearchTerm || 
-        appointment.patient_name?.toLowerCase().includes(debouncedSearchTerm.toLowerCase()) ||
-        appointment.service_name?.toLowerCase().includes(debouncedSearchTerm.toLowerCase())
-      
-      const matchesTherapist = !selectedTherapist || appointment.therapist_id === selectedTherapist
-      
-      return matchesSearch && matchesTherapist
-    })
-  }, [appointments, debouncedSearchTerm, selectedTherapist])
-
-  const getAppointmentsByDate = useCallback((date: Date) => {
-    const dateStr = format(date, 'yyyy-MM-dd')
-    const dayAppointments = getFilteredAppointments.filter(appointment => {
-      // Parse the start_at string to Date and format it to compare dates
-      const appointmentDate = format(new Date(appointment.start_at), 'yyyy-MM-dd')
-      return appointmentDate === dateStr
-    })
-    console.log('🗓️ Getting appointments for date:', { 
-      date, 
-      dateStr, 
-      totalAppointments: appointments.length,
-      filteredAppointments: getFilteredAppointments.length,
-      dayAppointments: dayAppointments.length,
-      appointments: dayAppointments
-    })
-    return dayAppointments
-  }, [getFilteredAppointments, appointments.length])
-
-  const getAppointmentStats = useMemo(() => {
-    return {
-      total: getFilteredAppointments.length,
-      scheduled: getFilteredAppointments.filter(a => a.status === 'scheduled').length,
-      completed: getFilteredAppointments.filter(a => a.status === 'completed').length,
-      cancelled: getFilteredAppointments.filter(a => a.status === 'cancelled').length
-    }
-  }, [getFilteredAppointments])
+  // Índice por dia/terapeuta + lanes de sobreposição + stats, construído uma vez por mudança de dados
+  const agendaIndex = useMemo(
+    () => buildAgendaIndex(appointments, {
+      search: debouncedSearchTerm,
+      therapistId: selectedTherapist || undefined
+    }),
+    [appointments, debouncedSearchTerm, selectedTherapist]
+  )
+
+  const getAppointmentsByDate = useCallback(
+    (date: Date) => agendaIndex.byDay.get(dayKey(date)) || EMPTY_APPOINTMENTS,
+    [agendaIndex]
+  )
+
+  const weekDays = useMemo(() => {
+    const weekStart = startOfWeek(currentDate, { locale: ptBR })
+    return Array.from({ length: 7 }, (_, i) => addDays(weekStart, i))
+  }, [currentDate])
 
   const formatDateHeader = () => {
     switch (viewMode) {
@@ -224,18 +197,20 @@ export default function AgendaPage() {
             <CardTitle className="text-lg">Calendário</CardTitle>
           </CardHeader>
           <CardContent>
-            <Calendar
-              mode="single"
-              selected={selectedDate}
-              onSelect={(date) => {
-                if (date) {
-                  setSelectedDate(date)
-                  setCurrentDate(date)
-                }
-              }}
-              className="rounded-md border"
-              locale={ptBR}
-            />
+            <Suspense fallback={<Skeleton className="h-[290px] w-full rounded-md" />}>
+              <LazyCalendar
+                mode="single"
+                selected={selectedDate}
+                onSelect={(date) => {
+                  if (date) {
+                    setSelectedDate(date)
+                    setCurrentDate(date)
+                  }
+                }}
+                className="rounded-md border"
+                locale={ptBR}
+              />
+            </Suspense>
           </CardContent>
         </Card>
 
@@ -248,7 +223,7 @@ export default function AgendaPage() {
             </CardDescription>
           </CardHeader>
           <CardContent>
-            <ScrollArea className="h-[600px]">
+            <div className="h-[600px]">
               {loading ? (
                 <AppointmentListSkeleton count={5} />
               ) : dayAppointments.length === 0 ? (
@@ -258,19 +233,14 @@ export default function AgendaPage() {
                   <p className="mt-1 text-sm text-gray-500">Não há agendamentos para este dia.</p>
                 </div>
               ) : (
-                <div className="space-y-3">
-                  {dayAppointments.map((appointment) => (
-                    <AppointmentCard 
-                  key={appointment.id} 
-                  appointment={appointment} 
+                <DayAppointmentList
+                  appointments={dayAppointments}
                   onUpdate={handleModalSave}
                   onEdit={handleEditAppointment}
                   onView={handleViewAppointment}
                 />
-                  ))}
-                </div>
               )}
-            </ScrollArea>
+            </div>
           </CardContent>
         </Card>
       </div>
@@ -278,48 +248,23 @@ export default function AgendaPage() {
   }
 
   const renderWeekView = () => {
-    const weekStart = startOfWeek(currentDate, { locale: ptBR })
-    const weekDays = Array.from({ length: 7 }, (_, i) => addDays(weekStart, i))
-
     return (
       <Card>
         <CardHeader>
           <CardTitle>{formatDateHeader()}</CardTitle>
         </CardHeader>
         <CardContent>
-          <div className="grid grid-cols-7 gap-4">
-            {weekDays.map((day) => {
-              const dayAppointments = getAppointmentsByDate(day)
-              const isToday = isSameDay(day, new Date())
-              
-              return (
-                <div key={day.toISOString()} className="space-y-2">
-                  <div className={`text-center p-2 rounded-lg ${isToday ? 'bg-blue-100 text-blue-900' : 'bg-gray-50'}`}>
-                    <div className="text-sm font-medium">
-                      {format(day, 'EEE', { locale: ptBR })}
-                    </div>
-                    <div className="text-lg font-bold">
-                      {format(day, 'd')}
-                    </div>
-                  </div>
-                  <ScrollArea className="h-[400px]">
-                    <div className="space-y-1">
-                      {dayAppointments.map((appointment) => (
-                        <AppointmentCard 
-                          key={appointment.id} 
-                          appointment={appointment} 
-                          onUpdate={handleModalSave}
-                          onEdit={handleEditAppointment}
-                          onView={handleViewAppointment}
-                          compact={true}
-                        />
-                      ))}
-                    </div>
-                  </ScrollArea>
-                </div>
-              )
-            })}
-          </div>
+          {loading ? (
+            <AppointmentListSkeleton count={5} />
+          ) : (
+            <AgendaWeekGrid
+              days={weekDays}
+              layoutByDay={agendaIndex.layoutByDay}
+              onSelect={handleEditAppointment}
+              onView={handleViewAppointment}
+              onSlotClick={handleNewAppointment}
+            />
+          )}
         </CardContent>
       </Card>
     )
@@ -408,7 +353,7 @@ export default function AgendaPage() {
     )
   }
 
-  const stats = getAppointmentStats
+  const stats = agendaIndex.stats
 
   return (
     <AppShell>
@@ -419,7 +364,11 @@ export default function AgendaPage() {
             <h1 className="text-3xl font-bold text-gray-900">Agenda</h1>
             <p className="text-gray-600">Gerencie seus agendamentos</p>
           </div>
-          <Button onClick={() => handleNewAppointment()}>
+          <Button
+            onClick={() => handleNewAppointment()}
+            onMouseEnter={preloadAppointmentModal}
+            onFocus={preloadAppointmentModal}
+          >
             <Plus className="mr-2 h-4 w-4" />
             Novo Agendamento
           </Button>
@@ -553,25 +502,80 @@ export default function AgendaPage() {
         </div>
       </div>
 
-      <Suspense fallback={<div>Carregando...</div>}>
-        <LazyAppointmentModal
-          isOpen={isNewAppointmentOpen}
-          onClose={handleCloseModal}
-          onSave={handleModalSave}
-          appointment={selectedAppointment}
-          mode={modalMode}
-          therapists={therapists}
-          patients={patients}
-          services={services}
-          defaultDate={defaultDate}
-          defaultTime={defaultTime}
-          cedroUser={cedroUser}
-        />
+      <Suspense fallback={null}>
+        {appointmentModalMounted && (
+          <LazyAppointmentModal
+            isOpen={isNewAppointmentOpen}
+            onClose={handleCloseModal}
+            onSave={handleModalSave}
+            appointment={selectedAppointment}
+            mode={modalMode}
+            therapists={therapists}
+            patients={patients}
+            services={services}
+            defaultDate={defaultDate}
+            defaultTime={defaultTime}
+            cedroUser={cedroUser}
+          />
+        )}
       </Suspense>
     </AppShell>
   )
 }
 
+/**
+ * Day view list: virtualized with measured rows, so cards whose text wraps
+ * (long patient or service names) don't overlap the next one.
+ */
+function DayAppointmentList({
+  appointments,
+  onUpdate,
+  onEdit,
+  onView
+}: {
+  appointments: Appointment[]
+  onUpdate: () => void
+  onEdit: (appointment: Appointment) => void
+  onView: (appointment: Appointment) => void
+}) {
+  const keys = useMemo(() => appointments.map((appointment) => appointment.id), [appointments])
+  const { containerRef, measureRef, onScroll, range, offsets, totalHeight } = useVariableVirtualList({
+    keys,
+    estimateHeight: DAY_LIST_ITEM_ESTIMATE,
+    overscan: 3
+  })
+
+  const visible = appointments.slice(range.start, range.end + 1)
+
+  return (
+    <div
+      ref={containerRef}
+      onScroll={onScroll}
+      className="overflow-auto"
+      style={{ height: DAY_LIST_HEIGHT }}
+    >
+      <div className="relative" style={{ height: totalHeight }}>
+        {visible.map((appointment, offset) => (
+          <div
+            key={appointment.id}
+            ref={measureRef}
+            data-key={appointment.id}
+            className="absolute left-0 right-0 pb-3"
+            style={{ top: offsets[range.start + offset] }}
+          >
+            <AppointmentCard
+              appointment={appointment}
+              onUpdate={onUpdate}
+              onEdit={onEdit}
+              onView={onView}
+            />
+          </div>
+        ))}
+      </div>
+    </div>
+  )
+}
+
 // Appointment Card Component
 const AppointmentCard = memo(function AppointmentCard({ 
   appointment, 
@@ -1,8 +1,9 @@
 import { NextRequest, NextResponse } from 'next/server'
+import { withRouteTracing } from '@/lib/tracing/server'
 import { createClient } from '@/lib/supabase'
-import { getPresignedUrl } from '@/lib/minio'
+import { getAudioUrl } from '@/lib/storage'
 
-export async function GET(request: NextRequest) {
+async function downloadAudio(request: NextRequest) {
   try {
     const recordingJobId = request.nextUrl.searchParams.get('recordingJobId')
     
@@ -37,12 +38,12 @@ export async function GET(request: NextRequest) {
       )
     }
 
-    // Generate presigned URL (valid for 1 hour)
-    const presignedUrl = await getPresignedUrl(recordingJob.audio_storage_url, 3600)
+    // Presigned URL (valid for up to 1 hour, reused while at least 30 min remain)
+    const { url, expiresAt } = await getAudioUrl(recordingJob.audio_storage_url, 3600)
 
     return NextResponse.json({
-      downloadUrl: presignedUrl,
-      expiresIn: 3600 // seconds
+      downloadUrl: url,
+      expiresIn: Math.floor((expiresAt - Date.now()) / 1000) // seconds
     })
 
   } catch (error) {
@@ -52,4 +53,6 @@ export async function GET(request: NextRequest) {
       { status: 500 }
     )
   }
-}
\ No newline at end of file
+}
+
+export const GET = withRouteTracing('GET /api/audio/download', downloadAudio)
@@ -2,13 +2,11 @@ import { NextRequest, NextResponse } from 'next/server'
 import fs from 'fs'
 import path from 'path'
 import { promisify } from 'util'
+import { LOCAL_STORAGE_DIR } from '@/lib/storage/filesystem-backend'
 
 const readFile = promisify(fs.readFile)
 const stat = promisify(fs.stat)
 
-// Local storage directory for audio files (same as in minio-fallback.ts)
-const STORAGE_DIR = path.join(process.cwd(), 'storage', 'audio')
-
 export async function GET(
   request: NextRequest,
   { params }: { params: { filename: string } }
@@ -22,7 +20,7 @@ export async function GET(
 
     // Security check to prevent directory traversal
     const safeFilename = path.basename(filename)
-    const filePath = path.join(STORAGE_DIR, safeFilename)
+    const filePath = path.join(LOCAL_STORAGE_DIR, safeFilename)
 
     // Check if file exists
     try {
@@ -42,7 +40,7 @@ export async function GET(
     else if (ext === '.wav') contentType = 'audio/wav'
     else if (ext === '.webm') contentType = 'audio/webm'
     else if (ext === '.m4a') contentType = 'audio/mp4'
-    else if (ext === '.ogg') contentType = 'audio/ogg'
+    else if (ext === '.ogg' || ext === '.opus') contentType = 'audio/ogg'
 
     // Return file
     return new NextResponse(fileBuffer, {
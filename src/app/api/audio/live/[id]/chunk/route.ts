@@ -0,0 +1,123 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { withRouteTracing } from '@/lib/tracing/server'
+import { createClient } from '@/lib/supabase/server'
+import {
+  appendLiveChunk,
+  hasLiveRecording,
+  transcribePendingAudio
+} from '@/lib/live-transcription'
+
+/**
+ * Recebe um chunk (timeslice do MediaRecorder) da gravação ao vivo.
+ * Form data: chunk (Blob), chunk_index (0..n), audio_seconds (áudio gravado
+ * acumulado até o fim deste chunk). Chunks devem chegar em ordem; reenvios
+ * de um índice já recebido são ignorados.
+ */
+async function receiveLiveChunk(
+  request: NextRequest,
+  { params }: { params: { id: string } }
+) {
+  try {
+    const recordingJobId = params.id
+    const formData = await request.formData()
+    const chunk = formData.get('chunk') as File | null
+    const chunkIndex = parseInt(formData.get('chunk_index') as string, 10)
+    const audioSeconds = parseFloat(formData.get('audio_seconds') as string)
+
+    if (!chunk || Number.isNaN(chunkIndex) || Number.isNaN(audioSeconds)) {
+      return NextResponse.json(
+        { error: 'chunk, chunk_index e audio_seconds são obrigatórios' },
+        { status: 400 }
+      )
+    }
+
+    const supabase = createClient()
+
+    const { data: recordingJob, error: jobError } = await supabase
+      .schema('cedro')
+      .from('recording_jobs')
+      .select('id, live_transcription, live_chunks_received, live_transcribed_until, audio_storage_url')
+      .eq('id', recordingJobId)
+      .single()
+
+    if (jobError || !recordingJob || !recordingJob.live_transcription) {
+      return NextResponse.json(
+        { error: 'Gravação ao vivo não encontrada' },
+        { status: 404 }
+      )
+    }
+
+    if (recordingJob.audio_storage_url) {
+      return NextResponse.json(
+        { error: 'Gravação já finalizada' },
+        { status: 409 }
+      )
+    }
+
+    // Reenvio de um chunk já gravado
+    if (chunkIndex < recordingJob.live_chunks_received) {
+      return NextResponse.json({ success: true, duplicate: true })
+    }
+
+    // Buraco na sequência ou arquivo perdido (outra instância/restart):
+    // o cliente volta para o upload único no fim da sessão
+    if (
+      chunkIndex > recordingJob.live_chunks_received ||
+      (chunkIndex > 0 && !(await hasLiveRecording(recordingJobId)))
+    ) {
+      return NextResponse.json(
+        { error: 'Sequência de chunks interrompida', expected_chunk_index: recordingJob.live_chunks_received },
+        { status: 409 }
+      )
+    }
+
+    await appendLiveChunk(recordingJobId, Buffer.from(await chunk.arrayBuffer()))
+
+    const { error: updateError } = await supabase
+      .schema('cedro')
+      .from('recording_jobs')
+      .update({
+        live_chunks_received: chunkIndex + 1,
+        live_audio_seconds: audioSeconds,
+        updated_at: new Date().toISOString()
+      })
+      .eq('id', recordingJobId)
+
+    if (updateError) {
+      console.error('Error updating live recording progress:', updateError)
+      return NextResponse.json(
+        { error: 'Erro ao registrar chunk' },
+        { status: 500 }
+      )
+    }
+
+    // Transcreve a janela pendente quando já há áudio novo suficiente.
+    // Falhas não derrubam o chunk: a janela é tentada de novo no próximo.
+    let segment: Awaited<ReturnType<typeof transcribePendingAudio>> = null
+    try {
+      segment = await transcribePendingAudio(
+        supabase,
+        recordingJobId,
+        Number(recordingJob.live_transcribed_until) || 0,
+        audioSeconds
+      )
+    } catch (transcriptionError) {
+      console.error('Error transcribing live segment:', transcriptionError)
+    }
+
+    return NextResponse.json({
+      success: true,
+      chunks_received: chunkIndex + 1,
+      transcribed_until: segment?.transcribedUntil ?? (Number(recordingJob.live_transcribed_until) || 0),
+      segment_text: segment?.text ?? null
+    })
+  } catch (error) {
+    console.error('Error receiving live chunk:', error)
+    return NextResponse.json(
+      { error: 'Erro interno do servidor' },
+      { status: 500 }
+    )
+  }
+}
+
+export const POST = withRouteTracing('POST /api/audio/live/[id]/chunk', receiveLiveChunk)
@@ -0,0 +1,164 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { withRouteTracing } from '@/lib/tracing/server'
+import { createClient } from '@/lib/supabase/server'
+import { storeAudio } from '@/lib/storage'
+import { fetchWithTimeout, NETWORK_CONFIG } from '@/lib/network-config'
+import {
+  hasLiveRecording,
+  liveRecordingPath,
+  removeLiveRecording,
+  transcribePendingAudio
+} from '@/lib/live-transcription'
+import { stitchSegments } from '@/lib/transcript-stitching'
+
+/**
+ * Finaliza a gravação ao vivo: transcreve o trecho final, costura os
+ * segmentos, guarda o áudio completo no MinIO e dispara o pipeline (n8n)
+ * já com a transcrição pronta.
+ */
+async function finishLiveRecording(
+  request: NextRequest,
+  { params }: { params: { id: string } }
+) {
+  try {
+    const recordingJobId = params.id
+    const { audio_seconds: audioSeconds } = await request.json()
+
+    const supabase = createClient()
+
+    const { data: recordingJob, error: jobError } = await supabase
+      .schema('cedro')
+      .from('recording_jobs')
+      .select('id, patient_id, therapist_id, appointment_id, live_transcription, live_audio_seconds, live_transcribed_until, audio_storage_url, sources_json')
+      .eq('id', recordingJobId)
+      .single()
+
+    if (jobError || !recordingJob || !recordingJob.live_transcription) {
+      return NextResponse.json(
+        { error: 'Gravação ao vivo não encontrada' },
+        { status: 404 }
+      )
+    }
+
+    if (recordingJob.audio_storage_url) {
+      return NextResponse.json({ success: true, recording_job_id: recordingJobId, already_finished: true })
+    }
+
+    if (!(await hasLiveRecording(recordingJobId))) {
+      return NextResponse.json(
+        { error: 'Áudio da gravação ao vivo indisponível neste servidor' },
+        { status: 409 }
+      )
+    }
+
+    const totalSeconds = Math.max(Number(audioSeconds) || 0, Number(recordingJob.live_audio_seconds) || 0)
+
+    // Trecho final (menor que uma janela); sem ele a transcrição fica incompleta
+    let transcriptComplete = true
+    try {
+      await transcribePendingAudio(
+        supabase,
+        recordingJobId,
+        Number(recordingJob.live_transcribed_until) || 0,
+        totalSeconds,
+        true
+      )
+    } catch (transcriptionError) {
+      console.error('Error transcribing final live segment:', transcriptionError)
+      transcriptComplete = false
+    }
+
+    const { data: segments, error: segmentsError } = await supabase
+      .schema('cedro')
+      .from('recording_job_segments')
+      .select('text, end_seconds')
+      .eq('recording_job_id', recordingJobId)
+      .order('segment_index', { ascending: true })
+
+    if (segmentsError) {
+      console.error('Error loading transcript segments:', segmentsError)
+      transcriptComplete = false
+    }
+
+    const segmentRows = (segments || []) as Array<{ text: string; end_seconds: number }>
+    const lastEnd = segmentRows.length > 0 ? Number(segmentRows[segmentRows.length - 1].end_seconds) : 0
+    if (lastEnd < totalSeconds) transcriptComplete = false
+
+    const transcript = stitchSegments(segmentRows.map(segment => segment.text))
+
+    // Áudio completo continua sendo guardado (reprocessamento / auditoria)
+    // Enviado em streaming a partir do disco (multipart no MinIO)
+    const storedAudio = await storeAudio(
+      { path: liveRecordingPath(recordingJobId) },
+      {
+        fileName: 'teleconsulta.webm',
+        contentType: 'audio/webm',
+        metadata: {
+          'upload-timestamp': new Date().toISOString()
+        }
+      }
+    )
+
+    const sources = Array.isArray(recordingJob.sources_json) ? recordingJob.sources_json : []
+    const { error: updateError } = await supabase
+      .schema('cedro')
+      .from('recording_jobs')
+      .update({
+        audio_storage_url: storedAudio.url,
+        live_audio_seconds: totalSeconds,
+        // Só entrega a transcrição ao n8n se cobre o áudio inteiro
+        transcript_raw_text: transcriptComplete ? transcript : null,
+        sources_json: sources.map((source: any, index: number) =>
+          index === 0 ? { ...source, size: storedAudio.size } : source
+        ),
+        updated_at: new Date().toISOString()
+      })
+      .eq('id', recordingJobId)
+
+    if (updateError) {
+      console.error('Error finishing live recording job:', updateError)
+      return NextResponse.json(
+        { error: 'Erro ao finalizar gravação' },
+        { status: 500 }
+      )
+    }
+
+    await removeLiveRecording(recordingJobId)
+
+    // Trigger audio processing pipeline
+    try {
+      const processResponse = await fetchWithTimeout(`${request.nextUrl.origin}/api/audio/process`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          cookie: request.headers.get('cookie') || ''
+        },
+        body: JSON.stringify({
+          recording_job_id: recordingJobId
+        }),
+        timeout: NETWORK_CONFIG.DEFAULT_TIMEOUT
+      })
+
+      if (!processResponse.ok) {
+        console.error('Error triggering audio processing:', await processResponse.text())
+      }
+    } catch (processError) {
+      console.error('Error triggering audio processing:', processError)
+    }
+
+    return NextResponse.json({
+      success: true,
+      recording_job_id: recordingJobId,
+      transcript_ready: transcriptComplete,
+      message: 'Gravação finalizada. Gerando prontuário.'
+    })
+  } catch (error) {
+    console.error('Error finishing live recording:', error)
+    return NextResponse.json(
+      { error: 'Erro interno do servidor' },
+      { status: 500 }
+    )
+  }
+}
+
+export const POST = withRouteTracing('POST /api/audio/live/[id]/finish', finishLiveRecording)
@@ -0,0 +1,77 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { createClient } from '@/lib/supabase/server'
+import { isLiveTranscriptionEnabled, LIVE_SEGMENT_SECONDS } from '@/lib/live-transcription'
+import { SPEECH_ENCODING } from '@/lib/client-audio-transcode'
+
+/**
+ * Inicia uma gravação com transcrição ao vivo.
+ * Cria o recording_job; os chunks chegam em /api/audio/live/[id]/chunk.
+ */
+export async function POST(request: NextRequest) {
+  try {
+    if (!isLiveTranscriptionEnabled()) {
+      return NextResponse.json(
+        { error: 'Transcrição ao vivo não configurada' },
+        { status: 501 }
+      )
+    }
+
+    const {
+      patient_id: patientId,
+      therapist_id: therapistId,
+      appointment_id: appointmentId,
+      tipo_consulta: tipoConsulta = 'evolucao',
+      mime_type: mimeType = 'audio/webm'
+    } = await request.json()
+
+    if (!patientId || !therapistId) {
+      return NextResponse.json(
+        { error: 'ID do paciente e ID do terapeuta são obrigatórios' },
+        { status: 400 }
+      )
+    }
+
+    const supabase = createClient()
+
+    const { data: recordingJob, error: jobError } = await supabase
+      .schema('cedro')
+      .from('recording_jobs')
+      .insert({
+        patient_id: patientId,
+        therapist_id: therapistId,
+        appointment_id: appointmentId || null,
+        tipo_consulta: tipoConsulta,
+        status: 'processing',
+        live_transcription: true,
+        sources_json: [{
+          type: 'teleconsultation',
+          filename: 'teleconsulta.webm',
+          mime_type: mimeType,
+          encoding: SPEECH_ENCODING,
+          live: true
+        }]
+      })
+      .select('id')
+      .single()
+
+    if (jobError || !recordingJob) {
+      console.error('Error creating live recording job:', jobError)
+      return NextResponse.json(
+        { error: 'Erro ao criar job de gravação' },
+        { status: 500 }
+      )
+    }
+
+    return NextResponse.json({
+      success: true,
+      recording_job_id: recordingJob.id,
+      segment_seconds: LIVE_SEGMENT_SECONDS
+    })
+  } catch (error) {
+    console.error('Error starting live recording:', error)
+    return NextResponse.json(
+      { error: 'Erro interno do servidor' },
+      { status: 500 }
+    )
+  }
+}
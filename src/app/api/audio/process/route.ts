@@ -1,8 +1,10 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { createClient } from '@/lib/supabase/server'
-import { getPresignedUrl } from '@/lib/minio'
+import { getAudioUrl } from '@/lib/storage'
+import { withSpan } from '@/lib/tracing'
+import { withRouteTracing } from '@/lib/tracing/server'
 
-export async function POST(request: NextRequest) {
+async function processRecording(request: NextRequest) {
   try {
     const { recording_job_id } = await request.json()
 
@@ -38,7 +40,7 @@ export async function POST(request: NextRequest) {
     }
 
     // Generate presigned URL for n8n to download the audio
-    const presignedUrl = await getPresignedUrl(recordingJob.audio_storage_url, 7200) // 2 hours
+    const { url: presignedUrl } = await getAudioUrl(recordingJob.audio_storage_url, 7200) // 2 hours
 
     // Extract filename from sources_json
     const audioFilename = recordingJob.sources_json?.[0]?.filename || 'audio.webm'
@@ -52,19 +54,27 @@ export async function POST(request: NextRequest) {
       tipo_consulta: recordingJob.tipo_consulta || 'evolucao', // 'anamnese' ou 'evolucao'
       audio_url_assinada: presignedUrl,
       audio_original_filename: audioFilename,
-      storage_path_do_audio: recordingJob.audio_storage_url
+      storage_path_do_audio: recordingJob.audio_storage_url,
+      // 'opus-16k-mono' quando o navegador já entregou áudio pronto para o Whisper
+      audio_encoding: recordingJob.sources_json?.[0]?.encoding || null,
+      // Gravação ao vivo: transcrição já costurada, o n8n pode pular o Whisper
+      transcricao_pronta: recordingJob.live_transcription ? recordingJob.transcript_raw_text || null : null
     }
 
     // Trigger n8n webhook
     const n8nWebhookUrl = process.env.N8N_WEBHOOK_URL || 'https://webh.procexai.tech/webhook/prontuarios-drbrain'
     
-    const webhookResponse = await fetch(n8nWebhookUrl, {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify(webhookPayload)
-    })
+    // Início da etapa n8n (duração = processing_completed_at - processing_started_at)
+    const n8nStartedAt = new Date().toISOString()
+    const webhookResponse = await withSpan('n8n prontuarios webhook', 'n8n', () =>
+      fetch(n8nWebhookUrl, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(webhookPayload)
+      })
+    )
 
     if (!webhookResponse.ok) {
       throw new Error(`Webhook failed: ${webhookResponse.status} ${webhookResponse.statusText}`)
@@ -76,6 +86,7 @@ export async function POST(request: NextRequest) {
       .from('recording_jobs')
       .update({
         status: 'processing_n8n',
+        processing_started_at: n8nStartedAt,
         updated_at: new Date().toISOString()
       })
       .eq('id', recording_job_id)
@@ -120,4 +131,6 @@ export async function POST(request: NextRequest) {
       { status: 500 }
     )
   }
-}
\ No newline at end of file
+}
+
+export const POST = withRouteTracing('POST /api/audio/process', processRecording)
@@ -1,7 +1,9 @@
 import { NextRequest, NextResponse } from 'next/server'
+import { withRouteTracing } from '@/lib/tracing/server'
 import { createClient } from '@/lib/supabase/server'
+import { getAudioUrl } from '@/lib/storage'
 
-export async function GET(
+async function getRecordingStatus(
   request: NextRequest,
   { params }: { params: { id: string } }
 ) {
@@ -49,7 +51,8 @@ export async function GET(
         processing_completed_at,
         created_at,
         updated_at,
-        sources_json
+        sources_json,
+        audio_storage_url
       `)
       .eq('id', recordingJobId)
       .single()
@@ -74,6 +77,14 @@ export async function GET(
       medicalRecord = record
     }
 
+    // Presigned URLs are cached per object, so polling doesn't sign a new one each time
+    const audioUrl = recordingJob.audio_storage_url
+      ? await getAudioUrl(recordingJob.audio_storage_url, 3600).catch((error) => {
+          console.error('Error generating audio URL:', error)
+          return null
+        })
+      : null
+
     return NextResponse.json({
       id: recordingJob.id,
       status: recordingJob.status,
@@ -99,6 +110,7 @@ export async function GET(
       created_at: recordingJob.created_at,
       updated_at: recordingJob.updated_at,
       sources: recordingJob.sources_json,
+      audio_url: audioUrl?.url || null,
       
       // Progress details from function
       progress_details: progressData
@@ -111,4 +123,6 @@ export async function GET(
       { status: 500 }
     )
   }
-}
\ No newline at end of file
+}
+
+export const GET = withRouteTracing('GET /api/audio/status/[id]', getRecordingStatus)
@@ -1,9 +1,10 @@
 import { NextRequest, NextResponse } from 'next/server'
+import { withRouteTracing } from '@/lib/tracing/server'
 import { createClient } from '@/lib/supabase'
-import { uploadAudioFile } from '@/lib/minio'
+import { storeAudio } from '@/lib/storage'
 import { fetchWithTimeout, NETWORK_CONFIG } from '@/lib/network-config'
 
-export async function POST(request: NextRequest) {
+async function uploadAudio(request: NextRequest) {
   try {
     const formData = await request.formData()
     const audioFile = formData.get('audio') as File
@@ -11,6 +12,8 @@ export async function POST(request: NextRequest) {
     const therapistId = formData.get('therapist_id') as string
     const appointmentId = formData.get('appointment_id') as string
     const tipoConsulta = formData.get('tipo_consulta') as string || 'evolucao'
+    // Set by the browser when it already encoded mono speech Opus (client-audio-transcode)
+    const audioEncoding = formData.get('audio_encoding') as string | null
 
     if (!audioFile || !patientId || !therapistId) {
       return NextResponse.json(
@@ -54,7 +57,8 @@ export async function POST(request: NextRequest) {
           type: 'teleconsultation',
           filename: audioFile.name,
           size: audioFile.size,
-          mime_type: audioFile.type
+          mime_type: audioFile.type,
+          encoding: audioEncoding
         }]
       })
       .select()
@@ -68,18 +72,15 @@ export async function POST(request: NextRequest) {
       )
     }
 
-    // Store audio file in MinIO
+    // Store audio file (content-addressed: a retried upload reuses the object)
     const audioBuffer = Buffer.from(await audioFile.arrayBuffer())
-    const audioStorageUrl = await uploadAudioFile(
-      audioFile.name,
-      audioBuffer,
-      {
-        'patient-id': patientId,
-        'therapist-id': therapistId,
-        'appointment-id': appointmentId || '',
+    const { url: audioStorageUrl } = await storeAudio(audioBuffer, {
+      fileName: audioFile.name,
+      contentType: audioFile.type || 'audio/webm',
+      metadata: {
         'upload-timestamp': new Date().toISOString()
       }
-    )
+    })
 
     // Update recording job with storage URL
     const { error: updateError } = await supabase
@@ -134,4 +135,6 @@ export async function POST(request: NextRequest) {
       { status: 500 }
     )
   }
-}
\ No newline at end of file
+}
+
+export const POST = withRouteTracing('POST /api/audio/upload', uploadAudio)
@@ -0,0 +1,76 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { withRouteTracing } from '@/lib/tracing/server'
+import { createClient, getServerCedroUser } from '@/lib/supabase/server'
+import { isIsoDate, parseBillingPeriod } from '@/lib/billing'
+
+export const dynamic = 'force-dynamic'
+
+/**
+ * POST /api/billing/run
+ * Body: { period: 'YYYY-MM', due_date?: 'YYYY-MM-DD', dry_run?: boolean }
+ * Gera, numa única transação, uma fatura (draft) por paciente com os
+ * atendimentos concluídos do mês. dry_run (padrão) só devolve a prévia.
+ * Repetir o mesmo período não duplica faturas. Restrito a administradores.
+ */
+async function runBilling(request: NextRequest) {
+  try {
+    const body = await request.json().catch(() => null)
+    const period = parseBillingPeriod(body?.period)
+    const dueDate = body?.due_date || null
+    const dryRun = body?.dry_run !== false
+
+    if (!period) {
+      return NextResponse.json(
+        { error: 'Informe o período no formato AAAA-MM' },
+        { status: 400 }
+      )
+    }
+
+    if (dueDate && !isIsoDate(dueDate)) {
+      return NextResponse.json(
+        { error: 'Data de vencimento inválida (use AAAA-MM-DD)' },
+        { status: 400 }
+      )
+    }
+
+    const supabase = createClient()
+
+    // Claims do token ou, sem o hook, a sessão validada + cedro.users
+    const cedroUser = await getServerCedroUser(supabase)
+    if (!cedroUser) {
+      return NextResponse.json({ error: 'Não autenticado' }, { status: 401 })
+    }
+    if (cedroUser.role !== 'admin') {
+      return NextResponse.json(
+        { error: 'Apenas administradores podem gerar o faturamento' },
+        { status: 403 }
+      )
+    }
+
+    const { data, error } = await supabase
+      .schema('cedro')
+      .rpc('run_monthly_billing', {
+        p_period: period,
+        p_due_date: dueDate,
+        p_dry_run: dryRun
+      })
+
+    if (error) {
+      console.error('Erro no faturamento mensal:', error)
+      return NextResponse.json(
+        { error: 'Erro ao gerar o faturamento', details: error.message },
+        { status: 500 }
+      )
+    }
+
+    return NextResponse.json(data)
+  } catch (error) {
+    console.error('Erro interno no faturamento mensal:', error)
+    return NextResponse.json(
+      { error: 'Erro interno do servidor', details: error instanceof Error ? error.message : 'Erro desconhecido' },
+      { status: 500 }
+    )
+  }
+}
+
+export const POST = withRouteTracing('POST /api/billing/run', runBilling)
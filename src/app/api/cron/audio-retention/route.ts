@@ -0,0 +1,148 @@
+/**
+ * Audio Retention - Cron Endpoint
+ *
+ * Mantém o armazenamento de áudio limitado conforme a clínica cresce
+ *
+ * Fluxo:
+ * 1. Listar objetos de áudio e recording_jobs que apontam para eles
+ * 2. Recodificar para Opus 16 kbps o áudio de sessões com prontuário gerado
+ *    há mais de AUDIO_ARCHIVE_AFTER_DAYS dias (padrão 30)
+ * 3. Apagar objetos sem recording_job (após AUDIO_ORPHAN_GRACE_HOURS, padrão 24)
+ * 4. Registrar a execução em audio_retention_runs com os bytes recuperados
+ *
+ * ?dry_run=true apenas reporta o que seria feito.
+ *
+ * Segurança: Requer CRON_SECRET válido no header
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { createClient } from '@supabase/supabase-js';
+import { retentionOptionsFromEnv, runAudioRetention } from '@/lib/audio-retention';
+
+const supabase = createClient(
+  process.env.NEXT_PUBLIC_SUPABASE_URL!,
+  process.env.SUPABASE_SERVICE_ROLE_KEY!,
+  {
+    db: {
+      schema: 'cedro',
+    },
+  }
+);
+
+const CRON_SECRET = process.env.CRON_SECRET;
+
+export const maxDuration = 300;
+
+function isAuthorized(request: NextRequest): boolean {
+  const authHeader = request.headers.get('authorization');
+  return !!CRON_SECRET && authHeader === `Bearer ${CRON_SECRET}`;
+}
+
+/**
+ * POST /api/cron/audio-retention
+ * Executa uma passada de retenção
+ */
+export async function POST(request: NextRequest) {
+  if (!isAuthorized(request)) {
+    console.warn('Unauthorized cron request');
+    return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  }
+
+  const dryRun = request.nextUrl.searchParams.get('dry_run') === 'true';
+  const startedAt = new Date().toISOString();
+
+  try {
+    console.log(`Starting audio retention${dryRun ? ' (dry run)' : ''}...`);
+
+    const report = await runAudioRetention(supabase, { ...retentionOptionsFromEnv(), dryRun });
+
+    const { error: logError } = await supabase.from('audio_retention_runs').insert({
+      started_at: startedAt,
+      finished_at: new Date().toISOString(),
+      dry_run: dryRun,
+      archived_objects: report.archived.length,
+      deleted_orphans: report.deletedOrphans.length,
+      reclaimed_bytes: report.reclaimedBytes,
+      errors: report.errors,
+    });
+
+    if (logError) {
+      console.error('Failed to log audio retention run:', logError.message);
+    }
+
+    // Durações de etapa (ffmpeg) só são lidas nas últimas 24h por /api/metrics
+    if (!dryRun) {
+      const { error: pruneError } = await supabase.rpc('prune_pipeline_stage_timings', { p_days: 30 });
+      if (pruneError) {
+        console.error('Failed to prune stage timings:', pruneError.message);
+      }
+    }
+
+    console.log('Audio retention completed:', {
+      archived: report.archived.length,
+      deleted_orphans: report.deletedOrphans.length,
+      reclaimed_bytes: report.reclaimedBytes,
+      errors: report.errors.length,
+    });
+
+    return NextResponse.json({
+      success: true,
+      dry_run: dryRun,
+      archived: report.archived,
+      deleted_orphans: report.deletedOrphans,
+      reclaimed_bytes: report.reclaimedBytes,
+      errors: report.errors,
+    });
+  } catch (error) {
+    console.error('Critical error in audio retention:', error);
+
+    return NextResponse.json(
+      {
+        success: false,
+        error: error instanceof Error ? error.message : 'Unknown error',
+      },
+      { status: 500 }
+    );
+  }
+}
+
+/**
+ * GET /api/cron/audio-retention
+ * Últimas execuções e total recuperado
+ */
+export async function GET(request: NextRequest) {
+  if (!isAuthorized(request)) {
+    return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  }
+
+  try {
+    const { data: runs, error } = await supabase
+      .from('audio_retention_runs')
+      .select('*')
+      .eq('dry_run', false)
+      .order('started_at', { ascending: false })
+      .limit(10);
+
+    if (error) {
+      throw new Error(error.message);
+    }
+
+    return NextResponse.json({
+      status: 'healthy',
+      last_run: runs?.[0] || null,
+      recent_runs: runs || [],
+      recent_reclaimed_bytes: (runs || []).reduce(
+        (total, run) => total + (Number(run.reclaimed_bytes) || 0),
+        0
+      ),
+    });
+  } catch (error) {
+    return NextResponse.json(
+      {
+        status: 'error',
+        error: error instanceof Error ? error.message : 'Unknown error',
+      },
+      { status: 500 }
+    );
+  }
+}
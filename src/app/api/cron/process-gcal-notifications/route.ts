@@ -0,0 +1,268 @@
+/**
+ * Process Google Calendar Notifications - Cron Endpoint
+ *
+ * Sincroniza (Google → Cedro) os calendários marcados como pendentes pelo
+ * webhook /api/gcal/webhook
+ *
+ * Fluxo:
+ * 1. Reservar calendários pendentes e quietos há NOTIFICATION_DEBOUNCE_MS (ou
+ *    pendentes há mais de NOTIFICATION_MAX_WAIT_MS) com cedro.claim_gcal_syncs:
+ *    lease por calendário, então nunca há dois syncs do mesmo calendário
+ * 2. Um sync incremental por calendário (full se alguma notificação pediu),
+ *    com concorrência limitada
+ * 3. Liberar o lock gravando o novo sync_token (em falha, o calendário volta a
+ *    ficar pendente)
+ * 4. Repetir até WORKER_BUDGET_MS, para a latência ficar perto do debounce
+ *    mesmo com o cron rodando a cada minuto
+ *
+ * Segurança: Requer CRON_SECRET válido no header
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { createClient } from '@supabase/supabase-js';
+import { tracedFetch } from '@/lib/tracing';
+import { withRouteTracing } from '@/lib/tracing/server';
+import { mapWithConcurrency } from '@/lib/google-calendar/channel-renewal';
+import { syncCalendarChanges } from '@/lib/google-calendar/incoming-sync';
+import {
+  isSyncDue,
+  NOTIFICATION_DEBOUNCE_MS,
+  NOTIFICATION_MAX_WAIT_MS,
+  SYNC_CLAIM_LIMIT,
+  SYNC_CONCURRENCY,
+  SYNC_LEASE_MS,
+  toPgInterval,
+  WORKER_BUDGET_MS,
+  WORKER_POLL_INTERVAL_MS,
+} from '@/lib/google-calendar/notification-coalescing';
+import { flushSyncLog } from '@/lib/google-calendar/sync-log';
+
+export const maxDuration = 60;
+
+const supabase = createClient(
+  process.env.NEXT_PUBLIC_SUPABASE_URL!,
+  process.env.SUPABASE_SERVICE_ROLE_KEY!,
+  {
+    db: {
+      schema: 'cedro',
+    },
+    global: {
+      fetch: tracedFetch,
+    },
+  }
+);
+
+const CRON_SECRET = process.env.CRON_SECRET;
+
+interface ClaimedCalendar {
+  calendar_id: string;
+  sync_token: string | null;
+  full_sync: boolean;
+  notification_count: number;
+  lock_owner: string;
+}
+
+interface CalendarSyncResult {
+  calendarId: string;
+  status: 'synced' | 'failed';
+  fullSync: boolean;
+  notifications: number;
+  processed: number;
+  ignored: number;
+  errors: number;
+  error?: string;
+}
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+async function claimDueCalendars(): Promise<ClaimedCalendar[]> {
+  const { data, error } = await supabase.rpc('claim_gcal_syncs', {
+    p_debounce: toPgInterval(NOTIFICATION_DEBOUNCE_MS),
+    p_max_wait: toPgInterval(NOTIFICATION_MAX_WAIT_MS),
+    p_lease: toPgInterval(SYNC_LEASE_MS),
+    p_limit: SYNC_CLAIM_LIMIT,
+  });
+
+  if (error) {
+    throw new Error(`Failed to claim calendars: ${error.message}`);
+  }
+
+  return (data || []) as ClaimedCalendar[];
+}
+
+async function syncClaimedCalendar(claim: ClaimedCalendar): Promise<CalendarSyncResult> {
+  const result = {
+    calendarId: claim.calendar_id,
+    notifications: claim.notification_count,
+  };
+
+  try {
+    const sync = await syncCalendarChanges(supabase, claim.calendar_id, {
+      syncToken: claim.sync_token,
+      fullSync: claim.full_sync,
+    });
+
+    const { error: releaseError } = await supabase.rpc('release_gcal_sync', {
+      p_calendar_id: claim.calendar_id,
+      p_lock_owner: claim.lock_owner,
+      p_success: true,
+      p_sync_token: sync.nextSyncToken ?? null,
+    });
+
+    if (releaseError) {
+      console.error(`Error releasing calendar ${claim.calendar_id}:`, releaseError.message);
+    }
+
+    return {
+      ...result,
+      status: 'synced',
+      fullSync: sync.fullSync,
+      processed: sync.processed,
+      ignored: sync.ignored,
+      errors: sync.errors.length,
+    };
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : String(error);
+    console.error(`Failed to sync calendar ${claim.calendar_id}:`, errorMessage);
+
+    // Devolve o calendário para a fila (mantendo o pedido de full sync)
+    const { error: releaseError } = await supabase.rpc('release_gcal_sync', {
+      p_calendar_id: claim.calendar_id,
+      p_lock_owner: claim.lock_owner,
+      p_success: false,
+      p_retry_full_sync: claim.full_sync,
+    });
+
+    if (releaseError) {
+      console.error(`Error releasing calendar ${claim.calendar_id}:`, releaseError.message);
+    }
+
+    return {
+      ...result,
+      status: 'failed',
+      fullSync: claim.full_sync,
+      processed: 0,
+      ignored: 0,
+      errors: 0,
+      error: errorMessage,
+    };
+  }
+}
+
+/**
+ * POST /api/cron/process-gcal-notifications
+ * Sincroniza calendários com notificações pendentes
+ */
+async function processNotifications(request: NextRequest) {
+  try {
+    // Validar CRON_SECRET
+    const authHeader = request.headers.get('authorization');
+    if (!CRON_SECRET || authHeader !== `Bearer ${CRON_SECRET}`) {
+      console.warn('Unauthorized cron request');
+      return NextResponse.json(
+        { error: 'Unauthorized' },
+        { status: 401 }
+      );
+    }
+
+    console.log('Starting Google Calendar notifications processing...');
+
+    const startedAt = Date.now();
+    const calendars: CalendarSyncResult[] = [];
+
+    while (Date.now() - startedAt < WORKER_BUDGET_MS) {
+      const claimed = await claimDueCalendars();
+
+      if (claimed.length === 0) {
+        if (Date.now() - startedAt + WORKER_POLL_INTERVAL_MS >= WORKER_BUDGET_MS) break;
+        await sleep(WORKER_POLL_INTERVAL_MS);
+        continue;
+      }
+
+      console.log(`${claimed.length} calendars due for sync`);
+
+      const results = await mapWithConcurrency(claimed, SYNC_CONCURRENCY, syncClaimedCalendar);
+      calendars.push(...results);
+
+      // Logs do lote em poucos INSERTs
+      await flushSyncLog();
+    }
+
+    const summary = {
+      synced: calendars.filter((calendar) => calendar.status === 'synced').length,
+      failed: calendars.filter((calendar) => calendar.status === 'failed').length,
+      notifications: calendars.reduce((sum, calendar) => sum + calendar.notifications, 0),
+      processed: calendars.reduce((sum, calendar) => sum + calendar.processed, 0),
+    };
+
+    console.log('Notifications processing completed:', summary);
+
+    return NextResponse.json({
+      success: true,
+      ...summary,
+      calendars,
+    });
+  } catch (error) {
+    console.error('Critical error in notifications processing:', error);
+    await flushSyncLog();
+
+    return NextResponse.json(
+      {
+        success: false,
+        error: error instanceof Error ? error.message : 'Unknown error',
+      },
+      { status: 500 }
+    );
+  }
+}
+
+export const POST = withRouteTracing('POST /api/cron/process-gcal-notifications', processNotifications);
+
+/**
+ * GET /api/cron/process-gcal-notifications
+ * Health check e calendários pendentes
+ */
+export async function GET(request: NextRequest) {
+  try {
+    // Validar CRON_SECRET
+    const authHeader = request.headers.get('authorization');
+    if (!CRON_SECRET || authHeader !== `Bearer ${CRON_SECRET}`) {
+      return NextResponse.json(
+        { error: 'Unauthorized' },
+        { status: 401 }
+      );
+    }
+
+    const { data: pending, error } = await supabase
+      .from('google_calendar_sync_state')
+      .select('calendar_id, pending_since, last_notified_at, sync_locked_until, notification_count')
+      .not('pending_since', 'is', null);
+
+    if (error) {
+      throw new Error(error.message);
+    }
+
+    const now = Date.now();
+    const rows = pending || [];
+    const oldest = rows.reduce<string | null>(
+      (min, row) => (!min || row.pending_since < min ? row.pending_since : min),
+      null
+    );
+
+    return NextResponse.json({
+      status: 'healthy',
+      pending_calendars: rows.length,
+      due_now: rows.filter((row) => isSyncDue(row, now)).length,
+      pending_notifications: rows.reduce((sum, row) => sum + (row.notification_count || 0), 0),
+      oldest_pending_since: oldest,
+    });
+  } catch (error) {
+    return NextResponse.json(
+      {
+        status: 'error',
+        error: error instanceof Error ? error.message : 'Unknown error',
+      },
+      { status: 500 }
+    );
+  }
+}
@@ -7,6 +7,7 @@
  * 1. Buscar lotes de jobs com status='pending'
  * 2. Marcar como 'processing'
  * 3. Executar create/update/delete no Google Calendar
+ *    (jobs de série viram um único evento recorrente)
  * 4. Marcar como 'completed' ou incrementar retry_count
  * 5. Com backoff exponencial para falhas
  *
@@ -15,8 +16,12 @@
 
 import { NextRequest, NextResponse } from 'next/server';
 import { createClient } from '@supabase/supabase-js';
+import { tracedFetch } from '@/lib/tracing';
+import { withRouteTracing } from '@/lib/tracing/server';
 import { googleCalendarService } from '@/lib/google-calendar/service';
-import type { CedroAppointmentForSync } from '@/lib/google-calendar/types';
+import { flushSyncLog } from '@/lib/google-calendar/sync-log';
+import { ensureSeriesEvent, planSeriesRecurrence } from '@/lib/google-calendar/series-event';
+import type { CedroAppointmentForSync, CedroSeriesForSync } from '@/lib/google-calendar/types';
 
 const supabase = createClient(
   process.env.NEXT_PUBLIC_SUPABASE_URL!,
@@ -25,6 +30,9 @@ const supabase = createClient(
     db: {
       schema: 'cedro',
     },
+    global: {
+      fetch: tracedFetch,
+    },
   }
 );
 
@@ -34,7 +42,9 @@ const BACKOFF_DELAYS = [2000, 4000, 8000, 16000]; // ms para retry (2s, 4s, 8s,
 
 interface SyncJob {
   id: string;
-  appointment_id: string;
+  appointment_id: string | null;
+  series_id: string | null;
+  series_from: string | null;
   action: 'create' | 'update' | 'delete';
   status: string;
   retry_count: number;
@@ -44,6 +54,13 @@ interface SyncJob {
   processed_at: string | null;
 }
 
+interface SeriesWithTherapist extends CedroSeriesForSync {
+  first_start_at: string;
+  therapist: {
+    google_calendar_id: string;
+  };
+}
+
 interface AppointmentWithTherapist extends CedroAppointmentForSync {
   therapist: {
     google_calendar_id: string;
@@ -54,7 +71,7 @@ interface AppointmentWithTherapist extends CedroAppointmentForSync {
  * POST /api/cron/process-gcal-sync
  * Processa fila de sincronização
  */
-export async function POST(request: NextRequest) {
+async function processSyncQueue(request: NextRequest) {
   try {
     // Validar CRON_SECRET
     const authHeader = request.headers.get('authorization');
@@ -108,93 +125,11 @@ export async function POST(request: NextRequest) {
           .update({ status: 'processing' })
           .eq('id', job.id);
 
-        // Buscar dados do agendamento com terapeuta
-        const { data: appointment, error: appointmentError } = await supabase
-          .from('appointments')
-          .select(
-            `
-            id,
-            summary,
-            start_at,
-            end_at,
-            notes,
-            patient_id,
-            external_event_id,
-            external_calendar_id,
-            gcal_etag,
-            therapist_id,
-            therapist:therapist_id (
-              id,
-              google_calendar_id
-            ),
-            patient:patient_id (
-              name
-            )
-          `
-          )
-          .eq('id', job.appointment_id)
-          .single();
-
-        if (appointmentError || !appointment) {
-          throw new Error(
-            `Appointment not found: ${appointmentError?.message || 'unknown'}`
-          );
-        }
-
-        const appointmentWithTherapist = appointment as any as AppointmentWithTherapist;
-
-        // Verificar se terapeuta tem Google Calendar configurado
-        // Nota: O Supabase retorna arrays para relações, então precisamos pegar o primeiro item se for array
-        const therapist = Array.isArray(appointmentWithTherapist.therapist) 
-          ? appointmentWithTherapist.therapist[0] 
-          : appointmentWithTherapist.therapist;
-          
-        if (!therapist?.google_calendar_id) {
-          throw new Error(
-            `Therapist has no Google Calendar configured (therapist_id: ${appointmentWithTherapist.therapist_id})`
-          );
-        }
-
-        const calendarId = therapist.google_calendar_id;
-
-        // 3. Executar ação apropriada
-        console.log(`Processing job ${job.id}: ${job.action} for appointment ${job.appointment_id}`);
-
-        switch (job.action) {
-          case 'create': {
-            await googleCalendarService.createEvent(
-              appointmentWithTherapist,
-              calendarId
-            );
-            break;
-          }
-
-          case 'update': {
-            await googleCalendarService.updateEvent(
-              appointmentWithTherapist,
-              {
-                summary: appointment.summary,
-                description: appointment.notes,
-                start_at: appointment.start_at,
-                end_at: appointment.end_at,
-              }
-            );
-            break;
-          }
-
-          case 'delete': {
-            if (!appointment.external_event_id) {
-              throw new Error('Cannot delete: missing external_event_id');
-            }
-            await googleCalendarService.deleteEvent(
-              calendarId,
-              appointment.external_event_id
-            );
-            break;
-          }
-
-          default:
-            throw new Error(`Unknown action: ${job.action}`);
+        // 3. Executar ação apropriada (job de série = um evento recorrente)
+        if (job.series_id) {
+          await processSeriesJob(job);
+        } else {
+          await processAppointmentJob(job);
         }
 
         // 4. Marcar como completed
@@ -254,6 +189,8 @@ export async function POST(request: NextRequest) {
       results.processed++;
     }
 
+    await flushSyncLog();
+
     console.log('Sync queue processing completed:', results);
 
     return NextResponse.json({
@@ -273,6 +210,245 @@ export async function POST(request: NextRequest) {
   }
 }
 
+export const POST = withRouteTracing('POST /api/cron/process-gcal-sync', processSyncQueue);
+
+/**
+ * Sincroniza um agendamento avulso (create/update/delete de um evento)
+ */
+async function processAppointmentJob(job: SyncJob): Promise<void> {
+  // Buscar dados do agendamento com terapeuta
+  const { data: appointment, error: appointmentError } = await supabase
+    .from('appointments')
+    .select(
+      `
+      id,
+      summary,
+      start_at,
+      end_at,
+      notes,
+      patient_id,
+      external_event_id,
+      external_calendar_id,
+      gcal_etag,
+      therapist_id,
+      therapist:therapist_id (
+        id,
+        google_calendar_id
+      ),
+      patient:patient_id (
+        name
+      )
+    `
+    )
+    .eq('id', job.appointment_id)
+    .single();
+
+  if (appointmentError || !appointment) {
+    throw new Error(
+      `Appointment not found: ${appointmentError?.message || 'unknown'}`
+    );
+  }
+
+  const appointmentWithTherapist = appointment as any as AppointmentWithTherapist;
+
+  // Verificar se terapeuta tem Google Calendar configurado
+  // Nota: O Supabase retorna arrays para relações, então precisamos pegar o primeiro item se for array
+  const therapist = Array.isArray(appointmentWithTherapist.therapist) 
+    ? appointmentWithTherapist.therapist[0] 
+    : appointmentWithTherapist.therapist;
+
+  if (!therapist?.google_calendar_id) {
+    throw new Error(
+      `Therapist has no Google Calendar configured (therapist_id: ${appointmentWithTherapist.therapist_id})`
+    );
+  }
+
+  const calendarId = therapist.google_calendar_id;
+
+  console.log(`Processing job ${job.id}: ${job.action} for appointment ${job.appointment_id}`);
+
+  switch (job.action) {
+    case 'create': {
+      await googleCalendarService.createEvent(
+        appointmentWithTherapist,
+        calendarId
+      );
+      break;
+    }
+
+    case 'update': {
+      await googleCalendarService.updateEvent(
+        appointmentWithTherapist,
+        {
+          summary: appointment.summary,
+          description: appointment.notes,
+          start_at: appointment.start_at,
+          end_at: appointment.end_at,
+        }
+      );
+      break;
+    }
+
+    case 'delete': {
+      if (!appointment.external_event_id) {
+        throw new Error('Cannot delete: missing external_event_id');
+      }
+      await googleCalendarService.deleteEvent(
+        calendarId,
+        appointment.external_event_id
+      );
+      break;
+    }
+
+    default:
+      throw new Error(`Unknown action: ${job.action}`);
+  }
+}
+
+/**
+ * Sincroniza uma série inteira com UM evento recorrente no Google
+ * - create: cria o evento recorrente para as ocorrências ainda não vinculadas
+ * - update: trunca o evento atual em series_from e recria para as deslocadas
+ * - delete: trunca (ou apaga, se o corte é anterior à série) o evento atual
+ */
+async function processSeriesJob(job: SyncJob): Promise<void> {
+  const { data: series, error: seriesError } = await supabase
+    .from('appointment_series')
+    .select(
+      `
+      id,
+      therapist_id,
+      summary,
+      notes,
+      interval_weeks,
+      first_start_at,
+      external_event_id,
+      external_calendar_id,
+      therapist:therapist_id (
+        google_calendar_id
+      ),
+      patient:patient_id (
+        name
+      )
+    `
+    )
+    .eq('id', job.series_id)
+    .single();
+
+  if (seriesError || !series) {
+    throw new Error(`Series not found: ${seriesError?.message || 'unknown'}`);
+  }
+
+  const seriesWithTherapist = series as any as SeriesWithTherapist;
+  const therapist = Array.isArray(seriesWithTherapist.therapist)
+    ? seriesWithTherapist.therapist[0]
+    : seriesWithTherapist.therapist;
+
+  if (!therapist?.google_calendar_id) {
+    throw new Error(
+      `Therapist has no Google Calendar configured (therapist_id: ${seriesWithTherapist.therapist_id})`
+    );
+  }
+
+  const calendarId = therapist.google_calendar_id;
+  const cutoff = job.series_from ? new Date(job.series_from) : null;
+
+  console.log(`Processing series job ${job.id}: ${job.action} for series ${job.series_id}`);
+
+  // Evento recorrente atual: truncar no corte (ou apagar se o corte o cobre inteiro)
+  if (job.action !== 'create' && seriesWithTherapist.external_event_id) {
+    const currentCalendarId = seriesWithTherapist.external_calendar_id || calendarId;
+
+    const { data: firstLinked } = await supabase
+      .from('appointments')
+      .select('start_at')
+      .eq('recurring_event_id', seriesWithTherapist.external_event_id)
+      .order('start_at', { ascending: true })
+      .limit(1)
+      .maybeSingle();
+
+    const masterStart = firstLinked ? new Date(firstLinked.start_at) : null;
+
+    if (!cutoff || !masterStart || cutoff <= masterStart) {
+      await googleCalendarService.deleteEvent(
+        currentCalendarId,
+        seriesWithTherapist.external_event_id
+      );
+    } else {
+      await googleCalendarService.truncateRecurringEvent(
+        currentCalendarId,
+        seriesWithTherapist.external_event_id,
+        cutoff
+      );
+    }
+  }
+
+  if (job.action === 'delete') {
+    return;
+  }
+
+  // Ocorrências ativas ainda sem evento no Google
+  const { data: pending, error: pendingError } = await supabase
+    .from('appointments')
+    .select('id, start_at, end_at')
+    .eq('series_id', seriesWithTherapist.id)
+    .is('recurring_event_id', null)
+    .is('external_event_id', null)
+    .in('status', ['scheduled', 'confirmed'])
+    .order('start_at', { ascending: true });
+
+  if (pendingError) {
+    throw new Error(`Failed to load series occurrences: ${pendingError.message}`);
+  }
+
+  if (!pending || pending.length === 0) {
+    console.log(`Series ${seriesWithTherapist.id} has no occurrences to sync`);
+    return;
+  }
+
+  // Regra semanal só com ocorrências que caem nas instâncias: canceladas viram
+  // EXDATE, movidas ficam de fora e o RPC enfileira um job para cada uma
+  const plan = planSeriesRecurrence(pending, seriesWithTherapist.interval_weeks);
+
+  if (plan.offGrid.length > 0) {
+    console.log(
+      `Series ${seriesWithTherapist.id}: ${plan.offGrid.length} occurrences off the weekly rule will sync one by one`
+    );
+  }
+
+  // Reaproveita o evento de uma tentativa anterior cujo vínculo falhou
+  const { event, reused } = await ensureSeriesEvent({
+    find: () =>
+      googleCalendarService.findRecurringEvent(
+        seriesWithTherapist.id,
+        plan.first.start_at,
+        calendarId
+      ),
+    create: () =>
+      googleCalendarService.createRecurringEvent(
+        seriesWithTherapist,
+        plan,
+        calendarId
+      ),
+    link: async (recurringEvent) => {
+      const { error: linkError } = await supabase.rpc('link_appointment_series_event', {
+        p_series_id: seriesWithTherapist.id,
+        p_event_id: recurringEvent.id,
+        p_calendar_id: calendarId,
+        p_appointment_ids: plan.onGrid.map((occurrence) => occurrence.id),
+      });
+
+      if (linkError) {
+        throw new Error(`Failed to link series occurrences: ${linkError.message}`);
+      }
+    },
+  });
+
+  if (reused) {
+    console.log(`Reused recurring event ${event.id} for series ${seriesWithTherapist.id}`);
+  }
+}
+
 /**
  * GET /api/cron/process-gcal-sync
  * Health check e status da fila
@@ -288,10 +464,12 @@ export async function GET(request: NextRequest) {
       );
     }
 
-    // Contar jobs por status
-    const { data: stats } = await supabase
-      .from('gcal_sync_queue')
-      .select('status', { count: 'exact' });
+    // Contar jobs por status (GROUP BY no banco, db/schema/pipeline_metrics.sql)
+    const { data: stats, error: statsError } = await supabase.rpc('gcal_sync_queue_counts');
+
+    if (statsError) {
+      throw new Error(`Failed to count queue: ${statsError.message}`);
+    }
 
     const statusCounts = {
       pending: 0,
@@ -300,10 +478,8 @@ export async function GET(request: NextRequest) {
       failed: 0,
     };
 
-    if (stats) {
-      for (const row of stats) {
-        statusCounts[row.status as keyof typeof statusCounts]++;
-      }
+    for (const row of (stats || []) as Array<{ status: string; jobs: number }>) {
+      statusCounts[row.status as keyof typeof statusCounts] = Number(row.jobs);
     }
 
     return NextResponse.json({
@@ -5,16 +5,28 @@
  * Este cron renova channels que estão para expirar
  *
  * Fluxo:
- * 1. Buscar channels que expiram em < 24h
- * 2. Para cada um, chamar events.watch novamente
- * 3. Atualizar google_calendar_channels mantendo sync_token
+ * 1. Buscar channels dentro da janela de renovação (24h + jitter por canal,
+ *    para que as expirações não se concentrem na mesma execução)
+ * 2. Chamar events.watch com concorrência limitada e backoff em rate limit
+ * 3. Gravar todos os canais renovados em um único upsert (mantendo sync_token)
+ *    e desativar os que falharam em um único update
  *
  * Segurança: Requer CRON_SECRET válido no header
  */
 
 import { NextRequest, NextResponse } from 'next/server';
 import { createClient } from '@supabase/supabase-js';
+import { tracedFetch } from '@/lib/tracing';
 import { googleCalendarService } from '@/lib/google-calendar/service';
+import {
+  isDueForRenewal,
+  mapWithConcurrency,
+  RENEWAL_CONCURRENCY,
+  RENEWAL_JITTER_MS,
+  RENEWAL_WINDOW_MS,
+  watchExpirationToIso,
+  withRateLimitBackoff,
+} from '@/lib/google-calendar/channel-renewal';
 import { v4 as uuidv4 } from 'uuid';
 
 const supabase = createClient(
@@ -24,6 +36,9 @@ const supabase = createClient(
     db: {
       schema: 'cedro',
     },
+    global: {
+      fetch: tracedFetch,
+    },
   }
 );
 
@@ -45,6 +60,16 @@ interface ChannelRecord {
   is_active: boolean;
 }
 
+interface ChannelRenewalResult {
+  channelId: string;
+  calendarId: string;
+  therapistId: string;
+  status: 'renewed' | 'failed' | 'deferred';
+  attempts: number;
+  expiration?: string;
+  error?: string;
+}
+
 /**
  * POST /api/cron/renew-gcal-channels
  * Renova channels que estão para expirar
@@ -63,10 +88,11 @@ export async function POST(request: NextRequest) {
 
     console.log('Starting Google Calendar channels renewal...');
 
-    // 1. Buscar channels que expiram em < 24h
-    const expirationThreshold = new Date(Date.now() + 24 * 60 * 60 * 1000);
+    // 1. Buscar channels na janela máxima (24h + jitter) e filtrar por canal
+    const now = Date.now();
+    const expirationThreshold = new Date(now + RENEWAL_WINDOW_MS + RENEWAL_JITTER_MS);
 
-    const { data: channelsToRenew, error: fetchError } = await supabase
+    const { data: candidates, error: fetchError } = await supabase
       .from('google_calendar_channels')
       .select('*')
       .eq('is_active', true)
@@ -76,7 +102,11 @@ export async function POST(request: NextRequest) {
       throw new Error(`Failed to fetch channels: ${fetchError.message}`);
     }
 
-    if (!channelsToRenew || channelsToRenew.length === 0) {
+    const channelsToRenew = ((candidates || []) as ChannelRecord[]).filter((channel) =>
+      isDueForRenewal(channel, now)
+    );
+
+    if (channelsToRenew.length === 0) {
       console.log('No channels need renewal');
       return NextResponse.json({
         success: true,
@@ -87,79 +117,103 @@ export async function POST(request: NextRequest) {
 
     console.log(`${channelsToRenew.length} channels need renewal`);
 
-    const results = {
-      renewed: 0,
-      failed: 0,
-      errors: [] as Array<{ calendarId: string; error: string }>,
-    };
+    const webhookAddress = `${APP_URL}/api/gcal/webhook`;
+    const renewedRows: Array<ChannelRecord & { updated_at: string }> = [];
+    const deactivateIds: string[] = [];
 
-    // 2. Renovar cada channel
-    for (const channel of channelsToRenew as ChannelRecord[]) {
-      try {
-        const webhookAddress = `${APP_URL}/api/gcal/webhook`;
+    // 2. Renovar com concorrência limitada
+    const channels = await mapWithConcurrency(
+      channelsToRenew,
+      RENEWAL_CONCURRENCY,
+      async (channel): Promise<ChannelRenewalResult> => {
+        const result = {
+          channelId: channel.id,
+          calendarId: channel.calendar_id,
+          therapistId: channel.therapist_id,
+        };
         const newChannelToken = uuidv4();
         const newChannelId = uuidv4();
 
-        console.log(`Renewing channel for calendar ${channel.calendar_id}`);
+        try {
+          const { value: watchResponse, attempts } = await withRateLimitBackoff(() =>
+            googleCalendarService.watchCalendar(
+              channel.calendar_id,
+              webhookAddress,
+              newChannelToken,
+              newChannelId
+            )
+          );
 
-        // Chamar events.watch
-        const watchResponse = await googleCalendarService.watchCalendar(
-          channel.calendar_id,
-          webhookAddress,
-          newChannelToken
-        );
-
-        // 3. Atualizar canal mantendo sync_token (IMPORTANTE!)
-        const { error: updateError } = await supabase
-          .from('google_calendar_channels')
-          .update({
+          const expiration = watchExpirationToIso(watchResponse.expiration);
+          renewedRows.push({
+            ...channel,
             channel_id: newChannelId,
             resource_id: watchResponse.resourceId,
             channel_token: newChannelToken,
-            expiration: watchResponse.expiration,
+            expiration,
             updated_at: new Date().toISOString(),
-          })
-          .eq('id', channel.id);
+          });
+
+          return { ...result, status: 'renewed', attempts, expiration };
+        } catch (error: any) {
+          const errorMessage = error instanceof Error ? error.message : String(error);
+          console.error(
+            `Failed to renew channel for calendar ${channel.calendar_id}:`,
+            errorMessage
+          );
+
+          // Rate limit esgotado com o canal ainda válido: tenta de novo na próxima execução
+          if (error?.rateLimited && Date.parse(channel.expiration) > Date.now()) {
+            return { ...result, status: 'deferred', attempts: error.attempts || 1, error: errorMessage };
+          }
 
-        if (updateError) {
-          throw new Error(`Failed to update channel: ${updateError.message}`);
+          deactivateIds.push(channel.id);
+          return { ...result, status: 'failed', attempts: error?.attempts || 1, error: errorMessage };
         }
+      }
+    );
 
-        results.renewed++;
-        console.log(`Channel renewed for calendar ${channel.calendar_id}`, {
-          new_expiration: watchResponse.expiration,
-        });
-      } catch (error) {
-        const errorMessage =
-          error instanceof Error ? error.message : String(error);
+    // 3. Gravar estado em lote (mantendo sync_token, que fica em google_calendar_sync_state)
+    if (renewedRows.length > 0) {
+      const { error: upsertError } = await supabase
+        .from('google_calendar_channels')
+        .upsert(renewedRows, { onConflict: 'id' });
 
-        results.failed++;
-        results.errors.push({
-          calendarId: channel.calendar_id,
-          error: errorMessage,
-        });
-
-        console.error(
-          `Failed to renew channel for calendar ${channel.calendar_id}:`,
-          errorMessage
-        );
-
-        // Marcar canal como inativo se falhar renovação
-        await supabase
-          .from('google_calendar_channels')
-          .update({
-            is_active: false,
-            updated_at: new Date().toISOString(),
-          })
-          .eq('id', channel.id);
+      if (upsertError) {
+        throw new Error(`Failed to update renewed channels: ${upsertError.message}`);
       }
     }
 
+    // Marcar como inativos os canais que falharam
+    if (deactivateIds.length > 0) {
+      const { error: deactivateError } = await supabase
+        .from('google_calendar_channels')
+        .update({
+          is_active: false,
+          updated_at: new Date().toISOString(),
+        })
+        .in('id', deactivateIds);
+
+      if (deactivateError) {
+        console.error('Failed to deactivate channels:', deactivateError.message);
+      }
+    }
+
+    const results = {
+      renewed: channels.filter((channel) => channel.status === 'renewed').length,
+      failed: channels.filter((channel) => channel.status === 'failed').length,
+      deferred: channels.filter((channel) => channel.status === 'deferred').length,
+      errors: channels
+        .filter((channel) => channel.error)
+        .map((channel) => ({ calendarId: channel.calendarId, error: channel.error as string })),
+    };
+
     console.log('Channel renewal completed:', results);
 
     return NextResponse.json({
       success: true,
       ...results,
+      channels,
     });
   } catch (error) {
     console.error('Critical error in channel renewal:', error);
@@ -0,0 +1,92 @@
+/**
+ * Calendar Sync Log Retention - Cron Endpoint
+ *
+ * calendar_sync_log é particionado por mês (db/schema/calendar_sync_log_partitioning.sql)
+ *
+ * Fluxo:
+ * 1. Criar as partições dos próximos meses (INSERTs nunca ficam sem partição)
+ * 2. Remover partições mais antigas que SYNC_LOG_RETENTION_MONTHS (padrão 6)
+ *
+ * Segurança: Requer CRON_SECRET válido no header
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { createClient } from '@supabase/supabase-js';
+
+const supabase = createClient(
+  process.env.NEXT_PUBLIC_SUPABASE_URL!,
+  process.env.SUPABASE_SERVICE_ROLE_KEY!,
+  {
+    db: {
+      schema: 'cedro',
+    },
+  }
+);
+
+const CRON_SECRET = process.env.CRON_SECRET;
+const RETENTION_MONTHS = Number(process.env.SYNC_LOG_RETENTION_MONTHS) || 6;
+const MONTHS_AHEAD = 3;
+
+/**
+ * POST /api/cron/sync-log-retention
+ * Mantém as partições do calendar_sync_log
+ */
+export async function POST(request: NextRequest) {
+  try {
+    // Validar CRON_SECRET
+    const authHeader = request.headers.get('authorization');
+    if (!CRON_SECRET || authHeader !== `Bearer ${CRON_SECRET}`) {
+      console.warn('Unauthorized cron request');
+      return NextResponse.json(
+        { error: 'Unauthorized' },
+        { status: 401 }
+      );
+    }
+
+    // 1. Partições futuras
+    const { data: created, error: ensureError } = await supabase.rpc(
+      'ensure_calendar_sync_log_partitions',
+      { p_months_ahead: MONTHS_AHEAD }
+    );
+
+    if (ensureError) {
+      throw new Error(`Failed to create partitions: ${ensureError.message}`);
+    }
+
+    // 2. Partições antigas
+    const { data: dropped, error: dropError } = await supabase.rpc(
+      'drop_calendar_sync_log_partitions',
+      { p_retention_months: RETENTION_MONTHS }
+    );
+
+    if (dropError) {
+      throw new Error(`Failed to drop partitions: ${dropError.message}`);
+    }
+
+    const droppedPartitions = ((dropped || []) as Array<{ partition_name: string }>).map(
+      (row) => row.partition_name
+    );
+
+    console.log('Sync log retention completed:', {
+      created_partitions: created || 0,
+      dropped_partitions: droppedPartitions,
+    });
+
+    return NextResponse.json({
+      success: true,
+      retention_months: RETENTION_MONTHS,
+      created_partitions: created || 0,
+      dropped_partitions: droppedPartitions,
+    });
+  } catch (error) {
+    console.error('Critical error in sync log retention:', error);
+
+    return NextResponse.json(
+      {
+        success: false,
+        error: error instanceof Error ? error.message : 'Unknown error',
+      },
+      { status: 500 }
+    );
+  }
+}
@@ -0,0 +1,71 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { withRouteTracing } from '@/lib/tracing/server'
+import { createClient, getServerCedroUser } from '@/lib/supabase/server'
+import {
+  createExportStream,
+  exportFilename,
+  EXPORT_CONTENT_TYPES,
+  EXPORT_FORMATS,
+  type ExportFormat
+} from '@/lib/export'
+import { datasetPages, EXPORT_DATASETS, isExportDataset } from '@/lib/export/datasets'
+
+export const dynamic = 'force-dynamic'
+
+/**
+ * GET /api/export/{invoices|patients|leads}?format=csv|xlsx&<filtros da lista>
+ * Exporta todas as linhas que a lista mostraria com os mesmos filtros,
+ * paginando por cursor (keyset) e escrevendo cada página direto na resposta.
+ * O RLS do usuário se aplica; terapeutas exportam apenas os próprios dados.
+ */
+async function exportDataset(
+  request: NextRequest,
+  { params }: { params: { dataset: string } }
+) {
+  try {
+    if (!isExportDataset(params.dataset)) {
+      return NextResponse.json({ error: 'Exportação não encontrada' }, { status: 404 })
+    }
+
+    const { searchParams } = new URL(request.url)
+    const format = (searchParams.get('format') || 'csv') as ExportFormat
+    if (!EXPORT_FORMATS.includes(format)) {
+      return NextResponse.json(
+        { error: 'Formato inválido (use csv ou xlsx)' },
+        { status: 400 }
+      )
+    }
+
+    const supabase = createClient()
+
+    // Claims do token ou, sem o hook, a sessão validada + cedro.users
+    const claims = await getServerCedroUser(supabase)
+    if (!claims) {
+      return NextResponse.json({ error: 'Não autenticado' }, { status: 401 })
+    }
+
+    const dataset = EXPORT_DATASETS[params.dataset]
+    const stream = createExportStream(
+      datasetPages(supabase, dataset, searchParams, claims),
+      dataset.columns,
+      format,
+      { sheetName: dataset.sheetName }
+    )
+
+    return new NextResponse(stream, {
+      headers: {
+        'Content-Type': EXPORT_CONTENT_TYPES[format],
+        'Content-Disposition': `attachment; filename="${exportFilename(dataset.filename, format)}"`,
+        'Cache-Control': 'no-store'
+      }
+    })
+  } catch (error) {
+    console.error('Erro interno na exportação:', error)
+    return NextResponse.json(
+      { error: 'Erro interno do servidor', details: error instanceof Error ? error.message : 'Erro desconhecido' },
+      { status: 500 }
+    )
+  }
+}
+
+export const GET = withRouteTracing('GET /api/export/[dataset]', exportDataset)
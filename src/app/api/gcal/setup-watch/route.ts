@@ -15,6 +15,7 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { createClient } from '@supabase/supabase-js';
 import { googleCalendarService } from '@/lib/google-calendar/service';
+import { watchExpirationToIso } from '@/lib/google-calendar/channel-renewal';
 import { v4 as uuidv4 } from 'uuid';
 
 const supabase = createClient(
@@ -125,7 +126,8 @@ export async function POST(request: NextRequest) {
       watchResponse = await googleCalendarService.watchCalendar(
         calendarId,
         webhookAddress,
-        channelToken
+        channelToken,
+        channelId
       );
     } catch (error) {
       console.error(`Failed to watch calendar on Google:`, error);
@@ -141,7 +143,7 @@ export async function POST(request: NextRequest) {
     }
 
     const resourceId = watchResponse.resourceId;
-    const expiration = watchResponse.expiration;
+    const expiration = watchExpirationToIso(watchResponse.expiration);
 
     // 4. Inserir/atualizar google_calendar_sync_state (se não existe)
     const { error: syncStateError } = await supabase
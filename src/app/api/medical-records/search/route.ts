@@ -0,0 +1,71 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { withRouteTracing } from '@/lib/tracing/server'
+import { createClient, getServerCedroClaims } from '@/lib/supabase/server'
+
+const MAX_LIMIT = 50
+
+/**
+ * GET /api/medical-records/search?q=<termos>&limit=20&offset=0[&therapist_id=]
+ * Busca textual (português) em título, notas e transcrição dos prontuários.
+ * O escopo por terapeuta é aplicado pela RPC a partir do usuário da sessão;
+ * therapist_id só tem efeito para administradores.
+ */
+async function searchMedicalRecords(request: NextRequest) {
+  try {
+    const { searchParams } = new URL(request.url)
+    const query = searchParams.get('q')?.trim() || ''
+    const limit = Math.min(Math.max(parseInt(searchParams.get('limit') || '20', 10) || 20, 1), MAX_LIMIT)
+    const offset = Math.max(parseInt(searchParams.get('offset') || '0', 10) || 0, 0)
+    const therapistId = searchParams.get('therapist_id') || null
+
+    if (query.length < 2) {
+      return NextResponse.json(
+        { error: 'Informe ao menos 2 caracteres para a busca' },
+        { status: 400 }
+      )
+    }
+
+    const supabase = createClient()
+
+    // Claims do token bastam; sem o hook de claims, valida a sessão no Auth
+    const claims = await getServerCedroClaims(supabase)
+    if (!claims) {
+      const { data: { user } } = await supabase.auth.getUser()
+      if (!user) {
+        return NextResponse.json({ error: 'Não autenticado' }, { status: 401 })
+      }
+    }
+
+    const { data, error } = await supabase
+      .schema('cedro')
+      .rpc('search_medical_records', {
+        p_query: query,
+        p_therapist_id: therapistId,
+        p_limit: limit,
+        p_offset: offset
+      })
+
+    if (error) {
+      console.error('Erro na busca de prontuários:', error)
+      return NextResponse.json(
+        { error: 'Erro ao buscar prontuários', details: error.message },
+        { status: 500 }
+      )
+    }
+
+    const results = (data || []) as any[]
+
+    return NextResponse.json({
+      results,
+      nextOffset: results.length === limit ? offset + limit : null
+    })
+  } catch (error) {
+    console.error('Erro interno na busca de prontuários:', error)
+    return NextResponse.json(
+      { error: 'Erro interno do servidor', details: error instanceof Error ? error.message : 'Erro desconhecido' },
+      { status: 500 }
+    )
+  }
+}
+
+export const GET = withRouteTracing('GET /api/medical-records/search', searchMedicalRecords)
@@ -0,0 +1,58 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { createClient } from '@supabase/supabase-js'
+import { tracedFetch } from '@/lib/tracing'
+import { withRouteTracing } from '@/lib/tracing/server'
+import { formatPipelineMetrics, PROMETHEUS_CONTENT_TYPE, type PipelineMetricsSnapshot } from '@/lib/prometheus'
+
+export const dynamic = 'force-dynamic'
+
+const supabase = createClient(
+  process.env.NEXT_PUBLIC_SUPABASE_URL!,
+  process.env.SUPABASE_SERVICE_ROLE_KEY!,
+  {
+    db: {
+      schema: 'cedro'
+    },
+    global: {
+      fetch: tracedFetch
+    }
+  }
+)
+
+// Token do scraper; CRON_SECRET continua aceito para não exigir outra variável
+const METRICS_TOKEN = process.env.METRICS_TOKEN || process.env.CRON_SECRET
+
+/**
+ * GET /api/metrics
+ * Métricas dos pipelines de sync do Google e de áudio no formato Prometheus.
+ * Um único RPC (cedro.pipeline_metrics) faz todas as agregações com GROUP BY.
+ */
+async function collectMetrics(request: NextRequest) {
+  const authHeader = request.headers.get('authorization')
+  if (!METRICS_TOKEN || authHeader !== `Bearer ${METRICS_TOKEN}`) {
+    return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+  }
+
+  try {
+    const { data, error } = await supabase.rpc('pipeline_metrics')
+
+    if (error || !data) {
+      throw new Error(error?.message || 'Empty metrics snapshot')
+    }
+
+    return new NextResponse(formatPipelineMetrics(data as PipelineMetricsSnapshot), {
+      headers: {
+        'Content-Type': PROMETHEUS_CONTENT_TYPE,
+        'Cache-Control': 'no-store'
+      }
+    })
+  } catch (error) {
+    console.error('Error collecting metrics:', error)
+    return NextResponse.json(
+      { error: 'Erro interno do servidor' },
+      { status: 500 }
+    )
+  }
+}
+
+export const GET = withRouteTracing('GET /api/metrics', collectMetrics)
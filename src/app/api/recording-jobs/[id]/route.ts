@@ -1,5 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { createClient } from '@/lib/supabase/server'
+import { removeLiveRecording } from '@/lib/live-transcription'
 
 export async function GET(
   request: NextRequest,
@@ -218,6 +219,9 @@ export async function DELETE(
       )
     }
 
+    // Sessão ao vivo descartada: apaga o arquivo de chunks em tmpdir()
+    await removeLiveRecording(id)
+
     return NextResponse.json(
       { message: 'Job de gravação deletado com sucesso' },
       { status: 200 }
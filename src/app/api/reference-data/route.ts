@@ -0,0 +1,61 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { withRouteTracing } from '@/lib/tracing/server'
+import { createClient, getServerCedroClaims } from '@/lib/supabase/server'
+import { referenceDataEtag, versionFromEtag } from '@/lib/reference-data'
+
+export const dynamic = 'force-dynamic'
+
+/**
+ * GET /api/reference-data
+ * Terapeutas e serviços numa única resposta, com ETag pela versão que os
+ * triggers de cedro.users/services incrementam. Com If-None-Match igual à
+ * versão atual responde 304 sem montar as listas. O ETag inclui o usuário:
+ * as listas dependem do RLS de quem pede.
+ */
+async function getReferenceData(request: NextRequest) {
+  try {
+    const supabase = createClient()
+
+    // Claims do token bastam; sem o hook de claims, valida a sessão no Auth
+    const claims = await getServerCedroClaims(supabase)
+    const userId = claims?.authUserId || (await supabase.auth.getUser()).data.user?.id
+    if (!userId) {
+      return NextResponse.json({ error: 'Não autenticado' }, { status: 401 })
+    }
+
+    const knownVersion = versionFromEtag(request.headers.get('if-none-match'), userId)
+
+    const { data, error } = await supabase
+      .schema('cedro')
+      .rpc('reference_data', { p_known_version: knownVersion })
+
+    if (error || !data) {
+      console.error('Error loading reference data:', error)
+      return NextResponse.json(
+        { error: 'Erro ao carregar dados de referência' },
+        { status: 500 }
+      )
+    }
+
+    const snapshot = data as { version: string; not_modified?: boolean }
+    const headers = {
+      ETag: referenceDataEtag(snapshot.version, userId),
+      // Privado (depende do RLS do usuário) e sempre revalidado pelo ETag
+      'Cache-Control': 'private, no-cache'
+    }
+
+    if (snapshot.not_modified) {
+      return new NextResponse(null, { status: 304, headers })
+    }
+
+    return NextResponse.json(snapshot, { headers })
+  } catch (error) {
+    console.error('Error in reference data route:', error)
+    return NextResponse.json(
+      { error: 'Erro interno do servidor' },
+      { status: 500 }
+    )
+  }
+}
+
+export const GET = withRouteTracing('GET /api/reference-data', getReferenceData)
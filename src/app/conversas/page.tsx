@@ -9,300 +9,59 @@ import {
   Search, 
   Send, 
   PaperclipIcon, 
-  Phone, 
-  Video,
-  MoreVertical,
   User,
   Loader2
 } from 'lucide-react'
-import { useState, useEffect } from 'react'
-import { fetchWithTimeout, NETWORK_CONFIG } from '@/lib/network-config'
-
-// Tipos para TypeScript
-interface Conversation {
-  id: string
-  contact_key: string
-  contact_name: string
-  channel: string
-  last_message: string
-  last_message_at: string
-  unread_count: number
-  created_at: string
-  updated_at: string
-}
-
-interface Message {
-  id: string
-  external_msg_id: string
-  direction: 'inbound' | 'outbound'
-  from_addr: string
-  to_addr: string[]
-  body_text: string
-  attachments: any
-  sent_at: string
-  received_at: string
-  created_at: string
-}
-
-interface MessagesResponse {
-  messages: Message[]
-  pagination: {
-    page: number
-    limit: number
-    total: number
-  }
-}
-
-interface MessageContent {
-  type: 'text' | 'image' | 'audio' | 'video' | 'document' | 'edited' | 'unknown'
-  content?: string
-  url?: string
-  mimetype?: string
-  originalContent?: string
-}
+import { useState, useCallback } from 'react'
+import { useConversationInbox } from '@/hooks/use-conversations'
+import { MessageList } from '@/components/conversas/message-list'
+import { formatMessageTime } from '@/components/conversas/message-bubble'
+import type { Message } from '@/lib/conversations'
 
 export default function ConversasPage() {
-  const [conversations, setConversations] = useState<Conversation[]>([])
-  const [messages, setMessages] = useState<Message[]>([])
-  const [selectedConversation, setSelectedConversation] = useState<Conversation | null>(null)
-  const [loading, setLoading] = useState(true)
-  const [messagesLoading, setMessagesLoading] = useState(false)
+  const {
+    conversations,
+    loading,
+    selected: selectedConversation,
+    select,
+    messages,
+    messagesLoading,
+    hasOlder,
+    loadingOlder,
+    loadOlder,
+    send,
+    retry,
+    activateCloser
+  } = useConversationInbox()
   const [newMessage, setNewMessage] = useState('')
   const [showCloserModal, setShowCloserModal] = useState(false)
 
-  // Carregar conversas
-  useEffect(() => {
-    loadConversations()
-  }, [])
-
-  // Carregar mensagens quando uma conversa é selecionada
-  useEffect(() => {
-    if (selectedConversation) {
-      loadMessages(selectedConversation.id)
-    }
-  }, [selectedConversation])
-
-  const loadConversations = async () => {
-    try {
-      setLoading(true)
-      const response = await fetchWithTimeout('http://localhost:3001/api/conversations', {
-        timeout: NETWORK_CONFIG.DEFAULT_TIMEOUT
-      })
-      if (!response.ok) throw new Error('Erro ao carregar conversas')
-      
-      const data = await response.json()
-      setConversations(data)
-      
-      // Selecionar primeira conversa automaticamente
-      if (data.length > 0 && !selectedConversation) {
-        setSelectedConversation(data[0])
-      }
-    } catch (error) {
-      console.error('Erro ao carregar conversas:', error)
-    } finally {
-      setLoading(false)
-    }
-  }
-
-  const loadMessages = async (conversationId: string) => {
-    try {
-      setMessagesLoading(true)
-      const response = await fetchWithTimeout(`http://localhost:3001/api/conversations/${conversationId}/messages`, {
-        timeout: NETWORK_CONFIG.DEFAULT_TIMEOUT
-      })
-      if (!response.ok) throw new Error('Erro ao carregar mensagens')
-      
-      const data: MessagesResponse = await response.json()
-      setMessages(data.messages.reverse()) // Ordem cronológica
-    } catch (error) {
-      console.error('Erro ao carregar mensagens:', error)
-    } finally {
-      setMessagesLoading(false)
-    }
-  }
-
-  const formatTime = (timestamp: string) => {
-    const date = new Date(timestamp)
-    const now = new Date()
-    const diffInHours = (now.getTime() - date.getTime()) / (1000 * 60 * 60)
-    
-    if (diffInHours < 24) {
-      return date.toLocaleTimeString('pt-BR', { hour: '2-digit', minute: '2-digit' })
-    } else if (diffInHours < 48) {
-      return 'Ontem'
-    } else {
-      return date.toLocaleDateString('pt-BR', { day: '2-digit', month: '2-digit' })
-    }
-  }
-
-  const processMessageContent = (bodyText: string) => {
-    try {
-      // Verificar se é um JSON de mídia
-      if (bodyText.startsWith('{') && (bodyText.includes('Message') || bodyText.includes('message'))) {
-        const mediaData = JSON.parse(bodyText)
-        
-        // Processar documento
-        if (mediaData.documentMessage) {
-          const doc = mediaData.documentMessage
-          return {
-            type: 'document',
-            title: doc.title || doc.fileName || 'Documento',
-            fileName: doc.fileName,
-            mimetype: doc.mimetype,
-            url: doc.url
-          }
-        }
-        
-        // Processar imagem
-        if (mediaData.imageMessage) {
-          const img = mediaData.imageMessage
-          return {
-            type: 'image',
-            url: img.url,
-            width: img.width,
-            height: img.height,
-            mimetype: img.mimetype
-          }
-        }
-        
-        // Processar sticker
-        if (mediaData.stickerMessage) {
-          return {
-            type: 'sticker',
-            url: mediaData.stickerMessage.url,
-            isAnimated: mediaData.stickerMessage.isAnimated || false,
-            mimetype: mediaData.stickerMessage.mimetype
-          }
-        }
-        
-        // Processar mensagem editada
-        if (mediaData.editedMessage) {
-          const editedMsg = mediaData.editedMessage
-          // Tentar extrair o conteúdo da mensagem editada
-          if (editedMsg.message && editedMsg.message.protocolMessage && editedMsg.message.protocolMessage.editedMessage) {
-            const editedContent = editedMsg.message.protocolMessage.editedMessage
-            if (editedContent.conversation) {
-              return {
-                type: 'edited',
-                content: editedContent.conversation,
-                originalContent: bodyText
-              }
-            }
-          }
-          return {
-            type: 'edited',
-            content: 'Mensagem editada',
-            originalContent: bodyText
-          }
-        }
-        
-        // Processar áudio
-        if (mediaData.audioMessage) {
-          return {
-            type: 'audio',
-            url: mediaData.audioMessage.url,
-            mimetype: mediaData.audioMessage.mimetype
-          }
-        }
-        
-        // Processar vídeo
-        if (mediaData.videoMessage) {
-          return {
-            type: 'video',
-            url: mediaData.videoMessage.url,
-            mimetype: mediaData.videoMessage.mimetype
-          }
-        }
-        
-        // Fallback para JSON não reconhecido - tentar extrair campo "conversation"
-        if (mediaData.conversation) {
-          return {
-            type: 'text',
-            content: mediaData.conversation
-          }
-        }
-        
-        // Se chegou até aqui, é um JSON que não conseguimos processar
-        return {
-          type: 'unknown',
-          content: 'Mensagem de mídia não suportada',
-          originalContent: bodyText
-        }
-      }
-      
-      // Retornar texto normal
-      return {
-        type: 'text',
-        content: bodyText
-      }
-    } catch (error) {
-      // Se não conseguir fazer parse, retornar como texto
-      return {
-        type: 'text',
-        content: bodyText
-      }
-    }
-  }
-
   const getContactInitial = (name: string) => {
     return name ? name.charAt(0).toUpperCase() : '?'
   }
 
   const handleSendMessage = async () => {
-    if (!newMessage.trim() || !selectedConversation) return
-    
+    const text = newMessage
+    if (!text.trim() || !selectedConversation) return
+
+    // Mensagem aparece na hora; falhas ficam marcadas na própria mensagem
+    setNewMessage('')
     try {
-      const response = await fetchWithTimeout(`http://localhost:3001/api/conversations/${selectedConversation.id}/send-message`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ message: newMessage }),
-        timeout: NETWORK_CONFIG.DEFAULT_TIMEOUT
-      })
-      
-      if (!response.ok) {
-        const errorData = await response.json()
-        throw new Error(errorData.error || 'Erro ao enviar mensagem')
-      }
-      
-      const result = await response.json()
-      console.log('✅ Mensagem enviada:', result)
-      
-      // Limpar campo de mensagem
-      setNewMessage('')
-      
-      // Recarregar mensagens para mostrar a nova mensagem
-      await loadMessages(selectedConversation.id)
-      
-    } catch (error) {
-      console.error('❌ Erro ao enviar mensagem:', error)
-      alert(`Erro ao enviar mensagem: ${error instanceof Error ? error.message : 'Erro desconhecido'}`)
+      await send(text)
+    } catch {
+      // Tratado em useConversationInbox (mensagem marcada como não enviada)
     }
   }
 
+  const handleRetry = useCallback((message: Message) => {
+    retry(message).catch(() => {})
+  }, [retry])
+
   const handleActivateCloser = async () => {
     if (!selectedConversation) return
     
     try {
-      const response = await fetchWithTimeout(`http://localhost:3001/api/conversations/${selectedConversation.id}/closer`, {
-        method: 'PUT',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ closer_active: true }),
-        timeout: NETWORK_CONFIG.DEFAULT_TIMEOUT
-      })
-      
-      if (!response.ok) throw new Error('Erro ao ativar closer')
-      
-      // Atualizar a conversa local
-      setConversations(prev => prev.map(conv => 
-        conv.id === selectedConversation.id 
-          ? { ...conv, closer_active: true }
-          : conv
-      ))
-      
+      await activateCloser()
       setShowCloserModal(false)
       alert('Closer ativado com sucesso!')
     } catch (error) {
@@ -338,7 +97,7 @@ export default function ConversasPage() {
                   className={`p-4 border-b hover:bg-gray-50 cursor-pointer ${
                     selectedConversation?.id === conversation.id ? 'bg-blue-50' : ''
                   }`}
-                  onClick={() => setSelectedConversation(conversation)}
+                  onClick={() => select(conversation)}
                 >
                   <div className="flex items-center space-x-3">
                     <div className="flex-shrink-0">
@@ -352,7 +111,7 @@ export default function ConversasPage() {
                           {conversation.contact_name || conversation.contact_key}
                         </p>
                         <p className="text-xs text-gray-500">
-                          {formatTime(conversation.last_message_at)}
+                          {formatMessageTime(conversation.last_message_at)}
                         </p>
                       </div>
                       <p className="text-sm text-gray-500 truncate">
@@ -394,128 +153,15 @@ export default function ConversasPage() {
           </div>
 
           {/* Messages */}
-          <div className="flex-1 p-4 overflow-y-auto bg-gray-50">
-            {messagesLoading ? (
-              <div className="flex items-center justify-center h-full">
-                <Loader2 className="h-6 w-6 animate-spin" />
-              </div>
-            ) : (
-              <div className="space-y-4">
-                {messages.map((message) => (
-                  <div
-                    key={message.id}
-                    className={`flex ${
-                      message.direction === 'outbound' ? 'justify-end' : 'justify-start'
-                    }`}
-                  >
-                    <div
-                      className={`max-w-[70%] rounded-lg p-3 ${
-                        message.direction === 'outbound'
-                          ? 'bg-blue-500 text-white'
-                          : 'bg-white border'
-                      }`}
-                    >
-                      {(() => {
-                        const content = processMessageContent(message.body_text)
-                        
-                        switch (content.type) {
-                          case 'document':
-                            return (
-                              <div className="flex items-center space-x-2">
-                                <PaperclipIcon className="h-4 w-4" />
-                                <div>
-                                  <p className="text-sm font-medium">{content.title}</p>
-                                  <p className="text-xs opacity-70">{content.fileName}</p>
-                                </div>
-                              </div>
-                            )
-                          
-                          case 'image':
-                            return (
-                              <div>
-                                <div className="bg-gray-200 rounded p-2 mb-1">
-                                  <div className="flex items-center space-x-2">
-                                    <div className="w-8 h-8 bg-blue-500 rounded flex items-center justify-center">
-                                      <span className="text-white text-xs">📷</span>
-                                    </div>
-                                    <span className="text-sm">Imagem</span>
-                                  </div>
-                                </div>
-                              </div>
-                            )
-                          
-                          case 'audio':
-                            return (
-                              <div className="flex items-center space-x-2">
-                                <div className="w-8 h-8 bg-green-500 rounded-full flex items-center justify-center">
-                                  <span className="text-white text-xs">🎵</span>
-                                </div>
-                                <span className="text-sm">Áudio</span>
-                              </div>
-                            )
-                          
-                          case 'video':
-                            return (
-                              <div className="flex items-center space-x-2">
-                                <div className="w-8 h-8 bg-red-500 rounded flex items-center justify-center">
-                                  <span className="text-white text-xs">🎬</span>
-                                </div>
-                                <span className="text-sm">Vídeo</span>
-                              </div>
-                            )
-                          
-                          case 'sticker':
-                            return (
-                              <div className="flex items-center space-x-2">
-                                <div className="w-8 h-8 bg-yellow-500 rounded flex items-center justify-center">
-                                  <span className="text-white text-xs">😀</span>
-                                </div>
-                                <span className="text-sm">
-                                  {content.isAnimated ? 'Sticker Animado' : 'Sticker'}
-                                </span>
-                              </div>
-                            )
-                          
-                          case 'edited':
-                            return (
-                              <div>
-                                <div className="flex items-center space-x-1 mb-1">
-                                  <span className="text-xs opacity-60">✏️ editado</span>
-                                </div>
-                                <p className="text-sm whitespace-pre-wrap">{content.content}</p>
-                              </div>
-                            )
-                          
-                          case 'unknown':
-                            return (
-                              <div className="flex items-center space-x-2">
-                                <div className="w-8 h-8 bg-gray-500 rounded flex items-center justify-center">
-                                  <span className="text-white text-xs">❓</span>
-                                </div>
-                                <div>
-                                  <p className="text-sm whitespace-pre-wrap">{content.content}</p>
-                                  <p className="text-xs opacity-60">Tipo de mensagem não suportado</p>
-                                </div>
-                              </div>
-                            )
-                          
-                          default:
-                            return <p className="text-sm whitespace-pre-wrap">{content.content}</p>
-                        }
-                      })()}
-                      <p
-                        className={`text-xs mt-1 text-right ${
-                          message.direction === 'outbound' ? 'text-blue-100' : 'text-gray-400'
-                        }`}
-                      >
-                        {formatTime(message.sent_at)}
-                      </p>
-                    </div>
-                  </div>
-                ))}
-              </div>
-            )}
-          </div>
+          <MessageList
+            conversationId={selectedConversation?.id || null}
+            messages={messages}
+            loading={messagesLoading}
+            loadingOlder={loadingOlder}
+            hasOlder={hasOlder}
+            onLoadOlder={loadOlder}
+            onRetry={handleRetry}
+          />
 
           {/* Message Input */}
           <div className="p-4 border-t">
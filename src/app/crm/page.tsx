@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, Suspense } from 'react'
 import { AppShell } from '@/components/layout/app-shell'
 import { Button } from '@/components/ui/button'
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
@@ -41,14 +41,20 @@ import {
   getLeadStats,
   getLeadSources,
   getLeadSourcesData,
-  updateLead,
   getStageColor,
   getStageText
 } from '@/data/crm'
-import { KanbanBoard } from '@/components/crm/kanban-board'
-import { LeadForm } from '@/components/crm/lead-form'
-import { LeadDetailDrawer } from '@/components/crm/lead-detail-drawer'
-import { LeadDeleteDialog } from '@/components/crm/lead-delete-dialog'
+import {
+  LazyKanbanBoard,
+  LazyLeadForm,
+  LazyLeadDetailDrawer,
+  LazyLeadDeleteDialog,
+  preloadKanbanBoard,
+  preloadLeadForm
+} from '@/components/lazy'
+import { useLazyMount } from '@/hooks/use-lazy-mount'
+import { ExportMenu } from '@/components/export/export-menu'
+import { useDebounce } from '@/hooks/use-debounce'
 
 export default function CRMPage() {
   const [leads, setLeads] = useState<Lead[]>([])
@@ -56,12 +62,18 @@ export default function CRMPage() {
   const [sources, setSources] = useState<LeadSourceData[]>([])
   const [loading, setLoading] = useState(true)
   const [view, setView] = useState<'kanban' | 'list'>('kanban')
+  // Incrementado para o kanban recarregar (ele carrega as próprias páginas)
+  const [boardRefreshKey, setBoardRefreshKey] = useState(0)
   
   // Modal states
   const [leadFormOpen, setLeadFormOpen] = useState(false)
   const [leadDetailOpen, setLeadDetailOpen] = useState(false)
   const [leadDeleteOpen, setLeadDeleteOpen] = useState(false)
   const [selectedLead, setSelectedLead] = useState<Lead | null>(null)
+  // Modais só são baixados na primeira abertura
+  const leadFormMounted = useLazyMount(leadFormOpen)
+  const leadDetailMounted = useLazyMount(leadDetailOpen)
+  const leadDeleteMounted = useLazyMount(leadDeleteOpen)
   
   // Filter states
   const [searchTerm, setSearchTerm] = useState('')
@@ -69,21 +81,26 @@ export default function CRMPage() {
   const [sourceFilter, setSourceFilter] = useState<string>('all')
   const [assignedFilter, setAssignedFilter] = useState<string>('all')
 
+  const debouncedSearch = useDebounce(searchTerm, 300)
+
   // Load initial data
   useEffect(() => {
     loadData()
   }, [])
 
+  // A lista completa só é necessária na visão de lista
+  useEffect(() => {
+    if (view === 'list') loadLeads()
+  }, [view])
+
   const loadData = async () => {
     setLoading(true)
     try {
-      const [leadsData, statsData, sourcesData] = await Promise.all([
-        getLeads({}, { page: 1, limit: 1000 }),
+      const [statsData, sourcesData] = await Promise.all([
         getLeadStats(),
         getLeadSourcesData()
       ])
       
-      setLeads(leadsData.data)
       setStats(statsData)
       setSources(sourcesData)
     } catch (error) {
@@ -94,6 +111,22 @@ export default function CRMPage() {
     }
   }
 
+  const loadLeads = async () => {
+    try {
+      const leadsData = await getLeads({}, { page: 1, limit: 1000 })
+      setLeads(leadsData.data)
+    } catch (error) {
+      console.error('Error loading leads:', error)
+      toast.error('Erro ao carregar leads')
+    }
+  }
+
+  const refreshAll = () => {
+    loadData()
+    if (view === 'list') loadLeads()
+    setBoardRefreshKey((key) => key + 1)
+  }
+
   // Filter leads based on current filters
   const filteredLeads = (leads || []).filter(lead => {
     const matchesSearch = (lead.name || '').toLowerCase().includes(searchTerm.toLowerCase()) ||
@@ -109,27 +142,6 @@ export default function CRMPage() {
     return matchesSearch && matchesStage && matchesSource && matchesAssigned
   })
 
-  // Handle lead stage update (for Kanban drag & drop)
-  const handleLeadUpdate = async (leadId: string, newStage: LeadStage) => {
-    try {
-      await updateLead(leadId, { stage: newStage })
-      
-      // Update local state
-      setLeads(prevLeads => 
-        prevLeads.map(lead => 
-          lead.id === leadId 
-            ? { ...lead, stage: newStage, updated_at: new Date().toISOString() }
-            : lead
-        )
-      )
-      
-      toast.success('Estágio do lead atualizado!')
-    } catch (error) {
-      console.error('Error updating lead:', error)
-      toast.error('Erro ao atualizar estágio do lead')
-    }
-  }
-
   // Handle lead actions
   const handleLeadView = (lead: Lead) => {
     setSelectedLead(lead)
@@ -147,11 +159,11 @@ export default function CRMPage() {
   }
 
   const handleLeadFormSuccess = () => {
-    loadData() // Reload data after create/update
+    refreshAll() // Reload data after create/update
   }
 
   const handleLeadDeleteSuccess = () => {
-    loadData() // Reload data after delete
+    refreshAll() // Reload data after delete
   }
 
   // Get unique assigned users for filter
@@ -184,14 +196,22 @@ export default function CRMPage() {
           </p>
         </div>
         <div className="flex space-x-2">
-          <Button variant="outline" onClick={loadData}>
+          <Button variant="outline" onClick={refreshAll}>
             <RefreshCw className="mr-2 h-4 w-4" />
             Atualizar
           </Button>
-          <Button onClick={() => {
-            setSelectedLead(null)
-            setLeadFormOpen(true)
-          }}>
+          <ExportMenu
+            dataset="leads"
+            filters={{ search: searchTerm, stage: stageFilter, source: sourceFilter }}
+          />
+          <Button
+            onClick={() => {
+              setSelectedLead(null)
+              setLeadFormOpen(true)
+            }}
+            onMouseEnter={preloadLeadForm}
+            onFocus={preloadLeadForm}
+          >
             <UserPlus className="mr-2 h-4 w-4" />
             Novo Lead
           </Button>
@@ -364,14 +384,17 @@ export default function CRMPage() {
             </div>
 
             <div className="flex items-center space-x-2">
-              <span className="text-sm text-muted-foreground">
-                {filteredLeads.length} de {(leads || []).length} leads
-              </span>
+              {view === 'list' && (
+                <span className="text-sm text-muted-foreground">
+                  {filteredLeads.length} de {(leads || []).length} leads
+                </span>
+              )}
               <div className="flex border rounded-lg">
                 <Button
                   variant={view === 'kanban' ? 'default' : 'ghost'}
                   size="sm"
                   onClick={() => setView('kanban')}
+                  onMouseEnter={preloadKanbanBoard}
                   className="rounded-r-none"
                 >
                   <LayoutGrid className="h-4 w-4" />
@@ -391,13 +414,25 @@ export default function CRMPage() {
 
         <CardContent>
           {view === 'kanban' ? (
-            <KanbanBoard
-              leads={filteredLeads}
-              onLeadUpdate={handleLeadUpdate}
-              onLeadView={handleLeadView}
-              onLeadEdit={handleLeadEdit}
-              onLeadDelete={handleLeadDelete}
-            />
+            <Suspense
+              fallback={
+                <div className="flex items-center justify-center h-64">
+                  <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-gray-900"></div>
+                </div>
+              }
+            >
+              <LazyKanbanBoard
+                filters={{
+                  search: debouncedSearch || undefined,
+                  source: sourceFilter === 'all' ? undefined : sourceFilter
+                }}
+                stages={stageFilter === 'all' ? undefined : [stageFilter]}
+                refreshKey={boardRefreshKey}
+                onLeadView={handleLeadView}
+                onLeadEdit={handleLeadEdit}
+                onLeadDelete={handleLeadDelete}
+              />
+            </Suspense>
           ) : (
             <div className="overflow-x-auto">
               <table className="w-full">
@@ -473,27 +508,39 @@ export default function CRMPage() {
       </Card>
 
       {/* Modals */}
-      <LeadForm
-        open={leadFormOpen}
-        onOpenChange={setLeadFormOpen}
-        lead={selectedLead}
-        onSuccess={handleLeadFormSuccess}
-      />
-
-      <LeadDetailDrawer
-        open={leadDetailOpen}
-        onOpenChange={setLeadDetailOpen}
-        lead={selectedLead}
-        onEdit={handleLeadEdit}
-        onDelete={handleLeadDelete}
-      />
-
-      <LeadDeleteDialog
-        open={leadDeleteOpen}
-        onOpenChange={setLeadDeleteOpen}
-        lead={selectedLead}
-        onSuccess={handleLeadDeleteSuccess}
-      />
+      <Suspense fallback={null}>
+        {leadFormMounted && (
+          <LazyLeadForm
+            open={leadFormOpen}
+            onOpenChange={setLeadFormOpen}
+            lead={selectedLead}
+            onSuccess={handleLeadFormSuccess}
+          />
+        )}
+      </Suspense>
+
+      <Suspense fallback={null}>
+        {leadDetailMounted && (
+          <LazyLeadDetailDrawer
+            open={leadDetailOpen}
+            onOpenChange={setLeadDetailOpen}
+            lead={selectedLead}
+            onEdit={handleLeadEdit}
+            onDelete={handleLeadDelete}
+          />
+        )}
+      </Suspense>
+
+      <Suspense fallback={null}>
+        {leadDeleteMounted && (
+          <LazyLeadDeleteDialog
+            open={leadDeleteOpen}
+            onOpenChange={setLeadDeleteOpen}
+            lead={selectedLead}
+            onSuccess={handleLeadDeleteSuccess}
+          />
+        )}
+      </Suspense>
       </div>
     </AppShell>
   )
@@ -1,68 +1,64 @@
-'use client'
-
-import { useState, useEffect } from 'react'
-import { useRouter } from 'next/navigation'
+import { Suspense } from 'react'
+import Link from 'next/link'
 import { AppShell } from '@/components/layout/app-shell'
-import { useSupabase } from '@/providers/supabase-provider'
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card'
-import { Badge } from '@/components/ui/badge'
-import { Button } from '@/components/ui/button'
-import { Skeleton } from '@/components/ui/skeleton'
-import { 
-  Calendar, 
-  Users, 
-  DollarSign, 
-  TrendingUp, 
-  Clock,
-  UserPlus,
-  AlertCircle,
-  Loader2
+import { buttonVariants } from '@/components/ui/button'
+import { cn } from '@/lib/utils'
+import {
+  Calendar,
+  DollarSign,
+  UserPlus
 } from 'lucide-react'
-import { 
-  type DashboardStats, 
-  type ProximaConsulta, 
-  type DashboardAlert,
-  getDashboardStats, 
-  getProximasConsultas, 
-  getDashboardAlerts,
-  formatCurrency 
+import { createClient, getServerCedroUser } from '@/lib/supabase/server'
+import {
+  getDashboardStats,
+  getProximasConsultas,
+  getDashboardAlerts
 } from '@/data/dashboard'
+import {
+  StatsCards,
+  ProximasConsultasList,
+  DashboardAlerts
+} from '@/components/dashboard/dashboard-widgets'
+import {
+  StatsCardsSkeleton,
+  ProximasConsultasSkeleton,
+  DashboardAlertsSkeleton
+} from '@/components/skeletons/dashboard-skeleton'
 
-export default function DashboardPage() {
-  const router = useRouter()
-  const { user, cedroUser } = useSupabase()
-  const [stats, setStats] = useState<DashboardStats | null>(null)
-  const [proximasConsultas, setProximasConsultas] = useState<ProximaConsulta[]>([])
-  const [alerts, setAlerts] = useState<DashboardAlert[]>([])
-  const [loading, setLoading] = useState(true)
+/**
+ * Rendered on the server (the middleware already required a session).
+ * The three loaders start together and each widget streams in behind its
+ * own Suspense boundary as soon as its data resolves.
+ */
+export default async function DashboardPage() {
+  const supabase = createClient()
+  // Claims do token ou, sem o hook, a sessão validada + cedro.users
+  const cedroUser = await getServerCedroUser(supabase)
 
-  useEffect(() => {
-    if (user && cedroUser) {
-      loadDashboardData()
-    }
-  }, [user, cedroUser])
+  if (!cedroUser) {
+    // Sessão sem usuário do Cedro: nada de dados da clínica inteira
+    return (
+      <AppShell>
+        <Card>
+          <CardHeader>
+            <CardTitle>Perfil não encontrado</CardTitle>
+            <CardDescription>
+              Sua conta ainda não está vinculada a um usuário do Cedro. Fale com um administrador.
+            </CardDescription>
+          </CardHeader>
+        </Card>
+      </AppShell>
+    )
+  }
 
-  const loadDashboardData = async () => {
-    setLoading(true)
-    try {
-      // Extrair therapist_id se o usuário for terapeuta
-      const therapistId = cedroUser?.role === 'therapist' ? cedroUser.id : undefined
+  // Só administradores veem a clínica inteira; os demais, os próprios dados
+  const therapistId = cedroUser.role === 'admin' ? undefined : cedroUser.userId
 
-      const [statsData, consultasData, alertsData] = await Promise.all([
-        getDashboardStats(therapistId),
-        getProximasConsultas(therapistId),
-        getDashboardAlerts(therapistId)
-      ])
+  const stats = getDashboardStats(therapistId, supabase)
+  const proximasConsultas = getProximasConsultas(therapistId, supabase)
+  const alerts = getDashboardAlerts(therapistId, supabase)
 
-      setStats(statsData)
-      setProximasConsultas(consultasData)
-      setAlerts(alertsData)
-    } catch (error) {
-      console.error('Error loading dashboard data:', error)
-    } finally {
-      setLoading(false)
-    }
-  }
   return (
     <AppShell>
       <div className="space-y-6">
@@ -73,91 +69,9 @@ export default function DashboardPage() {
         </div>
 
         {/* Stats Cards */}
-        <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6">
-          <Card>
-            <CardHeader className="flex flex-row items-center justify-between space-y-0 pb-2">
-              <CardTitle className="text-sm font-medium">Consultas Hoje</CardTitle>
-              <Calendar className="h-4 w-4 text-muted-foreground" />
-            </CardHeader>
-            <CardContent>
-              {loading ? (
-                <Skeleton className="h-8 w-16" />
-              ) : (
-                <div className="text-2xl font-bold">{stats?.consultasHoje || 0}</div>
-              )}
-              {loading ? (
-                <Skeleton className="h-4 w-24 mt-1" />
-              ) : (
-                <p className="text-xs text-muted-foreground">
-                  {stats?.consultasHojeVariacao || 'Dados indisponíveis'}
-                </p>
-              )}
-            </CardContent>
-          </Card>
-
-          <Card>
-            <CardHeader className="flex flex-row items-center justify-between space-y-0 pb-2">
-              <CardTitle className="text-sm font-medium">Pacientes Ativos</CardTitle>
-              <Users className="h-4 w-4 text-muted-foreground" />
-            </CardHeader>
-            <CardContent>
-              {loading ? (
-                <Skeleton className="h-8 w-16" />
-              ) : (
-                <div className="text-2xl font-bold">{stats?.pacientesAtivos || 0}</div>
-              )}
-              {loading ? (
-                <Skeleton className="h-4 w-24 mt-1" />
-              ) : (
-                <p className="text-xs text-muted-foreground">
-                  {stats?.pacientesAtivosVariacao || 'Dados indisponíveis'}
-                </p>
-              )}
-            </CardContent>
-          </Card>
-
-          <Card>
-            <CardHeader className="flex flex-row items-center justify-between space-y-0 pb-2">
-              <CardTitle className="text-sm font-medium">Receita Mensal</CardTitle>
-              <DollarSign className="h-4 w-4 text-muted-foreground" />
-            </CardHeader>
-            <CardContent>
-              {loading ? (
-                <Skeleton className="h-8 w-20" />
-              ) : (
-                <div className="text-2xl font-bold">{formatCurrency(stats?.receitaMensal || 0)}</div>
-              )}
-              {loading ? (
-                <Skeleton className="h-4 w-24 mt-1" />
-              ) : (
-                <p className="text-xs text-muted-foreground">
-                  {stats?.receitaMensalVariacao || 'Dados indisponíveis'}
-                </p>
-              )}
-            </CardContent>
-          </Card>
-
-          <Card>
-            <CardHeader className="flex flex-row items-center justify-between space-y-0 pb-2">
-              <CardTitle className="text-sm font-medium">Taxa de Ocupação</CardTitle>
-              <TrendingUp className="h-4 w-4 text-muted-foreground" />
-            </CardHeader>
-            <CardContent>
-              {loading ? (
-                <Skeleton className="h-8 w-16" />
-              ) : (
-                <div className="text-2xl font-bold">{stats?.taxaOcupacao || 0}%</div>
-              )}
-              {loading ? (
-                <Skeleton className="h-4 w-24 mt-1" />
-              ) : (
-                <p className="text-xs text-muted-foreground">
-                  {stats?.taxaOcupacaoVariacao || 'Dados indisponíveis'}
-                </p>
-              )}
-            </CardContent>
-          </Card>
-        </div>
+        <Suspense fallback={<StatsCardsSkeleton />}>
+          <StatsCards stats={stats} />
+        </Suspense>
 
         {/* Main Content Grid */}
         <div className="grid grid-cols-1 lg:grid-cols-3 gap-6">
@@ -168,62 +82,13 @@ export default function DashboardPage() {
               <CardDescription>Agendamentos para hoje</CardDescription>
             </CardHeader>
             <CardContent>
-              <div className="space-y-4">
-                {loading ? (
-                  Array.from({ length: 4 }).map((_, index) => (
-                    <div key={index} className="flex items-center justify-between p-3 border rounded-lg">
-                      <div className="flex items-center space-x-3">
-                        <Skeleton className="w-10 h-10 rounded-full" />
-                        <div className="space-y-2">
-                          <Skeleton className="h-4 w-24" />
-                          <Skeleton className="h-3 w-20" />
-                        </div>
-                      </div>
-                      <div className="flex items-center space-x-2">
-                        <Skeleton className="h-4 w-12" />
-                        <Skeleton className="h-6 w-16" />
-                      </div>
-                    </div>
-                  ))
-                ) : proximasConsultas.length > 0 ? (
-                  proximasConsultas.map((consulta) => (
-                    <div key={consulta.id} className="flex items-center justify-between p-3 border rounded-lg">
-                      <div className="flex items-center space-x-3">
-                        <div className="flex items-center justify-center w-10 h-10 bg-blue-100 rounded-full">
-                          <Clock className="h-5 w-5 text-blue-600" />
-                        </div>
-                        <div>
-                          <p className="font-medium">{consulta.patient}</p>
-                          <p className="text-sm text-gray-500">{consulta.type}</p>
-                        </div>
-                      </div>
-                      <div className="flex items-center space-x-2">
-                        <span className="text-sm font-medium">{consulta.time}</span>
-                        <Badge 
-                          variant={
-                            consulta.status === 'confirmado' ? 'default' :
-                            consulta.status === 'pendente' ? 'secondary' : 'destructive'
-                          }
-                        >
-                          {consulta.status}
-                        </Badge>
-                      </div>
-                    </div>
-                  ))
-                ) : (
-                  <div className="text-center py-4">
-                    <p className="text-sm text-gray-500">Nenhuma consulta agendada para hoje</p>
-                  </div>
-                )}
-              </div>
+              <Suspense fallback={<ProximasConsultasSkeleton />}>
+                <ProximasConsultasList consultas={proximasConsultas} />
+              </Suspense>
               <div className="mt-4">
-                <Button 
-                  variant="outline" 
-                  className="w-full"
-                  onClick={() => router.push('/agenda')}
-                >
+                <Link href="/agenda" className={cn(buttonVariants({ variant: 'outline' }), 'w-full')}>
                   Ver todos os agendamentos
-                </Button>
+                </Link>
               </div>
             </CardContent>
           </Card>
@@ -236,29 +101,18 @@ export default function DashboardPage() {
                 <CardTitle>Ações Rápidas</CardTitle>
               </CardHeader>
               <CardContent className="space-y-3">
-                <Button 
-                  className="w-full justify-start"
-                  onClick={() => router.push('/pacientes?new=true')}
-                >
+                <Link href="/pacientes?new=true" className={cn(buttonVariants(), 'w-full justify-start')}>
                   <UserPlus className="mr-2 h-4 w-4" />
                   Novo Paciente
-                </Button>
-                <Button 
-                  variant="outline" 
-                  className="w-full justify-start"
-                  onClick={() => router.push('/agenda')}
-                >
+                </Link>
+                <Link href="/agenda" className={cn(buttonVariants({ variant: 'outline' }), 'w-full justify-start')}>
                   <Calendar className="mr-2 h-4 w-4" />
                   Agendar Consulta
-                </Button>
-                <Button 
-                  variant="outline" 
-                  className="w-full justify-start"
-                  onClick={() => router.push('/financeiro')}
-                >
+                </Link>
+                <Link href="/financeiro" className={cn(buttonVariants({ variant: 'outline' }), 'w-full justify-start')}>
                   <DollarSign className="mr-2 h-4 w-4" />
                   Registrar Pagamento
-                </Button>
+                </Link>
               </CardContent>
             </Card>
 
@@ -267,29 +121,10 @@ export default function DashboardPage() {
               <CardHeader>
                 <CardTitle>Alertas</CardTitle>
               </CardHeader>
-              <CardContent className="space-y-3">
-                <div className="flex items-start space-x-3 p-3 bg-yellow-50 border border-yellow-200 rounded-lg">
-                  <AlertCircle className="h-5 w-5 text-yellow-600 mt-0.5" />
-                  <div>
-                    <p className="text-sm font-medium text-yellow-800">
-                      3 pacientes com consultas em atraso
-                    </p>
-                    <p className="text-xs text-yellow-600">
-                      Verificar reagendamentos
-                    </p>
-                  </div>
-                </div>
-                <div className="flex items-start space-x-3 p-3 bg-blue-50 border border-blue-200 rounded-lg">
-                  <AlertCircle className="h-5 w-5 text-blue-600 mt-0.5" />
-                  <div>
-                    <p className="text-sm font-medium text-blue-800">
-                      Backup automático realizado
-                    </p>
-                    <p className="text-xs text-blue-600">
-                      Última atualização: hoje às 03:00
-                    </p>
-                  </div>
-                </div>
+              <CardContent>
+                <Suspense fallback={<DashboardAlertsSkeleton />}>
+                  <DashboardAlerts alerts={alerts} />
+                </Suspense>
               </CardContent>
             </Card>
           </div>
@@ -297,4 +132,4 @@ export default function DashboardPage() {
       </div>
     </AppShell>
   )
-}
\ No newline at end of file
+}
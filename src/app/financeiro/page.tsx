@@ -32,6 +32,7 @@ import {
   type InvoiceStatus
 } from '@/data/financeiro'
 import { InvoiceDetailDrawer } from '@/components/financeiro/invoice-detail-drawer'
+import { ExportMenu } from '@/components/export/export-menu'
 
 const statusOptions: { value: InvoiceStatus | 'todos'; label: string }[] = [
   { value: 'todos', label: 'Todos' },
@@ -135,6 +136,7 @@ export default function FinanceiroPage() {
             </p>
           </div>
           <div className="flex items-center space-x-2">
+            <ExportMenu dataset="invoices" filters={filters} />
             <DollarSign className="h-8 w-8 text-green-600" />
           </div>
         </div>
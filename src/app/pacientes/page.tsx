@@ -32,6 +32,7 @@ import {
 import { Suspense } from 'react'
 import { LazyPatientForm, LazyPatientDetailDrawer, LazyPatientDeleteDialog } from '@/components/lazy'
 import { PatientListSkeleton, PatientTableSkeleton } from '@/components/skeletons/patient-skeleton'
+import { ExportMenu } from '@/components/export/export-menu'
 import { VirtualList } from '@/components/ui/virtual-list'
 import { useSupabase } from '@/providers/supabase-provider'
 import { usePatients, useTherapistsForFilter } from '@/hooks/use-patients'
@@ -248,10 +249,13 @@ function PacientesPageContent() {
               Gerencie os pacientes da clínica com visão 360 graus
             </p>
           </div>
-          <Button onClick={handleNewPatient}>
-            <Plus className="mr-2 h-4 w-4" />
-            Novo Paciente
-          </Button>
+          <div className="flex space-x-2">
+            <ExportMenu dataset="patients" filters={finalFilters} />
+            <Button onClick={handleNewPatient}>
+              <Plus className="mr-2 h-4 w-4" />
+              Novo Paciente
+            </Button>
+          </div>
         </div>
 
         {/* Stats Cards */}
@@ -32,34 +32,70 @@ import {
   Loader2,
   Trash2
 } from 'lucide-react'
-import { NewRecordModal } from '@/components/prontuarios/new-record-modal'
-import { ViewRecordModal } from '@/components/prontuarios/view-record-modal'
-import { EditRecordModal } from '@/components/prontuarios/edit-record-modal'
-import { useState, useEffect } from 'react'
+import type { ViewRecordSummary } from '@/components/prontuarios/view-record-modal'
+import {
+  LazyNewRecordModal,
+  LazyViewRecordModal,
+  LazyEditRecordModal,
+  preloadNewRecordModal
+} from '@/components/lazy'
+import { useState, useEffect, Suspense } from 'react'
+import { useLazyMount } from '@/hooks/use-lazy-mount'
 import { useSupabase } from '@/providers/supabase-provider'
+import { useDebounce } from '@/hooks/use-debounce'
 import { 
-  getMedicalRecords, 
+  getMedicalRecord,
   getMedicalRecordStats, 
   getMedicalRecordTypeLabel, 
-  getAllRecords,
+  getRecordsPage,
   getTherapistsForFilter,
+  searchMedicalRecords,
+  type MedicalRecordSearchResult,
   type MedicalRecordWithLegacyFields, 
   type MedicalRecordStats,
   type PendingRecord 
 } from '@/data/pacientes'
 
+const CONTENT_SEARCH_MIN_LENGTH = 3
+
+// Snippet do ts_headline: termos entre <mark></mark>, restante escapado
+function renderSnippet(snippet: string) {
+  const unescape = (text: string) =>
+    text.replace(/&lt;/g, '<').replace(/&gt;/g, '>').replace(/&amp;/g, '&')
+
+  return snippet.split(/(<mark>.*?<\/mark>)/g).map((part, index) =>
+    part.startsWith('<mark>') ? (
+      <mark key={index} className="bg-yellow-200 rounded px-0.5">
+        {unescape(part.slice(6, -7))}
+      </mark>
+    ) : (
+      <span key={index}>{unescape(part)}</span>
+    )
+  )
+}
+
 export default function ProntuariosPage() {
   const { user, cedroUser } = useSupabase()
   const [newRecordModalOpen, setNewRecordModalOpen] = useState(false)
   const [viewRecordModalOpen, setViewRecordModalOpen] = useState(false)
   const [editRecordModalOpen, setEditRecordModalOpen] = useState(false)
+  // Modais só são baixados na primeira abertura
+  const newRecordModalMounted = useLazyMount(newRecordModalOpen)
+  const viewRecordModalMounted = useLazyMount(viewRecordModalOpen)
+  const editRecordModalMounted = useLazyMount(editRecordModalOpen)
   const [selectedRecord, setSelectedRecord] = useState<MedicalRecordWithLegacyFields | null>(null)
+  const [viewedRecord, setViewedRecord] = useState<ViewRecordSummary | null>(null)
   const [records, setRecords] = useState<PendingRecord[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [stats, setStats] = useState<MedicalRecordStats | null>(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [searchTerm, setSearchTerm] = useState('')
   const [therapists, setTherapists] = useState<Array<{ id: string; name: string }>>([])
   const [selectedTherapist, setSelectedTherapist] = useState<string>('')
+  const [contentResults, setContentResults] = useState<MedicalRecordSearchResult[]>([])
+  const [contentSearching, setContentSearching] = useState(false)
+  const debouncedSearchTerm = useDebounce(searchTerm.trim(), 400)
 
   useEffect(() => {
     if (user && cedroUser) {
@@ -68,19 +104,20 @@ export default function ProntuariosPage() {
     }
   }, [user, cedroUser])
 
+  // Apenas terapeutas têm filtro automático - administradores veem todos os dados
+  const scopedTherapistId = cedroUser?.role === 'therapist' ? cedroUser.id : undefined
+
   const loadData = async () => {
     try {
       setLoading(true)
       
-      // Apenas terapeutas têm filtro automático - administradores veem todos os dados
-      const therapistId = cedroUser?.role === 'therapist' ? cedroUser.id : undefined
-      
-      const [recordsData, statsData] = await Promise.all([
-        getAllRecords(therapistId),
+      const [recordsPage, statsData] = await Promise.all([
+        getRecordsPage(scopedTherapistId),
         getMedicalRecordStats()
       ])
       
-      setRecords(recordsData)
+      setRecords(recordsPage.records)
+      setNextCursor(recordsPage.nextCursor)
       setStats(statsData)
     } catch (error) {
       console.error('Error loading medical records data:', error)
@@ -89,6 +126,50 @@ export default function ProntuariosPage() {
     }
   }
 
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore) return
+
+    try {
+      setLoadingMore(true)
+      const recordsPage = await getRecordsPage(scopedTherapistId, nextCursor)
+      setRecords(prev => [...prev, ...recordsPage.records])
+      setNextCursor(recordsPage.nextCursor)
+    } catch (error) {
+      console.error('Error loading more medical records:', error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
+  // Busca no conteúdo (notas e transcrições) via índice textual do servidor
+  useEffect(() => {
+    if (debouncedSearchTerm.length < CONTENT_SEARCH_MIN_LENGTH) {
+      setContentResults([])
+      return
+    }
+
+    const controller = new AbortController()
+    setContentSearching(true)
+
+    searchMedicalRecords(debouncedSearchTerm, {
+      limit: 10,
+      therapistId: selectedTherapist || undefined,
+      signal: controller.signal
+    })
+      .then(response => setContentResults(response.results))
+      .catch(error => {
+        if (error?.name !== 'AbortError') {
+          console.error('Error searching medical records content:', error)
+          setContentResults([])
+        }
+      })
+      .finally(() => {
+        if (!controller.signal.aborted) setContentSearching(false)
+      })
+
+    return () => controller.abort()
+  }, [debouncedSearchTerm, selectedTherapist])
+
   const loadTherapists = async () => {
     try {
       const therapistsData = await getTherapistsForFilter()
@@ -107,7 +188,6 @@ export default function ProntuariosPage() {
         record.therapist_name?.toLowerCase().includes(searchLower) ||
         (record.note_type && getMedicalRecordTypeLabel(record.note_type).toLowerCase().includes(searchLower)) ||
         (record.tipo_consulta && record.tipo_consulta.toLowerCase().includes(searchLower)) ||
-        record.content?.toLowerCase().includes(searchLower) ||
         record.title?.toLowerCase().includes(searchLower)
       )
     })()
@@ -180,135 +260,69 @@ export default function ProntuariosPage() {
     loadData() // Reload to get all records including new ones
   }
 
+  // O conteúdo e a transcrição são carregados pelo modal, só ao abrir
   const handleViewRecord = (record: PendingRecord | MedicalRecordWithLegacyFields) => {
-    // Check if it's a PendingRecord
-    if ('type' in record && 'status' in record) {
-      // Only allow viewing completed medical records
-      if (record.type === 'medical_record' && record.status === 'completed') {
-        // Convert PendingRecord back to MedicalRecordWithLegacyFields for the modal
-        let contentJson: any = {};
-        if (record.content) {
-          try {
-            // Try to parse as JSON first (in case it's already a JSON string)
-            const parsedContent = JSON.parse(record.content);
-            contentJson = parsedContent;
-          } catch {
-            // If parsing fails, treat as plain markdown content
-            contentJson = { markdown_content: record.content };
-          }
-        }
-        
-        const medicalRecord: MedicalRecordWithLegacyFields = {
-          id: record.id,
-          patient_id: record.patient_id,
-          appointment_id: record.appointment_id || null,
-          note_type: record.note_type!,
-          visibility: 'private',
-          content_json: contentJson,
-          created_at: record.created_at,
-          updated_at: record.created_at,
-          patient_name: record.patient_name,
-          therapist_name: record.therapist_name,
-          appointment_date: undefined,
-          content: record.content
-        }
-        setSelectedRecord(medicalRecord)
-        setViewRecordModalOpen(true)
-      }
-    } else {
-      // It's already a MedicalRecordWithLegacyFields
-      setSelectedRecord(record)
-      setViewRecordModalOpen(true)
+    if ('status' in record && (record.type !== 'medical_record' || record.status !== 'completed')) {
+      return
     }
+
+    setViewedRecord({
+      id: record.id,
+      patient_name: record.patient_name,
+      therapist_name: record.therapist_name,
+      note_type: record.note_type,
+      created_at: record.created_at
+    })
+    setViewRecordModalOpen(true)
   }
 
-  const handleEditRecord = (record: PendingRecord | MedicalRecordWithLegacyFields) => {
-    // Check if it's a PendingRecord
-    if ('type' in record && 'status' in record) {
-      // Only allow editing completed medical records
-      if (record.type === 'medical_record' && record.status === 'completed') {
-        // Convert PendingRecord back to MedicalRecordWithLegacyFields for the modal
-        let contentJson: any = {};
-        if (record.content) {
-          try {
-            // Try to parse as JSON first (in case it's already a JSON string)
-            const parsedContent = JSON.parse(record.content);
-            contentJson = parsedContent;
-          } catch {
-            // If parsing fails, treat as plain markdown content
-            contentJson = { markdown_content: record.content };
-          }
-        }
-        
-        const medicalRecord: MedicalRecordWithLegacyFields = {
-          id: record.id,
-          patient_id: record.patient_id,
-          appointment_id: record.appointment_id || null,
-          note_type: record.note_type!,
-          visibility: 'private',
-          content_json: contentJson,
-          created_at: record.created_at,
-          updated_at: record.created_at,
-          patient_name: record.patient_name,
-          therapist_name: record.therapist_name,
-          appointment_date: undefined,
-          content: record.content
-        }
-        setSelectedRecord(medicalRecord)
-        setEditRecordModalOpen(true)
-      }
-    } else {
-      // It's already a MedicalRecordWithLegacyFields
-      setSelectedRecord(record)
-      setEditRecordModalOpen(true)
+  const loadFullRecord = async (record: PendingRecord | MedicalRecordWithLegacyFields) => {
+    if ('status' in record && (record.type !== 'medical_record' || record.status !== 'completed')) {
+      return null
     }
+
+    try {
+      return await getMedicalRecord(record.id)
+    } catch (error) {
+      console.error('Error loading medical record:', error)
+      alert('Erro ao carregar prontuário. Tente novamente.')
+      return null
+    }
+  }
+
+  const handleEditRecord = async (record: PendingRecord | MedicalRecordWithLegacyFields) => {
+    const fullRecord = await loadFullRecord(record)
+    if (!fullRecord) return
+
+    setSelectedRecord(fullRecord)
+    setEditRecordModalOpen(true)
   }
 
   const handleRecordUpdated = (updatedRecord: MedicalRecordWithLegacyFields) => {
     loadData() // Reload to get updated records
   }
 
-  const handleDownloadRecord = (record: PendingRecord | MedicalRecordWithLegacyFields) => {
-    // Extract content from different sources
-    const getRecordContent = () => {
-      // Check if it's a MedicalRecordWithLegacyFields
-      if ('content_json' in record && record.content_json?.markdown_content) {
-        return record.content_json.markdown_content
-      }
-      if (record.content) {
-        return record.content
-      }
-      return null
-    }
+  const handleDownloadRecord = async (record: PendingRecord | MedicalRecordWithLegacyFields) => {
+    const fullRecord = await loadFullRecord(record)
+    if (!fullRecord) return
 
-    const getTranscriptionContent = () => {
-      // Check if it's a MedicalRecordWithLegacyFields
-      if ('content_json' in record && record.content_json?.raw_transcript) {
-        return record.content_json.raw_transcript
-      }
-      if ('transcription' in record && record.transcription) {
-        return record.transcription
-      }
-      return null
-    }
-
-    const content = getRecordContent()
-    const transcription = getTranscriptionContent()
+    const content = fullRecord.content_json?.markdown_content || fullRecord.content || null
+    const transcription = fullRecord.content_json?.raw_transcript || fullRecord.transcription || null
     
     const downloadContent = `
 PRONTUÁRIO MÉDICO
 ================
 
-Paciente: ${record.patient_name || 'Não informado'}
-Terapeuta: ${record.therapist_name || 'Não informado'}
-Tipo: ${'note_type' in record && record.note_type ? getMedicalRecordTypeLabel(record.note_type) : 'Não especificado'}
-Data: ${formatDateTime(record.created_at)}
-Visibilidade: ${'visibility' in record ? getVisibilityLabel(record.visibility) : 'Não especificado'}
+Paciente: ${fullRecord.patient_name || 'Não informado'}
+Terapeuta: ${fullRecord.therapist_name || 'Não informado'}
+Tipo: ${getMedicalRecordTypeLabel(fullRecord.note_type)}
+Data: ${formatDateTime(fullRecord.created_at)}
+Visibilidade: ${getVisibilityLabel(fullRecord.visibility)}
 
 CONTEÚDO:
 ${content || 'Sem conteúdo disponível'}
 
-${'audio_url' in record && record.audio_url ? `\nÁudio disponível: ${record.audio_url}` : ''}
+${fullRecord.audio_url ? `\nÁudio disponível: ${fullRecord.audio_url}` : ''}
 ${transcription ? `\nTranscrição: ${transcription}` : ''}
     `.trim()
 
@@ -316,7 +330,7 @@ ${transcription ? `\nTranscrição: ${transcription}` : ''}
     const url = URL.createObjectURL(blob)
     const link = document.createElement('a')
     link.href = url
-    link.download = `prontuario_${record.patient_name?.replace(/\s+/g, '_') || 'paciente'}_${new Date(record.created_at).toISOString().split('T')[0]}.txt`
+    link.download = `prontuario_${fullRecord.patient_name?.replace(/\s+/g, '_') || 'paciente'}_${new Date(fullRecord.created_at).toISOString().split('T')[0]}.txt`
     document.body.appendChild(link)
     link.click()
     document.body.removeChild(link)
@@ -386,7 +400,11 @@ ${transcription ? `\nTranscrição: ${transcription}` : ''}
             <h1 className="text-3xl font-bold text-gray-900">Prontuários</h1>
             <p className="text-gray-600">Gerencie registros médicos e histórico dos pacientes</p>
           </div>
-          <Button onClick={() => setNewRecordModalOpen(true)}>
+          <Button
+            onClick={() => setNewRecordModalOpen(true)}
+            onMouseEnter={preloadNewRecordModal}
+            onFocus={preloadNewRecordModal}
+          >
             <Plus className="mr-2 h-4 w-4" />
             Novo Registro
           </Button>
@@ -516,6 +534,62 @@ ${transcription ? `\nTranscrição: ${transcription}` : ''}
               </CardContent>
             </Card>
 
+            {/* Content Search Results */}
+            {debouncedSearchTerm.length >= CONTENT_SEARCH_MIN_LENGTH && (
+              <Card>
+                <CardHeader>
+                  <CardTitle className="flex items-center space-x-2">
+                    <span>Encontrado no conteúdo</span>
+                    {contentSearching && <Loader2 className="h-4 w-4 animate-spin" />}
+                  </CardTitle>
+                  <CardDescription>
+                    Prontuários cujas notas ou transcrições mencionam &quot;{debouncedSearchTerm}&quot;
+                  </CardDescription>
+                </CardHeader>
+                <CardContent>
+                  {contentResults.length === 0 ? (
+                    <p className="text-sm text-gray-500">
+                      {contentSearching ? 'Buscando...' : 'Nenhum prontuário menciona esses termos.'}
+                    </p>
+                  ) : (
+                    <div className="space-y-3">
+                      {contentResults.map(result => (
+                        <div
+                          key={result.id}
+                          className="border rounded-lg p-3 cursor-pointer hover:bg-gray-50"
+                          onClick={() => handleViewRecord({
+                            id: result.id,
+                            type: 'medical_record',
+                            patient_id: result.patient_id,
+                            patient_name: result.patient_name || 'Paciente não encontrado',
+                            therapist_name: '',
+                            therapist_id: '',
+                            status: 'completed',
+                            created_at: result.created_at,
+                            appointment_id: result.appointment_id,
+                            note_type: result.note_type,
+                            title: result.title
+                          })}
+                        >
+                          <div className="flex items-center justify-between">
+                            <div className="flex items-center space-x-2">
+                              <Badge variant="outline">{getMedicalRecordTypeLabel(result.note_type)}</Badge>
+                              <span className="font-medium">{result.patient_name || 'Paciente não identificado'}</span>
+                            </div>
+                            <span className="text-sm text-gray-500">{formatDateTime(result.created_at)}</span>
+                          </div>
+                          {result.title && (
+                            <div className="mt-1 text-sm font-medium text-gray-700">{result.title}</div>
+                          )}
+                          <p className="mt-1 text-sm text-gray-600">{renderSnippet(result.snippet)}</p>
+                        </div>
+                      ))}
+                    </div>
+                  )}
+                </CardContent>
+              </Card>
+            )}
+
             {/* Medical Records Table */}
             <Card>
               <CardHeader>
@@ -622,6 +696,14 @@ ${transcription ? `\nTranscrição: ${transcription}` : ''}
                     </TableBody>
                   </Table>
                 )}
+                {nextCursor && (
+                  <div className="flex justify-center pt-4">
+                    <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                      {loadingMore && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+                      Carregar mais
+                    </Button>
+                  </div>
+                )}
               </CardContent>
             </Card>
           </TabsContent>
@@ -711,24 +793,36 @@ ${transcription ? `\nTranscrição: ${transcription}` : ''}
         </Tabs>
       </div>
 
-      <NewRecordModal
-        open={newRecordModalOpen}
-        onOpenChange={setNewRecordModalOpen}
-        onRecordCreated={handleRecordCreated}
-      />
-
-      <ViewRecordModal
-        open={viewRecordModalOpen}
-        onOpenChange={setViewRecordModalOpen}
-        record={selectedRecord}
-      />
-
-      <EditRecordModal
-        open={editRecordModalOpen}
-        onOpenChange={setEditRecordModalOpen}
-        record={selectedRecord}
-        onRecordUpdated={handleRecordUpdated}
-      />
+      <Suspense fallback={null}>
+        {newRecordModalMounted && (
+          <LazyNewRecordModal
+            open={newRecordModalOpen}
+            onOpenChange={setNewRecordModalOpen}
+            onRecordCreated={handleRecordCreated}
+          />
+        )}
+      </Suspense>
+
+      <Suspense fallback={null}>
+        {viewRecordModalMounted && (
+          <LazyViewRecordModal
+            open={viewRecordModalOpen}
+            onOpenChange={setViewRecordModalOpen}
+            record={viewedRecord}
+          />
+        )}
+      </Suspense>
+
+      <Suspense fallback={null}>
+        {editRecordModalMounted && (
+          <LazyEditRecordModal
+            open={editRecordModalOpen}
+            onOpenChange={setEditRecordModalOpen}
+            record={selectedRecord}
+            onRecordUpdated={handleRecordUpdated}
+          />
+        )}
+      </Suspense>
     </AppShell>
   )
 }
\ No newline at end of file
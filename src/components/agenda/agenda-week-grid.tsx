@@ -0,0 +1,145 @@
+'use client'
+
+import { memo, useMemo } from 'react'
+import { format, isSameDay, parseISO } from 'date-fns'
+import { ptBR } from 'date-fns/locale'
+import { MoreHorizontal } from 'lucide-react'
+import { useVirtualList } from '@/hooks/use-virtual-list'
+import { dayKey, type IndexableAppointment, type LaidOutAppointment } from '@/lib/agenda-index'
+
+const HOUR_HEIGHT = 64
+const PX_PER_MINUTE = HOUR_HEIGHT / 60
+const GUTTER_WIDTH = 56
+const HOURS = Array.from({ length: 24 }, (_, hour) => hour)
+
+interface AgendaWeekGridProps<T extends IndexableAppointment> {
+  days: Date[]
+  layoutByDay: Map<string, LaidOutAppointment<T>[]>
+  onSelect: (appointment: T) => void
+  onView: (appointment: T) => void
+  onSlotClick: (date: Date, time: string) => void
+  height?: number
+}
+
+/**
+ * Time grid for the week view.
+ * Hour rows are virtualized with useVirtualList; only appointment blocks that
+ * intersect the visible hours are mounted. Overlapping appointments are placed
+ * side by side using the lanes precomputed by buildAgendaIndex.
+ */
+function AgendaWeekGridInner<T extends IndexableAppointment>({
+  days,
+  layoutByDay,
+  onSelect,
+  onView,
+  onSlotClick,
+  height = 600
+}: AgendaWeekGridProps<T>) {
+  const { visibleItems, totalHeight, handleScroll, visibleRange } = useVirtualList(HOURS, {
+    itemHeight: HOUR_HEIGHT,
+    containerHeight: height,
+    overscan: 2
+  })
+
+  const visibleStartMinute = visibleRange.startIndex * 60
+  const visibleEndMinute = (visibleRange.endIndex + 1) * 60
+  const columnWidth = `calc((100% - ${GUTTER_WIDTH}px) / ${days.length})`
+
+  const columns = useMemo(
+    () => days.map((day) => ({ day, items: layoutByDay.get(dayKey(day)) || [] })),
+    [days, layoutByDay]
+  )
+
+  return (
+    <div>
+      <div className="flex border-b" style={{ paddingLeft: GUTTER_WIDTH }}>
+        {days.map((day) => {
+          const isToday = isSameDay(day, new Date())
+          return (
+            <div
+              key={day.toISOString()}
+              className={`flex-1 text-center p-2 rounded-t-lg ${isToday ? 'bg-blue-100 text-blue-900' : 'bg-gray-50'}`}
+            >
+              <div className="text-sm font-medium">{format(day, 'EEE', { locale: ptBR })}</div>
+              <div className="text-lg font-bold">{format(day, 'd')}</div>
+            </div>
+          )
+        })}
+      </div>
+
+      <div className="overflow-auto" style={{ height }} onScroll={handleScroll}>
+        <div className="relative" style={{ height: totalHeight }}>
+          {visibleItems.map((hour) => (
+            <div
+              key={hour}
+              className="absolute left-0 right-0 border-t border-gray-100"
+              style={{ top: hour * HOUR_HEIGHT, height: HOUR_HEIGHT }}
+            >
+              <span className="absolute left-1 -top-2 bg-white px-1 text-xs text-gray-400">
+                {`${hour.toString().padStart(2, '0')}:00`}
+              </span>
+            </div>
+          ))}
+
+          {columns.map(({ day, items }, columnIndex) => (
+            <div
+              key={day.toISOString()}
+              className="absolute top-0 bottom-0 border-l border-gray-100 cursor-pointer"
+              style={{
+                left: `calc(${GUTTER_WIDTH}px + ${columnWidth} * ${columnIndex})`,
+                width: columnWidth
+              }}
+              onClick={(e) => {
+                const offset = e.clientY - e.currentTarget.getBoundingClientRect().top
+                const hour = Math.min(23, Math.max(0, Math.floor(offset / HOUR_HEIGHT)))
+                onSlotClick(day, `${hour.toString().padStart(2, '0')}:00`)
+              }}
+            >
+              {items
+                .filter(
+                  (item) =>
+                    item.endMinutes > visibleStartMinute && item.startMinutes < visibleEndMinute
+                )
+                .map((item) => (
+                  <div
+                    key={item.appointment.id}
+                    className={`group absolute overflow-hidden p-1 text-xs bg-blue-100 rounded border-l-2 border-blue-500 hover:bg-blue-200 transition-colors ${
+                      item.appointment.status === 'cancelled' ? 'opacity-50' : ''
+                    }`}
+                    style={{
+                      top: item.startMinutes * PX_PER_MINUTE,
+                      height: Math.max((item.endMinutes - item.startMinutes) * PX_PER_MINUTE, 18),
+                      left: `${(item.lane / item.laneCount) * 100}%`,
+                      width: `${100 / item.laneCount}%`
+                    }}
+                    onClick={(e) => {
+                      e.stopPropagation()
+                      onSelect(item.appointment)
+                    }}
+                  >
+                    <button
+                      type="button"
+                      aria-label="Ver agendamento"
+                      className="absolute right-0.5 top-0.5 rounded p-0.5 opacity-0 transition-opacity hover:bg-blue-300 group-hover:opacity-100 focus:opacity-100"
+                      onClick={(e) => {
+                        e.stopPropagation()
+                        onView(item.appointment)
+                      }}
+                    >
+                      <MoreHorizontal className="h-3 w-3" />
+                    </button>
+                    <div className="font-medium truncate">
+                      {format(parseISO(item.appointment.start_at), 'HH:mm')}
+                    </div>
+                    <div className="truncate text-gray-600">{item.appointment.patient_name}</div>
+                  </div>
+                ))}
+            </div>
+          ))}
+        </div>
+      </div>
+    </div>
+  )
+}
+
+export const AgendaWeekGrid = memo(AgendaWeekGridInner) as typeof AgendaWeekGridInner
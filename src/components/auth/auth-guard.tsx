@@ -3,7 +3,7 @@
 import { useEffect } from 'react'
 import { useRouter } from 'next/navigation'
 import { useSupabase } from '@/providers/supabase-provider'
-import { Loader2 } from 'lucide-react'
+import { logger } from '@/lib/logger'
 
 interface AuthGuardProps {
   children: React.ReactNode
@@ -14,37 +14,31 @@ export function AuthGuard({ children }: AuthGuardProps) {
   const router = useRouter()
 
   // Debug logging
-  console.log('🛡️ AuthGuard render:', { 
+  logger.debug('🛡️ AuthGuard render:', { 
     user: user?.id, 
     loading, 
     timestamp: new Date().toISOString() 
   })
 
   useEffect(() => {
-    console.log('🛡️ AuthGuard useEffect:', { user: user?.id, loading })
+    logger.debug('🛡️ AuthGuard useEffect:', { user: user?.id, loading })
     if (!loading && !user) {
-      console.log('🔄 Redirecting to login...')
+      logger.debug('🔄 Redirecting to login...')
       router.push('/login')
     }
   }, [user, loading, router])
 
+  // O middleware já exigiu sessão para esta página: renderiza (inclusive o
+  // HTML vindo do servidor) enquanto o cliente confirma a sessão
   if (loading) {
-    console.log('🔄 AuthGuard: Showing loading spinner')
-    return (
-      <div className="min-h-screen flex items-center justify-center">
-        <div className="text-center">
-          <Loader2 className="h-8 w-8 animate-spin mx-auto mb-4" />
-          <p className="text-gray-600">Carregando...</p>
-        </div>
-      </div>
-    )
+    return <>{children}</>
   }
 
   if (!user) {
-    console.log('❌ AuthGuard: No user, returning null')
+    logger.debug('❌ AuthGuard: No user, returning null')
     return null
   }
 
-  console.log('✅ AuthGuard: User authenticated, rendering children')
+  logger.debug('✅ AuthGuard: User authenticated, rendering children')
   return <>{children}</>
 }
\ No newline at end of file
@@ -0,0 +1,142 @@
+'use client'
+
+import { memo } from 'react'
+import { PaperclipIcon, AlertCircle } from 'lucide-react'
+import { parseMessageContent, type Message } from '@/lib/conversations'
+
+export function formatMessageTime(timestamp: string) {
+  const date = new Date(timestamp)
+  const now = new Date()
+  const diffInHours = (now.getTime() - date.getTime()) / (1000 * 60 * 60)
+
+  if (diffInHours < 24) {
+    return date.toLocaleTimeString('pt-BR', { hour: '2-digit', minute: '2-digit' })
+  } else if (diffInHours < 48) {
+    return 'Ontem'
+  } else {
+    return date.toLocaleDateString('pt-BR', { day: '2-digit', month: '2-digit' })
+  }
+}
+
+function MessageContentView({ bodyText }: { bodyText: string }) {
+  const content = parseMessageContent(bodyText)
+
+  switch (content.type) {
+    case 'document':
+      return (
+        <div className="flex items-center space-x-2">
+          <PaperclipIcon className="h-4 w-4" />
+          <div>
+            <p className="text-sm font-medium">{content.title}</p>
+            <p className="text-xs opacity-70">{content.fileName}</p>
+          </div>
+        </div>
+      )
+
+    case 'image':
+      return (
+        <div>
+          <div className="bg-gray-200 rounded p-2 mb-1">
+            <div className="flex items-center space-x-2">
+              <div className="w-8 h-8 bg-blue-500 rounded flex items-center justify-center">
+                <span className="text-white text-xs">📷</span>
+              </div>
+              <span className="text-sm">Imagem</span>
+            </div>
+          </div>
+        </div>
+      )
+
+    case 'audio':
+      return (
+        <div className="flex items-center space-x-2">
+          <div className="w-8 h-8 bg-green-500 rounded-full flex items-center justify-center">
+            <span className="text-white text-xs">🎵</span>
+          </div>
+          <span className="text-sm">Áudio</span>
+        </div>
+      )
+
+    case 'video':
+      return (
+        <div className="flex items-center space-x-2">
+          <div className="w-8 h-8 bg-red-500 rounded flex items-center justify-center">
+            <span className="text-white text-xs">🎬</span>
+          </div>
+          <span className="text-sm">Vídeo</span>
+        </div>
+      )
+
+    case 'sticker':
+      return (
+        <div className="flex items-center space-x-2">
+          <div className="w-8 h-8 bg-yellow-500 rounded flex items-center justify-center">
+            <span className="text-white text-xs">😀</span>
+          </div>
+          <span className="text-sm">
+            {content.isAnimated ? 'Sticker Animado' : 'Sticker'}
+          </span>
+        </div>
+      )
+
+    case 'edited':
+      return (
+        <div>
+          <div className="flex items-center space-x-1 mb-1">
+            <span className="text-xs opacity-60">✏️ editado</span>
+          </div>
+          <p className="text-sm whitespace-pre-wrap">{content.content}</p>
+        </div>
+      )
+
+    case 'unknown':
+      return (
+        <div className="flex items-center space-x-2">
+          <div className="w-8 h-8 bg-gray-500 rounded flex items-center justify-center">
+            <span className="text-white text-xs">❓</span>
+          </div>
+          <div>
+            <p className="text-sm whitespace-pre-wrap">{content.content}</p>
+            <p className="text-xs opacity-60">Tipo de mensagem não suportado</p>
+          </div>
+        </div>
+      )
+
+    default:
+      return <p className="text-sm whitespace-pre-wrap">{content.content}</p>
+  }
+}
+
+interface MessageBubbleProps {
+  message: Message
+  onRetry?: (message: Message) => void
+}
+
+export const MessageBubble = memo(function MessageBubble({ message, onRetry }: MessageBubbleProps) {
+  const outbound = message.direction === 'outbound'
+
+  return (
+    <div className={`flex ${outbound ? 'justify-end' : 'justify-start'}`}>
+      <div
+        className={`max-w-[70%] rounded-lg p-3 ${
+          outbound ? 'bg-blue-500 text-white' : 'bg-white border'
+        } ${message.pending ? 'opacity-70' : ''}`}
+      >
+        <MessageContentView bodyText={message.body_text} />
+        <p className={`text-xs mt-1 text-right ${outbound ? 'text-blue-100' : 'text-gray-400'}`}>
+          {message.pending ? 'Enviando...' : formatMessageTime(message.sent_at)}
+        </p>
+        {message.failed && (
+          <button
+            type="button"
+            className="flex items-center gap-1 text-xs mt-1 underline"
+            onClick={() => onRetry?.(message)}
+          >
+            <AlertCircle className="h-3 w-3" />
+            Não enviada. Tentar novamente
+          </button>
+        )}
+      </div>
+    </div>
+  )
+})
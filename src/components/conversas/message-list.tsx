@@ -0,0 +1,92 @@
+'use client'
+
+import { useEffect, useMemo } from 'react'
+import { Loader2 } from 'lucide-react'
+import { useVariableVirtualList } from '@/hooks/use-variable-virtual-list'
+import type { Message } from '@/lib/conversations'
+import { MessageBubble } from './message-bubble'
+
+interface MessageListProps {
+  /** Muda ao trocar de conversa (volta para o fim da lista) */
+  conversationId: string | null
+  messages: Message[]
+  loading: boolean
+  loadingOlder: boolean
+  hasOlder: boolean
+  onLoadOlder: () => void
+  onRetry: (message: Message) => void
+}
+
+const ESTIMATED_MESSAGE_HEIGHT = 76
+
+/**
+ * Conversa virtualizada: só as mensagens visíveis ficam no DOM, com altura
+ * medida por linha. Rolar até o topo carrega a página anterior.
+ */
+export function MessageList({
+  conversationId,
+  messages,
+  loading,
+  loadingOlder,
+  hasOlder,
+  onLoadOlder,
+  onRetry
+}: MessageListProps) {
+  const keys = useMemo(() => messages.map((message) => message.id), [messages])
+
+  const {
+    containerRef,
+    measureRef,
+    onScroll,
+    scrollToBottom,
+    range,
+    offsets,
+    totalHeight
+  } = useVariableVirtualList({
+    keys,
+    estimateHeight: ESTIMATED_MESSAGE_HEIGHT,
+    stickToBottom: true,
+    onReachTop: hasOlder && !loadingOlder ? onLoadOlder : undefined
+  })
+
+  useEffect(() => {
+    scrollToBottom()
+  }, [conversationId, scrollToBottom])
+
+  // Mensagem enviada por nós sempre leva ao fim da conversa
+  const last = messages[messages.length - 1]
+  useEffect(() => {
+    if (last?.pending) scrollToBottom()
+  }, [last?.id, last?.pending, scrollToBottom])
+
+  return (
+    <div className="flex-1 relative bg-gray-50 min-h-0">
+      {loadingOlder && (
+        <div className="absolute top-2 left-0 right-0 z-10 flex justify-center">
+          <Loader2 className="h-5 w-5 animate-spin text-gray-400" />
+        </div>
+      )}
+      <div ref={containerRef} onScroll={onScroll} className="h-full overflow-y-auto">
+        {loading ? (
+          <div className="flex items-center justify-center h-full">
+            <Loader2 className="h-6 w-6 animate-spin" />
+          </div>
+        ) : (
+          <div style={{ height: totalHeight, position: 'relative' }}>
+            {messages.slice(range.start, range.end + 1).map((message, index) => (
+              <div
+                key={message.id}
+                ref={measureRef}
+                data-key={message.id}
+                className="px-4 pt-4"
+                style={{ position: 'absolute', top: offsets[range.start + index], left: 0, right: 0 }}
+              >
+                <MessageBubble message={message} onRetry={onRetry} />
+              </div>
+            ))}
+          </div>
+        )}
+      </div>
+    </div>
+  )
+}
@@ -1,13 +1,12 @@
 'use client'
 
-import { useState } from 'react'
+import { useState, useCallback, useMemo } from 'react'
 import {
   DndContext,
   DragEndEvent,
-  DragOverEvent,
-  DragOverlay,
   DragStartEvent,
   PointerSensor,
+  DragOverlay,
   useSensor,
   useSensors,
   closestCorners
@@ -23,9 +22,14 @@ import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
 import { Badge } from '@/components/ui/badge'
 import { Button } from '@/components/ui/button'
 import { Avatar, AvatarFallback } from '@/components/ui/avatar'
+import { logger } from '@/lib/logger'
+import { useVariableVirtualList } from '@/hooks/use-variable-virtual-list'
+import { useKanbanBoard } from '@/hooks/use-kanban-board'
+import { LEAD_STAGES, type BoardColumnState } from '@/lib/crm-board'
 import { 
   Lead, 
   LeadStage, 
+  LeadBoardFilters,
   getStageText, 
   getStageColor, 
   getScoreColor,
@@ -40,7 +44,8 @@ import {
   MoreHorizontal,
   Eye,
   Edit,
-  Trash2
+  Trash2,
+  Loader2
 } from 'lucide-react'
 import {
   DropdownMenu,
@@ -50,21 +55,24 @@ import {
 } from '@/components/ui/dropdown-menu'
 
 interface KanbanBoardProps {
-  leads: Lead[]
-  onLeadUpdate: (leadId: string, stage: LeadStage) => void
+  /** Search/source filters, applied by the database */
+  filters: LeadBoardFilters
+  /** Columns to show (all stages by default) */
+  stages?: LeadStage[]
+  /** Bump to reload the board (e.g. after creating or editing a lead) */
+  refreshKey?: number
   onLeadView: (lead: Lead) => void
   onLeadEdit: (lead: Lead) => void
   onLeadDelete: (lead: Lead) => void
 }
 
-interface KanbanColumn {
+interface KanbanColumnDefinition {
   id: LeadStage
   title: string
   color: string
-  leads: Lead[]
 }
 
-const COLUMN_DEFINITIONS: Omit<KanbanColumn, 'leads'>[] = [
+const COLUMN_DEFINITIONS: KanbanColumnDefinition[] = [
   { id: 'lead', title: 'Leads', color: 'bg-blue-50 border-blue-200' },
   { id: 'mql', title: 'MQL', color: 'bg-green-50 border-green-200' },
   { id: 'sql', title: 'SQL', color: 'bg-yellow-50 border-yellow-200' },
@@ -72,10 +80,21 @@ const COLUMN_DEFINITIONS: Omit<KanbanColumn, 'leads'>[] = [
   { id: 'lost', title: 'Perdidos', color: 'bg-red-50 border-red-200' }
 ]
 
-export function KanbanBoard({ leads, onLeadUpdate, onLeadView, onLeadEdit, onLeadDelete }: KanbanBoardProps) {
-  const [activeId, setActiveId] = useState<string | null>(null)
+/** Estimated card height (px) before a card is measured */
+const ESTIMATED_CARD_HEIGHT = 150
+/** Vertical gap between cards (px) */
+const CARD_GAP = 12
+
+export function KanbanBoard({
+  filters,
+  stages = LEAD_STAGES,
+  refreshKey = 0,
+  onLeadView,
+  onLeadEdit,
+  onLeadDelete
+}: KanbanBoardProps) {
+  const { board, loading, loadMore, moveLead } = useKanbanBoard(filters, refreshKey)
   const [draggedLead, setDraggedLead] = useState<Lead | null>(null)
-  const [dragOverColumn, setDragOverColumn] = useState<string | null>(null)
 
   const sensors = useSensors(
     useSensor(PointerSensor, {
@@ -85,163 +104,47 @@ export function KanbanBoard({ leads, onLeadUpdate, onLeadView, onLeadEdit, onLea
     })
   )
 
-  // Group leads by stage
-  const columns: KanbanColumn[] = COLUMN_DEFINITIONS.map(col => ({
-    ...col,
-    leads: leads.filter(lead => lead.stage === col.id)
-  }))
+  const columns = COLUMN_DEFINITIONS.filter((column) => stages.includes(column.id))
 
-  const handleDragStart = (event: DragStartEvent) => {
-    const { active } = event
-    setActiveId(active.id as string)
-    
-    const lead = leads.find(l => l.id === active.id)
-    setDraggedLead(lead || null)
-  }
+  const findStage = useCallback((leadId: string): LeadStage | null => {
+    return LEAD_STAGES.find((stage) => board[stage].leads.some((lead) => lead.id === leadId)) || null
+  }, [board])
 
-  const handleDragOver = (event: DragOverEvent) => {
-    const { over } = event
-    
-    if (over?.data?.current?.type === 'column') {
-      setDragOverColumn(over.data.current.stage)
-    } else if (over?.data?.current?.type === 'lead') {
-      // Find which column this lead belongs to
-      const targetLead = leads.find(l => l.id === over.id)
-      if (targetLead) {
-        setDragOverColumn(targetLead.stage)
-      }
-    } else {
-      setDragOverColumn(null)
-    }
-  }
-
-  // Helper function to find column by coordinates
-  const findColumnByCoordinates = (x: number, y: number): LeadStage | null => {
-    const columnElements = document.querySelectorAll('[data-column-id]')
-    
-    for (const element of columnElements) {
-      const rect = element.getBoundingClientRect()
-      if (x >= rect.left && x <= rect.right && y >= rect.top && y <= rect.bottom) {
-        return element.getAttribute('data-column-id') as LeadStage
-      }
-    }
-    
-    return null
+  const handleDragStart = (event: DragStartEvent) => {
+    const lead = (event.active.data.current?.lead as Lead | undefined) || null
+    setDraggedLead(lead)
   }
 
   const handleDragEnd = (event: DragEndEvent) => {
-    const { active, over, delta } = event
-    
-    console.log('🔄 handleDragEnd called:', {
-      active: active?.id,
-      over: over?.id,
-      overData: over?.data,
-      dragOverColumn,
-      delta
-    })
-
-    setDragOverColumn(null)
+    const { active, over } = event
+    setDraggedLead(null)
+    if (!over) return
 
     const leadId = active.id as string
-    let newStage: LeadStage | null = null
-
-    if (over?.data?.current?.type === 'column') {
-      // Dropped directly on a column
-      newStage = over.id as LeadStage
-      console.log('🎯 Dropped on column:', newStage)
-    } else if (over?.data?.current?.type === 'lead') {
-      // Dropped on another lead - use coordinates to find the actual column
-      console.log('🎯 Dropped on lead, using coordinates to find column')
-      
-      // Try to find column by coordinates first
-      if (active.rect?.current?.translated) {
-        const rect = active.rect.current.translated
-        const centerX = rect.left + rect.width / 2
-        const centerY = rect.top + rect.height / 2
-        
-        newStage = findColumnByCoordinates(centerX, centerY)
-        console.log('🎯 Found column by coordinates (lead drop):', {
-          coordinates: { x: centerX, y: centerY },
-          foundStage: newStage
-        })
-      }
-      
-      // Fallback to target lead's stage if coordinates don't work
-      if (!newStage) {
-        const targetLeadId = over.id as string
-        const targetLead = leads.find(l => l.id === targetLeadId)
-        
-        console.log('🎯 Fallback to target lead stage:', {
-          targetLeadId,
-          targetLeadStage: targetLead?.stage
-        })
-        
-        if (targetLead) {
-          newStage = targetLead.stage
-        }
-      }
-    } else if (dragOverColumn) {
-      // Use the last column we were hovering over
-      newStage = dragOverColumn as LeadStage
-      console.log('🎯 Using dragOverColumn:', newStage)
-    }
-
-    // If we still don't have a stage, try to find it by coordinates
-    if (!newStage && active.rect?.current?.translated) {
-      const rect = active.rect.current.translated
-      const centerX = rect.left + rect.width / 2
-      const centerY = rect.top + rect.height / 2
-      
-      newStage = findColumnByCoordinates(centerX, centerY)
-      console.log('🎯 Found column by coordinates:', {
-        coordinates: { x: centerX, y: centerY },
-        foundStage: newStage
-      })
-    }
-
-    if (!newStage) {
-      console.log('❌ No valid drop target found')
-      setActiveId(null)
-      setDraggedLead(null)
-      return
+    let toStage: LeadStage | null = null
+    let index = 0
+
+    if (over.data.current?.type === 'lead') {
+      // Solto sobre outro card: ocupa o lugar dele na coluna
+      toStage = findStage(over.id as string)
+      if (toStage) index = board[toStage].leads.findIndex((lead) => lead.id === over.id)
+    } else if (over.data.current?.type === 'column') {
+      // Solto na área vazia da coluna: vai para o topo
+      toStage = over.data.current.stage as LeadStage
     }
 
-    console.log('📋 Drag details:', {
-      leadId,
-      newStage,
-      overType: over?.data?.current?.type || 'none'
-    })
-
-    const lead = leads.find(l => l.id === leadId)
-    if (!lead) {
-      setActiveId(null)
-      setDraggedLead(null)
-      return
-    }
-
-    // Don't update if the stage is the same
-    if (lead.stage === newStage) {
-      console.log('⏭️ No update needed:', {
-        leadExists: !!lead,
-        currentStage: lead.stage,
-        newStage
-      })
-      setActiveId(null)
-      setDraggedLead(null)
-      return
-    }
+    logger.debug('🔄 handleDragEnd:', { leadId, toStage, index })
+    if (!toStage || index < 0) return
 
-    console.log('✅ Updating lead stage:', {
-      leadId,
-      from: lead.stage,
-      to: newStage
-    })
-
-    // Update the lead stage
-    onLeadUpdate(leadId, newStage)
+    moveLead(leadId, toStage, index)
+  }
 
-    setActiveId(null)
-    setDraggedLead(null)
+  if (loading && LEAD_STAGES.every((stage) => board[stage].leads.length === 0)) {
+    return (
+      <div className="flex items-center justify-center h-64">
+        <Loader2 className="h-6 w-6 animate-spin text-muted-foreground" />
+      </div>
+    )
   }
 
   return (
@@ -249,14 +152,17 @@ export function KanbanBoard({ leads, onLeadUpdate, onLeadView, onLeadEdit, onLea
       sensors={sensors}
       collisionDetection={closestCorners}
       onDragStart={handleDragStart}
-      onDragOver={handleDragOver}
       onDragEnd={handleDragEnd}
+      onDragCancel={() => setDraggedLead(null)}
     >
       <div className="flex gap-6 overflow-x-auto pb-4">
         {columns.map((column) => (
           <KanbanColumn
             key={column.id}
             column={column}
+            state={board[column.id]}
+            activeId={draggedLead?.id || null}
+            onLoadMore={loadMore}
             onLeadView={onLeadView}
             onLeadEdit={onLeadEdit}
             onLeadDelete={onLeadDelete}
@@ -280,13 +186,20 @@ export function KanbanBoard({ leads, onLeadUpdate, onLeadView, onLeadEdit, onLea
 }
 
 interface KanbanColumnProps {
-  column: KanbanColumn
+  column: KanbanColumnDefinition
+  state: BoardColumnState
+  activeId: string | null
+  onLoadMore: (stage: LeadStage) => void
   onLeadView: (lead: Lead) => void
   onLeadEdit: (lead: Lead) => void
   onLeadDelete: (lead: Lead) => void
 }
 
-function KanbanColumn({ column, onLeadView, onLeadEdit, onLeadDelete }: KanbanColumnProps) {
+/**
+ * Column with only the visible cards mounted. The sortable context still
+ * knows every loaded id and the dragged card stays mounted while off-screen.
+ */
+function KanbanColumn({ column, state, activeId, onLoadMore, onLeadView, onLeadEdit, onLeadDelete }: KanbanColumnProps) {
   const {
     setNodeRef,
     isOver
@@ -298,6 +211,26 @@ function KanbanColumn({ column, onLeadView, onLeadEdit, onLeadDelete }: KanbanCo
     }
   })
 
+  const { leads, total, hasMore, loading } = state
+  const ids = useMemo(() => leads.map((lead) => lead.id), [leads])
+
+  const handleReachBottom = useCallback(() => {
+    if (hasMore && !loading) onLoadMore(column.id)
+  }, [hasMore, loading, onLoadMore, column.id])
+
+  const { containerRef, measureRef, onScroll, range, offsets, totalHeight } = useVariableVirtualList({
+    keys: ids,
+    estimateHeight: ESTIMATED_CARD_HEIGHT + CARD_GAP,
+    overscan: 3,
+    onReachBottom: handleReachBottom,
+    bottomThreshold: 400
+  })
+
+  const visible: number[] = []
+  for (let index = range.start; index <= range.end; index++) visible.push(index)
+  const activeIndex = activeId ? ids.indexOf(activeId) : -1
+  if (activeIndex >= 0 && (activeIndex < range.start || activeIndex > range.end)) visible.push(activeIndex)
+
   return (
     <div
       ref={setNodeRef}
@@ -310,29 +243,51 @@ function KanbanColumn({ column, onLeadView, onLeadEdit, onLeadDelete }: KanbanCo
         <div className="flex items-center justify-between mb-4">
           <h3 className="font-semibold text-gray-900">{column.title}</h3>
           <Badge variant="secondary" className="text-xs">
-            {column.leads.length}
+            {total}
           </Badge>
         </div>
 
-        <SortableContext items={column.leads.map(l => l.id)} strategy={verticalListSortingStrategy}>
-          <div className="space-y-3">
-            {column.leads.map((lead) => (
-              <SortableLeadCard
-                key={lead.id}
-                lead={lead}
-                onView={onLeadView}
-                onEdit={onLeadEdit}
-                onDelete={onLeadDelete}
-              />
-            ))}
-          </div>
-        </SortableContext>
+        <div
+          ref={containerRef}
+          onScroll={onScroll}
+          className="h-[calc(100vh-16rem)] min-h-[320px] overflow-y-auto"
+        >
+          <SortableContext items={ids} strategy={verticalListSortingStrategy}>
+            <div className="relative" style={{ height: totalHeight }}>
+              {visible.map((index) => {
+                const lead = leads[index]
+                return (
+                  <div
+                    key={lead.id}
+                    ref={measureRef}
+                    data-key={lead.id}
+                    className="absolute left-0 right-0"
+                    style={{ top: offsets[index], paddingBottom: CARD_GAP }}
+                  >
+                    <SortableLeadCard
+                      lead={lead}
+                      onView={onLeadView}
+                      onEdit={onLeadEdit}
+                      onDelete={onLeadDelete}
+                    />
+                  </div>
+                )
+              })}
+            </div>
+          </SortableContext>
 
-        {column.leads.length === 0 && (
-          <div className="text-center py-8 text-gray-500 text-sm">
-            Nenhum lead nesta etapa
-          </div>
-        )}
+          {loading && (
+            <div className="flex justify-center py-2">
+              <Loader2 className="h-4 w-4 animate-spin text-muted-foreground" />
+            </div>
+          )}
+
+          {leads.length === 0 && !loading && (
+            <div className="text-center py-8 text-gray-500 text-sm">
+              Nenhum lead nesta etapa
+            </div>
+          )}
+        </div>
       </div>
     </div>
   )
@@ -0,0 +1,129 @@
+import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
+import { Badge } from '@/components/ui/badge'
+import {
+  Calendar,
+  Users,
+  DollarSign,
+  TrendingUp,
+  Clock,
+  AlertCircle
+} from 'lucide-react'
+import {
+  type DashboardStats,
+  type ProximaConsulta,
+  type DashboardAlert,
+  formatCurrency
+} from '@/data/dashboard'
+
+// Server Components: cada widget recebe a promessa já iniciada pela página e
+// só ele espera por ela, então cada um é enviado assim que seus dados chegam
+
+export async function StatsCards({ stats: statsPromise }: { stats: Promise<DashboardStats> }) {
+  const stats = await statsPromise
+
+  const cards = [
+    { title: 'Consultas Hoje', icon: Calendar, value: String(stats.consultasHoje), variation: stats.consultasHojeVariacao },
+    { title: 'Pacientes Ativos', icon: Users, value: String(stats.pacientesAtivos), variation: stats.pacientesAtivosVariacao },
+    { title: 'Receita Mensal', icon: DollarSign, value: formatCurrency(stats.receitaMensal), variation: stats.receitaMensalVariacao },
+    { title: 'Taxa de Ocupação', icon: TrendingUp, value: `${stats.taxaOcupacao}%`, variation: stats.taxaOcupacaoVariacao }
+  ]
+
+  return (
+    <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6">
+      {cards.map(({ title, icon: Icon, value, variation }) => (
+        <Card key={title}>
+          <CardHeader className="flex flex-row items-center justify-between space-y-0 pb-2">
+            <CardTitle className="text-sm font-medium">{title}</CardTitle>
+            <Icon className="h-4 w-4 text-muted-foreground" />
+          </CardHeader>
+          <CardContent>
+            <div className="text-2xl font-bold">{value}</div>
+            <p className="text-xs text-muted-foreground">
+              {variation || 'Dados indisponíveis'}
+            </p>
+          </CardContent>
+        </Card>
+      ))}
+    </div>
+  )
+}
+
+export async function ProximasConsultasList({ consultas: consultasPromise }: { consultas: Promise<ProximaConsulta[]> }) {
+  const proximasConsultas = await consultasPromise
+
+  if (proximasConsultas.length === 0) {
+    return (
+      <div className="text-center py-4">
+        <p className="text-sm text-gray-500">Nenhuma consulta agendada para hoje</p>
+      </div>
+    )
+  }
+
+  return (
+    <div className="space-y-4">
+      {proximasConsultas.map((consulta) => (
+        <div key={consulta.id} className="flex items-center justify-between p-3 border rounded-lg">
+          <div className="flex items-center space-x-3">
+            <div className="flex items-center justify-center w-10 h-10 bg-blue-100 rounded-full">
+              <Clock className="h-5 w-5 text-blue-600" />
+            </div>
+            <div>
+              <p className="font-medium">{consulta.patient}</p>
+              <p className="text-sm text-gray-500">{consulta.type}</p>
+            </div>
+          </div>
+          <div className="flex items-center space-x-2">
+            <span className="text-sm font-medium">{consulta.time}</span>
+            <Badge
+              variant={
+                consulta.status === 'confirmado' ? 'default' :
+                consulta.status === 'pendente' ? 'secondary' : 'destructive'
+              }
+            >
+              {consulta.status}
+            </Badge>
+          </div>
+        </div>
+      ))}
+    </div>
+  )
+}
+
+const ALERT_STYLES: Record<DashboardAlert['type'], { box: string; icon: string; title: string; description: string }> = {
+  warning: { box: 'bg-yellow-50 border-yellow-200', icon: 'text-yellow-600', title: 'text-yellow-800', description: 'text-yellow-600' },
+  info: { box: 'bg-blue-50 border-blue-200', icon: 'text-blue-600', title: 'text-blue-800', description: 'text-blue-600' },
+  error: { box: 'bg-red-50 border-red-200', icon: 'text-red-600', title: 'text-red-800', description: 'text-red-600' }
+}
+
+export async function DashboardAlerts({ alerts: alertsPromise }: { alerts: Promise<DashboardAlert[]> }) {
+  const alerts = await alertsPromise
+
+  if (alerts.length === 0) {
+    return (
+      <div className="text-center py-4">
+        <p className="text-sm text-gray-500">Nenhum alerta no momento</p>
+      </div>
+    )
+  }
+
+  return (
+    <div className="space-y-3">
+      {alerts.map((alert) => {
+        const style = ALERT_STYLES[alert.type]
+        return (
+          <div key={alert.id} className={`flex items-start space-x-3 p-3 border rounded-lg ${style.box}`}>
+            <AlertCircle className={`h-5 w-5 mt-0.5 ${style.icon}`} />
+            <div>
+              <p className={`text-sm font-medium ${style.title}`}>
+                {alert.title}
+              </p>
+              <p className={`text-xs ${style.description}`}>
+                {alert.description}
+              </p>
+            </div>
+          </div>
+        )
+      })}
+    </div>
+  )
+}
@@ -0,0 +1,46 @@
+'use client'
+
+import { Download } from 'lucide-react'
+import { Button } from '@/components/ui/button'
+import {
+  DropdownMenu,
+  DropdownMenuContent,
+  DropdownMenuItem,
+  DropdownMenuTrigger,
+} from '@/components/ui/dropdown-menu'
+import { exportUrl, type ExportDatasetName } from '@/lib/export'
+
+interface ExportMenuProps {
+  dataset: ExportDatasetName
+  /** Filtros atuais da lista (mesmos nomes de InvoiceFilters/PatientFilters/LeadFilters) */
+  filters?: Record<string, unknown>
+}
+
+/**
+ * Exporta a lista com os filtros atuais. O download é um link direto para
+ * /api/export, que o navegador recebe em streaming.
+ */
+export function ExportMenu({ dataset, filters = {} }: ExportMenuProps) {
+  return (
+    <DropdownMenu>
+      <DropdownMenuTrigger asChild>
+        <Button variant="outline">
+          <Download className="mr-2 h-4 w-4" />
+          Exportar
+        </Button>
+      </DropdownMenuTrigger>
+      <DropdownMenuContent align="end">
+        <DropdownMenuItem asChild>
+          <a href={exportUrl(dataset, 'csv', filters)} download>
+            CSV
+          </a>
+        </DropdownMenuItem>
+        <DropdownMenuItem asChild>
+          <a href={exportUrl(dataset, 'xlsx', filters)} download>
+            Excel (XLSX)
+          </a>
+        </DropdownMenuItem>
+      </DropdownMenuContent>
+    </DropdownMenu>
+  )
+}
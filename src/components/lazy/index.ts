@@ -1,26 +1,91 @@
 import { lazy } from 'react'
 
 // Lazy load heavy components
-export const LazyAppointmentModal = lazy(() => 
-  import('@/components/agenda/appointment-modal').then(module => ({
+// Each loader is shared by the lazy component and its preload function, so
+// calling preload (e.g. on hover of the button that opens a modal) starts the
+// same chunk request the component will use.
+
+const loadAppointmentModal = () => import('@/components/agenda/appointment-modal')
+const loadNewRecordModal = () => import('@/components/prontuarios/new-record-modal')
+const loadKanbanBoard = () => import('@/components/crm/kanban-board')
+const loadLeadForm = () => import('@/components/crm/lead-form')
+
+export const LazyAppointmentModal = lazy(() =>
+  loadAppointmentModal().then(module => ({
     default: module.AppointmentModal
   }))
 )
 
-export const LazyPatientForm = lazy(() => 
+export const LazyPatientForm = lazy(() =>
   import('@/components/pacientes/patient-form').then(module => ({
     default: module.PatientForm
   }))
 )
 
-export const LazyPatientDeleteDialog = lazy(() => 
+export const LazyPatientDeleteDialog = lazy(() =>
   import('@/components/pacientes/patient-delete-dialog').then(module => ({
     default: module.PatientDeleteDialog
   }))
 )
 
-export const LazyPatientDetailDrawer = lazy(() => 
+export const LazyPatientDetailDrawer = lazy(() =>
   import('@/components/pacientes/patient-detail-drawer').then(module => ({
     default: module.PatientDetailDrawer
   }))
-)
\ No newline at end of file
+)
+
+// Agenda: calendário (react-day-picker) só aparece na visão por dia
+export const LazyCalendar = lazy(() =>
+  import('@/components/ui/calendar').then(module => ({
+    default: module.Calendar
+  }))
+)
+
+// Prontuários: gravação (MediaRecorder, transcodificação, transcrição)
+export const LazyNewRecordModal = lazy(() =>
+  loadNewRecordModal().then(module => ({
+    default: module.NewRecordModal
+  }))
+)
+
+export const LazyViewRecordModal = lazy(() =>
+  import('@/components/prontuarios/view-record-modal').then(module => ({
+    default: module.ViewRecordModal
+  }))
+)
+
+export const LazyEditRecordModal = lazy(() =>
+  import('@/components/prontuarios/edit-record-modal').then(module => ({
+    default: module.EditRecordModal
+  }))
+)
+
+// CRM: quadro com dnd-kit e formulários de lead
+export const LazyKanbanBoard = lazy(() =>
+  loadKanbanBoard().then(module => ({
+    default: module.KanbanBoard
+  }))
+)
+
+export const LazyLeadForm = lazy(() =>
+  loadLeadForm().then(module => ({
+    default: module.LeadForm
+  }))
+)
+
+export const LazyLeadDetailDrawer = lazy(() =>
+  import('@/components/crm/lead-detail-drawer').then(module => ({
+    default: module.LeadDetailDrawer
+  }))
+)
+
+export const LazyLeadDeleteDialog = lazy(() =>
+  import('@/components/crm/lead-delete-dialog').then(module => ({
+    default: module.LeadDeleteDialog
+  }))
+)
+
+export const preloadAppointmentModal = () => { loadAppointmentModal() }
+export const preloadNewRecordModal = () => { loadNewRecordModal() }
+export const preloadKanbanBoard = () => { loadKanbanBoard() }
+export const preloadLeadForm = () => { loadLeadForm() }
@@ -34,6 +34,11 @@ import { useSupabase } from '@/providers/supabase-provider'
 import { getPatients, type Patient } from '@/data/pacientes'
 import { AudioProcessingStatus } from './audio-processing-status'
 import { fetchWithTimeout, NETWORK_CONFIG } from '@/lib/network-config'
+import { stitchTranscript } from '@/lib/transcript-stitching'
+import { prepareAudioForUpload, SPEECH_ENCODING, SPEECH_RECORDER_OPTIONS } from '@/lib/client-audio-transcode'
+
+// Intervalo dos chunks enviados durante a gravação (transcrição ao vivo)
+const LIVE_TIMESLICE_MS = 10000
 
 interface NewRecordModalProps {
   open: boolean
@@ -78,6 +83,7 @@ export function NewRecordModal({
   // Audio import states
   const [importedAudio, setImportedAudio] = useState<File | null>(null)
   const [isImporting, setIsImporting] = useState(false)
+  const [transcodeProgress, setTranscodeProgress] = useState<number | null>(null)
   
   const [isLoading, setIsLoading] = useState(false)
   const [isSaving, setIsSaving] = useState(false)
@@ -90,6 +96,16 @@ export function NewRecordModal({
   const playbackIntervalRef = useRef<NodeJS.Timeout | null>(null)
   const fileInputRef = useRef<HTMLInputElement | null>(null)
 
+  // Live transcription: chunks go to /api/audio/live while recording.
+  // audioChunksRef is still filled so the single upload remains the fallback.
+  const [liveTranscript, setLiveTranscript] = useState('')
+  const liveJobIdRef = useRef<string | null>(null)
+  const liveFailedRef = useRef(false)
+  const liveChunkIndexRef = useRef(0)
+  const liveQueueRef = useRef<Promise<void>>(Promise.resolve())
+  const recordedMsRef = useRef(0)
+  const activeSinceRef = useRef<number | null>(null)
+
   // Load patients on mount
   useEffect(() => {
     const loadPatients = async () => {
@@ -141,11 +157,131 @@ export function NewRecordModal({
     setPlaybackTime(0)
     stopRecording()
     stopPlayback()
+    discardLiveSession()
     if (fileInputRef.current) {
       fileInputRef.current.value = ''
     }
   }
 
+  const getRecordedSeconds = () => {
+    const activeMs = activeSinceRef.current !== null ? performance.now() - activeSinceRef.current : 0
+    return (recordedMsRef.current + activeMs) / 1000
+  }
+
+  const startLiveSession = async () => {
+    liveJobIdRef.current = null
+    liveFailedRef.current = false
+    liveChunkIndexRef.current = 0
+    liveQueueRef.current = Promise.resolve()
+    setLiveTranscript('')
+
+    if (!selectedPatientId || !cedroUser?.id) return
+
+    try {
+      const response = await fetchWithTimeout('/api/audio/live/start', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          patient_id: selectedPatientId,
+          therapist_id: cedroUser.id,
+          appointment_id: appointmentId || null,
+          tipo_consulta: recordType === 'anamnesis' ? 'anamnese' : 'evolucao',
+          mime_type: 'audio/webm'
+        }),
+        timeout: NETWORK_CONFIG.DEFAULT_TIMEOUT
+      })
+
+      if (response.ok) {
+        const data = await response.json()
+        liveJobIdRef.current = data.recording_job_id
+      }
+    } catch (error) {
+      console.warn('Live transcription unavailable, using upload at the end:', error)
+    }
+  }
+
+  const sendLiveChunk = (chunk: Blob) => {
+    const jobId = liveJobIdRef.current
+    if (!jobId || liveFailedRef.current) return
+
+    const chunkIndex = liveChunkIndexRef.current++
+    const audioSeconds = getRecordedSeconds()
+
+    // Fila sequencial: o servidor exige os chunks em ordem
+    liveQueueRef.current = liveQueueRef.current.then(async () => {
+      if (liveFailedRef.current) return
+
+      try {
+        const formData = new FormData()
+        formData.append('chunk', chunk, `chunk-${chunkIndex}.webm`)
+        formData.append('chunk_index', String(chunkIndex))
+        formData.append('audio_seconds', audioSeconds.toFixed(3))
+
+        const response = await fetchWithTimeout(`/api/audio/live/${jobId}/chunk`, {
+          method: 'POST',
+          body: formData,
+          timeout: NETWORK_CONFIG.UPLOAD_TIMEOUT
+        })
+
+        if (!response.ok) {
+          throw new Error(`Chunk ${chunkIndex} rejeitado (${response.status})`)
+        }
+
+        const data = await response.json()
+        if (data.segment_text) {
+          setLiveTranscript(prev => stitchTranscript(prev, data.segment_text))
+        }
+      } catch (error) {
+        console.warn('Live transcription interrupted, using upload at the end:', error)
+        liveFailedRef.current = true
+      }
+    })
+  }
+
+  const discardLiveSession = () => {
+    const jobId = liveJobIdRef.current
+    liveJobIdRef.current = null
+    setLiveTranscript('')
+    if (jobId) {
+      fetch(`/api/recording-jobs/${jobId}`, { method: 'DELETE' }).catch(error =>
+        console.warn('Failed to discard live recording job:', error)
+      )
+    }
+  }
+
+  /**
+   * Finishes the live session (tail transcription + pipeline trigger).
+   * Returns the recording job id, or null when the caller must fall back to
+   * the single upload.
+   */
+  const finishLiveSession = async (): Promise<string | null> => {
+    const jobId = liveJobIdRef.current
+    if (!jobId) return null
+
+    await liveQueueRef.current
+
+    if (!liveFailedRef.current) {
+      try {
+        const response = await fetchWithTimeout(`/api/audio/live/${jobId}/finish`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ audio_seconds: recordedMsRef.current / 1000 }),
+          timeout: NETWORK_CONFIG.UPLOAD_TIMEOUT
+        })
+
+        if (response.ok) {
+          liveJobIdRef.current = null
+          return jobId
+        }
+      } catch (error) {
+        console.warn('Failed to finish live recording, using upload:', error)
+      }
+    }
+
+    discardLiveSession()
+    return null
+  }
+
   const startRecording = async () => {
     try {
       // Check if getDisplayMedia is supported
@@ -189,6 +325,10 @@ export function NewRecordModal({
       // Create AudioContext to mix both audio sources
       const audioContext = new AudioContext()
       const destination = audioContext.createMediaStreamDestination()
+      // Mix down to mono: speech only, half the data for the encoder
+      destination.channelCount = 1
+      destination.channelCountMode = 'explicit'
+      destination.channelInterpretation = 'speakers'
 
       // Create sources for both streams
       const displaySource = audioContext.createMediaStreamSource(new MediaStream(displayAudioTracks))
@@ -201,15 +341,17 @@ export function NewRecordModal({
       // Stop video tracks to save resources
       displayStream.getVideoTracks().forEach(track => track.stop())
       
-      const mediaRecorder = new MediaRecorder(destination.stream, {
-        mimeType: 'audio/webm;codecs=opus'
-      })
+      const mediaRecorder = new MediaRecorder(destination.stream, SPEECH_RECORDER_OPTIONS)
       mediaRecorderRef.current = mediaRecorder
       audioChunksRef.current = []
 
+      discardLiveSession()
+      await startLiveSession()
+
       mediaRecorder.ondataavailable = (event) => {
         if (event.data.size > 0) {
           audioChunksRef.current.push(event.data)
+          sendLiveChunk(event.data)
         }
       }
 
@@ -219,7 +361,7 @@ export function NewRecordModal({
         displayStream.getTracks().forEach(track => track.stop())
         micStream.getTracks().forEach(track => track.stop())
         
-        const audioBlob = new Blob(audioChunksRef.current, { type: 'audio/webm' })
+        const audioBlob = new Blob(audioChunksRef.current, { type: 'audio/webm;codecs=opus' })
         const audioUrl = URL.createObjectURL(audioBlob)
         setAudioRecording({
           blob: audioBlob,
@@ -228,7 +370,9 @@ export function NewRecordModal({
         })
       }
 
-      mediaRecorder.start()
+      recordedMsRef.current = 0
+      activeSinceRef.current = performance.now()
+      mediaRecorder.start(LIVE_TIMESLICE_MS)
       setIsRecording(true)
       setIsPaused(false)
       setRecordingTime(0)
@@ -272,6 +416,7 @@ export function NewRecordModal({
     if (mediaRecorderRef.current && isRecording) {
       if (isPaused) {
         mediaRecorderRef.current.resume()
+        activeSinceRef.current = performance.now()
         recordingIntervalRef.current = setInterval(() => {
           setRecordingTime(prev => prev + 1)
         }, 1000)
@@ -282,6 +427,10 @@ export function NewRecordModal({
       })
       } else {
         mediaRecorderRef.current.pause()
+        if (activeSinceRef.current !== null) {
+          recordedMsRef.current += performance.now() - activeSinceRef.current
+          activeSinceRef.current = null
+        }
         if (recordingIntervalRef.current) {
           clearInterval(recordingIntervalRef.current)
         }
@@ -296,6 +445,10 @@ export function NewRecordModal({
 
   const stopRecording = () => {
     if (mediaRecorderRef.current && isRecording) {
+      if (activeSinceRef.current !== null) {
+        recordedMsRef.current += performance.now() - activeSinceRef.current
+        activeSinceRef.current = null
+      }
       mediaRecorderRef.current.stop()
       setIsRecording(false)
       setIsPaused(false)
@@ -358,6 +511,7 @@ export function NewRecordModal({
 
   const deleteRecording = () => {
     if (audioRecording) {
+      discardLiveSession()
       URL.revokeObjectURL(audioRecording.url)
       setAudioRecording(null)
       setPlaybackTime(0)
@@ -447,8 +601,12 @@ export function NewRecordModal({
     
     try {
       // Upload the imported audio file
+      const prepared = await prepareImportedAudio(importedAudio)
       const formData = new FormData()
-      formData.append('audio', importedAudio)
+      formData.append('audio', prepared.file, prepared.file.name)
+      if (prepared.encoding) {
+        formData.append('audio_encoding', prepared.encoding)
+      }
       formData.append('patient_id', selectedPatientId)
       formData.append('therapist_id', cedroUser.id)
       if (appointmentId) {
@@ -503,6 +661,19 @@ export function NewRecordModal({
     }
   }
 
+  // Transcodes imported files to 16 kHz mono Opus in a worker before upload
+  const prepareImportedAudio = async (file: File) => {
+    setTranscodeProgress(0)
+    try {
+      return await prepareAudioForUpload(file, {
+        durationSeconds: audioRecording?.duration,
+        onProgress: setTranscodeProgress
+      })
+    } finally {
+      setTranscodeProgress(null)
+    }
+  }
+
   const removeImportedAudio = () => {
     if (audioRecording?.url) {
       URL.revokeObjectURL(audioRecording.url)
@@ -591,6 +762,21 @@ export function NewRecordModal({
     try {
       setIsSaving(true)
 
+      // Live recording: audio and most of the transcript are already on the server
+      if (audioRecording && !importedAudio) {
+        const liveJobId = await finishLiveSession()
+        if (liveJobId) {
+          setRecordingJobId(liveJobId)
+          toast({
+            title: 'Sucesso',
+            description: 'Transcrição concluída. Gerando o prontuário, acompanhe abaixo.',
+            duration: 5000
+          })
+          onRecordCreated?.()
+          return
+        }
+      }
+
       // If there's audio recording or imported audio, upload and process it
       if (audioRecording) {
         console.log('🎵 DEBUG Upload de áudio:')
@@ -604,10 +790,15 @@ export function NewRecordModal({
         // Upload audio for processing
         const formData = new FormData()
         if (isImported && importedAudio) {
-          formData.append('audio', importedAudio, importedAudio.name)
-          console.log('- Tipo: áudio importado, nome:', importedAudio.name)
+          const prepared = await prepareImportedAudio(importedAudio)
+          formData.append('audio', prepared.file, prepared.file.name)
+          if (prepared.encoding) {
+            formData.append('audio_encoding', prepared.encoding)
+          }
+          console.log('- Tipo: áudio importado, nome:', prepared.file.name, 'tamanho:', prepared.file.size)
         } else {
           formData.append('audio', audioRecording.blob, 'teleconsulta.webm')
+          formData.append('audio_encoding', SPEECH_ENCODING)
           console.log('- Tipo: áudio gravado, tamanho:', audioRecording.blob.size)
         }
         formData.append('patient_id', selectedPatientId)
@@ -918,6 +1109,13 @@ export function NewRecordModal({
                         )}
                       </div>
 
+                      {isRecording && liveTranscript && (
+                        <div className="text-left p-3 bg-muted rounded-md max-h-32 overflow-y-auto">
+                          <p className="text-xs font-medium text-muted-foreground mb-1">Transcrição ao vivo</p>
+                          <p className="text-sm whitespace-pre-wrap">{liveTranscript}</p>
+                        </div>
+                      )}
+
                       {isRecording && (
                         <div className="flex items-center justify-center gap-2">
                           <div className="flex items-center gap-2">
@@ -1029,7 +1227,9 @@ export function NewRecordModal({
             {isSaving ? (
               <>
                 <div className="w-4 h-4 border-2 border-white border-t-transparent rounded-full animate-spin" />
-                Salvando...
+                {transcodeProgress !== null
+                  ? `Otimizando áudio... ${Math.round(transcodeProgress * 100)}%`
+                  : 'Salvando...'}
               </>
             ) : (
               <>
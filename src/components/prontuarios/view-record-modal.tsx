@@ -15,21 +15,56 @@ import {
   Edit,
   Eye,
   EyeOff,
-  Lock
+  Lock,
+  Loader2
 } from 'lucide-react'
-import { type MedicalRecordWithLegacyFields, getMedicalRecordTypeLabel } from '@/data/pacientes'
+import { useQuery } from '@tanstack/react-query'
+import {
+  type MedicalRecordType,
+  type MedicalRecordWithLegacyFields,
+  getMedicalRecord,
+  getMedicalRecordTypeLabel
+} from '@/data/pacientes'
 import ReactMarkdown from 'react-markdown'
 import remarkGfm from 'remark-gfm'
 
+// List row data shown while the full record (content, transcription) loads
+export type ViewRecordSummary = {
+  id: string
+  patient_name?: string
+  therapist_name?: string
+  note_type?: MedicalRecordType
+  created_at: string
+}
+
 interface ViewRecordModalProps {
   open: boolean
   onOpenChange: (open: boolean) => void
-  record: MedicalRecordWithLegacyFields | null
+  record: ViewRecordSummary | null
   onEdit?: (record: MedicalRecordWithLegacyFields) => void
 }
 
-export function ViewRecordModal({ open, onOpenChange, record, onEdit }: ViewRecordModalProps) {
-  if (!record) return null
+export function ViewRecordModal({ open, onOpenChange, record: summary, onEdit }: ViewRecordModalProps) {
+  const { data: detail, isLoading, isError } = useQuery({
+    queryKey: ['medical-record-detail', summary?.id],
+    queryFn: () => getMedicalRecord(summary!.id),
+    enabled: open && !!summary?.id,
+    staleTime: 60 * 1000
+  })
+
+  if (!summary) return null
+
+  const record: MedicalRecordWithLegacyFields = detail ?? {
+    id: summary.id,
+    patient_id: '',
+    note_type: summary.note_type ?? 'evolution',
+    content_json: null,
+    visibility: 'private',
+    created_at: summary.created_at,
+    updated_at: summary.created_at,
+    patient_name: summary.patient_name,
+    therapist_name: summary.therapist_name
+  }
 
   const formatDateTime = (dateString: string) => {
     return new Date(dateString).toLocaleString('pt-BR')
@@ -221,7 +256,18 @@ ${transcription ? `\nTranscrição: ${transcription}` : ''}
             </CardHeader>
             <CardContent>
               <div className="prose prose-sm max-w-none">
-                {getRecordContent() ? (
+                {!detail ? (
+                  <div className="flex items-center justify-center py-8 text-gray-500">
+                    {isError ? (
+                      <p>Erro ao carregar o conteúdo do prontuário</p>
+                    ) : (
+                      <>
+                        <Loader2 className="h-5 w-5 animate-spin" />
+                        <span className="ml-2">{isLoading ? 'Carregando conteúdo...' : 'Conteúdo indisponível'}</span>
+                      </>
+                    )}
+                  </div>
+                ) : getRecordContent() ? (
                   <div className="markdown-content text-sm leading-relaxed">
                     <ReactMarkdown 
                       remarkPlugins={[remarkGfm]}
@@ -300,12 +346,12 @@ ${transcription ? `\nTranscrição: ${transcription}` : ''}
               ID: {record.id}
             </div>
             <div className="flex space-x-2">
-              <Button variant="outline" onClick={handleDownload}>
+              <Button variant="outline" onClick={handleDownload} disabled={!detail}>
                 <Download className="mr-2 h-4 w-4" />
                 Download
               </Button>
-              {onEdit && (
-                <Button onClick={() => onEdit(record)}>
+              {onEdit && detail && (
+                <Button onClick={() => onEdit(detail)}>
                   <Edit className="mr-2 h-4 w-4" />
                   Editar
                 </Button>
@@ -1,4 +1,6 @@
 import { supabase } from '@/lib/supabase'
+import { logger } from '@/lib/logger'
+import { getReferenceServices, getReferenceTherapists } from '@/lib/reference-data'
 import { format, startOfDay, endOfDay, startOfWeek, endOfWeek, startOfMonth, endOfMonth } from 'date-fns'
 
 export type Appointment = {
@@ -53,7 +55,7 @@ export async function getAppointments(
   therapistId?: string
 ): Promise<Appointment[]> {
   try {
-    console.log('🔍 getAppointments called with:', {
+    logger.debug('🔍 getAppointments called with:', {
       startDate: startDate.toISOString(),
       endDate: endDate.toISOString(),
       therapistId
@@ -74,7 +76,7 @@ export async function getAppointments(
 
     const { data, error } = await query
 
-    console.log('📊 Query result:', { 
+    logger.debug('📊 Query result:', { 
       data: data?.length || 0, 
       error: error?.message,
       firstItem: data?.[0]
@@ -300,19 +302,12 @@ export async function createScheduleException(exception: {
  */
 export async function getTherapists(): Promise<Array<{ id: string; name: string; email: string }>> {
   try {
-    const { data, error } = await supabase
-      .schema('cedro')
-      .from('users')
-      .select('id, name, email')
-      .in('role', ['therapist', 'admin'])
-      .order('name', { ascending: true })
-
-    if (error) {
-      console.error('Error fetching therapists:', error)
-      return []
-    }
-
-    return data || []
+    const therapists = await getReferenceTherapists()
+    return therapists.map(therapist => ({
+      id: therapist.id,
+      name: therapist.name,
+      email: therapist.email || ''
+    }))
   } catch (error) {
     console.error('Error in getTherapists:', error)
     return []
@@ -355,20 +350,10 @@ export async function getPatients(): Promise<Array<{ id: string; name: string; e
  */
 export async function getServices(): Promise<Array<{ id: string; name: string; duration_minutes: number }>> {
   try {
-    const { data, error } = await supabase
-      .schema('cedro')
-      .from('services')
-      .select('id, name, default_duration_min')
-      .eq('active', true)
-      .order('name', { ascending: true })
-
-    if (error) {
-      console.error('Error fetching services:', error)
-      return []
-    }
+    const services = await getReferenceServices()
 
     // Map default_duration_min to duration_minutes for interface compatibility
-    return (data || []).map(service => ({
+    return services.map(service => ({
       id: service.id,
       name: service.name,
       duration_minutes: service.default_duration_min
@@ -1,6 +1,10 @@
 'use client'
 
-import { createClient } from '@/lib/supabase'
+import { supabase } from '@/lib/supabase'
+import { getReferenceTherapists } from '@/lib/reference-data'
+import { calculateLeadScore } from '@/lib/lead-score'
+import { applyKeyset } from '@/lib/keyset'
+import { BOARD_PAGE_SIZE, LEAD_STAGES, type LeadMove } from '@/lib/crm-board'
 
 // Types
 export interface Lead {
@@ -28,6 +32,8 @@ export interface Lead {
   // Campos adicionais calculados (não estão na tabela)
   city_uf?: string
   is_christian?: boolean
+  /** Ordem no kanban (maior = topo), ver db/schema/crm_kanban.sql */
+  board_position?: number
 }
 
 export type LeadStage = 'lead' | 'mql' | 'sql' | 'won' | 'lost'
@@ -126,7 +132,6 @@ export async function getLeads(
   pagination: PaginationParams = { page: 1, limit: 50 }
 ): Promise<LeadListResponse> {
   try {
-    const supabase = createClient()
     const { page, limit } = pagination
     const offset = (page - 1) * limit
 
@@ -171,41 +176,7 @@ export async function getLeads(
       throw error
     }
 
-    const leads: Lead[] = (data || []).map((item: any) => {
-      // Calculate score dynamically based on lead data
-      const calculatedScore = calculateLeadScore({
-        source: item.source,
-        email: item.email,
-        phone: item.phone,
-        stage: item.stage,
-        is_christian: item.is_christian,
-        created_at: item.created_at
-      })
-
-      return {
-        id: item.id,
-        name: item.name,
-        email: item.email,
-        phone: item.phone,
-        source: item.source,
-        stage: item.stage,
-        score: calculatedScore,
-        // Campos existentes na tabela
-        notes: item.notes,
-        created_at: item.created_at,
-        updated_at: item.updated_at,
-        city_uf: item.city_uf,
-        is_christian: item.is_christian
-        
-        // ===== CAMPOS COMENTADOS (NÃO IMPLEMENTADOS) =====
-        // last_contact: item.last_contact,
-        // next_action: item.next_action,
-        // assigned_to: item.assigned_to,
-        // assigned_to_name: item.assigned_to_user?.name,
-        // converted_at: item.converted_at,
-        // converted_to_patient_id: item.converted_to_patient_id
-      }
-    })
+    const leads: Lead[] = (data || []).map(toLead)
 
     // Apply score filters after dynamic calculation
     let filteredLeads = leads
@@ -237,10 +208,98 @@ export async function getLeads(
   }
 }
 
+// Kanban: filtros aplicados no banco (busca e fonte)
+export interface LeadBoardFilters {
+  search?: string
+  source?: string
+}
+
+function applyBoardFilters(query: any, filters: LeadBoardFilters) {
+  if (filters.search) {
+    query = query.or(`name.ilike.%${filters.search}%,email.ilike.%${filters.search}%,phone.ilike.%${filters.search}%`)
+  }
+  if (filters.source) {
+    query = query.eq('source', filters.source)
+  }
+  return query
+}
+
+/**
+ * One page of a kanban column, after the last lead already loaded
+ * (keyset on board_position DESC, id DESC)
+ */
+export async function getLeadBoardPage(
+  stage: LeadStage,
+  filters: LeadBoardFilters = {},
+  after: Lead | null = null,
+  limit: number = BOARD_PAGE_SIZE
+): Promise<{ leads: Lead[]; hasMore: boolean }> {
+  const query = applyBoardFilters(
+    supabase.schema('cedro').from('crm_leads').select('*').eq('stage', stage),
+    filters
+  )
+
+  const cursor = after && after.board_position !== undefined
+    ? { value: after.board_position, id: after.id }
+    : null
+
+  // Uma linha a mais só para saber se há próxima página
+  const { data, error } = await applyKeyset(
+    query,
+    { column: 'board_position', idColumn: 'id', ascending: false },
+    cursor
+  ).limit(limit + 1)
+
+  if (error) {
+    console.error('Error fetching board leads:', error)
+    throw error
+  }
+
+  const rows = data || []
+  return {
+    leads: rows.slice(0, limit).map(toLead),
+    hasMore: rows.length > limit
+  }
+}
+
+/** Leads per stage counted by the database, with the board filters */
+export async function getLeadStageCounts(filters: LeadBoardFilters = {}): Promise<Record<LeadStage, number>> {
+  const { data, error } = await supabase
+    .schema('cedro')
+    .rpc('crm_lead_stage_counts', {
+      p_search: filters.search || null,
+      p_sources: filters.source ? [filters.source] : null
+    })
+
+  if (error) {
+    console.error('Error fetching lead stage counts:', error)
+    throw error
+  }
+
+  const rows = (data || []) as Array<{ stage: LeadStage; total: number }>
+  return LEAD_STAGES.reduce((counts, stage) => {
+    const row = rows.find((item) => item.stage === stage)
+    counts[stage] = row ? Number(row.total) : 0
+    return counts
+  }, {} as Record<LeadStage, number>)
+}
+
+/** Persists kanban stage/position changes in one call */
+export async function moveLeads(moves: LeadMove[]): Promise<void> {
+  if (moves.length === 0) return
+
+  const { error } = await supabase
+    .schema('cedro')
+    .rpc('move_crm_leads', { p_moves: moves })
+
+  if (error) {
+    console.error('Error moving leads:', error)
+    throw error
+  }
+}
+
 export async function getLeadById(id: string): Promise<LeadOverview | null> {
   try {
-    const supabase = createClient()
-
     // Get lead details
     const { data: leadData, error: leadError } = await supabase
       .schema('cedro')
@@ -335,8 +394,6 @@ export async function getLeadById(id: string): Promise<LeadOverview | null> {
 
 export async function createLead(data: CreateLeadData): Promise<Lead | null> {
   try {
-    const supabase = createClient()
-
     const leadData = {
       name: data.name,
       email: data.email,
@@ -406,8 +463,6 @@ export async function createLead(data: CreateLeadData): Promise<Lead | null> {
 
 export async function updateLead(id: string, data: UpdateLeadData): Promise<Lead | null> {
   try {
-    const supabase = createClient()
-
     // Get current lead for comparison
     const { data: currentLead } = await supabase
       .schema('cedro')
@@ -486,8 +541,6 @@ export async function updateLead(id: string, data: UpdateLeadData): Promise<Lead
 
 export async function deleteLead(id: string): Promise<boolean> {
   try {
-    const supabase = createClient()
-
     const { error } = await supabase
       .schema('cedro')
       .from('crm_leads')
@@ -554,8 +607,6 @@ export async function deleteLead(id: string): Promise<boolean> {
 
 export async function getLeadStats(): Promise<LeadStats> {
   try {
-    const supabase = createClient()
-
     // Get all leads for calculations
     const { data: leads } = await supabase
       .schema('cedro')
@@ -636,16 +687,8 @@ export async function getLeadStats(): Promise<LeadStats> {
 
 export async function getTherapistsForAssignment(): Promise<Array<{ id: string; name: string }>> {
   try {
-    const supabase = createClient()
-
-    const { data: therapists } = await supabase
-      .schema('cedro')
-      .from('users')
-      .select('id, name')
-      .in('role', ['therapist', 'admin'])
-      .eq('is_active', true)
-
-    return therapists || []
+    const therapists = await getReferenceTherapists({ activeOnly: true })
+    return therapists.map(({ id, name }) => ({ id, name }))
   } catch (error) {
     console.error('Error fetching therapists:', error)
     return []
@@ -654,8 +697,6 @@ export async function getTherapistsForAssignment(): Promise<Array<{ id: string;
 
 export async function getLeadSources(): Promise<string[]> {
   try {
-    const supabase = createClient()
-
     const { data: sources } = await supabase
       .schema('cedro')
       .from('crm_leads')
@@ -678,8 +719,6 @@ export async function getLeadSources(): Promise<string[]> {
 
 export async function getLeadSourcesData(): Promise<LeadSourceData[]> {
   try {
-    const supabase = createClient()
-
     const { data: leads } = await supabase
       .schema('cedro')
       .from('crm_leads')
@@ -713,70 +752,41 @@ export async function getLeadSourcesData(): Promise<LeadSourceData[]> {
 }
 
 // Utility functions
-function calculateLeadScore(data: {
-  source?: string
-  email?: string
-  phone?: string
-  stage?: string
-  is_christian?: boolean
-  created_at?: string
-}): number {
-  let score = 50 // Base score
-
-  // Source scoring
-  const sourceScores: Record<string, number> = {
-    'indicacao': 20,
-    'google': 15,
-    'instagram': 8,
-    'whatsapp': 12,
-  }
-
-  if (data.source) {
-    score += sourceScores[data.source.toLowerCase()] || 5
-  }
-
-  // Email domain scoring
-  if (data.email) {
-    const domain = data.email.split('@')[1]
-    if (domain && !['gmail.com', 'hotmail.com', 'yahoo.com'].includes(domain)) {
-      score += 10 // Corporate email
-    }
-  }
-
-  // Phone number scoring
-  if (data.phone) {
-    score += 10
-  }
-
-  // Stage scoring
-  const stageScores: Record<string, number> = {
-    'lead': 0,
-    'mql': 10,
-    'sql': 20,
-    'won': 30,
-    'lost': -20
-  }
-
-  if (data.stage) {
-    score += stageScores[data.stage] || 0
-  }
-
-  // Christian qualification scoring
-  if (data.is_christian === true) {
-    score += 15
-  }
+function toLead(item: any): Lead {
+  // Calculate score dynamically based on lead data
+  const calculatedScore = calculateLeadScore({
+    source: item.source,
+    email: item.email,
+    phone: item.phone,
+    stage: item.stage,
+    is_christian: item.is_christian,
+    created_at: item.created_at
+  })
 
-  // Time-based scoring (newer leads get slight boost)
-  if (data.created_at) {
-    const createdDate = new Date(data.created_at)
-    const daysSinceCreated = Math.floor((Date.now() - createdDate.getTime()) / (1000 * 60 * 60 * 24))
-    
-    if (daysSinceCreated <= 7) {
-      score += 5 // Recent lead bonus
-    }
+  return {
+    id: item.id,
+    name: item.name,
+    email: item.email,
+    phone: item.phone,
+    source: item.source,
+    stage: item.stage,
+    score: calculatedScore,
+    // Campos existentes na tabela
+    notes: item.notes,
+    created_at: item.created_at,
+    updated_at: item.updated_at,
+    city_uf: item.city_uf,
+    is_christian: item.is_christian,
+    board_position: item.board_position
+
+    // ===== CAMPOS COMENTADOS (NÃO IMPLEMENTADOS) =====
+    // last_contact: item.last_contact,
+    // next_action: item.next_action,
+    // assigned_to: item.assigned_to,
+    // assigned_to_name: item.assigned_to_user?.name,
+    // converted_at: item.converted_at,
+    // converted_to_patient_id: item.converted_to_patient_id
   }
-
-  return Math.min(100, Math.max(0, score))
 }
 
 function calculateInitialScore(data: CreateLeadData): number {
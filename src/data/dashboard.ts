@@ -1,5 +1,12 @@
+import type { SupabaseClient } from '@supabase/supabase-js'
 import { supabase } from '@/lib/supabase'
 
+// Também roda no servidor (dashboard renderizado no servidor, em UTC):
+// "hoje" e os horários são sempre os da clínica
+export const CLINIC_TIMEZONE = 'America/Sao_Paulo'
+// Sem horário de verão desde 2019
+const CLINIC_UTC_OFFSET = '-03:00'
+
 export interface DashboardStats {
   consultasHoje: number
   pacientesAtivos: number
@@ -29,124 +36,89 @@ export interface DashboardAlert {
   timestamp: string
 }
 
-export async function getDashboardStats(therapistId?: string): Promise<DashboardStats> {
-  try {
-    const today = new Date()
-    const startOfToday = new Date(today.getFullYear(), today.getMonth(), today.getDate())
-    const endOfToday = new Date(today.getFullYear(), today.getMonth(), today.getDate() + 1)
-
-    const yesterday = new Date(Date.now() - 24 * 60 * 60 * 1000)
-    const startOfYesterday = new Date(yesterday.getFullYear(), yesterday.getMonth(), yesterday.getDate())
-    const endOfYesterday = new Date(yesterday.getFullYear(), yesterday.getMonth(), yesterday.getDate() + 1)
-
-    const currentMonth = new Date().toISOString().slice(0, 7)
-    const lastMonth = new Date(Date.now() - 30 * 24 * 60 * 60 * 1000).toISOString().slice(0, 7)
-
-    // Consultas hoje
-    let consultasHojeQuery = supabase
-      .schema('cedro')
-      .from('appointments')
-      .select('*', { count: 'exact', head: true })
-      .gte('start_at', startOfToday.toISOString())
-      .lt('start_at', endOfToday.toISOString())
-
-    if (therapistId) {
-      consultasHojeQuery = consultasHojeQuery.eq('therapist_id', therapistId)
-    }
-
-    const { count: consultasHoje } = await consultasHojeQuery
+/** Start/end of the clinic's calendar day containing `date` */
+export function clinicDayBounds(date: Date): { date: string; start: Date; end: Date } {
+  // en-CA formata como YYYY-MM-DD
+  const day = new Intl.DateTimeFormat('en-CA', { timeZone: CLINIC_TIMEZONE }).format(date)
+  const start = new Date(`${day}T00:00:00${CLINIC_UTC_OFFSET}`)
+  return { date: day, start, end: new Date(start.getTime() + 24 * 60 * 60 * 1000) }
+}
 
-    // Consultas ontem
-    let consultasOntemQuery = supabase
-      .schema('cedro')
-      .from('appointments')
-      .select('*', { count: 'exact', head: true })
-      .gte('start_at', startOfYesterday.toISOString())
-      .lt('start_at', endOfYesterday.toISOString())
+function nextMonth(month: string): string {
+  const [year, value] = month.split('-').map(Number)
+  return value === 12 ? `${year + 1}-01` : `${year}-${String(value + 1).padStart(2, '0')}`
+}
 
-    if (therapistId) {
-      consultasOntemQuery = consultasOntemQuery.eq('therapist_id', therapistId)
-    }
+export async function getDashboardStats(
+  therapistId?: string,
+  client: SupabaseClient<any, any, any> = supabase
+): Promise<DashboardStats> {
+  try {
+    const today = clinicDayBounds(new Date())
+    const yesterday = clinicDayBounds(new Date(Date.now() - 24 * 60 * 60 * 1000))
 
-    const { count: consultasOntem } = await consultasOntemQuery
+    const currentMonth = today.date.slice(0, 7)
+    const lastMonth = clinicDayBounds(new Date(Date.now() - 30 * 24 * 60 * 60 * 1000)).date.slice(0, 7)
 
-    // Pacientes ativos (com consultas nos últimos 30 dias)
     const thirtyDaysAgo = new Date(Date.now() - 30 * 24 * 60 * 60 * 1000)
-    let pacientesAtivosQuery = supabase
-      .schema('cedro')
-      .from('appointments')
-      .select('patient_id')
-      .gte('start_at', thirtyDaysAgo.toISOString())
-
-    if (therapistId) {
-      pacientesAtivosQuery = pacientesAtivosQuery.eq('therapist_id', therapistId)
-    }
-
-    const { data: pacientesAtivos } = await pacientesAtivosQuery
-
-    const uniquePacientesAtivos = new Set(pacientesAtivos?.map(a => a.patient_id) || []).size
-
-    // Pacientes ativos mês passado
     const sixtyDaysAgo = new Date(Date.now() - 60 * 24 * 60 * 60 * 1000)
-    let pacientesAtivosMesPassadoQuery = supabase
-      .schema('cedro')
-      .from('appointments')
-      .select('patient_id')
-      .gte('start_at', sixtyDaysAgo.toISOString())
-      .lt('start_at', thirtyDaysAgo.toISOString())
-
-    if (therapistId) {
-      pacientesAtivosMesPassadoQuery = pacientesAtivosMesPassadoQuery.eq('therapist_id', therapistId)
-    }
-
-    const { data: pacientesAtivosMesPassado } = await pacientesAtivosMesPassadoQuery
 
-    const uniquePacientesAtivosMesPassado = new Set(pacientesAtivosMesPassado?.map(a => a.patient_id) || []).size
+    const forTherapist = <T extends { eq: (column: string, value: string) => T }>(query: T): T =>
+      therapistId ? query.eq('therapist_id', therapistId) : query
 
-    // Receita mensal (simulada - você pode implementar com dados reais de pagamentos)
-    let invoicesThisMonthQuery = supabase
+    const appointments = () => client.schema('cedro').from('appointments')
+    const paidInvoices = (month: string) => client
       .schema('cedro')
       .from('invoices')
       .select('amount_cents')
-      .gte('created_at', `${currentMonth}-01`)
-      .lt('created_at', `${currentMonth === '2025-12' ? '2026-01' : currentMonth.slice(0, 5) + String(parseInt(currentMonth.slice(5)) + 1).padStart(2, '0')}-01`)
+      .gte('created_at', `${month}-01`)
+      .lt('created_at', `${nextMonth(month)}-01`)
       .eq('status', 'paid')
 
-    if (therapistId) {
-      invoicesThisMonthQuery = invoicesThisMonthQuery.eq('therapist_id', therapistId)
-    }
-
-    const { data: invoicesThisMonth } = await invoicesThisMonthQuery
-
-    const receitaMensal = invoicesThisMonth?.reduce((sum, invoice) => sum + (invoice.amount_cents || 0), 0) || 0
-
-    let invoicesLastMonthQuery = supabase
-      .schema('cedro')
-      .from('invoices')
-      .select('amount_cents')
-      .gte('created_at', `${lastMonth}-01`)
-      .lt('created_at', `${lastMonth === '2025-12' ? '2026-01' : lastMonth.slice(0, 5) + String(parseInt(lastMonth.slice(5)) + 1).padStart(2, '0')}-01`)
-      .eq('status', 'paid')
-
-    if (therapistId) {
-      invoicesLastMonthQuery = invoicesLastMonthQuery.eq('therapist_id', therapistId)
-    }
-
-    const { data: invoicesLastMonth } = await invoicesLastMonthQuery
-
-    const receitaMesPassado = invoicesLastMonth?.reduce((sum, invoice) => sum + (invoice.amount_cents || 0), 0) || 0
-
-    // Taxa de ocupação (simulada - baseada em consultas vs slots disponíveis)
-    let totalSlotsQuery = supabase
-      .schema('cedro')
-      .from('therapist_schedules')
-      .select('*', { count: 'exact', head: true })
-
-    if (therapistId) {
-      totalSlotsQuery = totalSlotsQuery.eq('therapist_id', therapistId)
-    }
-
-    const { count: totalSlots } = await totalSlotsQuery
+    // Consultas independentes: todas em paralelo
+    const [
+      { count: consultasHoje },
+      { count: consultasOntem },
+      { data: pacientesAtivos },
+      { data: pacientesAtivosMesPassado },
+      { data: invoicesThisMonth },
+      { data: invoicesLastMonth },
+      { count: totalSlots }
+    ] = await Promise.all([
+      // Consultas hoje
+      forTherapist(appointments()
+        .select('*', { count: 'exact', head: true })
+        .gte('start_at', today.start.toISOString())
+        .lt('start_at', today.end.toISOString())),
+      // Consultas ontem
+      forTherapist(appointments()
+        .select('*', { count: 'exact', head: true })
+        .gte('start_at', yesterday.start.toISOString())
+        .lt('start_at', yesterday.end.toISOString())),
+      // Pacientes ativos (com consultas nos últimos 30 dias)
+      forTherapist(appointments()
+        .select('patient_id')
+        .gte('start_at', thirtyDaysAgo.toISOString())),
+      // Pacientes ativos mês passado
+      forTherapist(appointments()
+        .select('patient_id')
+        .gte('start_at', sixtyDaysAgo.toISOString())
+        .lt('start_at', thirtyDaysAgo.toISOString())),
+      // Receita mensal
+      forTherapist(paidInvoices(currentMonth)),
+      forTherapist(paidInvoices(lastMonth)),
+      // Taxa de ocupação (simulada - baseada em consultas vs slots disponíveis)
+      forTherapist(client
+        .schema('cedro')
+        .from('therapist_schedules')
+        .select('*', { count: 'exact', head: true }))
+    ])
+
+    const uniquePacientesAtivos = new Set(pacientesAtivos?.map((a: any) => a.patient_id) || []).size
+    const uniquePacientesAtivosMesPassado = new Set(pacientesAtivosMesPassado?.map((a: any) => a.patient_id) || []).size
+
+    const receitaMensal = invoicesThisMonth?.reduce((sum: number, invoice: any) => sum + (invoice.amount_cents || 0), 0) || 0
+    const receitaMesPassado = invoicesLastMonth?.reduce((sum: number, invoice: any) => sum + (invoice.amount_cents || 0), 0) || 0
 
     const taxaOcupacao = totalSlots ? Math.round((consultasHoje || 0) / (totalSlots / 7) * 100) : 0
 
@@ -180,14 +152,15 @@ export async function getDashboardStats(therapistId?: string): Promise<Dashboard
   }
 }
 
-export async function getProximasConsultas(therapistId?: string): Promise<ProximaConsulta[]> {
+export async function getProximasConsultas(
+  therapistId?: string,
+  client: SupabaseClient<any, any, any> = supabase
+): Promise<ProximaConsulta[]> {
   try {
-    const today = new Date()
-    const startOfToday = new Date(today.getFullYear(), today.getMonth(), today.getDate())
-    const endOfToday = new Date(today.getFullYear(), today.getMonth(), today.getDate() + 1)
+    const { start: startOfToday, end: endOfToday } = clinicDayBounds(new Date())
     const now = new Date()
 
-    let appointmentsQuery = supabase
+    let appointmentsQuery = client
       .schema('cedro')
       .from('appointments')
       .select(`
@@ -214,7 +187,7 @@ export async function getProximasConsultas(therapistId?: string): Promise<Proxim
 
     if (error) throw error
 
-    return appointments?.map(appointment => {
+    return appointments?.map((appointment: any) => {
       let status: 'confirmado' | 'pendente' | 'atrasado' = 'confirmado'
       
       const appointmentStart = new Date(appointment.start_at)
@@ -227,7 +200,7 @@ export async function getProximasConsultas(therapistId?: string): Promise<Proxim
 
       return {
         id: appointment.id,
-        time: appointmentStart.toLocaleTimeString('pt-BR', { hour: '2-digit', minute: '2-digit' }),
+        time: appointmentStart.toLocaleTimeString('pt-BR', { hour: '2-digit', minute: '2-digit', timeZone: CLINIC_TIMEZONE }),
         patient: (appointment.patients as any)?.full_name || 'Paciente não encontrado',
         type: 'Consulta',
         status,
@@ -241,16 +214,17 @@ export async function getProximasConsultas(therapistId?: string): Promise<Proxim
   }
 }
 
-export async function getDashboardAlerts(therapistId?: string): Promise<DashboardAlert[]> {
+export async function getDashboardAlerts(
+  therapistId?: string,
+  client: SupabaseClient<any, any, any> = supabase
+): Promise<DashboardAlert[]> {
   try {
     const alerts: DashboardAlert[] = []
     const now = new Date()
-    const today = new Date()
-    const startOfToday = new Date(today.getFullYear(), today.getMonth(), today.getDate())
-    const endOfToday = new Date(today.getFullYear(), today.getMonth(), today.getDate() + 1)
+    const { start: startOfToday, end: endOfToday } = clinicDayBounds(now)
 
     // Verificar consultas em atraso
-    let lateAppointmentsQuery = supabase
+    let lateAppointmentsQuery = client
       .schema('cedro')
       .from('appointments')
       .select('id')
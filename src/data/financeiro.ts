@@ -1,4 +1,5 @@
 import { supabase } from '@/lib/supabase'
+import { getReferenceTherapists } from '@/lib/reference-data'
 
 export type InvoiceStatus = 'draft' | 'open' | 'paid' | 'partial' | 'overdue' | 'cancelled' | 'todos'
 
@@ -211,20 +212,13 @@ export async function getInvoiceDetails(invoiceId: string): Promise<{
  * Busca lista de terapeutas para filtro
  */
 export async function getTherapistsForFilter(): Promise<Array<{ id: string; name: string }>> {
-  const { data, error } = await supabase
-    .schema('cedro')
-    .from('users')
-    .select('id, name')
-    .in('role', ['therapist', 'admin'])
-    .eq('is_active', true)
-    .order('name')
-
-  if (error) {
+  try {
+    const therapists = await getReferenceTherapists({ activeOnly: true })
+    return therapists.map(({ id, name }) => ({ id, name }))
+  } catch (error) {
     console.error('Erro ao buscar terapeutas:', error)
     return []
   }
-
-  return data || []
 }
 
 /**
@@ -1,4 +1,5 @@
 import { supabase } from '@/lib/supabase'
+import { getReferenceTherapists } from '@/lib/reference-data'
 
 // Recording Jobs Types
 export type RecordingJobStatus = 'uploaded' | 'processing' | 'completed' | 'failed' | 'completed_with_errors'
@@ -39,11 +40,18 @@ export type PendingRecord = {
   tipo_consulta?: 'anamnese' | 'evolucao'
   note_type?: MedicalRecordType
   title?: string
-  content?: string
 }
 
+export type RecordsPage = {
+  records: PendingRecord[]
+  nextCursor: string | null
+}
+
+export const RECORDS_PAGE_SIZE = 50
+
 /**
  * Get pending recording jobs (uploaded, processing)
+ * Only the columns the list needs: transcripts and generated records stay in the database
  */
 export async function getPendingRecordingJobs(therapistId?: string): Promise<RecordingJob[]> {
   try {
@@ -51,7 +59,13 @@ export async function getPendingRecordingJobs(therapistId?: string): Promise<Rec
       .schema('cedro')
       .from('recording_jobs')
       .select(`
-        *,
+        id,
+        patient_id,
+        therapist_id,
+        appointment_id,
+        tipo_consulta,
+        status,
+        created_at,
         patients!inner(full_name),
         users!recording_jobs_therapist_id_fkey(name)
       `)
@@ -73,7 +87,7 @@ export async function getPendingRecordingJobs(therapistId?: string): Promise<Rec
       ...job,
       patient_name: (job as any).patients?.full_name,
       therapist_name: (job as any).users?.name
-    })) || []
+    })) as RecordingJob[] || []
   } catch (error) {
     console.error('Error in getPendingRecordingJobs:', error)
     throw error
@@ -81,20 +95,24 @@ export async function getPendingRecordingJobs(therapistId?: string): Promise<Rec
 }
 
 /**
- * Get all records (medical records + pending recording jobs) combined
+ * Get one page of the Prontuários list (medical records + pending recording jobs)
+ * Pending jobs are only included on the first page; medical records are keyset-paginated
  */
-export async function getAllRecords(therapistId?: string): Promise<PendingRecord[]> {
+export async function getRecordsPage(
+  therapistId?: string,
+  cursor?: string | null,
+  limit: number = RECORDS_PAGE_SIZE
+): Promise<RecordsPage> {
   try {
     const [medicalRecords, pendingJobs] = await Promise.all([
-      getMedicalRecords(therapistId),
-      getPendingRecordingJobs(therapistId)
+      getMedicalRecordsPage({ therapistId, cursor, limit }),
+      cursor ? Promise.resolve([]) : getPendingRecordingJobs(therapistId)
     ])
 
     const combinedRecords: PendingRecord[] = []
 
     // Add completed medical records
-    medicalRecords.forEach(record => {
-      const recordWithLegacyFields = addLegacyFields(record)
+    medicalRecords.items.forEach(record => {
       combinedRecords.push({
         id: record.id,
         type: 'medical_record',
@@ -106,8 +124,7 @@ export async function getAllRecords(therapistId?: string): Promise<PendingRecord
         created_at: record.created_at,
         appointment_id: record.appointment_id,
         note_type: record.note_type,
-        title: recordWithLegacyFields.title,
-        content: recordWithLegacyFields.content
+        title: record.title
       })
     })
 
@@ -130,9 +147,9 @@ export async function getAllRecords(therapistId?: string): Promise<PendingRecord
     // Sort by creation date (newest first)
     combinedRecords.sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime())
 
-    return combinedRecords
+    return { records: combinedRecords, nextCursor: medicalRecords.nextCursor }
   } catch (error) {
-    console.error('Error in getAllRecords:', error)
+    console.error('Error in getRecordsPage:', error)
     throw error
   }
 }
@@ -626,22 +643,8 @@ export async function deletePatient(id: string): Promise<boolean> {
  */
 export async function getTherapistsForFilter(): Promise<Array<{ id: string; name: string }>> {
   try {
-    const { data, error } = await supabase
-      .schema('cedro')
-      .from('users')
-      .select('id, name')
-      .in('role', ['therapist', 'admin'])
-      .order('name', { ascending: true })
-
-    if (error) {
-      console.error('Error fetching therapists:', error)
-      return []
-    }
-
-    return (data || []).map((therapist: any) => ({
-      id: therapist.id,
-      name: therapist.name
-    }))
+    const therapists = await getReferenceTherapists()
+    return therapists.map(({ id, name }) => ({ id, name }))
   } catch (error) {
     console.error('Error in getTherapistsForFilter:', error)
     return []
@@ -821,21 +824,73 @@ export async function getMedicalRecord(id: string): Promise<MedicalRecordWithLeg
   }
 }
 
-export async function getMedicalRecords(patientId?: string, therapistId?: string): Promise<MedicalRecordWithLegacyFields[]> {
+// Slim projection for lists: no content_json (notes, transcripts), only the title
+export type MedicalRecordListItem = {
+  id: string
+  patient_id: string
+  appointment_id: string | null
+  note_type: MedicalRecordType
+  visibility: MedicalRecordVisibility
+  created_at: string
+  updated_at: string
+  title: string
+  patient_name?: string
+  therapist_name?: string
+  therapist_id?: string
+  appointment_date?: string
+}
+
+export type MedicalRecordListPage = {
+  items: MedicalRecordListItem[]
+  nextCursor: string | null
+}
+
+// Cursor = "<created_at>|<id>" of the last row of the previous page
+function encodeRecordCursor(record: { created_at: string; id: string }): string {
+  return `${record.created_at}|${record.id}`
+}
+
+function decodeRecordCursor(cursor: string): { createdAt: string; id: string } | null {
+  const separator = cursor.lastIndexOf('|')
+  if (separator <= 0) return null
+  return { createdAt: cursor.slice(0, separator), id: cursor.slice(separator + 1) }
+}
+
+export async function getMedicalRecordsPage(options: {
+  patientId?: string
+  therapistId?: string
+  cursor?: string | null
+  limit?: number
+} = {}): Promise<MedicalRecordListPage> {
+  const { patientId, therapistId, cursor, limit = RECORDS_PAGE_SIZE } = options
+
+  // Com therapistId o embed precisa ser !inner: num embed comum o filtro só
+  // anula appointments e todos os prontuários continuam na resposta
+  const appointmentsEmbed = therapistId ? 'appointments!inner' : 'appointments'
+
   try {
     let query = supabase
       .schema('cedro')
       .from('medical_records')
       .select(`
-        *,
+        id,
+        patient_id,
+        appointment_id,
+        note_type,
+        visibility,
+        created_at,
+        updated_at,
+        title:content_json->>title,
         patients!inner(full_name),
-        appointments(
+        ${appointmentsEmbed}(
           start_at,
           therapist_id,
           users!appointments_therapist_id_fkey(name)
         )
       `)
       .order('created_at', { ascending: false })
+      .order('id', { ascending: false })
+      .limit(limit + 1)
 
     if (patientId) {
       query = query.eq('patient_id', patientId)
@@ -845,29 +900,95 @@ export async function getMedicalRecords(patientId?: string, therapistId?: string
       query = query.eq('appointments.therapist_id', therapistId)
     }
 
+    const after = cursor ? decodeRecordCursor(cursor) : null
+    if (after) {
+      query = query.or(
+        `created_at.lt."${after.createdAt}",and(created_at.eq."${after.createdAt}",id.lt.${after.id})`
+      )
+    }
+
     const { data: records, error } = await query
 
     if (error) {
-      console.error('Error fetching medical records:', error)
+      console.error('Error fetching medical records page:', error)
       throw new Error('Erro ao buscar registros médicos')
     }
 
-    return records?.map(record => {
-      const baseRecord = {
-        ...record,
-        patient_name: (record as any).patients?.full_name,
-        therapist_name: (record as any).appointments?.users?.name,
-        therapist_id: (record as any).appointments?.therapist_id,
-        appointment_date: (record as any).appointments?.start_at
+    const rows = records || []
+    const hasMore = rows.length > limit
+    const pageRows = hasMore ? rows.slice(0, limit) : rows
+
+    const items: MedicalRecordListItem[] = pageRows.map(record => {
+      const row = record as any
+      return {
+        id: row.id,
+        patient_id: row.patient_id,
+        appointment_id: row.appointment_id,
+        note_type: row.note_type,
+        visibility: row.visibility,
+        created_at: row.created_at,
+        updated_at: row.updated_at,
+        title: row.title || `${getMedicalRecordTypeLabel(row.note_type)} - ${new Date(row.created_at).toLocaleDateString('pt-BR')}`,
+        patient_name: row.patients?.full_name,
+        therapist_name: row.appointments?.users?.name,
+        therapist_id: row.appointments?.therapist_id,
+        appointment_date: row.appointments?.start_at
       }
-      return addLegacyFields(baseRecord)
-    }) || []
+    })
+
+    return {
+      items,
+      nextCursor: hasMore ? encodeRecordCursor(pageRows[pageRows.length - 1] as any) : null
+    }
   } catch (error) {
-    console.error('Error in getMedicalRecords:', error)
+    console.error('Error in getMedicalRecordsPage:', error)
     throw error
   }
 }
 
+export type MedicalRecordSearchResult = {
+  id: string
+  patient_id: string
+  patient_name: string | null
+  appointment_id: string | null
+  note_type: MedicalRecordType
+  title: string
+  created_at: string
+  rank: number
+  // Trecho com os termos entre <mark></mark>; o restante do texto vem escapado
+  snippet: string
+}
+
+export type MedicalRecordSearchResponse = {
+  results: MedicalRecordSearchResult[]
+  nextOffset: number | null
+}
+
+/**
+ * Full-text search over titles, notes and transcriptions (ranked, with snippets)
+ * Scoped server-side to the signed-in therapist's patients
+ */
+export async function searchMedicalRecords(
+  query: string,
+  options: { limit?: number; offset?: number; therapistId?: string; signal?: AbortSignal } = {}
+): Promise<MedicalRecordSearchResponse> {
+  const params = new URLSearchParams({ q: query })
+  if (options.limit) params.set('limit', String(options.limit))
+  if (options.offset) params.set('offset', String(options.offset))
+  if (options.therapistId) params.set('therapist_id', options.therapistId)
+
+  const response = await fetch(`/api/medical-records/search?${params.toString()}`, {
+    signal: options.signal
+  })
+
+  if (!response.ok) {
+    const body = await response.json().catch(() => ({}))
+    throw new Error(body.error || 'Erro ao buscar prontuários')
+  }
+
+  return response.json()
+}
+
 export async function updateMedicalRecord(id: string, updates: {
   note_type?: MedicalRecordType
   content_json?: any
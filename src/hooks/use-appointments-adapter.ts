@@ -4,7 +4,19 @@
  * Provides backward-compatible hooks while using new API layer
  */
 
+import { useEffect } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
+import {
+  format,
+  startOfWeek,
+  endOfWeek,
+  startOfMonth,
+  endOfMonth,
+  addDays,
+  addWeeks,
+  addMonths
+} from 'date-fns'
+import { ptBR } from 'date-fns/locale'
 import {
   getAppointmentsWithDetails,
   getTherapistsList,
@@ -64,6 +76,83 @@ export function useAppointments(
   })
 }
 
+// ============ AGENDA RANGE / PREFETCH ============
+
+export type AgendaViewMode = 'day' | 'week' | 'month'
+
+/**
+ * Date range (yyyy-MM-dd) shown by the agenda for a view mode and date.
+ * Shared by the page and the prefetcher so both hit the same query keys.
+ */
+export function getAgendaDateRange(viewMode: AgendaViewMode, date: Date) {
+  switch (viewMode) {
+    case 'day':
+      return {
+        startDate: format(date, 'yyyy-MM-dd'),
+        endDate: format(date, 'yyyy-MM-dd')
+      }
+    case 'week':
+      return {
+        startDate: format(startOfWeek(date, { locale: ptBR }), 'yyyy-MM-dd'),
+        endDate: format(endOfWeek(date, { locale: ptBR }), 'yyyy-MM-dd')
+      }
+    case 'month':
+      return {
+        startDate: format(startOfMonth(date), 'yyyy-MM-dd'),
+        endDate: format(endOfMonth(date), 'yyyy-MM-dd')
+      }
+  }
+}
+
+/**
+ * Moves the agenda date one period forward (1) or back (-1)
+ */
+export function shiftAgendaDate(viewMode: AgendaViewMode, date: Date, direction: 1 | -1) {
+  switch (viewMode) {
+    case 'day':
+      return addDays(date, direction)
+    case 'week':
+      return addWeeks(date, direction)
+    case 'month':
+      return addMonths(date, direction)
+  }
+}
+
+/**
+ * Prefetches the previous and next period in the background so prev/next
+ * navigation renders straight from cache
+ */
+export function usePrefetchAdjacentAppointments(
+  viewMode: AgendaViewMode,
+  currentDate: Date,
+  therapistId?: string
+) {
+  const queryClient = useQueryClient()
+  const currentTime = currentDate.getTime()
+
+  useEffect(() => {
+    // Espera a navegação assentar para não competir com a query visível
+    const timer = setTimeout(() => {
+      ;([-1, 1] as const).forEach((direction) => {
+        const { startDate, endDate } = getAgendaDateRange(
+          viewMode,
+          shiftAgendaDate(viewMode, new Date(currentTime), direction)
+        )
+        const start = new Date(startDate)
+        const end = new Date(endDate)
+
+        queryClient.prefetchQuery({
+          queryKey: APPOINTMENTS_QUERY_KEYS.list(start, end, therapistId),
+          queryFn: () => getAppointmentsWithDetails(start, end, therapistId),
+          staleTime: 1 * 60 * 1000
+        })
+      })
+    }, 300)
+
+    return () => clearTimeout(timer)
+  }, [queryClient, viewMode, currentTime, therapistId])
+}
+
 /**
  * Hook to fetch therapists
  */
@@ -310,8 +310,11 @@ export function useUpdateAppointmentStatus() {
       status: Appointment['status']
     }) => updateAppointmentStatus(appointmentId, status),
     ...getMutationOptions<Appointment, Error>({
-      onSuccess: () => {
+      onSuccess: (_data, { status }) => {
         queryClient.invalidateQueries({ queryKey: queryKeys.appointments.all })
+        if (status === 'completed') {
+          queryClient.invalidateQueries({ queryKey: queryKeys.carePlans.all })
+        }
         toast({
           title: 'Sucesso',
           description: 'Status atualizado'
@@ -344,8 +347,12 @@ export function useBulkUpdateAppointmentStatus() {
       status: Appointment['status']
     }) => bulkUpdateAppointmentStatus(appointmentIds, status),
     ...getMutationOptions<void, Error>({
-      onSuccess: () => {
+      onSuccess: (_data, { status }) => {
         queryClient.invalidateQueries({ queryKey: queryKeys.appointments.all })
+        if (status === 'completed') {
+          // Conclusão desconta sessões dos planos de cuidado
+          queryClient.invalidateQueries({ queryKey: queryKeys.carePlans.all })
+        }
         toast({
           title: 'Sucesso',
           description: 'Agendamentos atualizados'
@@ -0,0 +1,201 @@
+'use client'
+
+import { useState, useEffect, useCallback, useRef } from 'react'
+import { NETWORK_CONFIG } from '@/lib/network-config'
+import {
+  activateCloser as activateCloserRequest,
+  createOptimisticMessage,
+  fetchConversations,
+  fetchMessages,
+  mergeMessages,
+  sendMessage,
+  subscribeToInbox,
+  updateLocalMessage,
+  upsertConversation,
+  type Conversation,
+  type Message
+} from '@/lib/conversations'
+
+/** Messages fetched per poll when the stream is unavailable */
+const POLL_PAGE_SIZE = 20
+
+/**
+ * State of the Conversas inbox: conversation list, the selected thread
+ * (newest page first, older pages on demand), live updates from the SSE
+ * stream (or polling as fallback) and optimistic sending.
+ */
+export function useConversationInbox() {
+  const [conversations, setConversations] = useState<Conversation[]>([])
+  const [loading, setLoading] = useState(true)
+  const [selected, setSelected] = useState<Conversation | null>(null)
+  const [messages, setMessages] = useState<Message[]>([])
+  const [messagesLoading, setMessagesLoading] = useState(false)
+  const [hasOlder, setHasOlder] = useState(false)
+  const [loadingOlder, setLoadingOlder] = useState(false)
+  const [polling, setPolling] = useState(false)
+
+  const selectedIdRef = useRef<string | null>(null)
+  const messagesRef = useRef<Message[]>([])
+  const loadingOlderRef = useRef(false)
+  messagesRef.current = messages
+
+  const loadConversations = useCallback(async () => {
+    try {
+      const data = await fetchConversations()
+      setConversations(data)
+      // Selecionar primeira conversa automaticamente
+      setSelected((current) => current || data[0] || null)
+    } catch (error) {
+      console.error('Erro ao carregar conversas:', error)
+    } finally {
+      setLoading(false)
+    }
+  }, [])
+
+  useEffect(() => {
+    loadConversations()
+  }, [loadConversations])
+
+  // Página mais recente da conversa selecionada
+  useEffect(() => {
+    const conversationId = selected?.id || null
+    selectedIdRef.current = conversationId
+    setMessages([])
+    setHasOlder(false)
+    if (!conversationId) return
+
+    setMessagesLoading(true)
+    fetchMessages(conversationId)
+      .then((page) => {
+        if (selectedIdRef.current !== conversationId) return
+        setMessages(page.messages)
+        setHasOlder(page.hasMore)
+      })
+      .catch((error) => console.error('Erro ao carregar mensagens:', error))
+      .finally(() => {
+        if (selectedIdRef.current === conversationId) setMessagesLoading(false)
+      })
+  }, [selected?.id])
+
+  const loadOlder = useCallback(async () => {
+    const conversationId = selectedIdRef.current
+    const oldest = messagesRef.current.find((message) => !message.pending && !message.failed)
+    if (!conversationId || !oldest || !hasOlder || loadingOlderRef.current) return
+
+    loadingOlderRef.current = true
+    setLoadingOlder(true)
+    try {
+      const page = await fetchMessages(conversationId, oldest)
+      if (selectedIdRef.current !== conversationId) return
+
+      const before = messagesRef.current.length
+      const merged = mergeMessages(messagesRef.current, page.messages)
+      setMessages(merged)
+      // Sem linhas novas (serviço sem cursor): não há mais o que carregar
+      setHasOlder(page.hasMore && merged.length > before)
+    } catch (error) {
+      console.error('Erro ao carregar mensagens anteriores:', error)
+    } finally {
+      loadingOlderRef.current = false
+      setLoadingOlder(false)
+    }
+  }, [hasOlder])
+
+  const touchConversation = useCallback((conversationId: string, message: Message) => {
+    setConversations((current) => {
+      const conversation = current.find((item) => item.id === conversationId)
+      if (!conversation) return current
+      return upsertConversation(current, {
+        ...conversation,
+        last_message: message.body_text,
+        last_message_at: message.sent_at || message.created_at
+      })
+    })
+  }, [])
+
+  // Novas mensagens e atualizações de conversas em tempo real
+  useEffect(() => {
+    return subscribeToInbox({
+      onMessage: (conversationId, message) => {
+        if (conversationId === selectedIdRef.current) {
+          setMessages((current) => mergeMessages(current, [message]))
+        }
+        touchConversation(conversationId, message)
+      },
+      onConversation: (conversation) => {
+        setConversations((current) => upsertConversation(current, conversation))
+      },
+      onUnavailable: () => setPolling(true)
+    })
+  }, [touchConversation])
+
+  // Fallback sem stream: busca só a página mais recente e mescla
+  useEffect(() => {
+    if (!polling) return
+    const interval = setInterval(async () => {
+      try {
+        setConversations(await fetchConversations())
+        const conversationId = selectedIdRef.current
+        if (!conversationId) return
+        const page = await fetchMessages(conversationId, null, POLL_PAGE_SIZE)
+        if (selectedIdRef.current === conversationId) {
+          setMessages((current) => mergeMessages(current, page.messages))
+        }
+      } catch (error) {
+        console.error('Erro ao atualizar conversas:', error)
+      }
+    }, NETWORK_CONFIG.POLLING_INTERVAL)
+    return () => clearInterval(interval)
+  }, [polling])
+
+  /** Appends the message immediately and reconciles it with the server's copy */
+  const send = useCallback(async (text: string) => {
+    const conversation = selected
+    if (!conversation || !text.trim()) return
+
+    const optimistic = createOptimisticMessage(conversation, text)
+    setMessages((current) => current.concat(optimistic))
+    touchConversation(conversation.id, optimistic)
+
+    try {
+      const stored = await sendMessage(conversation.id, text, optimistic.client_id!)
+      if (selectedIdRef.current !== conversation.id) return
+      setMessages((current) =>
+        stored ? mergeMessages(current, [stored]) : updateLocalMessage(current, optimistic.id, { pending: false })
+      )
+    } catch (error) {
+      console.error('Erro ao enviar mensagem:', error)
+      setMessages((current) => updateLocalMessage(current, optimistic.id, { pending: false, failed: true }))
+      throw error
+    }
+  }, [selected, touchConversation])
+
+  /** Resends a message that failed */
+  const retry = useCallback((message: Message) => {
+    setMessages((current) => current.filter((item) => item.id !== message.id))
+    return send(message.body_text)
+  }, [send])
+
+  const activateCloser = useCallback(async () => {
+    if (!selected) return
+    await activateCloserRequest(selected.id)
+    setConversations((current) => current.map((conversation) =>
+      conversation.id === selected.id ? { ...conversation, closer_active: true } : conversation
+    ))
+  }, [selected])
+
+  return {
+    conversations,
+    loading,
+    selected,
+    select: setSelected,
+    messages,
+    messagesLoading,
+    hasOlder,
+    loadingOlder,
+    loadOlder,
+    send,
+    retry,
+    activateCloser
+  }
+}
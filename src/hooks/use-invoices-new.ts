@@ -30,6 +30,7 @@ import {
   generateInvoiceContract
 } from '@/lib/api/invoices'
 import { queryKeys, QUERY_OPTIONS_LIST, QUERY_OPTIONS_DETAIL, getMutationOptions } from '@/lib/api/react-query-patterns'
+import { runMonthlyBilling, type BillingRunParams, type BillingRunResult } from '@/lib/billing'
 import type { Invoice } from '@/lib/api/types'
 
 // ============ QUERIES ============
@@ -205,6 +206,36 @@ export function useCreateInvoice() {
   })
 }
 
+/**
+ * Hook to run (or preview, with dryRun) the monthly billing of a period
+ */
+export function useRunMonthlyBilling() {
+  const queryClient = useQueryClient()
+  const { toast } = useToast()
+
+  return useMutation({
+    mutationFn: (params: BillingRunParams) => runMonthlyBilling(params),
+    ...getMutationOptions<BillingRunResult, Error>({
+      onSuccess: (result: BillingRunResult) => {
+        if (result.dry_run) return
+        queryClient.invalidateQueries({ queryKey: queryKeys.invoices.all })
+        queryClient.invalidateQueries({ queryKey: ['financial-summary'] })
+        toast({
+          title: 'Sucesso',
+          description: `${result.invoices_created} fatura(s) gerada(s)`
+        })
+      },
+      onError: (error: any) => {
+        toast({
+          title: 'Erro',
+          description: error.message || 'Erro ao gerar faturamento',
+          variant: 'destructive'
+        })
+      }
+    })
+  })
+}
+
 /**
  * Hook to update invoice
  */
@@ -0,0 +1,154 @@
+'use client'
+
+import { useState, useEffect, useCallback, useRef } from 'react'
+import { toast } from 'sonner'
+import {
+  getLeadBoardPage,
+  getLeadStageCounts,
+  moveLeads,
+  type LeadBoardFilters,
+  type LeadStage
+} from '@/data/crm'
+import {
+  LEAD_STAGES,
+  LeadMoveQueue,
+  emptyBoard,
+  moveLeadInBoard,
+  type BoardState
+} from '@/lib/crm-board'
+
+/**
+ * State of the CRM kanban: first page of every column plus the stage totals
+ * (loaded in parallel), further pages per column on demand and optimistic
+ * drags persisted in debounced batches.
+ */
+export function useKanbanBoard(filters: LeadBoardFilters, refreshKey: number = 0) {
+  const [board, setBoard] = useState<BoardState>(emptyBoard)
+  const [loading, setLoading] = useState(true)
+
+  const boardRef = useRef(board)
+  const generationRef = useRef(0)
+  boardRef.current = board
+
+  const { search, source } = filters
+
+  // Falha ao gravar um lote: recarrega para voltar ao estado do banco
+  const reloadRef = useRef<() => void>(() => {})
+  const queueRef = useRef<LeadMoveQueue | null>(null)
+  if (!queueRef.current) {
+    queueRef.current = new LeadMoveQueue(moveLeads, (moves, error) => {
+      console.error('Error moving leads:', moves, error)
+      toast.error('Erro ao atualizar estágio dos leads')
+      reloadRef.current()
+    })
+  }
+
+  const reload = useCallback(async () => {
+    const generation = ++generationRef.current
+    const current = { search, source }
+    setLoading(true)
+    try {
+      // Movimentos pendentes vão antes, senão a recarga traria a etapa antiga
+      await queueRef.current!.flush()
+      const [counts, pages] = await Promise.all([
+        getLeadStageCounts(current),
+        Promise.all(LEAD_STAGES.map((stage) => getLeadBoardPage(stage, current)))
+      ])
+      // Filtros mudaram durante a carga: resultado descartado
+      if (generation !== generationRef.current) return
+
+      const next = emptyBoard()
+      LEAD_STAGES.forEach((stage, index) => {
+        next[stage] = {
+          leads: pages[index].leads,
+          total: counts[stage],
+          hasMore: pages[index].hasMore,
+          loading: false
+        }
+      })
+      boardRef.current = next
+      setBoard(next)
+    } catch (error) {
+      console.error('Error loading kanban board:', error)
+      toast.error('Erro ao carregar o quadro de leads')
+    } finally {
+      if (generation === generationRef.current) setLoading(false)
+    }
+  }, [search, source])
+  reloadRef.current = reload
+
+  useEffect(() => {
+    reload()
+  }, [reload, refreshKey])
+
+  const loadMore = useCallback(async (stage: LeadStage) => {
+    const column = boardRef.current[stage]
+    if (column.loading || !column.hasMore || column.leads.length === 0) return
+
+    const generation = generationRef.current
+    const setColumnLoading = (value: boolean) =>
+      setBoard((prev) => ({ ...prev, [stage]: { ...prev[stage], loading: value } }))
+
+    boardRef.current = { ...boardRef.current, [stage]: { ...column, loading: true } }
+    setColumnLoading(true)
+    try {
+      const page = await getLeadBoardPage(stage, { search, source }, column.leads[column.leads.length - 1])
+      if (generation !== generationRef.current) return
+
+      setBoard((prev) => {
+        // Ignora leads que já estão no quadro (ex.: movidos antes do envio)
+        const loaded = new Set<string>()
+        LEAD_STAGES.forEach((item) => prev[item].leads.forEach((lead) => loaded.add(lead.id)))
+        const next = {
+          ...prev,
+          [stage]: {
+            ...prev[stage],
+            leads: prev[stage].leads.concat(page.leads.filter((lead) => !loaded.has(lead.id))),
+            hasMore: page.hasMore,
+            loading: false
+          }
+        }
+        boardRef.current = next
+        return next
+      })
+    } catch (error) {
+      console.error('Error loading more leads:', error)
+      toast.error('Erro ao carregar mais leads')
+      setColumnLoading(false)
+    }
+  }, [search, source])
+
+  /** Moves a lead to `toStage` at `index`; persisted with the next batch */
+  const moveLead = useCallback((leadId: string, toStage: LeadStage, index: number) => {
+    const result = moveLeadInBoard(boardRef.current, leadId, toStage, index)
+    if (!result) return
+    boardRef.current = result.board
+    setBoard(result.board)
+    queueRef.current!.enqueue(result.move)
+  }, [])
+
+  // Envia movimentos pendentes ao sair da página ou desmontar
+  useEffect(() => {
+    const queue = queueRef.current!
+    const flush = () => {
+      queue.flush()
+    }
+    window.addEventListener('pagehide', flush)
+    return () => {
+      window.removeEventListener('pagehide', flush)
+      flush()
+    }
+  }, [])
+
+  /** Sends pending moves now (e.g. before reloading other views) */
+  const flushMoves = useCallback(() => queueRef.current!.flush(), [])
+
+  return {
+    board,
+    loading,
+    loadMore,
+    moveLead,
+    flushMoves,
+    reload
+  }
+}
@@ -0,0 +1,16 @@
+import { useState, useEffect } from 'react'
+
+/**
+ * True from the first time `open` becomes true. Lets a page render a lazy
+ * modal only after it is first opened (so its chunk is fetched on demand)
+ * and keep it mounted afterwards, preserving the close animation.
+ */
+export function useLazyMount(open: boolean): boolean {
+  const [mounted, setMounted] = useState(open)
+
+  useEffect(() => {
+    if (open) setMounted(true)
+  }, [open])
+
+  return mounted || open
+}
@@ -3,34 +3,109 @@
 import { useEffect } from 'react'
 import { useQueryClient } from '@tanstack/react-query'
 import { supabase } from '@/lib/supabase'
-import { APPOINTMENTS_QUERY_KEYS } from '@/hooks/use-appointments'
+import { APPOINTMENTS_QUERY_KEYS, type Appointment } from '@/hooks/use-appointments-adapter'
 import { useToast } from '@/hooks/use-toast'
+import {
+  applyAppointmentChange,
+  type AppointmentChange,
+  type AppointmentListScope,
+  type AppointmentNameLookup,
+  type AppointmentRow
+} from '@/lib/realtime-appointments-cache'
 
-export function useRealtimeAppointments() {
+interface RealtimeAppointmentsScope {
+  /** Restringe a subscription às linhas deste terapeuta (filtro no servidor) */
+  therapistId?: string
+  /** Período em tela; mudanças fora dele não geram notificação */
+  startDate?: Date
+  endDate?: Date
+}
+
+type ReferenceRow = { id: string; name?: string; full_name?: string; email?: string }
+
+function toLookupMap(rows: ReferenceRow[] | undefined) {
+  return new Map((rows || []).map((row) => [row.id, row]))
+}
+
+export function useRealtimeAppointments(scope: RealtimeAppointmentsScope = {}) {
   const queryClient = useQueryClient()
   const { toast } = useToast()
+  const { therapistId } = scope
+  const rangeStart = scope.startDate?.getTime()
+  const rangeEnd = scope.endDate?.getTime()
 
   useEffect(() => {
+    // Resolve nomes a partir dos caches de referência já carregados
+    const buildLookup = (): AppointmentNameLookup => {
+      const patients = toLookupMap(queryClient.getQueryData<ReferenceRow[]>(APPOINTMENTS_QUERY_KEYS.patients()))
+      const therapists = toLookupMap(queryClient.getQueryData<ReferenceRow[]>(APPOINTMENTS_QUERY_KEYS.therapists()))
+      const services = toLookupMap(queryClient.getQueryData<ReferenceRow[]>(APPOINTMENTS_QUERY_KEYS.services()))
+
+      return {
+        patient: (id) => {
+          const patient = patients.get(id)
+          return patient ? { name: patient.full_name || patient.name || '', email: patient.email } : undefined
+        },
+        therapist: (id) => {
+          const therapist = therapists.get(id)
+          return therapist ? { name: therapist.name || '' } : undefined
+        },
+        service: (id) => {
+          const service = services.get(id)
+          return service ? { name: service.name || '' } : undefined
+        }
+      }
+    }
+
+    const isInVisibleRange = (row: Partial<AppointmentRow>) => {
+      if (rangeStart === undefined || rangeEnd === undefined || !row.start_at) return true
+      const start = Date.parse(row.start_at)
+      return start >= rangeStart && start <= rangeEnd
+    }
+
     // Configurar canal do Realtime para a tabela appointments
     const appointmentsChannel = supabase
-      .channel('appointments-changes')
+      .channel(`appointments-changes:${therapistId || 'all'}`)
       .on(
         'postgres_changes',
         {
           event: '*', // Escutar todos os eventos (INSERT, UPDATE, DELETE)
           schema: 'cedro',
-          table: 'appointments'
+          table: 'appointments',
+          ...(therapistId ? { filter: `therapist_id=eq.${therapistId}` } : {})
         },
         (payload) => {
-          console.log('Realtime appointment change:', payload)
-          
-          // Invalidar todas as queries relacionadas a appointments
-          queryClient.invalidateQueries({ queryKey: APPOINTMENTS_QUERY_KEYS.all })
-          queryClient.invalidateQueries({ queryKey: ['linked-patients'] })
-          queryClient.invalidateQueries({ queryKey: ['linked-therapists'] })
-          queryClient.invalidateQueries({ queryKey: APPOINTMENTS_QUERY_KEYS.patients() })
-          queryClient.invalidateQueries({ queryKey: APPOINTMENTS_QUERY_KEYS.therapists() })
-          
+          const change = {
+            eventType: payload.eventType,
+            new: payload.new as Partial<AppointmentRow>,
+            old: payload.old as Partial<AppointmentRow>
+          } as AppointmentChange
+
+          // Aplicar o payload direto nas listas em cache; refetch só da lista que não deu para aplicar
+          const lookup = buildLookup()
+          let touchedCache = false
+
+          queryClient
+            .getQueriesData<Appointment[]>({ queryKey: APPOINTMENTS_QUERY_KEYS.lists() })
+            .forEach(([queryKey, data]) => {
+              const listScope = queryKey[2] as AppointmentListScope | undefined
+              if (!listScope) return
+
+              const result = applyAppointmentChange(data, listScope, change, lookup)
+
+              if (result.kind === 'patched') {
+                queryClient.setQueryData(queryKey, result.data)
+                touchedCache = true
+              } else if (result.kind === 'refetch') {
+                queryClient.invalidateQueries({ queryKey, exact: true })
+                touchedCache = true
+              }
+            })
+
+          if (!touchedCache && !isInVisibleRange(change.new) && !isInVisibleRange(change.old)) {
+            return
+          }
+
           // Mostrar notificação baseada no tipo de evento
           switch (payload.eventType) {
             case 'INSERT':
@@ -58,32 +133,40 @@ export function useRealtimeAppointments() {
         }
       )
       .subscribe((status) => {
-        console.log('Appointments realtime status:', status)
-        
-        if (status === 'SUBSCRIBED') {
-          console.log('✅ Conectado ao Realtime para appointments')
-        } else if (status === 'CHANNEL_ERROR') {
+        if (status === 'CHANNEL_ERROR') {
           console.error('❌ Erro na conexão Realtime para appointments')
         }
       })
 
     // Configurar canal para a tabela patient_therapist_links
     const linksChannel = supabase
-      .channel('patient-therapist-links-changes')
+      .channel(`patient-therapist-links-changes:${therapistId || 'all'}`)
       .on(
         'postgres_changes',
         {
           event: '*',
           schema: 'cedro',
-          table: 'patient_therapist_links'
+          table: 'patient_therapist_links',
+          ...(therapistId ? { filter: `therapist_id=eq.${therapistId}` } : {})
         },
         (payload) => {
-          console.log('Realtime patient-therapist link change:', payload)
-          
-          // Invalidar queries de links
-          queryClient.invalidateQueries({ queryKey: ['linked-patients'] })
-          queryClient.invalidateQueries({ queryKey: ['linked-therapists'] })
-          
+          const row = (payload.eventType === 'DELETE' ? payload.old : payload.new) as {
+            therapist_id?: string
+            patient_id?: string
+          }
+
+          // Invalidar só as listas do terapeuta/paciente afetados
+          if (row.therapist_id) {
+            queryClient.invalidateQueries({ queryKey: APPOINTMENTS_QUERY_KEYS.linkedPatients(row.therapist_id) })
+          }
+          if (row.patient_id) {
+            queryClient.invalidateQueries({ queryKey: APPOINTMENTS_QUERY_KEYS.linkedTherapists(row.patient_id) })
+          }
+          if (!row.therapist_id && !row.patient_id) {
+            queryClient.invalidateQueries({ queryKey: ['appointments', 'linked-patients'] })
+            queryClient.invalidateQueries({ queryKey: ['appointments', 'linked-therapists'] })
+          }
+
           // Notificação para mudanças nos vínculos
           switch (payload.eventType) {
             case 'INSERT':
@@ -110,17 +193,14 @@ export function useRealtimeAppointments() {
           }
         }
       )
-      .subscribe((status) => {
-        console.log('Patient-therapist links realtime status:', status)
-      })
+      .subscribe()
 
     // Cleanup: desinscrever dos canais quando o componente for desmontado
     return () => {
-      console.log('🧹 Limpando subscriptions do Realtime')
       supabase.removeChannel(appointmentsChannel)
       supabase.removeChannel(linksChannel)
     }
-  }, [queryClient, toast])
+  }, [queryClient, toast, therapistId, rangeStart, rangeEnd])
 }
 
 // Hook para refresh manual de dados quando modal é aberto
@@ -132,14 +212,14 @@ export function useRefreshOnModalOpen() {
     
     // Invalidar todas as queries relacionadas para forçar refetch
     queryClient.invalidateQueries({ queryKey: APPOINTMENTS_QUERY_KEYS.all })
-    queryClient.invalidateQueries({ queryKey: ['linked-patients'] })
-    queryClient.invalidateQueries({ queryKey: ['linked-therapists'] })
+    queryClient.invalidateQueries({ queryKey: ['appointments', 'linked-patients'] })
+    queryClient.invalidateQueries({ queryKey: ['appointments', 'linked-therapists'] })
     queryClient.invalidateQueries({ queryKey: APPOINTMENTS_QUERY_KEYS.patients() })
     queryClient.invalidateQueries({ queryKey: APPOINTMENTS_QUERY_KEYS.therapists() })
     
     // Refetch imediatamente as queries mais importantes
-    queryClient.refetchQueries({ queryKey: ['linked-patients'] })
-    queryClient.refetchQueries({ queryKey: ['linked-therapists'] })
+    queryClient.refetchQueries({ queryKey: ['appointments', 'linked-patients'] })
+    queryClient.refetchQueries({ queryKey: ['appointments', 'linked-therapists'] })
   }
 
   return { refreshAppointmentData }
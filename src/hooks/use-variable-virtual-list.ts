@@ -0,0 +1,182 @@
+import { useState, useMemo, useCallback, useEffect, useLayoutEffect, useRef } from 'react'
+import { buildLayout, findVisibleRange } from '@/lib/virtual-layout'
+
+interface UseVariableVirtualListOptions {
+  /** Stable key per item (e.g. message id), in display order */
+  keys: string[]
+  estimateHeight: number
+  overscan?: number
+  /** Called when the user scrolls near the top (load older items) */
+  onReachTop?: () => void
+  topThreshold?: number
+  /** Called when the user scrolls near the bottom (load the next page) */
+  onReachBottom?: () => void
+  bottomThreshold?: number
+  /** Chat-like: start at the bottom and stay there while the user is there */
+  stickToBottom?: boolean
+}
+
+const BOTTOM_THRESHOLD = 40
+
+/**
+ * Virtualized list with measured row heights:
+ * - with stickToBottom (chat), starts and stays pinned to the bottom while
+ *   the user is there
+ * - keeps the visible rows in place when older items are prepended or rows
+ *   above the viewport change height after being measured
+ */
+export function useVariableVirtualList(options: UseVariableVirtualListOptions) {
+  const {
+    keys,
+    estimateHeight,
+    overscan = 5,
+    onReachTop,
+    topThreshold = 200,
+    onReachBottom,
+    bottomThreshold = 200,
+    stickToBottom = false
+  } = options
+
+  const containerRef = useRef<HTMLDivElement>(null)
+  const heightsRef = useRef(new Map<string, number>())
+  const observerRef = useRef<ResizeObserver | null>(null)
+  const observedRef = useRef(new Set<Element>())
+  const atBottomRef = useRef(stickToBottom)
+  const pendingAdjustRef = useRef(0)
+  const previousKeysRef = useRef<{ first?: string; last?: string }>({})
+
+  const [version, setVersion] = useState(0)
+  const [scrollTop, setScrollTop] = useState(0)
+  const [viewportHeight, setViewportHeight] = useState(0)
+
+  const layout = useMemo(
+    () => buildLayout(keys, heightsRef.current, estimateHeight),
+    // version: alturas medidas mudaram
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+    [keys, estimateHeight, version]
+  )
+
+  const layoutRef = useRef(layout)
+  const indexRef = useRef(new Map<string, number>())
+  layoutRef.current = layout
+  indexRef.current = useMemo(() => new Map(keys.map((key, index) => [key, index] as [string, number])), [keys])
+
+  const range = useMemo(
+    () => findVisibleRange(layout, scrollTop, viewportHeight, overscan),
+    [layout, scrollTop, viewportHeight, overscan]
+  )
+
+  // Altura da área visível
+  useEffect(() => {
+    const container = containerRef.current
+    if (!container) return
+    setViewportHeight(container.clientHeight)
+    const observer = new ResizeObserver(() => setViewportHeight(container.clientHeight))
+    observer.observe(container)
+    return () => observer.disconnect()
+  }, [])
+
+  // Medição das linhas renderizadas
+  useEffect(() => {
+    const observed = observedRef.current
+    observerRef.current = new ResizeObserver((entries) => {
+      const container = containerRef.current
+      let changed = false
+      entries.forEach((entry) => {
+        const element = entry.target as HTMLElement
+        const key = element.dataset.key
+        if (!key) return
+
+        const height = element.offsetHeight
+        const previous = heightsRef.current.get(key)
+        if (height === (previous === undefined ? estimateHeight : previous)) {
+          if (previous === undefined) heightsRef.current.set(key, height)
+          return
+        }
+
+        const index = indexRef.current.get(key)
+        if (container && index !== undefined && !atBottomRef.current &&
+            layoutRef.current.offsets[index] < container.scrollTop) {
+          // Linha acima da área visível mudou de altura: compensa o scroll
+          pendingAdjustRef.current += height - (previous === undefined ? estimateHeight : previous)
+        }
+        heightsRef.current.set(key, height)
+        changed = true
+      })
+      if (changed) setVersion((value) => value + 1)
+    })
+    return () => {
+      observerRef.current?.disconnect()
+      observed.clear()
+    }
+  }, [estimateHeight])
+
+  /** Ref for each rendered row (the element needs data-key) */
+  const measureRef = useCallback((element: HTMLElement | null) => {
+    if (element && !observedRef.current.has(element)) {
+      observedRef.current.add(element)
+      observerRef.current?.observe(element)
+    }
+  }, [])
+
+  useLayoutEffect(() => {
+    const container = containerRef.current
+    const previous = previousKeysRef.current
+    const first = keys[0]
+    const last = keys[keys.length - 1]
+    previousKeysRef.current = { first, last }
+
+    // Para de observar linhas que saíram da tela
+    observedRef.current.forEach((element) => {
+      if (!element.isConnected) {
+        observerRef.current?.unobserve(element)
+        observedRef.current.delete(element)
+      }
+    })
+
+    if (!container) return
+
+    if (atBottomRef.current) {
+      container.scrollTop = container.scrollHeight
+      pendingAdjustRef.current = 0
+      return
+    }
+
+    let adjust = pendingAdjustRef.current
+    pendingAdjustRef.current = 0
+
+    // Itens mais antigos inseridos no topo: mantém o primeiro anterior no lugar
+    if (previous.first && first !== previous.first) {
+      const index = indexRef.current.get(previous.first)
+      if (index !== undefined && index > 0) adjust += layout.offsets[index]
+    }
+
+    if (adjust !== 0) container.scrollTop += adjust
+  }, [layout, keys])
+
+  const onScroll = useCallback((event: React.UIEvent<HTMLDivElement>) => {
+    const element = event.currentTarget
+    const distanceToBottom = element.scrollHeight - element.scrollTop - element.clientHeight
+    setScrollTop(element.scrollTop)
+    atBottomRef.current = stickToBottom && distanceToBottom < BOTTOM_THRESHOLD
+    if (element.scrollTop < topThreshold && onReachTop) onReachTop()
+    if (distanceToBottom < bottomThreshold && onReachBottom) onReachBottom()
+  }, [onReachTop, topThreshold, onReachBottom, bottomThreshold, stickToBottom])
+
+  /** Scrolls to the bottom (and pins there with stickToBottom) */
+  const scrollToBottom = useCallback(() => {
+    atBottomRef.current = stickToBottom
+    const container = containerRef.current
+    if (container) container.scrollTop = container.scrollHeight
+  }, [stickToBottom])
+
+  return {
+    containerRef,
+    measureRef,
+    onScroll,
+    scrollToBottom,
+    range,
+    offsets: layout.offsets,
+    totalHeight: layout.totalHeight
+  }
+}
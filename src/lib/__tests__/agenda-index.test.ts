@@ -0,0 +1,77 @@
+import { describe, it, expect } from 'vitest'
+import { buildAgendaIndex, dayKey, layoutDay } from '../agenda-index'
+
+function appt(id: string, start: string, end: string, extra: Partial<{ therapist_id: string; status: string; patient_name: string }> = {}) {
+  return {
+    id,
+    therapist_id: extra.therapist_id ?? 't1',
+    status: extra.status ?? 'scheduled',
+    patient_name: extra.patient_name ?? `Paciente ${id}`,
+    service_name: 'Psicoterapia',
+    start_at: new Date(start).toISOString(),
+    end_at: new Date(end).toISOString()
+  }
+}
+
+describe('Agenda Index', () => {
+  describe('dayKey', () => {
+    it('should format local dates as yyyy-MM-dd', () => {
+      expect(dayKey(new Date(2025, 0, 5, 23, 59))).toBe('2025-01-05')
+      expect(dayKey(new Date(2025, 10, 20))).toBe('2025-11-20')
+    })
+  })
+
+  describe('buildAgendaIndex', () => {
+    it('should bucket by day and therapist, sorted by start', () => {
+      const index = buildAgendaIndex([
+        appt('b', '2025-01-27T15:00:00', '2025-01-27T16:00:00'),
+        appt('a', '2025-01-27T09:00:00', '2025-01-27T10:00:00', { therapist_id: 't2' }),
+        appt('c', '2025-01-28T09:00:00', '2025-01-28T10:00:00')
+      ])
+
+      expect(index.byDay.get('2025-01-27')?.map((a) => a.id)).toEqual(['a', 'b'])
+      expect(index.byDay.get('2025-01-28')?.map((a) => a.id)).toEqual(['c'])
+      expect(index.byTherapistDay.get('t2')?.get('2025-01-27')?.map((a) => a.id)).toEqual(['a'])
+      expect(index.byDay.has('2025-01-29')).toBe(false)
+    })
+
+    it('should apply search/therapist filters and compute stats in the same pass', () => {
+      const index = buildAgendaIndex(
+        [
+          appt('a', '2025-01-27T09:00:00', '2025-01-27T10:00:00', { patient_name: 'Maria' }),
+          appt('b', '2025-01-27T10:00:00', '2025-01-27T11:00:00', { patient_name: 'Mariana', status: 'cancelled' }),
+          appt('c', '2025-01-27T11:00:00', '2025-01-27T12:00:00', { patient_name: 'João' }),
+          appt('d', '2025-01-27T12:00:00', '2025-01-27T13:00:00', { patient_name: 'Maria', therapist_id: 't2' })
+        ],
+        { search: 'MARI', therapistId: 't1' }
+      )
+
+      expect(index.byDay.get('2025-01-27')?.map((a) => a.id)).toEqual(['a', 'b'])
+      expect(index.stats).toEqual({ total: 2, scheduled: 1, completed: 0, cancelled: 1 })
+    })
+  })
+
+  describe('layoutDay', () => {
+    it('should place overlapping appointments in separate lanes', () => {
+      const day = new Date(2025, 0, 27)
+      const layout = layoutDay(
+        [
+          appt('a', '2025-01-27T09:00:00', '2025-01-27T10:00:00'),
+          appt('b', '2025-01-27T09:30:00', '2025-01-27T10:30:00'),
+          appt('c', '2025-01-27T10:00:00', '2025-01-27T11:00:00'),
+          appt('d', '2025-01-27T14:00:00', '2025-01-27T15:00:00')
+        ],
+        day
+      )
+
+      expect(layout.map((l) => [l.appointment.id, l.lane, l.laneCount])).toEqual([
+        ['a', 0, 2],
+        ['b', 1, 2],
+        ['c', 0, 2],
+        ['d', 0, 1]
+      ])
+      expect(layout[0].startMinutes).toBe(9 * 60)
+      expect(layout[0].endMinutes).toBe(10 * 60)
+    })
+  })
+})
@@ -0,0 +1,68 @@
+import { describe, it, expect } from 'vitest'
+import { selectArchiveCandidates, selectOrphans, type RetentionJob } from '../audio-retention-policy'
+
+const DAY = 24 * 60 * 60 * 1000
+const now = Date.parse('2025-06-01T00:00:00.000Z')
+const daysAgo = (days: number) => new Date(now - days * DAY).toISOString()
+
+const job = (overrides: Partial<RetentionJob>): RetentionJob => ({
+  id: 'j1',
+  status: 'completed',
+  record_id: 'r1',
+  created_at: daysAgo(40),
+  audio_archived_at: null,
+  object_key: 'audio/a.webm',
+  ...overrides
+})
+
+describe('Audio retention policy', () => {
+  it('should archive old finalized sessions, oldest first', () => {
+    const candidates = selectArchiveCandidates([
+      job({ id: 'j1', object_key: 'audio/a.webm', created_at: daysAgo(35) }),
+      job({ id: 'j2', object_key: 'audio/b.webm', created_at: daysAgo(60) }),
+      job({ id: 'j3', object_key: 'audio/c.webm', created_at: daysAgo(5) }),
+      job({ id: 'j4', object_key: 'audio/d.webm', record_id: null, status: 'failed' })
+    ], { archiveAfterDays: 30, now })
+
+    expect(candidates).toEqual([
+      { key: 'audio/b.webm', jobIds: ['j2'], reencode: true },
+      { key: 'audio/a.webm', jobIds: ['j1'], reencode: true }
+    ])
+  })
+
+  it('should only archive a shared object when every referencing job is eligible', () => {
+    const shared = [
+      job({ id: 'j1', object_key: 'audio/a.webm' }),
+      job({ id: 'j2', object_key: 'audio/a.webm', created_at: daysAgo(2) })
+    ]
+    expect(selectArchiveCandidates(shared, { now })).toEqual([])
+
+    const partlyArchived = [
+      job({ id: 'j1', object_key: 'audio/a.ogg', audio_archived_at: daysAgo(1) }),
+      job({ id: 'j2', object_key: 'audio/a.ogg' })
+    ]
+    expect(selectArchiveCandidates(partlyArchived, { now })).toEqual([
+      { key: 'audio/a.ogg', jobIds: ['j2'], reencode: false }
+    ])
+  })
+
+  it('should respect the per-run limit', () => {
+    const jobs = [
+      job({ id: 'j1', object_key: 'audio/a.webm' }),
+      job({ id: 'j2', object_key: 'audio/b.webm' })
+    ]
+    expect(selectArchiveCandidates(jobs, { now, limit: 1 })).toHaveLength(1)
+  })
+
+  it('should delete only unreferenced objects past the grace period', () => {
+    const objects = [
+      { key: 'audio/a.webm', size: 10, lastModified: new Date(now - 2 * DAY) },
+      { key: 'audio/orphan.webm', size: 20, lastModified: new Date(now - 2 * DAY) },
+      { key: 'audio/uploading.webm', size: 30, lastModified: new Date(now - 60 * 1000) },
+      { key: 'audio/unknown.webm', size: 40, lastModified: null }
+    ]
+
+    expect(selectOrphans(objects, new Set(['audio/a.webm']), { orphanGraceHours: 24, now }))
+      .toEqual([objects[1]])
+  })
+})
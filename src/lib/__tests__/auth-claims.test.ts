@@ -0,0 +1,79 @@
+import { describe, it, expect, vi } from 'vitest'
+import { claimsFromJwtPayload, decodeJwtPayload, SessionCache } from '../auth-claims'
+
+const encode = (value: object) =>
+  Buffer.from(JSON.stringify(value)).toString('base64').replace(/\+/g, '-').replace(/\//g, '_').replace(/=+$/, '')
+
+const token = (payload: object) => `${encode({ alg: 'HS256' })}.${encode(payload)}.signature`
+
+describe('JWT custom claims', () => {
+  it('should read the Cedro id and role added by the access token hook', () => {
+    const payload = decodeJwtPayload(token({
+      sub: 'auth-1',
+      email: 'joão@cedro.com',
+      exp: 1700000000,
+      cedro_user_id: 'cedro-1',
+      cedro_role: 'therapist'
+    }))
+
+    expect(claimsFromJwtPayload(payload)).toEqual({
+      authUserId: 'auth-1',
+      userId: 'cedro-1',
+      role: 'therapist',
+      email: 'joão@cedro.com',
+      expiresAt: 1700000000
+    })
+  })
+
+  it('should return null without the hook claims or with an unknown role', () => {
+    expect(claimsFromJwtPayload(decodeJwtPayload(token({ sub: 'auth-1' })))).toBeNull()
+    expect(claimsFromJwtPayload({ sub: 'auth-1', cedro_user_id: 'c', cedro_role: 'superuser' })).toBeNull()
+    expect(decodeJwtPayload('not-a-jwt')).toBeNull()
+    expect(decodeJwtPayload(undefined)).toBeNull()
+  })
+})
+
+describe('SessionCache', () => {
+  it('should share one load between concurrent callers', async () => {
+    const cache = new SessionCache<string>()
+    const load = vi.fn(async () => 'user')
+
+    const [a, b] = await Promise.all([
+      cache.get('u1:admin', load, { owner: 'u1' }),
+      cache.get('u1:admin', load, { owner: 'u1' })
+    ])
+
+    expect(a).toBe('user')
+    expect(b).toBe('user')
+    expect(load).toHaveBeenCalledTimes(1)
+  })
+
+  it('should reload after expiry, invalidation or a failed load', async () => {
+    const cache = new SessionCache<string>()
+    const load = vi.fn(async () => 'user')
+
+    await cache.get('token', load, { owner: 'u1', expiresAt: 1000, now: 0 })
+    await cache.get('token', load, { owner: 'u1', expiresAt: 2000, now: 1500 })
+    expect(load).toHaveBeenCalledTimes(2)
+
+    cache.invalidate('u2')
+    await cache.get('token', load, { owner: 'u1', now: 1600 })
+    expect(load).toHaveBeenCalledTimes(2)
+
+    cache.invalidate('u1')
+    expect(cache.size).toBe(0)
+
+    await expect(cache.get('bad', async () => { throw new Error('timeout') }, { owner: 'u1' })).rejects.toThrow('timeout')
+    await Promise.resolve()
+    expect(cache.size).toBe(0)
+  })
+
+  it('should evict the oldest entries above the limit', async () => {
+    const cache = new SessionCache<number>(2)
+    await cache.get('a', async () => 1, { owner: 'u' })
+    await cache.get('b', async () => 2, { owner: 'u' })
+    await cache.get('c', async () => 3, { owner: 'u' })
+
+    expect(cache.size).toBe(2)
+  })
+})
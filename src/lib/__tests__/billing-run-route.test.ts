@@ -0,0 +1,87 @@
+// @vitest-environment node
+import { describe, it, expect, vi, beforeEach } from 'vitest'
+
+const rpc = vi.fn()
+const getServerCedroUser = vi.fn()
+
+vi.mock('@/lib/supabase/server', () => ({
+  createClient: () => ({ schema: () => ({ rpc }) }),
+  getServerCedroUser: (...args: unknown[]) => getServerCedroUser(...args)
+}))
+
+vi.mock('@/lib/tracing/server', () => ({
+  withRouteTracing: (_name: string, handler: unknown) => handler
+}))
+
+import { POST } from '@/app/api/billing/run/route'
+
+const user = (role: 'admin' | 'therapist') => ({
+  authUserId: 'auth-1',
+  userId: 'user-1',
+  role,
+  email: 'ana@cedro.com',
+  expiresAt: 0
+})
+
+const run = (body: object) =>
+  POST(new Request('http://localhost/api/billing/run', {
+    method: 'POST',
+    body: JSON.stringify(body)
+  }) as any)
+
+describe('POST /api/billing/run', () => {
+  beforeEach(() => {
+    rpc.mockReset().mockResolvedValue({ data: { dry_run: true, invoices: [] }, error: null })
+    getServerCedroUser.mockReset()
+  })
+
+  it('should reject requests without a Cedro user', async () => {
+    getServerCedroUser.mockResolvedValue(null)
+
+    const response = await run({ period: '2026-09' })
+
+    expect(response.status).toBe(401)
+    expect(rpc).not.toHaveBeenCalled()
+  })
+
+  it('should only let administrators run the billing', async () => {
+    getServerCedroUser.mockResolvedValue(user('therapist'))
+
+    const response = await run({ period: '2026-09', dry_run: false })
+
+    expect(response.status).toBe(403)
+    expect(rpc).not.toHaveBeenCalled()
+  })
+
+  it('should preview by default', async () => {
+    getServerCedroUser.mockResolvedValue(user('admin'))
+
+    const response = await run({ period: '2026-09' })
+
+    expect(response.status).toBe(200)
+    expect(rpc).toHaveBeenCalledWith('run_monthly_billing', {
+      p_period: '2026-09-01',
+      p_due_date: null,
+      p_dry_run: true
+    })
+  })
+
+  it('should create invoices only when dry_run is false', async () => {
+    getServerCedroUser.mockResolvedValue(user('admin'))
+
+    await run({ period: '2026-09', due_date: '2026-10-10', dry_run: false })
+
+    expect(rpc).toHaveBeenCalledWith('run_monthly_billing', {
+      p_period: '2026-09-01',
+      p_due_date: '2026-10-10',
+      p_dry_run: false
+    })
+  })
+
+  it('should validate the period before checking the session', async () => {
+    const response = await run({ period: '09/2026' })
+
+    expect(response.status).toBe(400)
+    expect(getServerCedroUser).not.toHaveBeenCalled()
+  })
+})
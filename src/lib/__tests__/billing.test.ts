@@ -0,0 +1,22 @@
+import { describe, it, expect } from 'vitest'
+import { isIsoDate, parseBillingPeriod } from '../billing'
+
+describe('Billing run', () => {
+  it('should normalize the period to the first day of the month', () => {
+    expect(parseBillingPeriod('2026-09')).toBe('2026-09-01')
+    expect(parseBillingPeriod(' 2026-02-28 ')).toBe('2026-02-01')
+  })
+
+  it('should reject invalid periods', () => {
+    expect(parseBillingPeriod('2026-13')).toBeNull()
+    expect(parseBillingPeriod('2026-02-30')).toBeNull()
+    expect(parseBillingPeriod('09/2026')).toBeNull()
+    expect(parseBillingPeriod(undefined)).toBeNull()
+  })
+
+  it('should validate due dates', () => {
+    expect(isIsoDate('2026-10-10')).toBe(true)
+    expect(isIsoDate('2026-02-29')).toBe(false)
+    expect(isIsoDate('2026-10')).toBe(false)
+  })
+})
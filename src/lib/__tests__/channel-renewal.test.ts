@@ -0,0 +1,80 @@
+import { describe, it, expect } from 'vitest'
+import {
+  isDueForRenewal,
+  isRateLimitError,
+  mapWithConcurrency,
+  renewalLeadMs,
+  RENEWAL_JITTER_MS,
+  RENEWAL_WINDOW_MS,
+  watchExpirationToIso,
+  withRateLimitBackoff
+} from '../google-calendar/channel-renewal'
+
+const noSleep = async () => {}
+
+describe('Google channel renewal', () => {
+  it('should spread renewal lead times within the jitter window', () => {
+    const leads = ['a', 'b', 'c', 'd', 'e'].map((id) => renewalLeadMs(`channel-${id}`))
+
+    leads.forEach((lead) => {
+      expect(lead).toBeGreaterThanOrEqual(RENEWAL_WINDOW_MS)
+      expect(lead).toBeLessThan(RENEWAL_WINDOW_MS + RENEWAL_JITTER_MS)
+    })
+    expect(new Set(leads).size).toBeGreaterThan(1)
+    expect(renewalLeadMs('channel-a')).toBe(leads[0])
+  })
+
+  it('should renew inside the window and skip channels far from expiry', () => {
+    const now = Date.parse('2025-01-01T00:00:00.000Z')
+    const soon = new Date(now + RENEWAL_WINDOW_MS - 1).toISOString()
+    const later = new Date(now + RENEWAL_WINDOW_MS + RENEWAL_JITTER_MS).toISOString()
+
+    expect(isDueForRenewal({ channel_id: 'x', expiration: soon }, now)).toBe(true)
+    expect(isDueForRenewal({ channel_id: 'x', expiration: later }, now)).toBe(false)
+  })
+
+  it('should convert Google millisecond expirations to ISO dates', () => {
+    expect(watchExpirationToIso('1735689600000')).toBe('2025-01-01T00:00:00.000Z')
+    expect(watchExpirationToIso('2025-01-01T00:00:00Z')).toBe('2025-01-01T00:00:00.000Z')
+  })
+
+  it('should recognize rate-limit errors', () => {
+    expect(isRateLimitError({ code: 429, message: 'Too Many Requests' })).toBe(true)
+    expect(isRateLimitError({ code: 403, message: 'x', details: [{ reason: 'userRateLimitExceeded' }] })).toBe(true)
+    expect(isRateLimitError({ code: 403, message: 'Forbidden', details: [{ reason: 'forbidden' }] })).toBe(false)
+    expect(isRateLimitError({ code: 404, message: 'Not Found' })).toBe(false)
+  })
+
+  it('should retry rate-limited calls with backoff and fail fast otherwise', async () => {
+    let calls = 0
+    const result = await withRateLimitBackoff(async () => {
+      calls++
+      if (calls < 3) throw { code: 429, message: 'Too Many Requests' }
+      return 'ok'
+    }, { sleep: noSleep })
+    expect(result).toEqual({ value: 'ok', attempts: 3 })
+
+    let otherCalls = 0
+    await expect(withRateLimitBackoff(async () => {
+      otherCalls++
+      throw { code: 404, message: 'Not Found' }
+    }, { sleep: noSleep })).rejects.toMatchObject({ message: 'Not Found', attempts: 1, rateLimited: false })
+    expect(otherCalls).toBe(1)
+  })
+
+  it('should bound concurrency and keep result order', async () => {
+    let inFlight = 0
+    let maxInFlight = 0
+
+    const results = await mapWithConcurrency([5, 1, 3, 2, 4], 2, async (value) => {
+      inFlight++
+      maxInFlight = Math.max(maxInFlight, inFlight)
+      await new Promise((resolve) => setTimeout(resolve, value))
+      inFlight--
+      return value * 10
+    })
+
+    expect(results).toEqual([50, 10, 30, 20, 40])
+    expect(maxInFlight).toBe(2)
+  })
+})
@@ -0,0 +1,67 @@
+import { describe, it, expect } from 'vitest'
+import { createOptimisticMessage, mergeMessages, upsertConversation, type Conversation, type Message } from '../conversations'
+
+const message = (id: string, sentAt: string, extra: Partial<Message> = {}): Message => ({
+  id,
+  external_msg_id: id,
+  direction: 'inbound',
+  from_addr: '5511999999999',
+  to_addr: [],
+  body_text: `msg ${id}`,
+  attachments: null,
+  sent_at: sentAt,
+  received_at: sentAt,
+  created_at: sentAt,
+  ...extra
+})
+
+const conversation = (id: string, lastMessageAt: string): Conversation => ({
+  id,
+  contact_key: `contact-${id}`,
+  contact_name: id,
+  channel: 'whatsapp',
+  last_message: '',
+  last_message_at: lastMessageAt,
+  unread_count: 0,
+  created_at: lastMessageAt,
+  updated_at: lastMessageAt
+})
+
+describe('Conversations', () => {
+  it('should prepend older pages and drop duplicates', () => {
+    const current = [message('3', '2026-10-01T10:03:00Z'), message('4', '2026-10-01T10:04:00Z')]
+    const older = [message('1', '2026-10-01T10:01:00Z'), message('2', '2026-10-01T10:02:00Z'), message('3', '2026-10-01T10:03:00Z')]
+
+    expect(mergeMessages(current, older).map(m => m.id)).toEqual(['1', '2', '3', '4'])
+  })
+
+  it('should append a new message without touching the rest', () => {
+    const current = [message('1', '2026-10-01T10:01:00Z')]
+    const merged = mergeMessages(current, [message('2', '2026-10-01T10:02:00Z')])
+
+    expect(merged.map(m => m.id)).toEqual(['1', '2'])
+    expect(merged[0]).toBe(current[0])
+  })
+
+  it('should replace the optimistic copy with the stored message', () => {
+    const optimistic = createOptimisticMessage(conversation('c1', ''), 'Olá', new Date('2026-10-01T10:05:00Z'))
+    const current = [message('1', '2026-10-01T10:01:00Z'), optimistic]
+
+    const byClientId = mergeMessages(current, [message('9', '2026-10-01T10:05:01Z', {
+      direction: 'outbound', body_text: 'Olá', client_id: optimistic.client_id
+    })])
+    expect(byClientId.map(m => m.id)).toEqual(['1', '9'])
+
+    // Stream sem client_id: casa pelo texto
+    const byText = mergeMessages(current, [message('9', '2026-10-01T10:05:01Z', { direction: 'outbound', body_text: 'Olá' })])
+    expect(byText.map(m => m.id)).toEqual(['1', '9'])
+  })
+
+  it('should keep the most recent conversation first', () => {
+    const list = [conversation('a', '2026-10-01T10:00:00Z'), conversation('b', '2026-10-01T09:00:00Z')]
+    const updated = upsertConversation(list, { ...list[1], last_message_at: '2026-10-01T11:00:00Z' })
+
+    expect(updated.map(c => c.id)).toEqual(['b', 'a'])
+    expect(upsertConversation(updated, conversation('c', '2026-10-01T12:00:00Z'))[0].id).toBe('c')
+  })
+})
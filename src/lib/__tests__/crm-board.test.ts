@@ -0,0 +1,114 @@
+import { describe, it, expect, vi } from 'vitest'
+import { LeadMoveQueue, emptyBoard, moveLeadInBoard, positionBetween, type BoardState, type LeadMove } from '../crm-board'
+import type { Lead, LeadStage } from '@/data/crm'
+
+const lead = (id: string, stage: LeadStage, position: number): Lead => ({
+  id,
+  name: id,
+  email: `${id}@example.com`,
+  source: 'site',
+  stage,
+  score: 50,
+  created_at: '2025-01-01T00:00:00Z',
+  updated_at: '2025-01-01T00:00:00Z',
+  board_position: position
+})
+
+const boardWith = (columns: Partial<Record<LeadStage, Lead[]>>): BoardState => {
+  const board = emptyBoard()
+  Object.entries(columns).forEach(([stage, leads]) => {
+    board[stage as LeadStage] = { leads: leads!, total: leads!.length, hasMore: false, loading: false }
+  })
+  return board
+}
+
+const ids = (board: BoardState, stage: LeadStage) => board[stage].leads.map((item) => item.id)
+
+describe('CRM board', () => {
+  describe('positionBetween', () => {
+    it('uses the midpoint between neighbours and steps past the edges', () => {
+      expect(positionBetween(30, 10)).toBe(20)
+      expect(positionBetween(30, undefined)).toBe(29)
+      expect(positionBetween(undefined, 10)).toBe(11)
+      expect(positionBetween(undefined, undefined, 1234)).toBe(1234)
+    })
+  })
+
+  describe('moveLeadInBoard', () => {
+    const board = boardWith({
+      lead: [lead('a', 'lead', 30), lead('b', 'lead', 20), lead('c', 'lead', 10)],
+      mql: [lead('x', 'mql', 50), lead('y', 'mql', 40)]
+    })
+
+    it('moves a lead to another column and updates the totals', () => {
+      const result = moveLeadInBoard(board, 'b', 'mql', 1)!
+      expect(ids(result.board, 'lead')).toEqual(['a', 'c'])
+      expect(ids(result.board, 'mql')).toEqual(['x', 'b', 'y'])
+      expect(result.board.lead.total).toBe(2)
+      expect(result.board.mql.total).toBe(3)
+      expect(result.move).toEqual({ id: 'b', stage: 'mql', board_position: 45 })
+      expect(result.board.mql.leads[1].stage).toBe('mql')
+    })
+
+    it('reorders within a column', () => {
+      const result = moveLeadInBoard(board, 'c', 'lead', 0)!
+      expect(ids(result.board, 'lead')).toEqual(['c', 'a', 'b'])
+      expect(result.move.board_position).toBe(31)
+      expect(result.board.lead.total).toBe(3)
+    })
+
+    it('ignores unknown leads and drops in the same place', () => {
+      expect(moveLeadInBoard(board, 'nope', 'mql', 0)).toBeNull()
+      expect(moveLeadInBoard(board, 'b', 'lead', 1)).toBeNull()
+    })
+  })
+
+  describe('LeadMoveQueue', () => {
+    const move = (id: string, stage: LeadStage, position: number): LeadMove => ({ id, stage, board_position: position })
+
+    const fakeTimer = () => {
+      let pending: (() => void) | null = null
+      return {
+        schedule: (callback: () => void) => {
+          pending = callback
+          return 1
+        },
+        cancel: () => {
+          pending = null
+        },
+        fire: () => pending?.()
+      }
+    }
+
+    it('sends one batch with the last move of each lead', async () => {
+      const send = vi.fn().mockResolvedValue(undefined)
+      const timer = fakeTimer()
+      const queue = new LeadMoveQueue(send, vi.fn(), 600, timer.schedule, timer.cancel)
+
+      queue.enqueue(move('a', 'mql', 1))
+      queue.enqueue(move('b', 'sql', 2))
+      queue.enqueue(move('a', 'won', 3))
+      expect(send).not.toHaveBeenCalled()
+      expect(queue.size).toBe(2)
+
+      timer.fire()
+      await Promise.resolve()
+
+      expect(send).toHaveBeenCalledTimes(1)
+      expect(send).toHaveBeenCalledWith([move('a', 'won', 3), move('b', 'sql', 2)])
+      expect(queue.size).toBe(0)
+    })
+
+    it('reports failed batches', async () => {
+      const error = new Error('offline')
+      const onError = vi.fn()
+      const timer = fakeTimer()
+      const queue = new LeadMoveQueue(vi.fn().mockRejectedValue(error), onError, 600, timer.schedule, timer.cancel)
+
+      queue.enqueue(move('a', 'mql', 1))
+      await queue.flush()
+
+      expect(onError).toHaveBeenCalledWith([move('a', 'mql', 1)], error)
+    })
+  })
+})
@@ -0,0 +1,133 @@
+import { describe, it, expect } from 'vitest'
+import { csvCell, csvLine } from '../export/csv'
+import { crc32, XlsxStreamWriter } from '../export/xlsx'
+import { applyKeyset, createExportStream, exportUrl, keysetFilter, keysetPager } from '../export'
+
+async function readAll(stream: ReadableStream<Uint8Array>): Promise<Uint8Array> {
+  const reader = stream.getReader()
+  const chunks: Uint8Array[] = []
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) break
+    chunks.push(value!)
+  }
+  const out = new Uint8Array(chunks.reduce((sum, chunk) => sum + chunk.length, 0))
+  let position = 0
+  chunks.forEach((chunk) => {
+    out.set(chunk, position)
+    position += chunk.length
+  })
+  return out
+}
+
+function fakeQuery() {
+  const calls: unknown[][] = []
+  const query: any = new Proxy({}, {
+    get: (_target, method: string) => (...args: unknown[]) => {
+      calls.push([method, ...args])
+      return query
+    }
+  })
+  return { query, calls }
+}
+
+describe('Export', () => {
+  it('should escape CSV cells for Excel pt-BR', () => {
+    expect(csvCell('a;b')).toBe('"a;b"')
+    expect(csvCell('diz "oi"')).toBe('"diz ""oi"""')
+    expect(csvCell('=SUM(A1)')).toBe("'=SUM(A1)")
+    expect(csvCell(12.5)).toBe('12,5')
+    expect(csvCell(12.5, ',')).toBe('12.5')
+    expect(csvLine(['Ana', null, true])).toBe('Ana;;Sim\r\n')
+  })
+
+  it('should build keyset conditions after the cursor', () => {
+    expect(keysetFilter(
+      { column: 'created_at', idColumn: 'id', ascending: false },
+      { value: '2026-01-01T00:00:00+00:00', id: 'b' }
+    )).toBe('created_at.lt."2026-01-01T00:00:00+00:00",and(created_at.eq."2026-01-01T00:00:00+00:00",id.lt."b")')
+
+    expect(keysetFilter(
+      { column: 'full_name', idColumn: 'patient_id', ascending: true, nullable: true },
+      { value: 'Silva, "Ana"', id: 'p1' }
+    )).toBe('full_name.gt."Silva, \\"Ana\\"",and(full_name.eq."Silva, \\"Ana\\"",patient_id.gt."p1"),full_name.is.null')
+  })
+
+  it('should page through NULLs by id only', () => {
+    const { query, calls } = fakeQuery()
+    applyKeyset(query, { column: 'due_date', idColumn: 'invoice_id', ascending: false, nullable: true }, { value: null, id: 'i9' })
+
+    expect(calls).toEqual([
+      ['is', 'due_date', null],
+      ['lt', 'invoice_id', 'i9'],
+      ['order', 'due_date', { ascending: false, nullsFirst: false }],
+      ['order', 'invoice_id', { ascending: false }]
+    ])
+  })
+
+  it('should advance the cursor until a short page', async () => {
+    const rows = Array.from({ length: 5 }, (_, i) => ({ id: `r${i}` }))
+    const cursors: unknown[] = []
+    const pager = keysetPager(async (cursor, size) => {
+      cursors.push(cursor)
+      const start = cursor ? rows.findIndex((row) => row.id === cursor.id) + 1 : 0
+      return rows.slice(start, start + size)
+    }, (row) => ({ value: row.id, id: row.id }), 2)
+
+    const pages: unknown[] = []
+    for (let page = await pager.next(); page; page = await pager.next()) pages.push(page)
+
+    expect(pages).toHaveLength(3)
+    expect(cursors).toEqual([null, { value: 'r1', id: 'r1' }, { value: 'r3', id: 'r3' }])
+  })
+
+  it('should stream CSV with a BOM and header', async () => {
+    const pages = [[{ name: 'Ana', total: 10 }], [{ name: 'Bia', total: 2.5 }]]
+    const source = { next: async () => pages.shift() || null }
+    const columns = [
+      { header: 'Nome', value: (row: any) => row.name },
+      { header: 'Total', value: (row: any) => row.total }
+    ]
+
+    const text = new TextDecoder('utf-8', { ignoreBOM: true }).decode(await readAll(createExportStream(source, columns, 'csv')))
+    expect(text).toBe('\uFEFFNome;Total\r\nAna;10\r\nBia;2,5\r\n')
+  })
+
+  it('should skip pages that were filtered down to nothing', async () => {
+    const pages = [[], [{ name: 'Ana' }], [], []]
+    const source = { next: async () => pages.shift() || null }
+    const columns = [{ header: 'Nome', value: (row: any) => row.name }]
+
+    const text = new TextDecoder('utf-8', { ignoreBOM: true }).decode(await readAll(createExportStream(source, columns, 'csv')))
+    expect(text).toBe('\uFEFFNome\r\nAna\r\n')
+  })
+
+  it('should write a well-formed zip for XLSX', () => {
+    const writer = new XlsxStreamWriter('Faturas')
+    const parts = [writer.start(), writer.rows([['Ana & Bia', 1]]), writer.finish()]
+    const file = new Uint8Array(parts.reduce((sum, part) => sum + part.length, 0))
+    let position = 0
+    parts.forEach((part) => {
+      file.set(part, position)
+      position += part.length
+    })
+
+    const view = new DataView(file.buffer)
+    const end = file.length - 22
+    expect(view.getUint32(end, true)).toBe(0x06054b50)
+    expect(view.getUint16(end + 10, true)).toBe(5)
+    expect(view.getUint32(end + 16, true) + view.getUint32(end + 12, true)).toBe(end)
+    expect(view.getUint32(0, true)).toBe(0x04034b50)
+  })
+
+  it('should compute the standard CRC-32', () => {
+    expect(crc32(new TextEncoder().encode('123456789'))).toBe(0xcbf43926)
+  })
+
+  it('should serialize list filters into the export URL', () => {
+    expect(exportUrl('leads', 'xlsx', { stage: 'all', source: ['google', 'instagram'], search: 'ana' }))
+      .toBe('/api/export/leads?format=xlsx&search=ana&source=google%2Cinstagram')
+    expect(exportUrl('invoices', 'csv', { status: 'todos', therapistId: undefined }))
+      .toBe('/api/export/invoices?format=csv')
+  })
+})
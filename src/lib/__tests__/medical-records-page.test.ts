@@ -0,0 +1,49 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest'
+
+// Query builder que registra select/eq e devolve `rows`
+const calls: { select: string[]; eq: Array<[string, unknown]> } = { select: [], eq: [] }
+
+vi.mock('@/lib/supabase', () => {
+  const builder: any = {
+    select: (columns: string) => { calls.select.push(columns); return builder },
+    order: () => builder,
+    limit: () => builder,
+    or: () => builder,
+    eq: (column: string, value: unknown) => { calls.eq.push([column, value]); return builder },
+    then: (resolve: (value: any) => void) => resolve({ data: [], error: null })
+  }
+  return {
+    supabase: {
+      schema: () => ({ from: () => builder })
+    }
+  }
+})
+
+vi.mock('@/lib/reference-data', () => ({
+  getReferenceTherapists: vi.fn().mockResolvedValue([])
+}))
+
+import { getMedicalRecordsPage } from '@/data/pacientes'
+
+const compact = (select: string) => select.replace(/\s+/g, '')
+
+describe('getMedicalRecordsPage', () => {
+  beforeEach(() => {
+    calls.select = []
+    calls.eq = []
+  })
+
+  it('should restrict parent rows to the therapist through an inner embed', async () => {
+    await getMedicalRecordsPage({ therapistId: 'therapist-1' })
+
+    expect(compact(calls.select[0])).toContain('appointments!inner(')
+    expect(calls.eq).toContainEqual(['appointments.therapist_id', 'therapist-1'])
+  })
+
+  it('should keep records without appointment when no therapist is given', async () => {
+    await getMedicalRecordsPage({ patientId: 'patient-1' })
+
+    expect(compact(calls.select[0])).not.toContain('appointments!inner')
+    expect(calls.eq).toEqual([['patient_id', 'patient-1']])
+  })
+})
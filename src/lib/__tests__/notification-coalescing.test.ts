@@ -0,0 +1,49 @@
+import { describe, it, expect } from 'vitest'
+import {
+  isFullSyncNotification,
+  isSyncDue,
+  NOTIFICATION_DEBOUNCE_MS,
+  NOTIFICATION_MAX_WAIT_MS,
+  toPgInterval
+} from '../google-calendar/notification-coalescing'
+
+const now = Date.parse('2025-01-01T12:00:00.000Z')
+const ago = (ms: number) => new Date(now - ms).toISOString()
+
+describe('Google notification coalescing', () => {
+  it('should not sync calendars without pending notifications', () => {
+    expect(isSyncDue({ pending_since: null, last_notified_at: ago(60 * 60 * 1000) }, now)).toBe(false)
+  })
+
+  it('should wait until the calendar is quiet for the debounce window', () => {
+    const burst = { pending_since: ago(5000), last_notified_at: ago(1000) }
+    const quiet = { pending_since: ago(20000), last_notified_at: ago(NOTIFICATION_DEBOUNCE_MS) }
+
+    expect(isSyncDue(burst, now)).toBe(false)
+    expect(isSyncDue(quiet, now)).toBe(true)
+  })
+
+  it('should sync a continuous stream once the max wait has passed', () => {
+    const stream = { pending_since: ago(NOTIFICATION_MAX_WAIT_MS), last_notified_at: ago(500) }
+
+    expect(isSyncDue(stream, now)).toBe(true)
+  })
+
+  it('should skip calendars locked by another worker until the lease expires', () => {
+    const pending = { pending_since: ago(NOTIFICATION_MAX_WAIT_MS), last_notified_at: ago(NOTIFICATION_MAX_WAIT_MS) }
+
+    expect(isSyncDue({ ...pending, sync_locked_until: new Date(now + 1000).toISOString() }, now)).toBe(false)
+    expect(isSyncDue({ ...pending, sync_locked_until: ago(1000) }, now)).toBe(true)
+  })
+
+  it('should only ask for a full sync on the watch handshake', () => {
+    expect(isFullSyncNotification('sync')).toBe(true)
+    expect(isFullSyncNotification('exists')).toBe(false)
+  })
+
+  it('should format Postgres intervals in whole seconds', () => {
+    expect(toPgInterval(NOTIFICATION_DEBOUNCE_MS)).toBe('10 seconds')
+    expect(toPgInterval(1499)).toBe('1 seconds')
+    expect(toPgInterval(-5)).toBe('0 seconds')
+  })
+})
@@ -0,0 +1,57 @@
+import { describe, it, expect } from 'vitest'
+import { buildOggPage, lacingValues, muxOggOpus, oggCrc32 } from '../ogg-opus'
+
+function readPages(file: Uint8Array) {
+  const pages: Array<{ flags: number; granule: number; sequence: number; segments: number[] }> = []
+  const view = new DataView(file.buffer, file.byteOffset, file.byteLength)
+  let offset = 0
+
+  while (offset < file.length) {
+    expect(String.fromCharCode(...file.subarray(offset, offset + 4))).toBe('OggS')
+    const count = file[offset + 26]
+    const segments = Array.from(file.subarray(offset + 27, offset + 27 + count))
+    const body = segments.reduce((sum, value) => sum + value, 0)
+    pages.push({
+      flags: file[offset + 5],
+      granule: view.getUint32(offset + 6, true),
+      sequence: view.getUint32(offset + 18, true),
+      segments
+    })
+    offset += 27 + count + body
+  }
+
+  return pages
+}
+
+describe('Ogg Opus muxer', () => {
+  it('should compute the Ogg CRC-32 variant', () => {
+    expect(oggCrc32(new TextEncoder().encode('123456789'))).toBe(0x89a1897f)
+  })
+
+  it('should lace packets in 255-byte segments', () => {
+    expect(lacingValues(100)).toEqual([100])
+    expect(lacingValues(255)).toEqual([255, 0])
+    expect(lacingValues(600)).toEqual([255, 255, 90])
+  })
+
+  it('should write a page whose CRC validates', () => {
+    const page = buildOggPage([new Uint8Array([1, 2, 3])], { granule: 960, serial: 7, sequence: 2 })
+    const view = new DataView(page.buffer)
+    const crc = view.getUint32(22, true)
+    view.setUint32(22, 0, true)
+    expect(oggCrc32(page)).toBe(crc)
+  })
+
+  it('should emit header pages and audio pages with 48 kHz granules', () => {
+    const packets = Array.from({ length: 60 }, () => ({ data: new Uint8Array(40), samples: 960 }))
+    const file = muxOggOpus(packets, { channels: 1, inputSampleRate: 16000, serial: 1 })
+    const pages = readPages(file)
+
+    expect(pages[0].flags).toBe(0x02)
+    expect(String.fromCharCode(...file.subarray(28, 36))).toBe('OpusHead')
+    expect(pages.map((page) => page.sequence)).toEqual(pages.map((_, index) => index))
+    // 60 packets x 20 ms = 1.2 s: one page at 1 s (50 packets), the rest on the EOS page
+    expect(pages.slice(2).map((page) => page.granule)).toEqual([48000, 57600])
+    expect(pages[pages.length - 1].flags).toBe(0x04)
+  })
+})
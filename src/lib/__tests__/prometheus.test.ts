@@ -0,0 +1,50 @@
+import { describe, it, expect } from 'vitest'
+import { formatPipelineMetrics, MetricsWriter, type PipelineMetricsSnapshot } from '../prometheus'
+
+const emptyHistogram = { buckets: [{ le: 1, count: 0 }], sum: 0, count: 0 }
+
+const snapshot: PipelineMetricsSnapshot = {
+  gcal_queue: [
+    { status: 'pending', jobs: 3, retries: 2, oldest_age_seconds: 125.5 },
+    { status: 'completed', jobs: 40, retries: 1, oldest_age_seconds: 86400 }
+  ],
+  gcal_queue_duration_seconds: { buckets: [{ le: 1, count: 2 }, { le: 5, count: 3 }], sum: 6.5, count: 4 },
+  gcal_sync_log_24h: [{ direction: 'google_to_cedro', action: 'sync', status: 'error', events: 2 }],
+  recording_jobs: [{ status: 'completed', jobs: 10 }],
+  n8n_duration_seconds: emptyHistogram,
+  stage_duration_seconds: [{ stage: 'ffmpeg_archive', failures: 1, histogram: emptyHistogram }]
+}
+
+describe('Prometheus exposition', () => {
+  it('should render gauges for every queue status, including empty ones', () => {
+    const text = formatPipelineMetrics(snapshot)
+
+    expect(text).toContain('# TYPE cedro_gcal_queue_jobs gauge')
+    expect(text).toContain('cedro_gcal_queue_jobs{status="pending"} 3')
+    expect(text).toContain('cedro_gcal_queue_jobs{status="failed"} 0')
+    expect(text).toContain('cedro_gcal_queue_oldest_pending_age_seconds 125.5')
+    expect(text).toContain('cedro_gcal_sync_events_24h{direction="google_to_cedro",action="sync",status="error"} 2')
+    expect(text.endsWith('\n')).toBe(true)
+  })
+
+  it('should render histograms with cumulative buckets, +Inf, sum and count', () => {
+    const text = formatPipelineMetrics(snapshot)
+
+    expect(text).toContain('# TYPE cedro_gcal_queue_duration_seconds histogram')
+    expect(text).toContain('cedro_gcal_queue_duration_seconds_bucket{le="5"} 3')
+    expect(text).toContain('cedro_gcal_queue_duration_seconds_bucket{le="+Inf"} 4')
+    expect(text).toContain('cedro_gcal_queue_duration_seconds_sum 6.5')
+    expect(text).toContain('cedro_pipeline_stage_duration_seconds_count{stage="ffmpeg_archive"} 0')
+  })
+
+  it('should declare each family once and escape label values', () => {
+    const text = new MetricsWriter()
+      .gauge('x', 'help', 1, { name: 'a"b' })
+      .gauge('x', 'help', 2, { name: 'c\\d' })
+      .toString()
+
+    expect(text.match(/# TYPE x gauge/g)).toHaveLength(1)
+    expect(text).toContain('x{name="a\\"b"} 1')
+    expect(text).toContain('x{name="c\\\\d"} 2')
+  })
+})
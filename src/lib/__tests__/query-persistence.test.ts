@@ -0,0 +1,69 @@
+import { describe, it, expect } from 'vitest'
+import {
+  QUERY_CACHE_VERSION,
+  isCurrentVersionKey,
+  isUserKey,
+  persistKey,
+  selectEvictions,
+  shouldPersistQuery
+} from '../query-persistence'
+
+describe('Query Persistence', () => {
+  describe('keys', () => {
+    it('should prefix query hashes with the cache version and user', () => {
+      const key = persistKey('["appointments","therapists"]', 'user-1')
+      expect(key).toBe(`v${QUERY_CACHE_VERSION}:user-1:["appointments","therapists"]`)
+      expect(isCurrentVersionKey(key)).toBe(true)
+      expect(isCurrentVersionKey(`v${QUERY_CACHE_VERSION + 1}:user-1:x`)).toBe(false)
+    })
+
+    it('should only match entries written for the given user', () => {
+      const key = persistKey('["patients"]', 'user-1')
+      expect(isUserKey(key, 'user-1')).toBe(true)
+      expect(isUserKey(key, 'user-2')).toBe(false)
+      expect(isUserKey(key, null)).toBe(false)
+      expect(isUserKey(`v${QUERY_CACHE_VERSION + 1}:user-1:["patients"]`, 'user-1')).toBe(false)
+    })
+
+    it('should only persist successful allow-listed queries', () => {
+      expect(shouldPersistQuery(['appointments', 'list', {}], 'success')).toBe(true)
+      expect(shouldPersistQuery(['appointments', 'list', {}], 'error')).toBe(false)
+      expect(shouldPersistQuery(['medicalRecords', 'list'], 'success')).toBe(false)
+    })
+  })
+
+  describe('selectEvictions', () => {
+    const now = 1_000_000
+
+    it('should evict expired entries regardless of size', () => {
+      const evicted = selectEvictions(
+        [
+          { key: 'old', size: 10, savedAt: now - 5000 },
+          { key: 'new', size: 10, savedAt: now - 10 }
+        ],
+        1000,
+        1000,
+        now
+      )
+      expect(evicted).toEqual(['old'])
+    })
+
+    it('should evict oldest entries until the total fits the budget', () => {
+      const evicted = selectEvictions(
+        [
+          { key: 'c', size: 40, savedAt: now - 10 },
+          { key: 'a', size: 40, savedAt: now - 30 },
+          { key: 'b', size: 40, savedAt: now - 20 }
+        ],
+        50,
+        10_000,
+        now
+      )
+      expect(evicted).toEqual(['a', 'b'])
+    })
+
+    it('should keep everything when within budget', () => {
+      expect(selectEvictions([{ key: 'a', size: 10, savedAt: now }], 50, 10_000, now)).toEqual([])
+    })
+  })
+})
@@ -0,0 +1,94 @@
+import { describe, it, expect } from 'vitest'
+import { applyAppointmentChange, type AppointmentNameLookup } from '../realtime-appointments-cache'
+
+const scope = {
+  startDate: '2025-01-26T00:00:00.000Z',
+  endDate: '2025-02-01T00:00:00.000Z',
+  therapistId: 't1'
+}
+
+const lookup: AppointmentNameLookup = {
+  patient: (id) => (id === 'p1' ? { name: 'Maria', email: 'maria@example.com' } : id === 'p2' ? { name: 'João' } : undefined),
+  therapist: (id) => (id === 't1' ? { name: 'Dra. Ana' } : undefined),
+  service: (id) => (id === 's1' ? { name: 'Psicoterapia' } : undefined)
+}
+
+const cached = [
+  {
+    id: 'a1',
+    therapist_id: 't1',
+    patient_id: 'p1',
+    service_id: 's1',
+    start_at: '2025-01-27T12:00:00.000Z',
+    status: 'scheduled',
+    patient_name: 'Maria',
+    therapist_name: 'Dra. Ana',
+    service_name: 'Psicoterapia'
+  }
+]
+
+describe('Realtime appointments cache', () => {
+  it('should insert an in-scope row with resolved names, sorted by start', () => {
+    const result = applyAppointmentChange(cached, scope, {
+      eventType: 'INSERT',
+      new: { id: 'a0', therapist_id: 't1', patient_id: 'p2', service_id: null, start_at: '2025-01-27T09:00:00.000Z' },
+      old: {}
+    }, lookup)
+
+    expect(result.kind).toBe('patched')
+    if (result.kind !== 'patched') return
+    expect(result.data.map((a) => a.id)).toEqual(['a0', 'a1'])
+    expect(result.data[0].patient_name).toBe('João')
+    expect(result.data[0].therapist_name).toBe('Dra. Ana')
+  })
+
+  it('should merge updates and keep names when foreign keys are unchanged', () => {
+    const result = applyAppointmentChange(cached, scope, {
+      eventType: 'UPDATE',
+      new: { ...cached[0], status: 'completed' },
+      old: { id: 'a1' }
+    }, { ...lookup, patient: () => undefined })
+
+    expect(result.kind).toBe('patched')
+    if (result.kind !== 'patched') return
+    expect(result.data[0].status).toBe('completed')
+    expect(result.data[0].patient_name).toBe('Maria')
+  })
+
+  it('should drop rows that move out of the cached range or therapist', () => {
+    const result = applyAppointmentChange(cached, scope, {
+      eventType: 'UPDATE',
+      new: { ...cached[0], start_at: '2025-03-01T12:00:00.000Z' },
+      old: { id: 'a1' }
+    }, lookup)
+
+    expect(result).toEqual({ kind: 'patched', data: [] })
+  })
+
+  it('should ignore changes that never touch the cached list', () => {
+    const result = applyAppointmentChange(cached, scope, {
+      eventType: 'INSERT',
+      new: { id: 'x', therapist_id: 't2', patient_id: null, service_id: null, start_at: '2025-01-27T09:00:00.000Z' },
+      old: {}
+    }, lookup)
+
+    expect(result.kind).toBe('unchanged')
+  })
+
+  it('should remove deleted rows and request a refetch when the payload has no id', () => {
+    expect(applyAppointmentChange(cached, scope, { eventType: 'DELETE', new: {}, old: { id: 'a1' } }, lookup))
+      .toEqual({ kind: 'patched', data: [] })
+    expect(applyAppointmentChange(cached, scope, { eventType: 'DELETE', new: {}, old: {} }, lookup).kind)
+      .toBe('refetch')
+  })
+
+  it('should request a refetch when a name cannot be resolved', () => {
+    const result = applyAppointmentChange(cached, scope, {
+      eventType: 'INSERT',
+      new: { id: 'a2', therapist_id: 't1', patient_id: 'unknown', service_id: null, start_at: '2025-01-28T09:00:00.000Z' },
+      old: {}
+    }, lookup)
+
+    expect(result.kind).toBe('refetch')
+  })
+})
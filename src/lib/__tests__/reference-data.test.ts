@@ -0,0 +1,108 @@
+import { describe, it, expect, vi } from 'vitest'
+import { ReferenceDataStore, referenceDataEtag, selectActiveServices, selectTherapists, versionFromEtag } from '../reference-data'
+
+const snapshot = {
+  version: '3.7',
+  therapists: [
+    { id: 't1', name: 'Ana', email: 'ana@cedro.com', role: 'therapist', is_active: true },
+    { id: 't2', name: 'Bruno', email: null, role: 'admin', is_active: false }
+  ],
+  services: [
+    { id: 's1', name: 'Consulta', description: null, default_duration_min: 50, base_price_cents: 20000, active: true },
+    { id: 's2', name: 'Antigo', description: null, default_duration_min: 30, base_price_cents: 0, active: false }
+  ]
+}
+
+const response = (status: number, body: any = null, etag: string | null = null) => ({
+  status,
+  ok: status >= 200 && status < 300,
+  headers: { get: (name: string) => (name.toLowerCase() === 'etag' ? etag : null) },
+  json: async () => body
+})
+
+describe('Reference data', () => {
+  it('should round-trip the version through the ETag of the same user', () => {
+    expect(referenceDataEtag('3.7', 'u1')).toBe('"ref-u1:3.7"')
+    expect(versionFromEtag('W/"ref-u1:3.7"', 'u1')).toBe('3.7')
+    expect(versionFromEtag('"ref-u1:3.7"', 'u2')).toBeNull()
+    expect(versionFromEtag('"something-else"', 'u1')).toBeNull()
+    expect(versionFromEtag(null, 'u1')).toBeNull()
+  })
+
+  it('should share one request and serve from memory while fresh', async () => {
+    const fetchImpl = vi.fn(async () => response(200, snapshot))
+    const store = new ReferenceDataStore(fetchImpl, '/api/reference-data', 1000)
+
+    const [a, b] = await Promise.all([store.get(0), store.get(0)])
+    await store.get(500)
+
+    expect(a).toBe(b)
+    expect(fetchImpl).toHaveBeenCalledTimes(1)
+  })
+
+  it('should revalidate with If-None-Match and keep the data on 304', async () => {
+    const fetchImpl = vi.fn()
+      .mockResolvedValueOnce(response(200, snapshot, '"ref-u1:3.7"'))
+      .mockResolvedValueOnce(response(304))
+    const store = new ReferenceDataStore(fetchImpl, '/api/reference-data', 1000)
+
+    const first = await store.get(0)
+    const second = await store.get(2000)
+
+    expect(second).toBe(first)
+    expect(fetchImpl).toHaveBeenLastCalledWith('/api/reference-data', { headers: { 'If-None-Match': '"ref-u1:3.7"' } })
+  })
+
+  it('should drop the cached data when the signed-in user changes', async () => {
+    const fetchImpl = vi.fn(async () => response(200, snapshot, '"ref-u1:3.7"'))
+    const store = new ReferenceDataStore(fetchImpl, '/api/reference-data', 1000)
+
+    store.setUser('u1')
+    await store.get(0)
+    store.setUser('u1')
+    await store.get(10)
+    expect(fetchImpl).toHaveBeenCalledTimes(1)
+
+    store.setUser(null)
+    await store.get(20)
+
+    expect(fetchImpl).toHaveBeenCalledTimes(2)
+    expect(fetchImpl).toHaveBeenLastCalledWith('/api/reference-data', { headers: {} })
+  })
+
+  it('should not keep a response that arrives after sign-out', async () => {
+    let resolveFirst: (value: any) => void = () => {}
+    const other = { ...snapshot, version: '9.1' }
+    const fetchImpl = vi.fn()
+      .mockImplementationOnce(() => new Promise((resolve) => { resolveFirst = resolve }))
+      .mockResolvedValueOnce(response(200, other, '"ref-u2:9.1"'))
+    const store = new ReferenceDataStore(fetchImpl, '/api/reference-data', 1000)
+
+    const pending = store.get(0)
+    store.clear()
+    resolveFirst(response(200, snapshot, '"ref-u1:3.7"'))
+
+    expect((await pending).version).toBe('9.1')
+    expect((await store.get(10)).version).toBe('9.1')
+  })
+
+  it('should keep the last known data when revalidation fails', async () => {
+    const fetchImpl = vi.fn()
+      .mockResolvedValueOnce(response(200, snapshot))
+      .mockResolvedValueOnce(response(500, { error: 'falhou' }))
+    const store = new ReferenceDataStore(fetchImpl, '/api/reference-data', 1000)
+
+    await store.get(0)
+    store.invalidate()
+
+    expect((await store.get(10)).version).toBe('3.7')
+    await expect(new ReferenceDataStore(async () => response(500, { error: 'falhou' })).get()).rejects.toThrow('falhou')
+  })
+
+  it('should filter inactive therapists and services', () => {
+    const data = snapshot as any
+    expect(selectTherapists(data).map(t => t.id)).toEqual(['t1', 't2'])
+    expect(selectTherapists(data, { activeOnly: true }).map(t => t.id)).toEqual(['t1'])
+    expect(selectActiveServices(data).map(s => s.id)).toEqual(['s1'])
+  })
+})
@@ -0,0 +1,156 @@
+import { describe, it, expect } from 'vitest'
+import {
+  ensureSeriesEvent,
+  planSeriesRecurrence,
+  seriesEventKey,
+  seriesRecurrenceRules,
+  toGoogleUtc,
+  toPrivatePropertyFilters
+} from '../google-calendar/series-event'
+
+interface FakeEvent {
+  id: string
+  properties: Record<string, string>
+}
+
+/** In-memory calendar with the same find-by-private-property semantics */
+function fakeCalendar() {
+  const events: FakeEvent[] = []
+  return {
+    events,
+    find: async (properties: Record<string, string>) =>
+      events.find((event) =>
+        Object.keys(properties).every((key) => event.properties[key] === properties[key])
+      ) || null,
+    create: async (properties: Record<string, string>) => {
+      const event = { id: `event-${events.length + 1}`, properties }
+      events.push(event)
+      return event
+    }
+  }
+}
+
+describe('Google series event', () => {
+  it('should key the event by series and first occurrence', () => {
+    const key = seriesEventKey('series-1', '2025-03-03T13:00:00.000Z')
+
+    expect(key).toEqual({
+      cedro_series_id: 'series-1',
+      cedro_series_start: '2025-03-03T13:00:00.000Z'
+    })
+    expect(seriesEventKey('series-1', '2025-03-03T10:00:00-03:00')).toEqual(key)
+    expect(toPrivatePropertyFilters(key)).toEqual([
+      'cedro_series_id=series-1',
+      'cedro_series_start=2025-03-03T13:00:00.000Z'
+    ])
+  })
+
+  it('should not create a second recurring event when the link failed and the job is retried', async () => {
+    const calendar = fakeCalendar()
+    const key = seriesEventKey('series-1', '2025-03-03T13:00:00.000Z')
+    let linkFails = true
+    const linked: string[] = []
+
+    const attempt = () =>
+      ensureSeriesEvent({
+        find: () => calendar.find(key),
+        create: () => calendar.create(key),
+        link: async (event) => {
+          if (linkFails) throw new Error('link_appointment_series_event failed')
+          linked.push(event.id)
+        }
+      })
+
+    await expect(attempt()).rejects.toThrow('link_appointment_series_event failed')
+    expect(calendar.events).toHaveLength(1)
+
+    linkFails = false
+    const retry = await attempt()
+
+    expect(retry).toEqual({ event: calendar.events[0], reused: true })
+    expect(calendar.events).toHaveLength(1)
+    expect(linked).toEqual(['event-1'])
+  })
+
+  it('should create a new event for a new cut of the series', async () => {
+    const calendar = fakeCalendar()
+    await calendar.create(seriesEventKey('series-1', '2025-03-03T13:00:00.000Z'))
+
+    const nextKey = seriesEventKey('series-1', '2025-04-07T13:00:00.000Z')
+    const result = await ensureSeriesEvent({
+      find: () => calendar.find(nextKey),
+      create: () => calendar.create(nextKey),
+      link: async () => {}
+    })
+
+    expect(result.reused).toBe(false)
+    expect(calendar.events).toHaveLength(2)
+  })
+
+  describe('planSeriesRecurrence', () => {
+    // Segundas 14h (-03), 50 minutos
+    const occurrence = (id: string, start: string) => ({
+      id,
+      start_at: start,
+      end_at: new Date(new Date(start).getTime() + 50 * 60 * 1000).toISOString()
+    })
+
+    it('should use a plain rule when the occurrences are evenly spaced', () => {
+      const plan = planSeriesRecurrence([
+        occurrence('a', '2025-03-03T17:00:00.000Z'),
+        occurrence('b', '2025-03-10T17:00:00.000Z'),
+        occurrence('c', '2025-03-17T17:00:00.000Z')
+      ], 1)
+
+      expect(plan.first.id).toBe('a')
+      expect(plan.count).toBe(3)
+      expect(plan.exdates).toEqual([])
+      expect(plan.offGrid).toEqual([])
+      expect(seriesRecurrenceRules(plan, 1)).toEqual(['RRULE:FREQ=WEEKLY;INTERVAL=1;COUNT=3'])
+    })
+
+    it('should exclude the slot of a cancelled occurrence', () => {
+      const plan = planSeriesRecurrence([
+        occurrence('a', '2025-03-03T17:00:00.000Z'),
+        occurrence('c', '2025-03-17T17:00:00.000Z'),
+        occurrence('d', '2025-03-24T17:00:00.000Z')
+      ], 1)
+
+      expect(plan.count).toBe(4)
+      expect(plan.exdates).toEqual(['20250310T170000Z'])
+      expect(plan.onGrid.map((o) => o.id)).toEqual(['a', 'c', 'd'])
+      expect(seriesRecurrenceRules(plan, 1)).toEqual([
+        'RRULE:FREQ=WEEKLY;INTERVAL=1;COUNT=4',
+        'EXDATE:20250310T170000Z'
+      ])
+    })
+
+    it('should leave a moved occurrence out of the rule', () => {
+      const plan = planSeriesRecurrence([
+        occurrence('a', '2025-03-03T17:00:00.000Z'),
+        occurrence('b', '2025-03-11T13:00:00.000Z'),
+        occurrence('c', '2025-03-17T17:00:00.000Z')
+      ], 1)
+
+      expect(plan.onGrid.map((o) => o.id)).toEqual(['a', 'c'])
+      expect(plan.offGrid.map((o) => o.id)).toEqual(['b'])
+      expect(plan.exdates).toEqual(['20250310T170000Z'])
+    })
+
+    it('should anchor the rule on the grid holding most occurrences', () => {
+      const plan = planSeriesRecurrence([
+        occurrence('moved', '2025-03-02T12:00:00.000Z'),
+        occurrence('a', '2025-03-03T17:00:00.000Z'),
+        occurrence('b', '2025-03-17T17:00:00.000Z')
+      ], 2)
+
+      expect(plan.first.id).toBe('a')
+      expect(plan.count).toBe(2)
+      expect(plan.offGrid.map((o) => o.id)).toEqual(['moved'])
+    })
+
+    it('should format instance starts like Google instance IDs', () => {
+      expect(toGoogleUtc('2025-03-10T14:00:00-03:00')).toBe('20250310T170000Z')
+    })
+  })
+})
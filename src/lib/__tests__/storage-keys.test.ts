@@ -0,0 +1,48 @@
+import { describe, it, expect } from 'vitest'
+import { audioExtension, contentAddressedKey, PresignedUrlCache, toObjectKey } from '../storage/keys'
+
+describe('Audio storage keys', () => {
+  it('should derive the extension from the file name, then the content type', () => {
+    expect(audioExtension('consulta.MP3', 'application/octet-stream')).toBe('mp3')
+    expect(audioExtension('blob', 'audio/webm;codecs=opus')).toBe('webm')
+    expect(audioExtension('arquivo.xyz', 'audio/ogg')).toBe('ogg')
+    expect(audioExtension('arquivo', undefined)).toBe('bin')
+  })
+
+  it('should build content-addressed keys under audio/', () => {
+    expect(contentAddressedKey('abc123', 'webm')).toBe('audio/abc123.webm')
+  })
+
+  it('should resolve stored URLs and legacy keys to object keys', () => {
+    expect(toObjectKey('https://s3.example.com/cedro-audio/audio/1700000000000-a.webm', 'cedro-audio'))
+      .toBe('audio/1700000000000-a.webm')
+    expect(toObjectKey('http://minio:9000/cedro-audio/audio/abc.ogg?X-Amz-Signature=x', 'cedro-audio'))
+      .toBe('audio/abc.ogg')
+    expect(toObjectKey('/api/audio/file/1700000000000-a.webm', 'cedro-audio')).toBe('audio/1700000000000-a.webm')
+    expect(toObjectKey('audio/abc.webm', 'cedro-audio')).toBe('audio/abc.webm')
+  })
+})
+
+describe('PresignedUrlCache', () => {
+  it('should reuse a URL while at least half of the expiry remains', () => {
+    const cache = new PresignedUrlCache()
+    cache.set('audio/a.webm', { url: 'signed', expiresAt: 3_600_000 })
+
+    expect(cache.get('audio/a.webm', 3600, 1_000_000)?.url).toBe('signed')
+    expect(cache.get('audio/a.webm', 60, 2_000_000)?.url).toBe('signed')
+    // Dropped once too close to expiry for the requested lifetime
+    expect(cache.get('audio/a.webm', 3600, 2_000_000)).toBeNull()
+    expect(cache.get('audio/a.webm', 60, 2_000_000)).toBeNull()
+  })
+
+  it('should evict the oldest entries beyond the size bound', () => {
+    const cache = new PresignedUrlCache(2)
+    cache.set('a', { url: 'a', expiresAt: Infinity })
+    cache.set('b', { url: 'b', expiresAt: Infinity })
+    cache.set('c', { url: 'c', expiresAt: Infinity })
+
+    expect(cache.get('a', 1)).toBeNull()
+    expect(cache.get('b', 1)?.url).toBe('b')
+    expect(cache.get('c', 1)?.url).toBe('c')
+  })
+})
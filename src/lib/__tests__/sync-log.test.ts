@@ -0,0 +1,98 @@
+import { describe, it, expect, vi, afterEach } from 'vitest'
+import { SyncLogWriter, type SyncLogEntry } from '../google-calendar/sync-log'
+
+const entry = (eventId: string): SyncLogEntry => ({
+  event_id: eventId,
+  calendar_id: 'cal',
+  action: 'sync',
+  direction: 'google_to_cedro',
+  status: 'success'
+})
+
+describe('SyncLogWriter', () => {
+  afterEach(() => {
+    vi.useRealTimers()
+  })
+
+  it('should batch rows into one insert per flush', async () => {
+    const batches: SyncLogEntry[][] = []
+    const writer = new SyncLogWriter(async (rows) => {
+      batches.push(rows)
+      return { error: null }
+    })
+
+    writer.log(entry('a'))
+    writer.log(entry('b'))
+    writer.log(entry('c'))
+    await writer.flush()
+
+    expect(batches).toHaveLength(1)
+    expect(batches[0].map((row) => row.event_id)).toEqual(['a', 'b', 'c'])
+    expect(batches[0][0].created_at).toBeDefined()
+    expect(writer.pending).toBe(0)
+  })
+
+  it('should split large buffers by batch size and flush on the timer', async () => {
+    vi.useFakeTimers()
+    const sizes: number[] = []
+    const writer = new SyncLogWriter(async (rows) => {
+      sizes.push(rows.length)
+      return { error: null }
+    }, { batchSize: 2, flushMs: 500 })
+
+    writer.log(entry('a'))
+    expect(sizes).toEqual([])
+
+    await vi.advanceTimersByTimeAsync(500)
+    expect(sizes).toEqual([1])
+
+    writer.log(entry('b'))
+    writer.log(entry('c'))
+    await writer.flush()
+    expect(sizes).toEqual([1, 2])
+  })
+
+  it('should keep failed batches for a retry and drop them after repeated failures', async () => {
+    let fail = true
+    const written: SyncLogEntry[] = []
+    const writer = new SyncLogWriter(async (rows) => {
+      if (fail) return { error: { message: 'connection refused' } }
+      written.push(...rows)
+      return { error: null }
+    })
+    const consoleError = vi.spyOn(console, 'error').mockImplementation(() => {})
+
+    writer.log(entry('a'))
+    await writer.flush()
+    expect(writer.pending).toBe(1)
+
+    fail = false
+    await writer.flush()
+    expect(written.map((row) => row.event_id)).toEqual(['a'])
+
+    fail = true
+    writer.log(entry('b'))
+    await writer.flush()
+    await writer.flush()
+    await writer.flush()
+    expect(writer.pending).toBe(0)
+    expect(writer.dropped).toBe(1)
+
+    consoleError.mockRestore()
+  })
+
+  it('should bound the buffer by dropping the oldest rows', async () => {
+    const consoleWarn = vi.spyOn(console, 'warn').mockImplementation(() => {})
+    const writer = new SyncLogWriter(async () => ({ error: null }), { batchSize: 100, maxBuffer: 2 })
+
+    writer.log(entry('a'))
+    writer.log(entry('b'))
+    writer.log(entry('c'))
+
+    expect(writer.pending).toBe(2)
+    expect(writer.dropped).toBe(1)
+
+    await writer.flush()
+    consoleWarn.mockRestore()
+  })
+})
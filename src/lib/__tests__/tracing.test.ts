@@ -0,0 +1,56 @@
+import { describe, it, expect } from 'vitest'
+import { describeSupabaseRequest, formatServerTiming, withSpan, type FinishedSpan } from '../tracing'
+import { createLogger, resolveLogLevel } from '../logger'
+
+const span = (kind: FinishedSpan['kind'], durationMs: number): FinishedSpan => ({
+  name: `${kind} call`,
+  kind,
+  traceId: 't',
+  spanId: 's',
+  startTime: 0,
+  durationMs,
+  attributes: {}
+})
+
+describe('Server-Timing', () => {
+  it('should aggregate spans per kind with call counts and a total', () => {
+    const header = formatServerTiming(
+      [span('db', 10), span('db', 2.3), span('google', 100), span('internal', 5)],
+      130
+    )
+
+    expect(header).toBe('db;dur=12.3;desc="2 calls", google;dur=100.0;desc="1 call", total;dur=130.0')
+  })
+
+  it('should only report the total when there were no external calls', () => {
+    expect(formatServerTiming([], 4)).toBe('total;dur=4.0')
+  })
+
+  it('should describe PostgREST and auth requests', () => {
+    expect(describeSupabaseRequest('https://x.supabase.co/rest/v1/appointments?select=*', 'GET')).toBe('GET appointments')
+    expect(describeSupabaseRequest('https://x.supabase.co/rest/v1/rpc/pipeline_metrics', 'POST')).toBe('POST rpc/pipeline_metrics')
+    expect(describeSupabaseRequest('https://x.supabase.co/auth/v1/user')).toBe('GET auth/user')
+  })
+
+  it('should record errors and rethrow them from withSpan', async () => {
+    await expect(withSpan('failing', 'internal', async () => { throw new Error('boom') })).rejects.toThrow('boom')
+  })
+})
+
+describe('Log level', () => {
+  it('should default to warn in production and debug elsewhere', () => {
+    expect(resolveLogLevel(undefined, 'production')).toBe('warn')
+    expect(resolveLogLevel('', 'development')).toBe('debug')
+    expect(resolveLogLevel('INFO', 'production')).toBe('info')
+    expect(resolveLogLevel('verbose', 'test')).toBe('debug')
+  })
+
+  it('should turn disabled levels into no-ops', () => {
+    const logger = createLogger('warn')
+
+    expect(logger.isDebugEnabled).toBe(false)
+    expect(logger.debug).not.toBe(logger.warn)
+    expect(() => logger.debug('ignored', { big: 'payload' })).not.toThrow()
+    expect(createLogger('debug').isDebugEnabled).toBe(true)
+  })
+})
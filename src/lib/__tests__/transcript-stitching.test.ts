@@ -0,0 +1,28 @@
+import { describe, it, expect } from 'vitest'
+import { findOverlap, stitchSegments, stitchTranscript, transcriptTail } from '../transcript-stitching'
+
+describe('Transcript Stitching', () => {
+  it('should drop words repeated by the overlapping window', () => {
+    expect(stitchTranscript('O paciente relatou ansiedade no trabalho', 'no trabalho e dificuldade para dormir'))
+      .toBe('O paciente relatou ansiedade no trabalho e dificuldade para dormir')
+  })
+
+  it('should compare ignoring case, accents and punctuation', () => {
+    expect(findOverlap('Falamos sobre a relação.', 'sobre a Relacao com o pai')).toBe(3)
+  })
+
+  it('should keep both texts when there is no overlap', () => {
+    expect(stitchTranscript('Bom dia.', 'Como você está?')).toBe('Bom dia. Como você está?')
+    expect(stitchTranscript('', 'Início')).toBe('Início')
+    expect(stitchTranscript('Fim', '   ')).toBe('Fim')
+  })
+
+  it('should stitch segments in order', () => {
+    expect(stitchSegments(['um dois três', 'três quatro cinco', 'cinco seis'])).toBe('um dois três quatro cinco seis')
+  })
+
+  it('should limit the overlap search window', () => {
+    expect(findOverlap('a b c d', 'a b c d e', 2)).toBe(0)
+    expect(transcriptTail('um dois três quatro', 2)).toBe('três quatro')
+  })
+})
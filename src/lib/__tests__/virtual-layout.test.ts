@@ -0,0 +1,27 @@
+import { describe, it, expect } from 'vitest'
+import { buildLayout, findVisibleRange, indexAtOffset } from '../virtual-layout'
+
+describe('Virtual layout', () => {
+  it('should use measured heights and the estimate for the rest', () => {
+    const layout = buildLayout(['a', 'b', 'c'], new Map([['b', 120]]), 50)
+
+    expect(layout.offsets).toEqual([0, 50, 170, 220])
+    expect(layout.totalHeight).toBe(220)
+  })
+
+  it('should find the item at an offset', () => {
+    const offsets = [0, 50, 170, 220]
+    expect(indexAtOffset(offsets, 0)).toBe(0)
+    expect(indexAtOffset(offsets, 169)).toBe(1)
+    expect(indexAtOffset(offsets, 170)).toBe(2)
+    expect(indexAtOffset(offsets, 1000)).toBe(2)
+  })
+
+  it('should return the visible range with overscan', () => {
+    const keys = Array.from({ length: 100 }, (_, i) => String(i))
+    const layout = buildLayout(keys, new Map(), 10)
+
+    expect(findVisibleRange(layout, 200, 100, 2)).toEqual({ start: 18, end: 32 })
+    expect(findVisibleRange(buildLayout([], new Map(), 10), 0, 100)).toEqual({ start: 0, end: -1 })
+  })
+})
@@ -0,0 +1,181 @@
+/**
+ * Agenda index
+ *
+ * Builds, in a single pass over the loaded appointments, everything the agenda
+ * views need: per-day buckets, per-therapist/day buckets, overlap lanes for
+ * side-by-side layout and the status counters. Views then do O(1) lookups per
+ * day cell instead of re-filtering the whole array.
+ */
+
+export interface IndexableAppointment {
+  id: string
+  therapist_id: string
+  start_at: string
+  end_at: string
+  status: string
+  patient_name?: string | null
+  service_name?: string | null
+}
+
+export interface LaidOutAppointment<T extends IndexableAppointment> {
+  appointment: T
+  /** Minutes from local midnight of the bucket day */
+  startMinutes: number
+  endMinutes: number
+  /** Zero-based column within its overlap group */
+  lane: number
+  /** Number of columns used by its overlap group */
+  laneCount: number
+}
+
+export interface AgendaStats {
+  total: number
+  scheduled: number
+  completed: number
+  cancelled: number
+}
+
+export interface AgendaIndex<T extends IndexableAppointment> {
+  byDay: Map<string, T[]>
+  byTherapistDay: Map<string, Map<string, T[]>>
+  layoutByDay: Map<string, LaidOutAppointment<T>[]>
+  stats: AgendaStats
+}
+
+export interface AgendaIndexFilters {
+  search?: string
+  therapistId?: string
+}
+
+const MINUTES_PER_DAY = 24 * 60
+
+/**
+ * Local yyyy-MM-dd key (same as date-fns `format(date, 'yyyy-MM-dd')`)
+ */
+export function dayKey(date: Date): string {
+  const month = date.getMonth() + 1
+  const day = date.getDate()
+  return `${date.getFullYear()}-${month < 10 ? '0' : ''}${month}-${day < 10 ? '0' : ''}${day}`
+}
+
+function pushTo<K, V>(map: Map<K, V[]>, key: K, value: V) {
+  const bucket = map.get(key)
+  if (bucket) {
+    bucket.push(value)
+  } else {
+    map.set(key, [value])
+  }
+}
+
+/**
+ * Assigns overlap lanes to a day's appointments (sorted by start).
+ * Greedy interval partitioning: each appointment takes the first lane whose
+ * last appointment has already ended; every appointment in a connected
+ * overlap group shares that group's lane count.
+ */
+export function layoutDay<T extends IndexableAppointment>(
+  sortedAppointments: T[],
+  day: Date
+): LaidOutAppointment<T>[] {
+  const dayStart = new Date(day.getFullYear(), day.getMonth(), day.getDate()).getTime()
+  const result: LaidOutAppointment<T>[] = []
+
+  let group: LaidOutAppointment<T>[] = []
+  let laneEnds: number[] = []
+  let groupEnd = -1
+
+  const closeGroup = () => {
+    const laneCount = laneEnds.length
+    for (const item of group) item.laneCount = laneCount
+    group = []
+    laneEnds = []
+  }
+
+  for (const appointment of sortedAppointments) {
+    const start = Math.max(0, Math.round((new Date(appointment.start_at).getTime() - dayStart) / 60000))
+    const rawEnd = Math.round((new Date(appointment.end_at).getTime() - dayStart) / 60000)
+    // Zero-length or inverted ranges still need a visible slot
+    const end = Math.min(MINUTES_PER_DAY, Math.max(rawEnd, start + 1))
+
+    if (group.length > 0 && start >= groupEnd) {
+      closeGroup()
+    }
+
+    let lane = laneEnds.findIndex((laneEnd) => laneEnd <= start)
+    if (lane === -1) {
+      lane = laneEnds.length
+      laneEnds.push(end)
+    } else {
+      laneEnds[lane] = end
+    }
+
+    const item: LaidOutAppointment<T> = {
+      appointment,
+      startMinutes: start,
+      endMinutes: end,
+      lane,
+      laneCount: 1
+    }
+    group.push(item)
+    result.push(item)
+    groupEnd = Math.max(groupEnd, end)
+  }
+
+  closeGroup()
+  return result
+}
+
+/**
+ * Builds the agenda index. Filtering, bucketing and stats happen in one pass;
+ * each day bucket is then sorted once and laid out.
+ */
+export function buildAgendaIndex<T extends IndexableAppointment>(
+  appointments: T[],
+  filters: AgendaIndexFilters = {}
+): AgendaIndex<T> {
+  const search = filters.search?.toLowerCase() || ''
+  const byDay = new Map<string, T[]>()
+  const byTherapistDay = new Map<string, Map<string, T[]>>()
+  const dayDates = new Map<string, Date>()
+  const stats: AgendaStats = { total: 0, scheduled: 0, completed: 0, cancelled: 0 }
+
+  for (const appointment of appointments) {
+    if (filters.therapistId && appointment.therapist_id !== filters.therapistId) continue
+    if (
+      search &&
+      !appointment.patient_name?.toLowerCase().includes(search) &&
+      !appointment.service_name?.toLowerCase().includes(search)
+    ) {
+      continue
+    }
+
+    const start = new Date(appointment.start_at)
+    const key = dayKey(start)
+
+    pushTo(byDay, key, appointment)
+    if (!dayDates.has(key)) dayDates.set(key, start)
+
+    let therapistDays = byTherapistDay.get(appointment.therapist_id)
+    if (!therapistDays) {
+      therapistDays = new Map()
+      byTherapistDay.set(appointment.therapist_id, therapistDays)
+    }
+    pushTo(therapistDays, key, appointment)
+
+    stats.total++
+    if (appointment.status === 'scheduled') stats.scheduled++
+    else if (appointment.status === 'completed') stats.completed++
+    else if (appointment.status === 'cancelled') stats.cancelled++
+  }
+
+  const byStart = (a: T, b: T) => Date.parse(a.start_at) - Date.parse(b.start_at)
+
+  const layoutByDay = new Map<string, LaidOutAppointment<T>[]>()
+  byDay.forEach((bucket, key) => {
+    bucket.sort(byStart)
+    layoutByDay.set(key, layoutDay(bucket, dayDates.get(key)!))
+  })
+  byTherapistDay.forEach((days) => days.forEach((bucket) => bucket.sort(byStart)))
+
+  return { byDay, byTherapistDay, layoutByDay, stats }
+}
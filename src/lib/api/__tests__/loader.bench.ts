@@ -0,0 +1,43 @@
+/**
+ * Micro-benchmark: a screen rendering 30 cards that each call getById.
+ * Simulated PostgREST round trip of 2ms, with at most 6 concurrent
+ * connections like a browser. Run with `npm run bench`.
+ */
+import { bench, describe } from 'vitest'
+import { BatchLoader } from '../loader'
+
+const ROUND_TRIP_MS = 2
+const MAX_CONNECTIONS = 6
+const CARDS = 30
+
+let active = 0
+const waiting: Array<() => void> = []
+
+async function request<T>(result: () => T): Promise<T> {
+  if (active >= MAX_CONNECTIONS) {
+    await new Promise<void>(resolve => waiting.push(resolve))
+  }
+  active++
+  try {
+    await new Promise(resolve => setTimeout(resolve, ROUND_TRIP_MS))
+    return result()
+  } finally {
+    active--
+    waiting.shift()?.()
+  }
+}
+
+const ids = Array.from({ length: CARDS }, (_, index) => `plan-${index % 20}`)
+
+describe(`getById x${CARDS}`, () => {
+  bench('one request per card', async () => {
+    await Promise.all(ids.map(id => request(() => ({ id }))))
+  })
+
+  bench('BatchLoader (one .in() per tick)', async () => {
+    const loader = new BatchLoader<string, { id: string }>(keys =>
+      request(() => new Map(keys.map(key => [key, { id: key }] as [string, { id: string }])))
+    )
+    await Promise.all(ids.map(id => loader.load(id)))
+  })
+})
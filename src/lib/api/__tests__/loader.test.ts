@@ -0,0 +1,57 @@
+import { describe, it, expect, vi } from 'vitest'
+import { BatchLoader, InflightRequests, requestKey } from '../loader'
+
+const rowsById = (ids: string[]) => new Map(ids.filter(id => id !== 'missing').map(id => [id, { id }] as [string, { id: string }]))
+
+describe('BatchLoader', () => {
+  it('should merge loads of the same tick into one batch with unique keys', async () => {
+    const batchFn = vi.fn(async (ids: string[]) => rowsById(ids))
+    const loader = new BatchLoader(batchFn)
+
+    const results = await Promise.all([loader.load('a'), loader.load('b'), loader.load('a'), loader.load('missing')])
+
+    expect(batchFn).toHaveBeenCalledTimes(1)
+    expect(batchFn).toHaveBeenCalledWith(['a', 'b', 'missing'])
+    expect(results).toEqual([{ id: 'a' }, { id: 'b' }, { id: 'a' }, null])
+  })
+
+  it('should split large batches and not cache settled results', async () => {
+    const batchFn = vi.fn(async (ids: string[]) => rowsById(ids))
+    const loader = new BatchLoader(batchFn, { maxBatchSize: 2 })
+
+    await loader.loadMany(['a', 'b', 'c'])
+    expect(batchFn).toHaveBeenCalledTimes(2)
+
+    await loader.load('a')
+    expect(batchFn).toHaveBeenCalledTimes(3)
+  })
+
+  it('should reject every caller of a failed batch', async () => {
+    const loader = new BatchLoader<string, { id: string }>(async () => { throw new Error('PGRST') })
+
+    const results = await Promise.allSettled([loader.load('a'), loader.load('b')])
+
+    expect(results.map(result => result.status)).toEqual(['rejected', 'rejected'])
+  })
+})
+
+describe('InflightRequests', () => {
+  it('should share identical requests only while they are in flight', async () => {
+    const inflight = new InflightRequests()
+    const fn = vi.fn(async () => 42)
+
+    const [a, b] = await Promise.all([inflight.run('k', fn), inflight.run('k', fn)])
+    expect([a, b]).toEqual([42, 42])
+    expect(fn).toHaveBeenCalledTimes(1)
+
+    await inflight.run('k', fn)
+    expect(fn).toHaveBeenCalledTimes(2)
+    expect(inflight.size).toBe(0)
+  })
+
+  it('should build the same key regardless of option order', () => {
+    expect(requestKey('query', 'patients', { limit: 10, order: { column: 'name' } }))
+      .toBe(requestKey('query', 'patients', { order: { column: 'name' }, limit: 10 }))
+    expect(requestKey('count', 'patients', [{ key: 'a' }])).not.toBe(requestKey('count', 'patients', [{ key: 'b' }]))
+  })
+})
@@ -5,7 +5,9 @@
  */
 
 import { supabase } from '@/lib/supabase'
+import { logger } from '@/lib/logger'
 import { api } from './client'
+import { getReferenceServices, getReferenceTherapists, referenceData } from '@/lib/reference-data'
 import type { Appointment } from './types'
 
 export interface AppointmentWithDetails extends Appointment {
@@ -28,7 +30,7 @@ export async function getAppointmentsWithDetails(
     const startISO = startDate.toISOString()
     const endISO = endDate.toISOString()
 
-    console.log('🔍 getAppointmentsWithDetails called with:', {
+    logger.debug('🔍 getAppointmentsWithDetails called with:', {
       startDate: startISO,
       endDate: endISO,
       therapistId
@@ -55,7 +57,7 @@ export async function getAppointmentsWithDetails(
       return fallbackGetAppointmentsWithDetails(startDate, endDate, therapistId)
     }
 
-    console.log('📊 Query result:', {
+    logger.debug('📊 Query result:', {
       data: data?.length || 0,
       firstItem: data?.[0]
     })
@@ -99,21 +101,23 @@ async function fallbackGetAppointmentsWithDetails(
       throw apptError || new Error('No appointments found')
     }
 
-    // Get all related data in parallel
-    const [patientsResult, therapistsResult, servicesResult] = await Promise.all([
-      supabase.schema('cedro').from('users').select('id, name, email'),
-      supabase.schema('cedro').from('users').select('id, name'),
-      supabase.schema('cedro').from('services').select('id, name')
+    // Terapeutas e serviços vêm do cache de referência; pacientes só os da página
+    const patientIds = Array.from(new Set(appointments.map(apt => apt.patient_id).filter(Boolean)))
+    const [patientsResult, reference] = await Promise.all([
+      patientIds.length > 0
+        ? supabase.schema('cedro').from('patients').select('id, full_name, email').in('id', patientIds)
+        : Promise.resolve({ data: [] as Array<{ id: string; full_name: string; email: string | null }> }),
+      referenceData.get()
     ])
 
-    const patients = new Map(patientsResult.data?.map(p => [p.id, p]) || [])
-    const therapists = new Map(therapistsResult.data?.map(t => [t.id, t]) || [])
-    const services = new Map(servicesResult.data?.map(s => [s.id, s]) || [])
+    const patients = new Map((patientsResult.data || []).map(p => [p.id, p] as [string, typeof p]))
+    const therapists = new Map(reference.therapists.map(t => [t.id, t] as [string, typeof t]))
+    const services = new Map(reference.services.map(s => [s.id, s] as [string, typeof s]))
 
     // Enrich appointments with related data
     const enriched = appointments.map(apt => ({
       ...apt,
-      patient_name: patients.get(apt.patient_id)?.name,
+      patient_name: patients.get(apt.patient_id)?.full_name,
       patient_email: patients.get(apt.patient_id)?.email,
       therapist_name: therapists.get(apt.therapist_id)?.name,
       service_name: apt.service_id ? services.get(apt.service_id)?.name : null
@@ -131,18 +135,8 @@ async function fallbackGetAppointmentsWithDetails(
  */
 export async function getTherapistsList() {
   try {
-    const { data, error } = await supabase
-      .schema('cedro')
-      .from('users')
-      .select('id, name, email, role')
-      .in('role', ['therapist', 'admin'])
-      .order('name', { ascending: true })
-
-    if (error) {
-      throw api.errors.parseSupabaseError(error)
-    }
-
-    return (data || []) as Array<{
+    const therapists = await getReferenceTherapists()
+    return therapists.map(({ id, name, email, role }) => ({ id, name, email: email || undefined, role })) as Array<{
       id: string
       name: string
       email?: string
@@ -196,18 +190,11 @@ export async function getPatientsList() {
  */
 export async function getServicesList() {
   try {
-    const { data, error } = await supabase
-      .schema('cedro')
-      .from('services')
-      .select('id, name, description, default_duration_min, base_price_cents, active')
-      .eq('active', true)
-      .order('name', { ascending: true })
-
-    if (error) {
-      throw api.errors.parseSupabaseError(error)
-    }
-
-    return (data || []) as Array<{
+    const services = await getReferenceServices()
+    return services.map(service => ({
+      ...service,
+      description: service.description || undefined
+    })) as Array<{
       id: string
       name: string
       description?: string
@@ -8,7 +8,7 @@
 
 import { supabase } from '@/lib/supabase'
 import { api } from './client'
-import type { Appointment, AppointmentWithDetails } from './types'
+import type { Appointment, AppointmentSeries, AppointmentWithDetails } from './types'
 
 // ============ QUERIES ============
 
@@ -246,9 +246,55 @@ export async function updateAppointmentStatus(
   appointmentId: string,
   status: Appointment['status']
 ): Promise<Appointment> {
+  if (status === 'completed') {
+    // Conclusão também desconta a sessão do plano de cuidado (mesma transação)
+    await completeAppointments([appointmentId])
+    const appointment = await getAppointmentById(appointmentId)
+    if (!appointment) {
+      throw new api.errors.CedroApiError('Appointment not found', 'NOT_FOUND', 404)
+    }
+    return appointment
+  }
   return updateAppointment(appointmentId, { status })
 }
 
+export interface CompleteAppointmentsResult {
+  completed: number
+  care_plans: Array<{
+    care_plan_id: string
+    consumed_sessions: number
+    over_limit: number
+    remaining_sessions: number
+  }>
+}
+
+/**
+ * Complete appointments and consume their care plan sessions atomically
+ * (cedro.complete_appointments). Already completed appointments are skipped,
+ * so retries never consume a session twice.
+ */
+export async function completeAppointments(appointmentIds: string[]): Promise<CompleteAppointmentsResult> {
+  try {
+    const { data, error } = await supabase
+      .schema('cedro')
+      .rpc('complete_appointments', { p_appointment_ids: appointmentIds })
+
+    if (error) {
+      throw api.errors.parseSupabaseError(error)
+    }
+
+    return (data || { completed: 0, care_plans: [] }) as CompleteAppointmentsResult
+  } catch (error) {
+    const apiError = api.errors.parseSupabaseError(error)
+    throw new api.errors.CedroApiError(
+      apiError.message,
+      apiError.code,
+      apiError.status,
+      apiError.details
+    )
+  }
+}
+
 /**
  * Bulk update appointment status
  */
@@ -256,6 +302,11 @@ export async function bulkUpdateAppointmentStatus(
   appointmentIds: string[],
   status: Appointment['status']
 ): Promise<void> {
+  if (status === 'completed') {
+    await completeAppointments(appointmentIds)
+    return
+  }
+
   try {
     const { error } = await supabase
       .schema('cedro')
@@ -313,3 +364,142 @@ export async function getAppointmentsWithDetails(
     )
   }
 }
+
+// ============ RECURRING SERIES ============
+// Set-based RPCs (db/schema/appointment_series.sql): one statement per series
+// operation and a single Google Calendar queue entry per series.
+
+export interface CreateAppointmentSeriesInput {
+  therapist_id: string
+  first_start_at: string
+  duration_minutes: number
+  /** Defaults to the care plan's remaining sessions when omitted */
+  occurrences?: number
+  interval_weeks?: number
+  patient_id?: string | null
+  service_id?: string | null
+  care_plan_id?: string | null
+  summary?: string | null
+  notes?: string | null
+}
+
+/**
+ * Create a weekly series and all of its occurrences
+ * Returns the new series id
+ */
+export async function createAppointmentSeries(input: CreateAppointmentSeriesInput): Promise<string> {
+  try {
+    const { data, error } = await supabase
+      .schema('cedro')
+      .rpc('create_appointment_series', {
+        p_therapist_id: input.therapist_id,
+        p_first_start_at: input.first_start_at,
+        p_duration_minutes: input.duration_minutes,
+        p_occurrences: input.occurrences ?? null,
+        p_interval_weeks: input.interval_weeks ?? 1,
+        p_patient_id: input.patient_id ?? null,
+        p_service_id: input.service_id ?? null,
+        p_care_plan_id: input.care_plan_id ?? null,
+        p_summary: input.summary ?? null,
+        p_notes: input.notes ?? null
+      })
+
+    if (error) {
+      throw api.errors.parseSupabaseError(error)
+    }
+
+    return data as string
+  } catch (error) {
+    const apiError = api.errors.parseSupabaseError(error)
+    throw new api.errors.CedroApiError(
+      apiError.message,
+      apiError.code,
+      apiError.status,
+      apiError.details
+    )
+  }
+}
+
+/**
+ * Shift every active occurrence from `from` onwards by `offsetMinutes`
+ * Returns the number of shifted occurrences
+ */
+export async function shiftAppointmentSeries(
+  seriesId: string,
+  offsetMinutes: number,
+  from: string = new Date().toISOString()
+): Promise<number> {
+  try {
+    const { data, error } = await supabase
+      .schema('cedro')
+      .rpc('shift_appointment_series', {
+        p_series_id: seriesId,
+        p_offset: `${offsetMinutes} minutes`,
+        p_from: from
+      })
+
+    if (error) {
+      throw api.errors.parseSupabaseError(error)
+    }
+
+    return (data as number) || 0
+  } catch (error) {
+    const apiError = api.errors.parseSupabaseError(error)
+    throw new api.errors.CedroApiError(
+      apiError.message,
+      apiError.code,
+      apiError.status,
+      apiError.details
+    )
+  }
+}
+
+/**
+ * Cancel every active occurrence from `from` onwards
+ * Returns the number of cancelled occurrences
+ */
+export async function cancelAppointmentSeries(
+  seriesId: string,
+  from: string = new Date().toISOString()
+): Promise<number> {
+  try {
+    const { data, error } = await supabase
+      .schema('cedro')
+      .rpc('cancel_appointment_series', {
+        p_series_id: seriesId,
+        p_from: from
+      })
+
+    if (error) {
+      throw api.errors.parseSupabaseError(error)
+    }
+
+    return (data as number) || 0
+  } catch (error) {
+    const apiError = api.errors.parseSupabaseError(error)
+    throw new api.errors.CedroApiError(
+      apiError.message,
+      apiError.code,
+      apiError.status,
+      apiError.details
+    )
+  }
+}
+
+/**
+ * Get a series definition
+ */
+export async function getAppointmentSeriesById(seriesId: string): Promise<AppointmentSeries | null> {
+  return api.getById<AppointmentSeries>('appointment_series', seriesId)
+}
+
+/**
+ * Get all occurrences of a series
+ */
+export async function getAppointmentsBySeries(seriesId: string): Promise<Appointment[]> {
+  return api.executeQuery<Appointment>('appointments', {
+    columns: 'id, patient_id, therapist_id, service_id, care_plan_id, series_id, status, start_at, end_at, notes, created_at, updated_at',
+    filter: [{ key: 'series_id', value: seriesId }],
+    order: { column: 'start_at', ascending: true }
+  })
+}
@@ -91,16 +91,16 @@ export async function countActiveCarePlans(): Promise<number> {
 
 /**
  * Get care plans needing sessions
- * (active plans with used_sessions < total_sessions)
+ * (active plans with remaining_sessions > 0, partial index idx_care_plans_needing_sessions)
  */
 export async function getCarePlansNeedingSessions(): Promise<CarePlan[]> {
   try {
     const { data, error } = await supabase
       .schema('cedro')
       .from('care_plans')
-      .select('id, patient_id, therapist_id, service_id, plan_type, total_sessions, used_sessions, price_cents, discount_percent, status, created_at, updated_at')
+      .select('id, patient_id, therapist_id, service_id, plan_type, total_sessions, used_sessions, remaining_sessions, price_cents, discount_percent, status, created_at, updated_at')
       .eq('status', 'active')
-      .lt('used_sessions', 'total_sessions')
+      .gt('remaining_sessions', 0)
       .order('updated_at', { ascending: true })
 
     if (error) {
@@ -183,25 +183,17 @@ export async function updateCarePlan(
 
 /**
  * Consume a session from care plan
+ * Single conditional UPDATE (cedro.consume_care_plan_session): concurrent
+ * calls can't lose increments or go past total_sessions
  */
 export async function consumeSessionFromCarePlan(planId: string): Promise<CarePlan> {
-  try {
-    const plan = await getCarePlanById(planId)
-
-    if (!plan) {
-      throw new Error('Care plan not found')
-    }
+  const { data, error } = await supabase
+    .schema('cedro')
+    .rpc('consume_care_plan_session', { p_care_plan_id: planId })
 
-    if (plan.used_sessions >= plan.total_sessions) {
-      throw new Error('All sessions have been used')
-    }
-
-    return updateCarePlan(planId, {
-      used_sessions: plan.used_sessions + 1
-    })
-  } catch (error) {
-    if (error instanceof Error && (error.message === 'Care plan not found' || error.message === 'All sessions have been used')) {
-      throw error
+  if (error) {
+    if (error.message === 'Care plan not found' || error.message === 'All sessions have been used') {
+      throw new Error(error.message)
     }
     const apiError = api.errors.parseSupabaseError(error)
     throw new api.errors.CedroApiError(
@@ -211,6 +203,12 @@ export async function consumeSessionFromCarePlan(planId: string): Promise<CarePl
       apiError.details
     )
   }
+
+  const plan = Array.isArray(data) ? data[0] : data
+  if (!plan) {
+    throw new Error('Care plan not found')
+  }
+  return plan as CarePlan
 }
 
 /**
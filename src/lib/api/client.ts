@@ -1,9 +1,14 @@
 /**
  * CEDRO API Client
  * Wrapper around Supabase with error handling, logging, and retry logic
+ *
+ * Reads are coalesced (see ./loader): getById calls in the same tick become
+ * one `.in('id', ...)` query per table, and identical executeQuery/count
+ * requests in flight share one PostgREST round trip.
  */
 
 import { supabase } from '@/lib/supabase'
+import { BatchLoader, InflightRequests, requestKey } from './loader'
 import type { ApiError, PaginatedResponse } from './types'
 
 // ============ ERROR HANDLING ============
@@ -62,12 +67,31 @@ interface QueryOptions {
   offset?: number
 }
 
+const inflight = new InflightRequests()
+
+function toCedroApiError(error: unknown): CedroApiError {
+  if (error instanceof CedroApiError) {
+    return error
+  }
+  const apiError = parseSupabaseError(error)
+  return new CedroApiError(apiError.message, apiError.code, apiError.status, apiError.details)
+}
+
 /**
  * Build Supabase query with error handling
+ * Identical queries in flight share one request (each caller gets its own array)
  */
 async function executeQuery<T>(
   tableName: string,
   options: QueryOptions = {}
+): Promise<T[]> {
+  const rows = await inflight.run(requestKey('query', tableName, options), () => runQuery<T>(tableName, options))
+  return rows.slice()
+}
+
+async function runQuery<T>(
+  tableName: string,
+  options: QueryOptions
 ): Promise<T[]> {
   try {
     let query: any = supabase.schema('cedro').from(tableName)
@@ -136,34 +160,56 @@ async function executeQuery<T>(
   }
 }
 
+// Um loader por tabela + colunas: getById do mesmo tick vira um único SELECT ... IN
+const byIdLoaders = new Map<string, BatchLoader<string, any>>()
+
+function selectWithId(columns?: string): string {
+  if (!columns || columns.trim() === '*') return '*'
+  const names = columns.split(',').map(column => column.trim())
+  return names.indexOf('id') === -1 ? `id, ${columns}` : columns
+}
+
+function getByIdLoader(tableName: string, columns?: string): BatchLoader<string, any> {
+  const select = selectWithId(columns)
+  const key = `${tableName}|${select}`
+  let loader = byIdLoaders.get(key)
+
+  if (!loader) {
+    loader = new BatchLoader<string, any>(async (ids) => {
+      try {
+        const { data, error } = await supabase
+          .schema('cedro')
+          .from(tableName)
+          .select(select)
+          .in('id', ids)
+
+        if (error) {
+          throw error
+        }
+
+        return new Map((data || []).map((row: any) => [row.id, row] as [string, any]))
+      } catch (error) {
+        throw toCedroApiError(error)
+      }
+    })
+    byIdLoaders.set(key, loader)
+  }
+  return loader
+}
+
 /**
  * Get single record by ID
+ * Batched with other getById calls of the same tick (one request per table)
  */
 async function getById<T>(tableName: string, id: string, columns?: string): Promise<T | null> {
-  try {
-    let query: any = supabase.schema('cedro').from(tableName)
-
-    if (columns) {
-      query = query.select(columns)
-    } else {
-      query = query.select('*')
-    }
-
-    const { data, error } = await query.eq('id', id).maybeSingle()
-
-    if (error) {
-      const apiError = parseSupabaseError(error)
-      throw new CedroApiError(apiError.message, apiError.code, apiError.status, apiError.details)
-    }
+  return (await getByIdLoader(tableName, columns).load(id)) as T | null
+}
 
-    return (data || null) as T | null
-  } catch (error) {
-    if (error instanceof CedroApiError) {
-      throw error
-    }
-    const apiError = parseSupabaseError(error)
-    throw new CedroApiError(apiError.message, apiError.code, apiError.status, apiError.details)
-  }
+/**
+ * Get several records by ID in one request (missing ids resolve to null)
+ */
+async function getManyByIds<T>(tableName: string, ids: string[], columns?: string): Promise<Array<T | null>> {
+  return (await getByIdLoader(tableName, columns).loadMany(ids)) as Array<T | null>
 }
 
 /**
@@ -172,6 +218,13 @@ async function getById<T>(tableName: string, id: string, columns?: string): Prom
 async function count(
   tableName: string,
   filters?: { key: string; value: string; operator?: 'eq' | 'in' }[]
+): Promise<number> {
+  return inflight.run(requestKey('count', tableName, filters || []), () => runCount(tableName, filters))
+}
+
+async function runCount(
+  tableName: string,
+  filters?: { key: string; value: string; operator?: 'eq' | 'in' }[]
 ): Promise<number> {
   try {
     let query: any = supabase.schema('cedro').from(tableName).select('*', { count: 'exact', head: true })
@@ -286,6 +339,7 @@ async function deleteRecord(tableName: string, id: string): Promise<void> {
 export const api = {
   executeQuery,
   getById,
+  getManyByIds,
   count,
   insert,
   update,
@@ -0,0 +1,112 @@
+/**
+ * Request coalescing for the API client
+ *
+ * - BatchLoader: DataLoader-style batching. Every load() issued in the same
+ *   tick is merged into one batch call (e.g. one `.in('id', [...])` query
+ *   instead of one request per card); duplicate keys share one slot.
+ * - InflightRequests: identical requests already in flight share the same
+ *   promise instead of hitting PostgREST again.
+ *
+ * Only in-flight work is shared: settled results are not cached here
+ * (react-query owns caching), so a later call always sees fresh data.
+ */
+
+export type BatchFn<K, V> = (keys: K[]) => Promise<Map<K, V>>
+
+export interface BatchLoaderOptions {
+  /** Keys per batch call; PostgREST puts `in.(...)` in the URL */
+  maxBatchSize?: number
+}
+
+export const DEFAULT_MAX_BATCH_SIZE = 100
+
+export class BatchLoader<K, V> {
+  private queue: Array<{ key: K; resolve: (value: V | null) => void; reject: (error: unknown) => void }> = []
+  private pending = new Map<K, Promise<V | null>>()
+  private scheduled = false
+
+  constructor(private batchFn: BatchFn<K, V>, private options: BatchLoaderOptions = {}) {}
+
+  load(key: K): Promise<V | null> {
+    const inFlight = this.pending.get(key)
+    if (inFlight) return inFlight
+
+    const promise = new Promise<V | null>((resolve, reject) => {
+      this.queue.push({ key, resolve, reject })
+    })
+    this.pending.set(key, promise)
+
+    if (!this.scheduled) {
+      this.scheduled = true
+      // Microtask: junta todos os load() síncronos do mesmo tick
+      Promise.resolve().then(() => this.dispatch())
+    }
+    return promise
+  }
+
+  loadMany(keys: K[]): Promise<Array<V | null>> {
+    return Promise.all(keys.map((key) => this.load(key)))
+  }
+
+  private dispatch() {
+    this.scheduled = false
+    const queue = this.queue
+    this.queue = []
+
+    const maxBatchSize = this.options.maxBatchSize || DEFAULT_MAX_BATCH_SIZE
+    for (let start = 0; start < queue.length; start += maxBatchSize) {
+      this.runBatch(queue.slice(start, start + maxBatchSize))
+    }
+  }
+
+  private async runBatch(batch: BatchLoader<K, V>['queue']) {
+    const settle = (key: K) => this.pending.delete(key)
+
+    try {
+      const results = await this.batchFn(batch.map((item) => item.key))
+      batch.forEach((item) => {
+        settle(item.key)
+        item.resolve(results.has(item.key) ? (results.get(item.key) as V) : null)
+      })
+    } catch (error) {
+      batch.forEach((item) => {
+        settle(item.key)
+        item.reject(error)
+      })
+    }
+  }
+}
+
+export class InflightRequests {
+  private requests = new Map<string, Promise<unknown>>()
+
+  /** Runs fn, or joins the identical request (same key) already in flight */
+  run<T>(key: string, fn: () => Promise<T>): Promise<T> {
+    const existing = this.requests.get(key)
+    if (existing) return existing as Promise<T>
+
+    const promise = fn()
+    this.requests.set(key, promise)
+    const clear = () => {
+      if (this.requests.get(key) === promise) this.requests.delete(key)
+    }
+    promise.then(clear, clear)
+    return promise
+  }
+
+  get size(): number {
+    return this.requests.size
+  }
+}
+
+/** Stable key for a request description (object keys sorted) */
+export function requestKey(...parts: unknown[]): string {
+  return JSON.stringify(parts, (_key, value) =>
+    value && typeof value === 'object' && !Array.isArray(value)
+      ? Object.keys(value).sort().reduce((sorted: Record<string, unknown>, name) => {
+          sorted[name] = value[name]
+          return sorted
+        }, {})
+      : value
+  )
+}
@@ -69,6 +69,7 @@ export interface Appointment extends Timestamps {
   origin_message_id: string | null
   notes: string | null
   meet_link: string | null
+  series_id: string | null
 
   // Google Calendar / Sync fields
   summary: string | null
@@ -82,6 +83,23 @@ export interface Appointment extends Timestamps {
   gcal_etag: string | null
 }
 
+export interface AppointmentSeries extends Timestamps {
+  id: string
+  therapist_id: string
+  patient_id: string | null
+  service_id: string | null
+  care_plan_id: string | null
+  first_start_at: string
+  duration_minutes: number
+  interval_weeks: number
+  occurrences: number
+  status: 'active' | 'cancelled'
+  summary: string | null
+  notes: string | null
+  external_event_id: string | null
+  external_calendar_id: string | null
+}
+
 export interface AppointmentWithDetails extends Appointment {
   patient?: Patient
   therapist?: User
@@ -206,6 +224,8 @@ export interface CarePlan extends Timestamps {
   plan_type: 'avulsa' | '4' | '10' | 'quinzenal'
   total_sessions: number
   used_sessions: number
+  /** Generated column: total_sessions - used_sessions */
+  remaining_sessions?: number
   price_cents: number
   discount_percent: number
   status: 'active' | 'paused' | 'ended'
@@ -237,6 +257,8 @@ export interface Invoice extends Timestamps {
   contract_generated_at: string | null
   contract_status: string
   contract_id: string | null
+  /** Month billed by run_monthly_billing (YYYY-MM-01); null for one-off invoices */
+  billing_period?: string | null
 }
 
 export interface InvoiceWithDetails extends Invoice {
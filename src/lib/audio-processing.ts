@@ -3,6 +3,7 @@ import { promisify } from 'util'
 import { writeFile, unlink, readFile } from 'fs/promises'
 import { join } from 'path'
 import { tmpdir } from 'os'
+import { timeStage } from './metrics'
 
 const execAsync = promisify(exec)
 
@@ -10,6 +11,11 @@ const execAsync = promisify(exec)
 export const CHUNK_DURATION_MINUTES = 20
 export const CHUNK_DURATION_SECONDS = CHUNK_DURATION_MINUTES * 60
 export const SAMPLE_RATE = 44100
+// Inputs already at or below these are sent to Whisper as they are
+export const WHISPER_MAX_SAMPLE_RATE = 16000
+export const WHISPER_MAX_SPEECH_BITRATE = 48000
+// Long-term storage format for finalized sessions (audio-retention cron)
+export const ARCHIVE_BITRATE = 16000
 
 export interface AudioChunk {
   buffer: Buffer
@@ -51,9 +57,9 @@ export async function splitAudioIntoChunks(
       const outputFile = join(tempDir, `chunk_${i}_${Date.now()}.mp3`)
 
       try {
-        await execAsync(
+        await timeStage('ffmpeg_split_chunk', () => execAsync(
           `ffmpeg -i "${inputFile}" -ss ${startTime} -t ${chunkDurationSeconds} -acodec mp3 -y "${outputFile}"`
-        )
+        ))
 
         const chunkBuffer = await readFile(outputFile)
         chunks.push(chunkBuffer)
@@ -77,8 +83,36 @@ export async function splitAudioIntoChunks(
   }
 }
 
+// Whether a file can go to Whisper without re-encoding: mono speech-rate
+// Opus (what the browser now uploads) or an already downsampled MP3.
+// Opus always reports 48 kHz, so its bitrate is the speech indicator
+// (MediaRecorder WebM has no duration, so ffprobe may not know it: accept).
+export function isWhisperReady(metadata: {
+  codec: string
+  sampleRate: number
+  channels: number
+  bitrate: number
+}): boolean {
+  if (metadata.channels !== 1) return false
+  if (metadata.codec === 'opus') {
+    return metadata.bitrate === 0 || metadata.bitrate <= WHISPER_MAX_SPEECH_BITRATE
+  }
+  if (metadata.codec === 'mp3') {
+    return metadata.sampleRate > 0 && metadata.sampleRate <= WHISPER_MAX_SAMPLE_RATE
+  }
+  return false
+}
+
 // Convert audio to format suitable for Whisper
 export async function convertAudioForWhisper(audioBuffer: Buffer, originalFormat: string = 'webm'): Promise<Buffer> {
+  try {
+    if (isWhisperReady(await getAudioMetadata(audioBuffer, originalFormat))) {
+      return audioBuffer
+    }
+  } catch (probeError) {
+    console.warn('Could not probe audio, converting anyway:', probeError)
+  }
+
   const tempDir = tmpdir()
   const inputFile = join(tempDir, `input_${Date.now()}.${originalFormat}`)
   const outputFile = join(tempDir, `output_${Date.now()}.mp3`)
@@ -88,9 +122,9 @@ export async function convertAudioForWhisper(audioBuffer: Buffer, originalFormat
     await writeFile(inputFile, audioBuffer)
 
     // Convert to MP3 format suitable for Whisper
-    await execAsync(
+    await timeStage('ffmpeg_convert_whisper', () => execAsync(
       `ffmpeg -i "${inputFile}" -acodec mp3 -ar ${SAMPLE_RATE} -ac 1 "${outputFile}"`
-    )
+    ))
 
     // Read converted file
     const convertedBuffer = await readFile(outputFile)
@@ -109,6 +143,50 @@ export async function convertAudioForWhisper(audioBuffer: Buffer, originalFormat
   }
 }
 
+// Cut [startSeconds, startSeconds + durationSeconds) from a file on disk and
+// encode it for Whisper (16 kHz mono MP3, enough for speech)
+export async function extractSegmentForWhisper(
+  inputFile: string,
+  startSeconds: number,
+  durationSeconds: number
+): Promise<Buffer> {
+  const outputFile = join(tmpdir(), `segment_${Date.now()}_${Math.round(startSeconds)}.mp3`)
+
+  try {
+    await timeStage('ffmpeg_live_segment', () => execAsync(
+      `ffmpeg -ss ${startSeconds.toFixed(3)} -t ${durationSeconds.toFixed(3)} -i "${inputFile}" -vn -acodec mp3 -ar 16000 -ac 1 -y "${outputFile}"`
+    ))
+
+    return await readFile(outputFile)
+  } catch (error) {
+    console.error('Error extracting audio segment:', error)
+    throw new Error('Failed to extract audio segment')
+  } finally {
+    try {
+      await unlink(outputFile)
+    } catch (cleanupError) {
+      console.warn('Failed to clean up segment file:', cleanupError)
+    }
+  }
+}
+
+// Re-encode a file on disk to the archive format (16 kHz mono Opus in Ogg,
+// voice-tuned); still fine for re-transcription. Returns the output path.
+export async function encodeAudioForArchive(inputFile: string): Promise<string> {
+  const outputFile = join(tmpdir(), `archive_${Date.now()}_${Math.random().toString(36).slice(2)}.ogg`)
+
+  try {
+    await timeStage('ffmpeg_archive', () => execAsync(
+      `ffmpeg -i "${inputFile}" -vn -ac 1 -ar 16000 -c:a libopus -b:a ${ARCHIVE_BITRATE} -application voip -y "${outputFile}"`
+    ))
+    return outputFile
+  } catch (error) {
+    console.error('Error encoding audio for archive:', error)
+    await unlink(outputFile).catch(() => {})
+    throw new Error('Failed to encode audio for archive')
+  }
+}
+
 // Validate audio file
 export function validateAudioBuffer(buffer: Buffer): boolean {
   // Basic validation - check if buffer has content and starts with valid audio headers
@@ -150,6 +228,7 @@ export function validateAudioBuffer(buffer: Buffer): boolean {
 // Get audio metadata
 export async function getAudioMetadata(audioBuffer: Buffer, originalFormat: string = 'webm'): Promise<{
   duration: number
+  codec: string
   sampleRate: number
   channels: number
   bitrate: number
@@ -169,9 +248,10 @@ export async function getAudioMetadata(audioBuffer: Buffer, originalFormat: stri
 
     return {
       duration: parseFloat(metadata.format.duration || '0'),
+      codec: audioStream?.codec_name || '',
       sampleRate: parseInt(audioStream?.sample_rate || '0'),
       channels: parseInt(audioStream?.channels || '0'),
-      bitrate: parseInt(metadata.format.bit_rate || '0')
+      bitrate: parseInt(audioStream?.bit_rate || metadata.format.bit_rate || '0')
     }
   } catch (error) {
     console.error('Error getting audio metadata:', error)
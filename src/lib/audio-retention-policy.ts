@@ -0,0 +1,107 @@
+/**
+ * Audio retention policy (pure)
+ *
+ * Decides which stored audio objects get re-encoded to the archive format and
+ * which are orphans that can be deleted. Execution lives in audio-retention.ts.
+ *
+ * - Archive: every recording_job pointing at the object has produced a
+ *   medical record (record_id set, status completed*) and is older than
+ *   archiveAfterDays. Objects are content-addressed and may be shared by
+ *   several jobs, so candidates are grouped by object key.
+ * - Orphan: no recording_job references the object and it was last modified
+ *   more than orphanGraceHours ago (uploads store the object before the job
+ *   row points at it).
+ */
+
+export const DEFAULT_ARCHIVE_AFTER_DAYS = 30
+export const DEFAULT_ORPHAN_GRACE_HOURS = 24
+
+const DAY_MS = 24 * 60 * 60 * 1000
+const HOUR_MS = 60 * 60 * 1000
+
+const FINAL_STATUSES = new Set(['completed', 'completed_with_errors'])
+
+export interface RetentionJob {
+  id: string
+  status: string
+  record_id: string | null
+  created_at: string
+  audio_archived_at: string | null
+  /** Object key resolved from audio_storage_url */
+  object_key: string
+}
+
+export interface RetentionObject {
+  key: string
+  size: number
+  lastModified: Date | null
+}
+
+export interface ArchiveCandidate {
+  key: string
+  jobIds: string[]
+  /** False when the object is already in archive format (shared with an archived job) */
+  reencode: boolean
+}
+
+function isFinalized(job: RetentionJob): boolean {
+  return !!job.record_id && FINAL_STATUSES.has(job.status)
+}
+
+/**
+ * Objects to archive, oldest first. `limit` bounds the ffmpeg work per run.
+ */
+export function selectArchiveCandidates(
+  jobs: RetentionJob[],
+  options: { archiveAfterDays?: number; limit?: number; now?: number } = {}
+): ArchiveCandidate[] {
+  const { archiveAfterDays = DEFAULT_ARCHIVE_AFTER_DAYS, limit = Infinity, now = Date.now() } = options
+  const cutoff = now - archiveAfterDays * DAY_MS
+
+  const byKey = new Map<string, RetentionJob[]>()
+  for (const job of jobs) {
+    const group = byKey.get(job.object_key)
+    if (group) group.push(job)
+    else byKey.set(job.object_key, [job])
+  }
+
+  const candidates: Array<ArchiveCandidate & { newest: number }> = []
+  byKey.forEach((group, key) => {
+    const pending = group.filter((job) => !job.audio_archived_at)
+    if (pending.length === 0) return
+    if (!group.every((job) => isFinalized(job) && Date.parse(job.created_at) < cutoff)) return
+
+    candidates.push({
+      key,
+      jobIds: pending.map((job) => job.id),
+      reencode: pending.length === group.length,
+      newest: Math.max(...group.map((job) => Date.parse(job.created_at)))
+    })
+  })
+
+  return candidates
+    .sort((a, b) => a.newest - b.newest)
+    .slice(0, limit)
+    .map(({ key, jobIds, reencode }) => ({ key, jobIds, reencode }))
+}
+
+/**
+ * Stored objects that no job references and that are past the grace period.
+ * Objects without a modification time are kept.
+ */
+export function selectOrphans(
+  objects: RetentionObject[],
+  referencedKeys: Set<string>,
+  options: { orphanGraceHours?: number; limit?: number; now?: number } = {}
+): RetentionObject[] {
+  const { orphanGraceHours = DEFAULT_ORPHAN_GRACE_HOURS, limit = Infinity, now = Date.now() } = options
+  const cutoff = now - orphanGraceHours * HOUR_MS
+
+  return objects
+    .filter((object) =>
+      !referencedKeys.has(object.key) &&
+      object.lastModified !== null &&
+      object.lastModified.getTime() < cutoff
+    )
+    .slice(0, limit)
+}
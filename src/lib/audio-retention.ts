@@ -0,0 +1,185 @@
+/**
+ * Audio retention job (server-only, run by /api/cron/audio-retention)
+ *
+ * Applies audio-retention-policy to the storage backend: re-encodes audio of
+ * finalized sessions to the archive format (encodeAudioForArchive), repoints
+ * the recording_jobs rows at the new object and deletes orphaned objects.
+ * Every run reports the bytes it reclaimed and is logged in
+ * cedro.audio_retention_runs.
+ */
+
+import type { SupabaseClient } from '@supabase/supabase-js'
+import { writeFile, unlink } from 'fs/promises'
+import { join } from 'path'
+import { tmpdir } from 'os'
+import { encodeAudioForArchive } from './audio-processing'
+import {
+  DEFAULT_ARCHIVE_AFTER_DAYS,
+  DEFAULT_ORPHAN_GRACE_HOURS,
+  selectArchiveCandidates,
+  selectOrphans,
+  type RetentionJob
+} from './audio-retention-policy'
+import { deleteAudioFile, downloadAudioFile, listAudioFiles, objectKeyFor, storeAudio } from './storage'
+
+const JOBS_PAGE_SIZE = 1000
+const DEFAULT_ARCHIVE_LIMIT = 10 // ffmpeg is the expensive part: bound it per run
+const DEFAULT_ORPHAN_LIMIT = 500
+
+export interface AudioRetentionOptions {
+  dryRun?: boolean
+  archiveAfterDays?: number
+  orphanGraceHours?: number
+  archiveLimit?: number
+  orphanLimit?: number
+}
+
+export interface AudioRetentionReport {
+  dryRun: boolean
+  archived: Array<{ key: string; newKey: string; jobIds: string[]; originalBytes: number; archivedBytes: number }>
+  deletedOrphans: Array<{ key: string; size: number }>
+  reclaimedBytes: number
+  errors: Array<{ key: string; error: string }>
+}
+
+export function retentionOptionsFromEnv(): AudioRetentionOptions {
+  return {
+    archiveAfterDays: Number(process.env.AUDIO_ARCHIVE_AFTER_DAYS) || DEFAULT_ARCHIVE_AFTER_DAYS,
+    orphanGraceHours: Number(process.env.AUDIO_ORPHAN_GRACE_HOURS) || DEFAULT_ORPHAN_GRACE_HOURS
+  }
+}
+
+async function loadJobsWithAudio(supabase: SupabaseClient<any, any, any>): Promise<RetentionJob[]> {
+  const jobs: RetentionJob[] = []
+
+  for (let from = 0; ; from += JOBS_PAGE_SIZE) {
+    const { data, error } = await supabase
+      .from('recording_jobs')
+      .select('id, status, record_id, created_at, audio_archived_at, audio_storage_url')
+      .not('audio_storage_url', 'is', null)
+      .order('id')
+      .range(from, from + JOBS_PAGE_SIZE - 1)
+
+    if (error) throw new Error(`Failed to load recording jobs: ${error.message}`)
+
+    for (const row of data || []) {
+      jobs.push({
+        id: row.id,
+        status: row.status,
+        record_id: row.record_id,
+        created_at: row.created_at,
+        audio_archived_at: row.audio_archived_at,
+        object_key: objectKeyFor(row.audio_storage_url)
+      })
+    }
+
+    if (!data || data.length < JOBS_PAGE_SIZE) break
+  }
+
+  return jobs
+}
+
+async function archiveObject(key: string) {
+  const inputFile = join(tmpdir(), `retention_${Date.now()}_${Math.random().toString(36).slice(2)}`)
+  let outputFile: string | null = null
+
+  try {
+    await writeFile(inputFile, await downloadAudioFile(key))
+    outputFile = await encodeAudioForArchive(inputFile)
+    return await storeAudio({ path: outputFile }, { fileName: 'arquivo.ogg', contentType: 'audio/ogg' })
+  } finally {
+    await unlink(inputFile).catch(() => {})
+    if (outputFile) await unlink(outputFile).catch(() => {})
+  }
+}
+
+/**
+ * Runs one retention pass. With dryRun nothing is written; the report lists
+ * what would be archived/deleted and the orphan bytes that would be reclaimed.
+ */
+export async function runAudioRetention(
+  supabase: SupabaseClient<any, any, any>,
+  options: AudioRetentionOptions = {}
+): Promise<AudioRetentionReport> {
+  const {
+    dryRun = false,
+    archiveLimit = DEFAULT_ARCHIVE_LIMIT,
+    orphanLimit = DEFAULT_ORPHAN_LIMIT
+  } = options
+
+  const report: AudioRetentionReport = { dryRun, archived: [], deletedOrphans: [], reclaimedBytes: 0, errors: [] }
+
+  // Objects first: anything uploaded after this listing is simply not considered
+  const objects = await listAudioFiles()
+  const sizes = new Map(objects.map((object) => [object.key, object.size] as [string, number]))
+  const jobs = await loadJobsWithAudio(supabase)
+
+  // 1. Archive audio of finalized sessions
+  const candidates = selectArchiveCandidates(jobs, { archiveAfterDays: options.archiveAfterDays, limit: archiveLimit })
+  const replacedKeys = new Map<string, string>()
+
+  for (const candidate of candidates) {
+    const originalBytes = sizes.get(candidate.key) || 0
+
+    if (dryRun) {
+      report.archived.push({ key: candidate.key, newKey: candidate.key, jobIds: candidate.jobIds, originalBytes, archivedBytes: originalBytes })
+      continue
+    }
+
+    try {
+      let target = { url: '', key: candidate.key, size: originalBytes }
+      if (candidate.reencode) {
+        const archived = await archiveObject(candidate.key)
+        // Already small (e.g. browser-encoded Opus): keep the original object
+        if (archived.size < originalBytes) target = archived
+        else if (!archived.deduplicated) await deleteAudioFile(archived.key)
+      }
+
+      const { error } = await supabase
+        .from('recording_jobs')
+        .update({
+          ...(target.url ? { audio_storage_url: target.url } : {}),
+          audio_archived_at: new Date().toISOString(),
+          audio_original_bytes: originalBytes,
+          audio_archived_bytes: target.size,
+          updated_at: new Date().toISOString()
+        })
+        .in('id', candidate.jobIds)
+
+      if (error) throw new Error(`Failed to update recording jobs: ${error.message}`)
+
+      if (target.key !== candidate.key) {
+        await deleteAudioFile(candidate.key)
+        replacedKeys.set(candidate.key, target.key)
+        report.reclaimedBytes += originalBytes - target.size
+      }
+
+      report.archived.push({ key: candidate.key, newKey: target.key, jobIds: candidate.jobIds, originalBytes, archivedBytes: target.size })
+    } catch (error) {
+      report.errors.push({ key: candidate.key, error: error instanceof Error ? error.message : String(error) })
+    }
+  }
+
+  // 2. Delete orphans (keys replaced above are already gone)
+  const referenced = new Set<string>()
+  jobs.forEach((job) => referenced.add(replacedKeys.get(job.object_key) || job.object_key))
+  replacedKeys.forEach((newKey) => referenced.add(newKey))
+
+  const orphans = selectOrphans(
+    objects.filter((object) => !replacedKeys.has(object.key)),
+    referenced,
+    { orphanGraceHours: options.orphanGraceHours, limit: orphanLimit }
+  )
+
+  for (const orphan of orphans) {
+    try {
+      if (!dryRun) await deleteAudioFile(orphan.key)
+      report.deletedOrphans.push({ key: orphan.key, size: orphan.size })
+      report.reclaimedBytes += orphan.size
+    } catch (error) {
+      report.errors.push({ key: orphan.key, error: error instanceof Error ? error.message : String(error) })
+    }
+  }
+
+  return report
+}
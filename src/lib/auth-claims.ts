@@ -0,0 +1,119 @@
+/**
+ * Cedro claims embedded in the Supabase access token
+ *
+ * cedro.custom_access_token_hook (db/schema/jwt_custom_claims.sql) adds
+ * `cedro_user_id` and `cedro_role` to every JWT it issues, so identity and
+ * role checks can read the token instead of querying cedro.users.
+ * Isomorphic: used by src/lib/auth.ts (browser) and src/lib/supabase/server.ts.
+ */
+
+export type CedroRole = 'admin' | 'therapist' | 'patient'
+
+const CEDRO_ROLES: CedroRole[] = ['admin', 'therapist', 'patient']
+
+export interface CedroClaims {
+  /** auth.users id (JWT `sub`) */
+  authUserId: string
+  /** cedro.users id; differs from authUserId only for legacy, unmigrated users */
+  userId: string
+  role: CedroRole
+  email: string | null
+  /** Token expiry, epoch seconds */
+  expiresAt: number
+}
+
+/**
+ * Reads the Cedro claims from a decoded JWT payload.
+ * Returns null when the hook is not enabled or the user has no cedro.users row.
+ */
+export function claimsFromJwtPayload(payload: Record<string, any> | null | undefined): CedroClaims | null {
+  if (!payload || typeof payload.sub !== 'string') return null
+  if (typeof payload.cedro_user_id !== 'string') return null
+  if (CEDRO_ROLES.indexOf(payload.cedro_role) === -1) return null
+
+  return {
+    authUserId: payload.sub,
+    userId: payload.cedro_user_id,
+    role: payload.cedro_role,
+    email: typeof payload.email === 'string' ? payload.email : null,
+    expiresAt: Number(payload.exp) || 0
+  }
+}
+
+/**
+ * Decodes (without verifying) the payload of a JWT. Only for tokens that were
+ * already verified or that come from the local Supabase session.
+ */
+export function decodeJwtPayload(token: string | null | undefined): Record<string, any> | null {
+  const segment = token?.split('.')[1]
+  if (!segment) return null
+
+  try {
+    const base64 = segment.replace(/-/g, '+').replace(/_/g, '/')
+    const padded = base64 + '='.repeat((4 - (base64.length % 4)) % 4)
+    const json = typeof atob === 'function'
+      ? decodeURIComponent(Array.prototype.map.call(atob(padded), (char: string) =>
+          '%' + ('00' + char.charCodeAt(0).toString(16)).slice(-2)
+        ).join(''))
+      : Buffer.from(padded, 'base64').toString('utf8')
+    return JSON.parse(json)
+  } catch {
+    return null
+  }
+}
+
+/**
+ * Small session-scoped cache: one value per key (e.g. user + role), shared
+ * by concurrent callers while it loads, expiring at `expiresAt` (epoch ms).
+ * Failed loads are not cached.
+ */
+export class SessionCache<T> {
+  private entries = new Map<string, { value: Promise<T>; expiresAt: number; owner: string }>()
+
+  constructor(private maxEntries: number = 500) {}
+
+  get(
+    key: string,
+    load: () => Promise<T>,
+    options: { owner: string; expiresAt?: number; now?: number }
+  ): Promise<T> {
+    const now = options.now ?? Date.now()
+    const cached = this.entries.get(key)
+    if (cached && cached.expiresAt > now) return cached.value
+
+    const value = load()
+    this.entries.set(key, { value, expiresAt: options.expiresAt ?? Infinity, owner: options.owner })
+    value.catch(() => {
+      if (this.entries.get(key)?.value === value) this.entries.delete(key)
+    })
+    this.evict(now)
+    return value
+  }
+
+  /** Drops every entry of one user (e.g. after a role change), or everything */
+  invalidate(owner?: string): void {
+    if (owner === undefined) {
+      this.entries.clear()
+      return
+    }
+    this.entries.forEach((entry, key) => {
+      if (entry.owner === owner) this.entries.delete(key)
+    })
+  }
+
+  get size(): number {
+    return this.entries.size
+  }
+
+  private evict(now: number) {
+    if (this.entries.size <= this.maxEntries) return
+    this.entries.forEach((entry, key) => {
+      if (entry.expiresAt <= now) this.entries.delete(key)
+    })
+    // Ainda cheio: remove as entradas mais antigas (ordem de inserção do Map)
+    const keys = Array.from(this.entries.keys())
+    for (let i = 0; this.entries.size > this.maxEntries && i < keys.length; i++) {
+      this.entries.delete(keys[i])
+    }
+  }
+}
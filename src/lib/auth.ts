@@ -1,11 +1,13 @@
 import { supabase } from './supabase'
-import { User } from '@supabase/supabase-js'
+import { logger } from './logger'
+import { Session, User } from '@supabase/supabase-js'
+import { claimsFromJwtPayload, decodeJwtPayload, SessionCache, type CedroClaims, type CedroRole } from './auth-claims'
 
 export type CedroUser = {
   id: string
   email: string
   name: string
-  role: 'admin' | 'therapist' | 'patient'
+  role: CedroRole
   phone: string | null
   created_at: string
   updated_at: string
@@ -17,15 +19,15 @@ export type CedroUser = {
  */
 export async function mapAuthUserToCedroUser(authUser: User): Promise<CedroUser | null> {
   try {
-    console.log('🔍 Starting mapAuthUserToCedroUser for:', { 
+    logger.debug('🔍 Starting mapAuthUserToCedroUser for:', { 
       id: authUser.id, 
       email: authUser.email,
       aud: authUser.aud,
       role: authUser.role
     })
 
-    console.log('🔍 AuthUser object details:', authUser)
-    console.log('🔍 AuthUser email check:', {
+    logger.debug('🔍 AuthUser object details:', authUser)
+    logger.debug('🔍 AuthUser email check:', {
       email: authUser.email,
       hasEmail: !!authUser.email,
       emailType: typeof authUser.email
@@ -36,10 +38,10 @@ export async function mapAuthUserToCedroUser(authUser: User): Promise<CedroUser
       return null
     }
 
-    console.log('✅ Email validated, proceeding with user lookup...')
+    logger.debug('✅ Email validated, proceeding with user lookup...')
 
     // First, try to find existing user by email
-    console.log('📡 Querying cedro.users for email:', authUser.email)
+    logger.debug('📡 Querying cedro.users for email:', authUser.email)
 
     // Query only necessary columns to improve performance
     const queryPromise = supabase
@@ -58,13 +60,13 @@ export async function mapAuthUserToCedroUser(authUser: User): Promise<CedroUser
       const result = await Promise.race([queryPromise, timeoutPromise]) as any
       existingUser = result.data
       fetchError = result.error
-      console.log('📊 Query completed successfully')
+      logger.debug('📊 Query completed successfully')
     } catch (timeoutError) {
       console.error('⏰ Query timeout or error:', timeoutError)
       return null
     }
 
-    console.log('📊 Existing user query result:', { 
+    logger.debug('📊 Existing user query result:', { 
       existingUser: existingUser ? { id: existingUser.id, email: existingUser.email, role: existingUser.role } : null, 
       fetchError: fetchError ? { code: fetchError.code, message: fetchError.message } : null 
     })
@@ -98,7 +100,7 @@ export async function mapAuthUserToCedroUser(authUser: User): Promise<CedroUser
             // Fallback: return existing user, but warn about instability
             console.warn('⚠️ Returning mismatched user due to migration failure. Application may be unstable.')
           } else {
-            console.log('✅ User migration successful:', migrationResult)
+            logger.debug('✅ User migration successful:', migrationResult)
             // Update the ID in the object we're about to return
             // This ensures the session immediately uses the correct, new ID
             existingUser.id = authUser.id
@@ -108,7 +110,7 @@ export async function mapAuthUserToCedroUser(authUser: User): Promise<CedroUser
         }
       }
 
-      console.log('✅ Found existing user, returning:', { id: existingUser.id, email: existingUser.email, role: existingUser.role })
+      logger.debug('✅ Found existing user, returning:', { id: existingUser.id, email: existingUser.email, role: existingUser.role })
       return existingUser as CedroUser
     }
 
@@ -121,7 +123,7 @@ export async function mapAuthUserToCedroUser(authUser: User): Promise<CedroUser
       phone: authUser.user_metadata?.phone || null,
     }
 
-    console.log('🆕 Creating new user:', newUser)
+    logger.debug('🆕 Creating new user:', newUser)
 
     // Add timeout to creation query
     const createPromise = supabase
@@ -140,13 +142,13 @@ export async function mapAuthUserToCedroUser(authUser: User): Promise<CedroUser
       const result = await Promise.race([createPromise, createTimeoutPromise]) as any
       createdUser = result.data
       createError = result.error
-      console.log('📊 User creation query completed')
+      logger.debug('📊 User creation query completed')
     } catch (timeoutError) {
       console.error('⏰ User creation timeout or error:', timeoutError)
       return null
     }
 
-    console.log('📝 User creation result:', { 
+    logger.debug('📝 User creation result:', { 
       createdUser: createdUser ? { id: createdUser.id, email: createdUser.email, role: createdUser.role } : null, 
       createError: createError ? { code: createError.code, message: createError.message } : null 
     })
@@ -156,7 +158,7 @@ export async function mapAuthUserToCedroUser(authUser: User): Promise<CedroUser
       return null
     }
 
-    console.log('✅ Successfully created user, returning:', { id: createdUser.id, email: createdUser.email, role: createdUser.role })
+    logger.debug('✅ Successfully created user, returning:', { id: createdUser.id, email: createdUser.email, role: createdUser.role })
     return createdUser as CedroUser
   } catch (error) {
     console.error('❌ CRITICAL ERROR in mapAuthUserToCedroUser:', error)
@@ -169,36 +171,101 @@ export async function mapAuthUserToCedroUser(authUser: User): Promise<CedroUser
   }
 }
 
+// Perfil do cedro.users por sessão: chave = usuário + papel do token, então
+// um token novo com outro papel (troca de papel) nunca reaproveita o perfil antigo
+const cedroUserCache = new SessionCache<CedroUser | null>(20)
+let staleClaimsKey: string | null = null
+
+/**
+ * Cedro id and role from the current access token (no network or database
+ * round trip). Null when signed out or when the access token hook is not enabled.
+ */
+export async function getCedroClaims(): Promise<CedroClaims | null> {
+  const { data: { session } } = await supabase.auth.getSession()
+  return claimsFromJwtPayload(decodeJwtPayload(session?.access_token))
+}
+
 /**
  * Gets the current authenticated user's cedro.users record
+ * Cached for the session; concurrent callers share one lookup
  */
 export async function getCurrentCedroUser(): Promise<CedroUser | null> {
   try {
-    const { data: { user: authUser } } = await supabase.auth.getUser()
-    
-    if (!authUser) {
-      return null
-    }
-
-    return await mapAuthUserToCedroUser(authUser)
+    const { data: { session } } = await supabase.auth.getSession()
+    return await getCedroUserForSession(session)
   } catch (error) {
     console.error('Error getting current cedro user:', error)
     return null
   }
 }
 
+/**
+ * Same as getCurrentCedroUser for a session already at hand (auth state
+ * listeners must not call back into supabase.auth)
+ */
+export async function getCedroUserForSession(session: Session | null): Promise<CedroUser | null> {
+  const authUser = session?.user
+  if (!session || !authUser) {
+    return null
+  }
+
+  const claims = claimsFromJwtPayload(decodeJwtPayload(session.access_token))
+  const key = `${authUser.id}:${claims ? `${claims.userId}:${claims.role}` : 'no-claims'}`
+
+  const user = await cedroUserCache.get(key, () => mapAuthUserToCedroUser(authUser), { owner: authUser.id })
+  if (!user) {
+    // Não guarda falhas (timeout, erro de rede): próxima chamada tenta de novo
+    cedroUserCache.invalidate(authUser.id)
+  } else if (claims && claims.role !== user.role && staleClaimsKey !== key) {
+    // Papel mudou no banco depois da emissão do token: pede um token novo (uma vez)
+    staleClaimsKey = key
+    void refreshCedroClaims()
+  }
+  return user
+}
+
+/**
+ * Drops the cached profile (all users, or one auth user id).
+ * Call on sign out and after changing a user's role.
+ */
+export function invalidateCedroUserCache(authUserId?: string): void {
+  cedroUserCache.invalidate(authUserId)
+}
+
+/**
+ * Re-issues the access token so it carries the current cedro_role
+ * (the hook runs on every refresh) and drops the cached profile
+ */
+export async function refreshCedroClaims(): Promise<CedroClaims | null> {
+  invalidateCedroUserCache()
+  const { data: { session }, error } = await supabase.auth.refreshSession()
+  if (error) {
+    console.error('Error refreshing session claims:', error)
+    return null
+  }
+  return claimsFromJwtPayload(decodeJwtPayload(session?.access_token))
+}
+
+async function currentRole(): Promise<CedroUser['role'] | null> {
+  const claims = await getCedroClaims()
+  if (claims) return claims.role
+
+  // Hook ainda não habilitado: cai no perfil (em cache após a primeira consulta)
+  const user = await getCurrentCedroUser()
+  return user?.role ?? null
+}
+
 /**
  * Checks if the current user has the required role
  */
 export async function hasRole(requiredRole: CedroUser['role']): Promise<boolean> {
-  const user = await getCurrentCedroUser()
-  return user?.role === requiredRole
+  return (await currentRole()) === requiredRole
 }
 
 /**
  * Checks if the current user has any of the required roles
  */
 export async function hasAnyRole(requiredRoles: CedroUser['role'][]): Promise<boolean> {
-  const user = await getCurrentCedroUser()
-  return user ? requiredRoles.includes(user.role) : false
-}
\ No newline at end of file
+  const role = await currentRole()
+  return role ? requiredRoles.includes(role) : false
+}
@@ -0,0 +1,76 @@
+/**
+ * Monthly billing run
+ *
+ * Types and helpers for POST /api/billing/run, which calls
+ * cedro.run_monthly_billing (db/schema/monthly_billing.sql): one invoice per
+ * patient and month, generated from completed appointments in a single
+ * transaction. dry_run returns the same summary without writing anything.
+ */
+
+export interface BillingRunInvoice {
+  patient_id: string
+  patient_name: string | null
+  therapist_id: string | null
+  sessions: number
+  amount_cents: number
+  /** 'exists' when the patient already has an invoice for the period */
+  status: 'new' | 'exists'
+}
+
+export interface BillingRunResult {
+  billing_period: string
+  due_date: string
+  dry_run: boolean
+  invoices_created: number
+  patients: number
+  sessions: number
+  total_cents: number
+  invoices: BillingRunInvoice[]
+}
+
+export interface BillingRunParams {
+  /** Month as YYYY-MM (or any date inside it, YYYY-MM-DD) */
+  period: string
+  dueDate?: string | null
+  dryRun?: boolean
+}
+
+/** First day of the month (YYYY-MM-01) for YYYY-MM or YYYY-MM-DD; null when invalid */
+export function parseBillingPeriod(value: string | null | undefined): string | null {
+  const match = /^(\d{4})-(\d{2})(?:-(\d{2}))?$/.exec((value || '').trim())
+  if (!match) return null
+
+  const month = Number(match[2])
+  if (month < 1 || month > 12) return null
+  if (match[3]) {
+    const day = Number(match[3])
+    const lastDay = new Date(Date.UTC(Number(match[1]), month, 0)).getUTCDate()
+    if (day < 1 || day > lastDay) return null
+  }
+  return `${match[1]}-${match[2]}-01`
+}
+
+/** Validates YYYY-MM-DD */
+export function isIsoDate(value: string | null | undefined): boolean {
+  if (!value || !/^\d{4}-\d{2}-\d{2}$/.test(value)) return false
+  const date = new Date(`${value}T00:00:00Z`)
+  return !isNaN(date.getTime()) && date.toISOString().slice(0, 10) === value
+}
+
+export async function runMonthlyBilling(params: BillingRunParams): Promise<BillingRunResult> {
+  const response = await fetch('/api/billing/run', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({
+      period: params.period,
+      due_date: params.dueDate || null,
+      dry_run: params.dryRun !== false
+    })
+  })
+
+  const body = await response.json().catch(() => ({}))
+  if (!response.ok) {
+    throw new Error(body?.error || `Billing run failed (${response.status})`)
+  }
+  return body as BillingRunResult
+}
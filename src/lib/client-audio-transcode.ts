@@ -0,0 +1,123 @@
+/**
+ * Browser-side speech encoding before upload
+ *
+ * Target: mono Opus at a speech bitrate (Opus switches to wideband, i.e. a
+ * 16 kHz audio band, at this rate). That is all Whisper uses, and it makes
+ * uploads on clinic Wi-Fi several times smaller than the browser defaults or
+ * the original mp3/wav/m4a.
+ *
+ * - Recordings: MediaRecorder is configured with SPEECH_RECORDER_OPTIONS on a
+ *   mono mix (see new-record-modal)
+ * - Imports: decoded + downmixed/resampled to 16 kHz here, then encoded to
+ *   Ogg Opus in opus-encoder.worker (WebCodecs). Falls back to the original
+ *   file when WebCodecs is unavailable or the file is too long to decode in
+ *   memory.
+ */
+
+export const SPEECH_SAMPLE_RATE = 16000
+export const SPEECH_BITRATE = 24000
+// Declared to /api/audio/upload so the server can skip its ffmpeg pass
+export const SPEECH_ENCODING = 'opus-16k-mono'
+
+export const SPEECH_RECORDER_OPTIONS: MediaRecorderOptions = {
+  mimeType: 'audio/webm;codecs=opus',
+  audioBitsPerSecond: SPEECH_BITRATE
+}
+
+// Decoded PCM is kept in memory (16 kHz float32 per channel)
+const MAX_TRANSCODE_SECONDS = 60 * 60
+
+export interface PreparedAudio {
+  file: File
+  encoding: string | null
+}
+
+export function canTranscodeInBrowser(): boolean {
+  return (
+    typeof window !== 'undefined' &&
+    typeof Worker !== 'undefined' &&
+    typeof OfflineAudioContext !== 'undefined' &&
+    typeof (window as any).AudioEncoder !== 'undefined'
+  )
+}
+
+async function decodeToSpeechPcm(file: File): Promise<Float32Array> {
+  const encoded = await file.arrayBuffer()
+
+  // decodeAudioData resamples to the context rate, so decoding already lands at 16 kHz
+  const decodeContext = new OfflineAudioContext(1, 1, SPEECH_SAMPLE_RATE)
+  const decoded = await decodeContext.decodeAudioData(encoded)
+
+  if (decoded.numberOfChannels === 1 && decoded.sampleRate === SPEECH_SAMPLE_RATE) {
+    return decoded.getChannelData(0)
+  }
+
+  // Downmix (and resample, if the browser decoded at another rate) to mono 16 kHz
+  const length = Math.ceil(decoded.duration * SPEECH_SAMPLE_RATE)
+  const mixContext = new OfflineAudioContext(1, length, SPEECH_SAMPLE_RATE)
+  const source = mixContext.createBufferSource()
+  source.buffer = decoded
+  source.connect(mixContext.destination)
+  source.start()
+
+  const rendered = await mixContext.startRendering()
+  return rendered.getChannelData(0)
+}
+
+function encodeInWorker(pcm: Float32Array, onProgress?: (progress: number) => void): Promise<ArrayBuffer> {
+  return new Promise((resolve, reject) => {
+    const worker = new Worker(new URL('./opus-encoder.worker.ts', import.meta.url))
+
+    worker.onmessage = (event: MessageEvent) => {
+      const message = event.data
+      if (message.type === 'progress') {
+        onProgress?.(message.progress)
+      } else if (message.type === 'done') {
+        worker.terminate()
+        resolve(message.data)
+      } else if (message.type === 'error') {
+        worker.terminate()
+        reject(new Error(message.message))
+      }
+    }
+    worker.onerror = (error) => {
+      worker.terminate()
+      reject(error)
+    }
+
+    worker.postMessage({ pcm, sampleRate: SPEECH_SAMPLE_RATE, bitrate: SPEECH_BITRATE }, [pcm.buffer])
+  })
+}
+
+/**
+ * Transcodes an imported audio file to 16 kHz mono Ogg Opus.
+ * Returns the original file (encoding null) when transcoding is not possible
+ * or would not make the upload smaller.
+ */
+export async function prepareAudioForUpload(
+  file: File,
+  options: { durationSeconds?: number; onProgress?: (progress: number) => void } = {}
+): Promise<PreparedAudio> {
+  const original: PreparedAudio = { file, encoding: null }
+
+  if (!canTranscodeInBrowser()) return original
+  if (options.durationSeconds && options.durationSeconds > MAX_TRANSCODE_SECONDS) return original
+
+  try {
+    const pcm = await decodeToSpeechPcm(file)
+    // The worker takes ownership of the buffer; copy if it is a view on a larger one
+    const transferable = pcm.byteOffset === 0 && pcm.byteLength === pcm.buffer.byteLength ? pcm : pcm.slice()
+    const encoded = await encodeInWorker(transferable, options.onProgress)
+
+    if (encoded.byteLength >= file.size) return original
+
+    const baseName = file.name.replace(/\.[^.]+$/, '') || 'audio'
+    return {
+      file: new File([encoded], `${baseName}.ogg`, { type: 'audio/ogg' }),
+      encoding: SPEECH_ENCODING
+    }
+  } catch (error) {
+    console.warn('Falha ao converter áudio no navegador, enviando original:', error)
+    return original
+  }
+}
@@ -0,0 +1,363 @@
+/**
+ * Conversas inbox client
+ *
+ * Talks to the messaging service (NEXT_PUBLIC_CONVERSATIONS_API_URL,
+ * localhost:3001 in development):
+ * - GET  /api/conversations
+ * - GET  /api/conversations/:id/messages?limit=&before=&before_id=
+ *        newest first; `before`/`before_id` are the sent_at and id of the
+ *        oldest message already loaded (keyset cursor)
+ * - POST /api/conversations/:id/send-message  { message, client_id }
+ * - GET  /api/conversations/stream (SSE): `message` events
+ *        ({ conversation_id, message }) and `conversation` events
+ *
+ * Pages are merged by message id, so a service that ignores the cursor just
+ * yields no new rows (and loading older stops) instead of duplicates. When the
+ * stream is unavailable the inbox falls back to polling the newest page.
+ */
+
+import { fetchWithTimeout, NETWORK_CONFIG } from '@/lib/network-config'
+
+export const CONVERSATIONS_API_URL = process.env.NEXT_PUBLIC_CONVERSATIONS_API_URL || 'http://localhost:3001'
+
+export const MESSAGES_PAGE_SIZE = 50
+
+/** SSE connection attempts that fail before ever opening until we poll instead */
+export const STREAM_MAX_FAILED_ATTEMPTS = 3
+
+export interface Conversation {
+  id: string
+  contact_key: string
+  contact_name: string
+  channel: string
+  last_message: string
+  last_message_at: string
+  unread_count: number
+  created_at: string
+  updated_at: string
+  closer_active?: boolean
+}
+
+export interface Message {
+  id: string
+  external_msg_id: string
+  direction: 'inbound' | 'outbound'
+  from_addr: string
+  to_addr: string[]
+  body_text: string
+  attachments: any
+  sent_at: string
+  received_at: string
+  created_at: string
+  /** Local (optimistic) messages only */
+  client_id?: string
+  pending?: boolean
+  failed?: boolean
+}
+
+export interface MessagePage {
+  /** Chronological (oldest first) */
+  messages: Message[]
+  hasMore: boolean
+}
+
+const LOCAL_ID_PREFIX = 'local-'
+
+// ============ MERGE ============
+
+const messageTime = (message: Message) => message.sent_at || message.created_at || ''
+
+function compareMessages(a: Message, b: Message): number {
+  const byTime = messageTime(a).localeCompare(messageTime(b))
+  return byTime !== 0 ? byTime : a.id.localeCompare(b.id)
+}
+
+export function isLocalMessage(message: Message): boolean {
+  return message.id.startsWith(LOCAL_ID_PREFIX)
+}
+
+/**
+ * Adds server messages to the thread (chronological, deduplicated by id).
+ * An outbound message from the server replaces the optimistic copy with the
+ * same client_id or, failing that, the oldest local copy with the same text.
+ */
+export function mergeMessages(current: Message[], incoming: Message[]): Message[] {
+  if (incoming.length === 0) return current
+
+  const byId = new Map<string, Message>()
+  current.forEach((message) => byId.set(message.id, message))
+
+  incoming.forEach((message) => {
+    if (message.direction === 'outbound' && !byId.has(message.id)) {
+      const local = current.find((candidate) =>
+        isLocalMessage(candidate) &&
+        byId.has(candidate.id) &&
+        (message.client_id ? candidate.client_id === message.client_id : candidate.body_text === message.body_text)
+      )
+      if (local) byId.delete(local.id)
+    }
+    byId.set(message.id, message)
+  })
+
+  const merged = Array.from(byId.values())
+  // Caminho comum (mensagem nova no fim): evita reordenar a conversa inteira
+  const last = current[current.length - 1]
+  if (incoming.length === 1 && merged.length === current.length + 1 && (!last || compareMessages(last, incoming[0]) <= 0)) {
+    return current.concat(incoming)
+  }
+  return merged.sort(compareMessages)
+}
+
+export function createOptimisticMessage(conversation: Conversation, text: string, now: Date = new Date()): Message {
+  const clientId = `${now.getTime().toString(36)}-${Math.random().toString(36).slice(2, 8)}`
+  const timestamp = now.toISOString()
+  return {
+    id: `${LOCAL_ID_PREFIX}${clientId}`,
+    client_id: clientId,
+    external_msg_id: '',
+    direction: 'outbound',
+    from_addr: '',
+    to_addr: [conversation.contact_key],
+    body_text: text,
+    attachments: null,
+    sent_at: timestamp,
+    received_at: timestamp,
+    created_at: timestamp,
+    pending: true
+  }
+}
+
+export function updateLocalMessage(messages: Message[], localId: string, changes: Partial<Message>): Message[] {
+  return messages.map((message) => (message.id === localId ? { ...message, ...changes } : message))
+}
+
+/** Inserts or replaces a conversation, keeping the most recent first */
+export function upsertConversation(conversations: Conversation[], conversation: Conversation): Conversation[] {
+  const index = conversations.findIndex((item) => item.id === conversation.id)
+  const next = index >= 0
+    ? conversations.map((item) => (item.id === conversation.id ? { ...item, ...conversation } : item))
+    : conversations.concat(conversation)
+  return next.sort((a, b) => (b.last_message_at || '').localeCompare(a.last_message_at || ''))
+}
+
+// ============ API ============
+
+export async function fetchConversations(): Promise<Conversation[]> {
+  const response = await fetchWithTimeout(`${CONVERSATIONS_API_URL}/api/conversations`, {
+    timeout: NETWORK_CONFIG.DEFAULT_TIMEOUT
+  })
+  if (!response.ok) throw new Error('Erro ao carregar conversas')
+  return response.json()
+}
+
+/** One page of messages older than `before` (or the newest page) */
+export async function fetchMessages(
+  conversationId: string,
+  before: Message | null = null,
+  limit: number = MESSAGES_PAGE_SIZE
+): Promise<MessagePage> {
+  const params = new URLSearchParams({ limit: String(limit) })
+  if (before) {
+    params.set('before', messageTime(before))
+    params.set('before_id', before.id)
+  }
+
+  const response = await fetchWithTimeout(
+    `${CONVERSATIONS_API_URL}/api/conversations/${conversationId}/messages?${params.toString()}`,
+    { timeout: NETWORK_CONFIG.DEFAULT_TIMEOUT }
+  )
+  if (!response.ok) throw new Error('Erro ao carregar mensagens')
+
+  const data = await response.json()
+  const messages: Message[] = (data.messages || []).slice().reverse()
+  return {
+    messages,
+    hasMore: typeof data.has_more === 'boolean' ? data.has_more : messages.length >= limit
+  }
+}
+
+/** Sends a message; resolves with the stored message when the service returns it */
+export async function sendMessage(conversationId: string, text: string, clientId: string): Promise<Message | null> {
+  const response = await fetchWithTimeout(`${CONVERSATIONS_API_URL}/api/conversations/${conversationId}/send-message`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ message: text, client_id: clientId }),
+    timeout: NETWORK_CONFIG.DEFAULT_TIMEOUT
+  })
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({}))
+    throw new Error(errorData.error || 'Erro ao enviar mensagem')
+  }
+
+  const result = await response.json().catch(() => null)
+  const stored = result?.message && typeof result.message === 'object' ? result.message : result
+  return stored && stored.id && stored.body_text !== undefined ? { ...stored, client_id: clientId } : null
+}
+
+export async function activateCloser(conversationId: string): Promise<void> {
+  const response = await fetchWithTimeout(`${CONVERSATIONS_API_URL}/api/conversations/${conversationId}/closer`, {
+    method: 'PUT',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ closer_active: true }),
+    timeout: NETWORK_CONFIG.DEFAULT_TIMEOUT
+  })
+  if (!response.ok) throw new Error('Erro ao ativar closer')
+}
+
+// ============ STREAM ============
+
+export interface InboxStreamHandlers {
+  onMessage: (conversationId: string, message: Message) => void
+  onConversation: (conversation: Conversation) => void
+  /** The stream could not be opened; the caller should poll instead */
+  onUnavailable: () => void
+}
+
+/** Subscribes to new messages and conversation updates; returns unsubscribe */
+export function subscribeToInbox(handlers: InboxStreamHandlers): () => void {
+  if (typeof EventSource === 'undefined') {
+    handlers.onUnavailable()
+    return () => {}
+  }
+
+  const source = new EventSource(`${CONVERSATIONS_API_URL}/api/conversations/stream`)
+  let opened = false
+  let failures = 0
+
+  const parse = (event: MessageEvent) => {
+    try {
+      return JSON.parse(event.data)
+    } catch {
+      return null
+    }
+  }
+
+  source.onopen = () => {
+    opened = true
+    failures = 0
+  }
+
+  source.addEventListener('message', (event) => {
+    const data = parse(event as MessageEvent)
+    if (data?.conversation_id && data?.message) handlers.onMessage(data.conversation_id, data.message)
+  })
+
+  source.addEventListener('conversation', (event) => {
+    const data = parse(event as MessageEvent)
+    if (data?.id) handlers.onConversation(data)
+  })
+
+  source.onerror = () => {
+    // Depois de aberto, o EventSource reconecta sozinho
+    if (opened) return
+    failures += 1
+    if (failures >= STREAM_MAX_FAILED_ATTEMPTS) {
+      source.close()
+      handlers.onUnavailable()
+    }
+  }
+
+  return () => source.close()
+}
+
+// ============ CONTENT ============
+
+export interface MessageContent {
+  type: 'text' | 'image' | 'audio' | 'video' | 'document' | 'sticker' | 'edited' | 'unknown'
+  content?: string
+  url?: string
+  mimetype?: string
+  originalContent?: string
+  title?: string
+  fileName?: string
+  width?: number
+  height?: number
+  isAnimated?: boolean
+}
+
+/** Interprets the WhatsApp media JSON stored in body_text */
+export function parseMessageContent(bodyText: string): MessageContent {
+  try {
+    // Verificar se é um JSON de mídia
+    if (bodyText.startsWith('{') && (bodyText.includes('Message') || bodyText.includes('message'))) {
+      const mediaData = JSON.parse(bodyText)
+
+      if (mediaData.documentMessage) {
+        const doc = mediaData.documentMessage
+        return {
+          type: 'document',
+          title: doc.title || doc.fileName || 'Documento',
+          fileName: doc.fileName,
+          mimetype: doc.mimetype,
+          url: doc.url
+        }
+      }
+
+      if (mediaData.imageMessage) {
+        const img = mediaData.imageMessage
+        return {
+          type: 'image',
+          url: img.url,
+          width: img.width,
+          height: img.height,
+          mimetype: img.mimetype
+        }
+      }
+
+      if (mediaData.stickerMessage) {
+        return {
+          type: 'sticker',
+          url: mediaData.stickerMessage.url,
+          isAnimated: mediaData.stickerMessage.isAnimated || false,
+          mimetype: mediaData.stickerMessage.mimetype
+        }
+      }
+
+      if (mediaData.editedMessage) {
+        const editedContent = mediaData.editedMessage.message?.protocolMessage?.editedMessage
+        return {
+          type: 'edited',
+          content: editedContent?.conversation || 'Mensagem editada',
+          originalContent: bodyText
+        }
+      }
+
+      if (mediaData.audioMessage) {
+        return {
+          type: 'audio',
+          url: mediaData.audioMessage.url,
+          mimetype: mediaData.audioMessage.mimetype
+        }
+      }
+
+      if (mediaData.videoMessage) {
+        return {
+          type: 'video',
+          url: mediaData.videoMessage.url,
+          mimetype: mediaData.videoMessage.mimetype
+        }
+      }
+
+      // Fallback para JSON não reconhecido - tentar extrair campo "conversation"
+      if (mediaData.conversation) {
+        return { type: 'text', content: mediaData.conversation }
+      }
+
+      return {
+        type: 'unknown',
+        content: 'Mensagem de mídia não suportada',
+        originalContent: bodyText
+      }
+    }
+
+    return { type: 'text', content: bodyText }
+  } catch (error) {
+    // Se não conseguir fazer parse, retornar como texto
+    return { type: 'text', content: bodyText }
+  }
+}
@@ -0,0 +1,138 @@
+/**
+ * CRM kanban state
+ *
+ * Columns are loaded page by page (board_position DESC, id DESC) with stage
+ * totals counted by the database, so the board never needs the full lead
+ * list. Drags are applied to the local state immediately and queued in
+ * LeadMoveQueue, which coalesces moves per lead and sends them in one
+ * cedro.move_crm_leads call after a short pause.
+ */
+
+import type { Lead, LeadStage } from '@/data/crm'
+
+export const LEAD_STAGES: LeadStage[] = ['lead', 'mql', 'sql', 'won', 'lost']
+
+/** Cards per column page */
+export const BOARD_PAGE_SIZE = 30
+
+/** Quiet time after the last drag before the moves are sent */
+export const MOVE_FLUSH_DELAY_MS = 600
+
+export interface LeadMove {
+  id: string
+  stage: LeadStage
+  board_position: number
+}
+
+export interface BoardColumnState {
+  leads: Lead[]
+  /** Leads in the stage (database count, not just the loaded ones) */
+  total: number
+  hasMore: boolean
+  loading: boolean
+}
+
+export type BoardState = Record<LeadStage, BoardColumnState>
+
+export function emptyBoard(): BoardState {
+  return LEAD_STAGES.reduce((board, stage) => {
+    board[stage] = { leads: [], total: 0, hasMore: true, loading: false }
+    return board
+  }, {} as BoardState)
+}
+
+/**
+ * Position for a card placed between `above` and `below` (higher = closer
+ * to the top). Midpoint between neighbours, so no other card is renumbered.
+ */
+export function positionBetween(above?: number, below?: number, now: number = Date.now() / 1000): number {
+  if (above !== undefined && below !== undefined) return (above + below) / 2
+  if (above !== undefined) return above - 1
+  if (below !== undefined) return below + 1
+  return now
+}
+
+/**
+ * Moves a lead to `toStage` at `index` (in the target column without the
+ * lead). Returns the new board and the move to persist, or null when the
+ * lead is not on the board or nothing changes.
+ */
+export function moveLeadInBoard(
+  board: BoardState,
+  leadId: string,
+  toStage: LeadStage,
+  index: number
+): { board: BoardState; move: LeadMove } | null {
+  const fromStage = LEAD_STAGES.find((stage) => board[stage].leads.some((lead) => lead.id === leadId))
+  if (!fromStage) return null
+
+  const lead = board[fromStage].leads.find((item) => item.id === leadId)!
+  const target = board[toStage].leads.filter((item) => item.id !== leadId)
+  const at = Math.max(0, Math.min(index, target.length))
+
+  if (fromStage === toStage && board[fromStage].leads.indexOf(lead) === at) return null
+
+  const position = positionBetween(target[at - 1]?.board_position, target[at]?.board_position)
+  const moved: Lead = { ...lead, stage: toStage, board_position: position }
+  target.splice(at, 0, moved)
+
+  const next: BoardState = { ...board, [toStage]: { ...board[toStage], leads: target } }
+  if (fromStage !== toStage) {
+    next[fromStage] = {
+      ...board[fromStage],
+      leads: board[fromStage].leads.filter((item) => item.id !== leadId),
+      total: Math.max(0, board[fromStage].total - 1)
+    }
+    next[toStage] = { ...next[toStage], total: board[toStage].total + 1 }
+  }
+
+  return { board: next, move: { id: leadId, stage: toStage, board_position: position } }
+}
+
+type Schedule = (callback: () => void, delay: number) => unknown
+type Cancel = (handle: any) => void
+
+/**
+ * Debounced batch of lead moves: the last move of each lead wins and the
+ * batch is sent once no drag happened for `delay` ms (or on flush()).
+ */
+export class LeadMoveQueue {
+  private moves = new Map<string, LeadMove>()
+  private timer: unknown = null
+
+  constructor(
+    private send: (moves: LeadMove[]) => Promise<void>,
+    private onError: (moves: LeadMove[], error: unknown) => void,
+    private delay: number = MOVE_FLUSH_DELAY_MS,
+    private schedule: Schedule = (callback, delay) => setTimeout(callback, delay),
+    private cancel: Cancel = (handle) => clearTimeout(handle)
+  ) {}
+
+  enqueue(move: LeadMove): void {
+    this.moves.set(move.id, move)
+    if (this.timer !== null) this.cancel(this.timer)
+    this.timer = this.schedule(() => {
+      this.flush()
+    }, this.delay)
+  }
+
+  async flush(): Promise<void> {
+    if (this.timer !== null) {
+      this.cancel(this.timer)
+      this.timer = null
+    }
+    if (this.moves.size === 0) return
+
+    const batch = Array.from(this.moves.values())
+    this.moves.clear()
+    try {
+      await this.send(batch)
+    } catch (error) {
+      this.onError(batch, error)
+    }
+  }
+
+  get size(): number {
+    return this.moves.size
+  }
+}
@@ -0,0 +1,40 @@
+/**
+ * CSV encoding for exports
+ *
+ * Defaults follow what Excel pt-BR opens directly: `;` as delimiter, decimal
+ * comma and a UTF-8 BOM at the start of the file.
+ */
+
+export type CellValue = string | number | boolean | null | undefined
+
+export interface CsvOptions {
+  delimiter?: string
+}
+
+export const CSV_BOM = '\uFEFF'
+
+// Células que o Excel interpretaria como fórmula
+const FORMULA_PREFIX = /^[=+\-@\t\r]/
+
+export function csvCell(value: CellValue, delimiter: string = ';'): string {
+  if (value === null || value === undefined) return ''
+
+  let text: string
+  if (typeof value === 'number') {
+    text = delimiter === ';' ? String(value).replace('.', ',') : String(value)
+  } else if (typeof value === 'boolean') {
+    text = value ? 'Sim' : 'Não'
+  } else {
+    text = FORMULA_PREFIX.test(value) ? `'${value}` : value
+  }
+
+  if (text.includes(delimiter) || /["\r\n]/.test(text)) {
+    return `"${text.replace(/"/g, '""')}"`
+  }
+  return text
+}
+
+export function csvLine(values: CellValue[], options: CsvOptions = {}): string {
+  const delimiter = options.delimiter || ';'
+  return values.map((value) => csvCell(value, delimiter)).join(delimiter) + '\r\n'
+}
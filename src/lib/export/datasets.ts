@@ -0,0 +1,241 @@
+/**
+ * Export datasets: source view, keyset order, columns and the same filters
+ * the financeiro (getInvoices), pacientes (getPatients) and CRM (getLeads)
+ * list pages apply, read from the export URL's query string.
+ */
+
+import type { CedroClaims } from '@/lib/auth-claims'
+import { calculateLeadScore } from '@/lib/lead-score'
+import {
+  applyKeyset,
+  keysetPager,
+  EXPORT_PAGE_SIZE,
+  type ExportColumn,
+  type ExportDatasetName,
+  type KeysetCursor,
+  type KeysetOrder,
+  type PageSource
+} from './index'
+
+export interface ExportDataset {
+  view: string
+  select: string
+  order: KeysetOrder
+  /** File name prefix (date and extension are appended) */
+  filename: string
+  sheetName: string
+  columns: ExportColumn<any>[]
+  cursorOf(row: any): KeysetCursor
+  applyFilters(query: any, params: URLSearchParams, claims: CedroClaims): any
+  /** Filters that only exist after loading the page (e.g. the lead score) */
+  transform?(rows: any[], params: URLSearchParams): any[]
+}
+
+const INVOICE_STATUS_TEXT: Record<string, string> = {
+  draft: 'Rascunho',
+  open: 'Em aberto',
+  paid: 'Pago',
+  partial: 'Parcial',
+  overdue: 'Vencido',
+  cancelled: 'Cancelado'
+}
+
+const LEAD_STAGE_TEXT: Record<string, string> = {
+  lead: 'Lead',
+  mql: 'MQL',
+  sql: 'SQL',
+  won: 'Ganho',
+  lost: 'Perdido'
+}
+
+const cents = (value: number | null | undefined) => (value === null || value === undefined ? null : value / 100)
+
+const list = (params: URLSearchParams, key: string) =>
+  (params.get(key) || '').split(',').map((value) => value.trim()).filter(Boolean)
+
+const numberParam = (params: URLSearchParams, key: string) => {
+  const value = params.get(key)
+  return value === null || value === '' || isNaN(Number(value)) ? undefined : Number(value)
+}
+
+/** Therapists only ever export their own data, like the list pages */
+const scopedTherapistId = (params: URLSearchParams, claims: CedroClaims) =>
+  claims.role === 'therapist' ? claims.userId : params.get('therapistId')
+
+export const EXPORT_DATASETS: Record<ExportDatasetName, ExportDataset> = {
+  invoices: {
+    view: 'vw_invoice_basic',
+    select: 'invoice_id, patient_id, therapist_id, status, amount_cents, due_date, paid_at, paid_amount_cents, patients!inner(full_name), users(name)',
+    order: { column: 'due_date', idColumn: 'invoice_id', ascending: false, nullable: true },
+    filename: 'faturas',
+    sheetName: 'Faturas',
+    columns: [
+      { header: 'Fatura', value: (row) => row.invoice_id },
+      { header: 'Paciente', value: (row) => row.patients?.full_name },
+      { header: 'Terapeuta', value: (row) => row.users?.name },
+      { header: 'Status', value: (row) => INVOICE_STATUS_TEXT[row.status] || row.status },
+      { header: 'Valor (R$)', value: (row) => cents(row.amount_cents) },
+      { header: 'Valor pago (R$)', value: (row) => cents(row.paid_amount_cents || 0) },
+      { header: 'Vencimento', value: (row) => row.due_date },
+      { header: 'Pago em', value: (row) => row.paid_at }
+    ],
+    cursorOf: (row) => ({ value: row.due_date, id: row.invoice_id }),
+    applyFilters(query, params, claims) {
+      const status = params.get('status')
+      if (status && status !== 'todos') {
+        query = query.eq('status', status)
+      }
+
+      const startDate = params.get('startDate')
+      const endDate = params.get('endDate')
+      if (startDate && endDate) {
+        query = query.gte('due_date', startDate).lte('due_date', endDate)
+      }
+
+      const therapistId = scopedTherapistId(params, claims)
+      if (therapistId) {
+        query = query.eq('therapist_id', therapistId)
+      }
+
+      const patientName = params.get('patientName')
+      if (patientName) {
+        query = query.ilike('patients.full_name', `%${patientName}%`)
+      }
+      return query
+    }
+  },
+
+  patients: {
+    view: 'vw_patient_overview',
+    select: 'patient_id, full_name, email, phone, cpf, birth_date, gender, origin, current_therapist_id, current_therapist_name, total_appointments, last_appointment, next_appointment, created_at',
+    order: { column: 'full_name', idColumn: 'patient_id', ascending: true },
+    filename: 'pacientes',
+    sheetName: 'Pacientes',
+    columns: [
+      { header: 'Nome', value: (row) => row.full_name },
+      { header: 'E-mail', value: (row) => row.email },
+      { header: 'Telefone', value: (row) => row.phone },
+      { header: 'CPF', value: (row) => row.cpf },
+      { header: 'Nascimento', value: (row) => row.birth_date },
+      { header: 'Gênero', value: (row) => row.gender },
+      { header: 'Origem', value: (row) => row.origin },
+      { header: 'Terapeuta', value: (row) => row.current_therapist_name },
+      { header: 'Atendimentos', value: (row) => row.total_appointments || 0 },
+      { header: 'Último atendimento', value: (row) => row.last_appointment },
+      { header: 'Próximo atendimento', value: (row) => row.next_appointment },
+      { header: 'Cadastro', value: (row) => row.created_at }
+    ],
+    cursorOf: (row) => ({ value: row.full_name, id: row.patient_id }),
+    applyFilters(query, params, claims) {
+      const search = params.get('search')
+      if (search) {
+        query = query.or(`full_name.ilike.%${search}%,email.ilike.%${search}%,phone.ilike.%${search}%`)
+      }
+
+      const therapistId = scopedTherapistId(params, claims)
+      if (therapistId) {
+        query = query.eq('current_therapist_id', therapistId)
+      }
+      return query
+    }
+  },
+
+  leads: {
+    view: 'crm_leads',
+    select: '*',
+    order: { column: 'created_at', idColumn: 'id', ascending: false },
+    filename: 'leads',
+    sheetName: 'Leads',
+    columns: [
+      { header: 'Nome', value: (row) => row.name },
+      { header: 'E-mail', value: (row) => row.email },
+      { header: 'Telefone', value: (row) => row.phone },
+      { header: 'Origem', value: (row) => row.source },
+      { header: 'Estágio', value: (row) => LEAD_STAGE_TEXT[row.stage] || row.stage },
+      { header: 'Score', value: (row) => row.score },
+      { header: 'Cristão', value: (row) => row.is_christian },
+      { header: 'Criado em', value: (row) => row.created_at },
+      { header: 'Observações', value: (row) => row.notes }
+    ],
+    cursorOf: (row) => ({ value: row.created_at, id: row.id }),
+    applyFilters(query, params) {
+      const search = params.get('search')
+      if (search) {
+        query = query.or(`name.ilike.%${search}%,email.ilike.%${search}%,phone.ilike.%${search}%`)
+      }
+
+      const stage = list(params, 'stage')
+      if (stage.length > 0) {
+        query = query.in('stage', stage)
+      }
+
+      const source = list(params, 'source')
+      if (source.length > 0) {
+        query = query.in('source', source)
+      }
+
+      const assignedTo = list(params, 'assigned_to')
+      if (assignedTo.length > 0) {
+        query = query.in('assigned_to', assignedTo)
+      }
+
+      const createdAfter = params.get('created_after')
+      if (createdAfter) {
+        query = query.gte('created_at', createdAfter)
+      }
+
+      const createdBefore = params.get('created_before')
+      if (createdBefore) {
+        query = query.lte('created_at', createdBefore)
+      }
+      return query
+    },
+    transform(rows, params) {
+      // Score é calculado (não existe no banco): filtra depois de carregar
+      const scoreMin = numberParam(params, 'score_min')
+      const scoreMax = numberParam(params, 'score_max')
+      return rows
+        .map((row) => ({ ...row, score: calculateLeadScore(row) }))
+        .filter((row) => (scoreMin === undefined || row.score >= scoreMin) && (scoreMax === undefined || row.score <= scoreMax))
+    }
+  }
+}
+
+export function isExportDataset(name: string): name is ExportDatasetName {
+  return Object.prototype.hasOwnProperty.call(EXPORT_DATASETS, name)
+}
+
+/**
+ * Keyset pages of a dataset read through the given (RLS-scoped) Supabase
+ * client. Keyset runs on the raw rows, before transform().
+ */
+export function datasetPages(
+  supabase: any,
+  dataset: ExportDataset,
+  params: URLSearchParams,
+  claims: CedroClaims,
+  pageSize: number = EXPORT_PAGE_SIZE
+): PageSource<any> {
+  const pager = keysetPager<any>(
+    async (cursor, limit) => {
+      const base = dataset.applyFilters(
+        supabase.schema('cedro').from(dataset.view).select(dataset.select),
+        params,
+        claims
+      )
+      const { data, error } = await applyKeyset(base, dataset.order, cursor).limit(limit)
+      if (error) throw error
+      return data || []
+    },
+    dataset.cursorOf,
+    pageSize
+  )
+
+  if (!dataset.transform) return pager
+  return {
+    async next() {
+      const rows = await pager.next()
+      return rows && dataset.transform!(rows, params)
+    }
+  }
+}
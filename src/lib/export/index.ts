@@ -0,0 +1,135 @@
+/**
+ * Streaming exports (CSV / XLSX)
+ *
+ * Rows are read page by page with keyset cursors (WHERE (col, id) > cursor,
+ * never OFFSET) and each page is encoded and handed to the response stream
+ * before the next one is requested. ReadableStream only pulls a new page
+ * when the client has consumed the previous one, so memory stays at about
+ * one page regardless of the export size.
+ */
+
+import { CSV_BOM, csvLine, type CellValue } from './csv'
+import { XlsxStreamWriter } from './xlsx'
+import { logger } from '@/lib/logger'
+import type { KeysetCursor } from '@/lib/keyset'
+
+export type { CellValue } from './csv'
+export { applyKeyset, keysetFilter, type KeysetCursor, type KeysetOrder, type KeysetQuery } from '@/lib/keyset'
+
+export type ExportFormat = 'csv' | 'xlsx'
+export type ExportDatasetName = 'invoices' | 'patients' | 'leads'
+
+export const EXPORT_FORMATS: ExportFormat[] = ['csv', 'xlsx']
+
+/** Rows per database round trip (PostgREST's default max-rows) */
+export const EXPORT_PAGE_SIZE = 1000
+
+export const EXPORT_CONTENT_TYPES: Record<ExportFormat, string> = {
+  csv: 'text/csv; charset=utf-8',
+  xlsx: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+}
+
+export interface ExportColumn<T> {
+  header: string
+  value: (row: T) => CellValue
+}
+
+// ============ PAGES ============
+
+export interface PageSource<T> {
+  /** Next page, or null once the source is exhausted */
+  next(): Promise<T[] | null>
+}
+
+export function keysetPager<T>(
+  fetchPage: (cursor: KeysetCursor | null, pageSize: number) => Promise<T[]>,
+  cursorOf: (row: T) => KeysetCursor,
+  pageSize: number = EXPORT_PAGE_SIZE
+): PageSource<T> {
+  let cursor: KeysetCursor | null = null
+  let done = false
+
+  return {
+    async next() {
+      if (done) return null
+      const rows = await fetchPage(cursor, pageSize)
+      if (rows.length < pageSize) done = true
+      if (rows.length === 0) return null
+      cursor = cursorOf(rows[rows.length - 1])
+      return rows
+    }
+  }
+}
+
+// ============ STREAM ============
+
+export function createExportStream<T>(
+  source: PageSource<T>,
+  columns: ExportColumn<T>[],
+  format: ExportFormat,
+  options: { sheetName?: string } = {}
+): ReadableStream<Uint8Array> {
+  const encoder = new TextEncoder()
+  const xlsx = format === 'xlsx' ? new XlsxStreamWriter(options.sheetName || 'Exportação') : null
+  const header = columns.map((column) => column.header)
+  const toCells = (row: T) => columns.map((column) => column.value(row))
+
+  return new ReadableStream<Uint8Array>({
+    start(controller) {
+      if (xlsx) {
+        controller.enqueue(xlsx.start())
+        controller.enqueue(xlsx.rows([header]))
+      } else {
+        controller.enqueue(encoder.encode(CSV_BOM + csvLine(header)))
+      }
+    },
+
+    async pull(controller) {
+      try {
+        // pull só é chamado de novo depois de um enqueue: páginas que ficaram
+        // vazias após filtros (ex.: score dos leads) são puladas aqui
+        let page = await source.next()
+        while (page && page.length === 0) {
+          page = await source.next()
+        }
+        if (!page) {
+          if (xlsx) controller.enqueue(xlsx.finish())
+          controller.close()
+          return
+        }
+
+        const cells = page.map(toCells)
+        controller.enqueue(xlsx ? xlsx.rows(cells) : encoder.encode(cells.map((row) => csvLine(row)).join('')))
+      } catch (error) {
+        // Cabeçalhos já foram enviados: só resta abortar o download
+        logger.error('Export stream failed:', error)
+        controller.error(error)
+      }
+    }
+  })
+}
+
+// ============ CLIENT ============
+
+/**
+ * URL of GET /api/export/<dataset> for the filters of a list page
+ * (arrays are sent comma-separated; empty values and 'todos'/'all' are omitted)
+ */
+export function exportUrl(
+  dataset: ExportDatasetName,
+  format: ExportFormat,
+  filters: Record<string, unknown> = {}
+): string {
+  const params = new URLSearchParams({ format })
+  Object.keys(filters).sort().forEach((key) => {
+    const raw = filters[key]
+    const value = Array.isArray(raw) ? raw.join(',') : raw
+    if (value === undefined || value === null || value === '' || value === 'todos' || value === 'all') return
+    params.set(key, String(value))
+  })
+  return `/api/export/${dataset}?${params.toString()}`
+}
+
+export function exportFilename(name: string, format: ExportFormat, date: Date = new Date()): string {
+  return `${name}-${date.toISOString().slice(0, 10)}.${format}`
+}
@@ -0,0 +1,221 @@
+/**
+ * Streaming XLSX writer
+ *
+ * Writes a single-sheet workbook as a ZIP with stored (uncompressed) entries
+ * and data descriptors, so the sheet is emitted row by row without knowing
+ * its size up front: only the CRC and the offsets of the five entries are
+ * kept in memory. Cells use inline strings (no shared string table).
+ */
+
+import type { CellValue } from './csv'
+
+const encoder = new TextEncoder()
+
+const CRC_TABLE = (() => {
+  const table = new Uint32Array(256)
+  for (let n = 0; n < 256; n++) {
+    let c = n
+    for (let k = 0; k < 8; k++) {
+      c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1
+    }
+    table[n] = c >>> 0
+  }
+  return table
+})()
+
+export function crc32(data: Uint8Array, previous: number = 0): number {
+  let crc = previous ^ 0xffffffff
+  for (let i = 0; i < data.length; i++) {
+    crc = CRC_TABLE[(crc ^ data[i]) & 0xff] ^ (crc >>> 8)
+  }
+  return (crc ^ 0xffffffff) >>> 0
+}
+
+// Bit 3: CRC/tamanhos no descritor após os dados; bit 11: nomes em UTF-8
+const ZIP_FLAGS = 0x0808
+
+interface ZipEntry {
+  name: Uint8Array
+  offset: number
+  crc: number
+  size: number
+}
+
+function bytes(size: number, write: (view: DataView) => void): Uint8Array {
+  const buffer = new Uint8Array(size)
+  write(new DataView(buffer.buffer))
+  return buffer
+}
+
+function concat(chunks: Uint8Array[]): Uint8Array {
+  const total = chunks.reduce((sum, chunk) => sum + chunk.length, 0)
+  const out = new Uint8Array(total)
+  let position = 0
+  chunks.forEach((chunk) => {
+    out.set(chunk, position)
+    position += chunk.length
+  })
+  return out
+}
+
+function dosDateTime(date: Date): { time: number; date: number } {
+  return {
+    time: (date.getHours() << 11) | (date.getMinutes() << 5) | Math.floor(date.getSeconds() / 2),
+    date: ((date.getFullYear() - 1980) << 9) | ((date.getMonth() + 1) << 5) | date.getDate()
+  }
+}
+
+export function escapeXml(text: string): string {
+  return text
+    // Caracteres de controle não são válidos em XML 1.0
+    .replace(/[\u0000-\u0008\u000b\u000c\u000e-\u001f]/g, '')
+    .replace(/&/g, '&amp;')
+    .replace(/</g, '&lt;')
+    .replace(/>/g, '&gt;')
+    .replace(/"/g, '&quot;')
+}
+
+export function xlsxCell(value: CellValue): string {
+  if (value === null || value === undefined || value === '') return '<c/>'
+  if (typeof value === 'number' && isFinite(value)) return `<c><v>${value}</v></c>`
+  if (typeof value === 'boolean') return `<c t="b"><v>${value ? 1 : 0}</v></c>`
+  return `<c t="inlineStr"><is><t xml:space="preserve">${escapeXml(String(value))}</t></is></c>`
+}
+
+const CONTENT_TYPES = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>' +
+  '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">' +
+  '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>' +
+  '<Default Extension="xml" ContentType="application/xml"/>' +
+  '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>' +
+  '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>' +
+  '</Types>'
+
+const ROOT_RELS = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>' +
+  '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">' +
+  '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>' +
+  '</Relationships>'
+
+const WORKBOOK_RELS = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>' +
+  '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">' +
+  '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>' +
+  '</Relationships>'
+
+const SHEET_START = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>' +
+  '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+
+const SHEET_END = '</sheetData></worksheet>'
+
+function workbookXml(sheetName: string): string {
+  // Nome de aba: até 31 caracteres, sem []:*?/\
+  const name = escapeXml(sheetName.replace(/[\[\]:*?/\\]/g, ' ').slice(0, 31).trim() || 'Planilha')
+  return '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>' +
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" ' +
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">' +
+    `<sheets><sheet name="${name}" sheetId="1" r:id="rId1"/></sheets></workbook>`
+}
+
+export class XlsxStreamWriter {
+  private entries: ZipEntry[] = []
+  private offset = 0
+  private current: ZipEntry | null = null
+  private stamp = dosDateTime(new Date())
+
+  constructor(private sheetName: string) {}
+
+  /** Static workbook parts plus the opening of the sheet */
+  start(): Uint8Array {
+    return concat([
+      this.file('[Content_Types].xml', CONTENT_TYPES),
+      this.file('_rels/.rels', ROOT_RELS),
+      this.file('xl/workbook.xml', workbookXml(this.sheetName)),
+      this.file('xl/_rels/workbook.xml.rels', WORKBOOK_RELS),
+      this.open('xl/worksheets/sheet1.xml'),
+      this.data(SHEET_START)
+    ])
+  }
+
+  rows(rows: CellValue[][]): Uint8Array {
+    return this.data(rows.map((row) => `<row>${row.map(xlsxCell).join('')}</row>`).join(''))
+  }
+
+  /** Closes the sheet and writes the central directory */
+  finish(): Uint8Array {
+    return concat([this.data(SHEET_END), this.close(), this.centralDirectory()])
+  }
+
+  private file(name: string, content: string): Uint8Array {
+    return concat([this.open(name), this.data(content), this.close()])
+  }
+
+  private open(name: string): Uint8Array {
+    const entry: ZipEntry = { name: encoder.encode(name), offset: this.offset, crc: 0, size: 0 }
+    this.current = entry
+    this.entries.push(entry)
+
+    const header = bytes(30, (view) => {
+      view.setUint32(0, 0x04034b50, true)
+      view.setUint16(4, 20, true)
+      view.setUint16(6, ZIP_FLAGS, true)
+      view.setUint16(8, 0, true) // stored
+      view.setUint16(10, this.stamp.time, true)
+      view.setUint16(12, this.stamp.date, true)
+      view.setUint16(26, entry.name.length, true)
+    })
+    return this.track(concat([header, entry.name]))
+  }
+
+  private data(content: string): Uint8Array {
+    const chunk = encoder.encode(content)
+    const entry = this.current!
+    entry.crc = crc32(chunk, entry.crc)
+    entry.size += chunk.length
+    return this.track(chunk)
+  }
+
+  private close(): Uint8Array {
+    const entry = this.current!
+    this.current = null
+    return this.track(bytes(16, (view) => {
+      view.setUint32(0, 0x08074b50, true)
+      view.setUint32(4, entry.crc, true)
+      view.setUint32(8, entry.size, true)
+      view.setUint32(12, entry.size, true)
+    }))
+  }
+
+  private centralDirectory(): Uint8Array {
+    const start = this.offset
+    const records = this.entries.map((entry) => concat([
+      bytes(46, (view) => {
+        view.setUint32(0, 0x02014b50, true)
+        view.setUint16(4, 20, true)
+        view.setUint16(6, 20, true)
+        view.setUint16(8, ZIP_FLAGS, true)
+        view.setUint16(10, 0, true)
+        view.setUint16(12, this.stamp.time, true)
+        view.setUint16(14, this.stamp.date, true)
+        view.setUint32(16, entry.crc, true)
+        view.setUint32(20, entry.size, true)
+        view.setUint32(24, entry.size, true)
+        view.setUint16(28, entry.name.length, true)
+        view.setUint32(42, entry.offset, true)
+      }),
+      entry.name
+    ]))
+    const directory = concat(records)
+
+    const end = bytes(22, (view) => {
+      view.setUint32(0, 0x06054b50, true)
+      view.setUint16(8, this.entries.length, true)
+      view.setUint16(10, this.entries.length, true)
+      view.setUint32(12, directory.length, true)
+      view.setUint32(16, start, true)
+    })
+    return this.track(concat([directory, end]))
+  }
+
+  private track(chunk: Uint8Array): Uint8Array {
+    this.offset += chunk.length
+    return chunk
+  }
+}
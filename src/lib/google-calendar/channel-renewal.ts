@@ -0,0 +1,130 @@
+/**
+ * Google Calendar channel renewal helpers
+ * Janela de renovação com jitter, concorrência limitada e backoff para rate limit
+ * (usados por /api/cron/renew-gcal-channels)
+ */
+
+/** Channels expiring within this window are renewed */
+export const RENEWAL_WINDOW_MS = 24 * 60 * 60 * 1000;
+
+/**
+ * Extra lead time (0..RENEWAL_JITTER_MS) per channel, so channels created on
+ * the same day are renewed at different times and their expirations drift
+ * apart instead of clustering in the same cron run.
+ */
+export const RENEWAL_JITTER_MS = 12 * 60 * 60 * 1000;
+
+export const RENEWAL_CONCURRENCY = 5;
+
+const RATE_LIMIT_REASONS = new Set(['rateLimitExceeded', 'userRateLimitExceeded', 'quotaExceeded']);
+
+/** FNV-1a: stable per-channel jitter without storing extra state */
+function hashToUnit(value: string): number {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < value.length; i++) {
+    hash ^= value.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193) >>> 0;
+  }
+  return hash / 0x100000000;
+}
+
+/**
+ * Lead time before expiration at which this channel is renewed. Depends on
+ * the channel id, so a renewed channel (new id) gets a new lead.
+ */
+export function renewalLeadMs(channelId: string): number {
+  return RENEWAL_WINDOW_MS + Math.floor(hashToUnit(channelId) * RENEWAL_JITTER_MS);
+}
+
+export function isDueForRenewal(
+  channel: { channel_id: string; expiration: string },
+  now: number = Date.now()
+): boolean {
+  return Date.parse(channel.expiration) - now < renewalLeadMs(channel.channel_id);
+}
+
+/**
+ * Google returns `expiration` as milliseconds since epoch (string);
+ * timestamptz columns need an ISO date.
+ */
+export function watchExpirationToIso(expiration: string | number): string {
+  const value = String(expiration);
+  return /^\d+$/.test(value) ? new Date(Number(value)).toISOString() : new Date(value).toISOString();
+}
+
+/**
+ * 429, or 403 with a rate/quota reason (GoogleCalendarSyncError from parseError)
+ */
+export function isRateLimitError(error: any): boolean {
+  const code = Number(error?.code || error?.status);
+  if (code === 429) return true;
+  if (code !== 403) return false;
+
+  const details: any[] = Array.isArray(error?.details) ? error.details : [];
+  return details.some((detail) => RATE_LIMIT_REASONS.has(detail?.reason)) ||
+    /rate limit|quota/i.test(String(error?.message || ''));
+}
+
+export interface BackoffOptions {
+  retries?: number;
+  baseDelayMs?: number;
+  maxDelayMs?: number;
+  sleep?: (ms: number) => Promise<void>;
+  random?: () => number;
+}
+
+const defaultSleep = (ms: number) => new Promise<void>((resolve) => setTimeout(resolve, ms));
+
+/**
+ * Runs fn, retrying only rate-limit errors with exponential backoff and full
+ * jitter. Any other error is thrown immediately.
+ */
+export async function withRateLimitBackoff<T>(
+  fn: () => Promise<T>,
+  options: BackoffOptions = {}
+): Promise<{ value: T; attempts: number }> {
+  const {
+    retries = 4,
+    baseDelayMs = 1000,
+    maxDelayMs = 16000,
+    sleep = defaultSleep,
+    random = Math.random,
+  } = options;
+
+  for (let attempt = 1; ; attempt++) {
+    try {
+      return { value: await fn(), attempts: attempt };
+    } catch (error) {
+      if (attempt > retries || !isRateLimitError(error)) {
+        throw Object.assign(error instanceof Error ? error : new Error(String((error as any)?.message || error)), {
+          attempts: attempt,
+          rateLimited: isRateLimitError(error),
+        });
+      }
+      const ceiling = Math.min(maxDelayMs, baseDelayMs * Math.pow(2, attempt - 1));
+      await sleep(Math.floor(random() * ceiling));
+    }
+  }
+}
+
+/**
+ * Maps items with at most `limit` calls in flight; results keep input order.
+ */
+export async function mapWithConcurrency<T, R>(
+  items: T[],
+  limit: number,
+  fn: (item: T, index: number) => Promise<R>
+): Promise<R[]> {
+  const results = new Array<R>(items.length);
+  let next = 0;
+
+  const worker = async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index], index);
+    }
+  };
+
+  await Promise.all(Array.from({ length: Math.min(limit, items.length) }, worker));
+  return results;
+}
@@ -5,6 +5,7 @@
 
 import { google } from 'googleapis';
 import { OAuth2Client } from 'google-auth-library';
+import { withSpan } from '../tracing';
 
 if (
   !process.env.GOOGLE_CLIENT_ID ||
@@ -66,7 +67,29 @@ export async function refreshAccessToken(): Promise<string> {
  */
 export function getGoogleCalendar() {
   const auth = getGoogleAuth();
-  return google.calendar({ version: 'v3', auth });
+  const calendar = google.calendar({ version: 'v3', auth });
+  calendar.events = traceResource(calendar.events, 'events');
+  calendar.channels = traceResource(calendar.channels, 'channels');
+  return calendar;
+}
+
+/**
+ * Envolve cada método do recurso (events.list, channels.stop...) num span
+ * `google`, contabilizado no Server-Timing da rota
+ */
+function traceResource<T extends object>(resource: T, name: string): T {
+  return new Proxy(resource, {
+    get(target, property, receiver) {
+      const value = Reflect.get(target, property, receiver);
+      if (typeof value !== 'function' || typeof property !== 'string') {
+        return value;
+      }
+      return (...args: any[]) =>
+        withSpan(`google calendar.${name}.${property}`, 'google', () =>
+          Promise.resolve(value.apply(target, args))
+        );
+    },
+  });
 }
 
 /**
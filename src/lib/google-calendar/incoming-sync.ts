@@ -0,0 +1,214 @@
+/**
+ * Google Calendar → Cedro sync for one calendar
+ * Lista as mudanças (incremental com syncToken ou full na janela móvel) e
+ * grava em appointments com origin='google'. Usado pelo worker
+ * /api/cron/process-gcal-notifications; não grava o sync_token, quem chama
+ * decide (junto com a liberação do lock do calendário).
+ */
+
+import type { SupabaseClient } from '@supabase/supabase-js';
+import { googleCalendarService } from './service';
+import { logSyncEvent } from './sync-log';
+
+/** Full sync window: last 30 days + next 365 */
+const FULL_SYNC_DAYS_BACK = 30;
+const FULL_SYNC_DAYS_FORWARD = 365;
+
+export interface IncomingSyncResult {
+  calendarId: string;
+  fullSync: boolean;
+  processed: number;
+  ignored: number;
+  errors: { eventId: string; error: string }[];
+  nextSyncToken?: string;
+}
+
+/**
+ * Sync the changes of one calendar into appointments.
+ * Per-event failures are collected in `errors`; listing failures throw.
+ */
+export async function syncCalendarChanges(
+  supabase: SupabaseClient<any, any, any>,
+  calendarId: string,
+  options: { syncToken?: string | null; fullSync?: boolean } = {}
+): Promise<IncomingSyncResult> {
+  const fullSync = !!options.fullSync || !options.syncToken;
+
+  let listResult;
+  if (fullSync) {
+    console.log(`Doing full sync for calendar ${calendarId}`);
+
+    listResult = await googleCalendarService.listEvents(calendarId, {
+      singleEvents: true,
+      timeMin: new Date(Date.now() - FULL_SYNC_DAYS_BACK * 24 * 60 * 60 * 1000).toISOString(),
+      timeMax: new Date(Date.now() + FULL_SYNC_DAYS_FORWARD * 24 * 60 * 60 * 1000).toISOString(),
+    });
+  } else {
+    console.log(`Doing incremental sync for calendar ${calendarId} with syncToken`);
+
+    listResult = await googleCalendarService.listEvents(calendarId, {
+      syncToken: options.syncToken as string,
+    });
+  }
+
+  const events = listResult.events;
+  console.log(`${fullSync ? 'Full' : 'Incremental'} sync listed ${events.length} events`);
+
+  let therapistId: string | null | undefined;
+  const result: IncomingSyncResult = {
+    calendarId,
+    fullSync,
+    processed: 0,
+    ignored: 0,
+    errors: [],
+    nextSyncToken: listResult.nextSyncToken,
+  };
+
+  for (const event of events) {
+    try {
+      // Ignorar eventos transparent (não bloqueiam tempo)
+      if (event.transparency === 'transparent') {
+        console.debug(`Ignoring transparent event: ${event.id}`);
+        result.ignored++;
+        continue;
+      }
+
+      // Mapear para formato Cedro
+      const cedroData = await googleCalendarService.mapGoogleEventToCedro(event);
+
+      if (!cedroData) {
+        result.ignored++;
+        continue;
+      }
+
+      // Se evento foi deletado, atualizar status
+      if (cedroData.status === 'cancelled') {
+        const { error: updateError } = await supabase
+          .from('appointments')
+          .update({
+            status: 'cancelled',
+            source_updated_at: cedroData.source_updated_at,
+            updated_at: new Date().toISOString(),
+          })
+          .eq('external_event_id', event.id)
+          .eq('external_calendar_id', calendarId);
+
+        if (updateError) {
+          throw new Error(`Failed to cancel event: ${updateError.message}`);
+        }
+
+        console.log(`Event cancelled: ${event.id}`);
+        result.processed++;
+        continue;
+      }
+
+      // Upsert por (external_calendar_id, external_event_id)
+      // Usar origem='google' para evitar loop
+      const upsertData = {
+        ...cedroData,
+        external_calendar_id: calendarId,
+        origin: 'google', // IMPORTANTE: previne loop
+        updated_at: new Date().toISOString(),
+      };
+
+      const { data: existingAppointment } = await supabase
+        .from('appointments')
+        .select('id')
+        .eq('external_event_id', event.id)
+        .eq('external_calendar_id', calendarId)
+        .maybeSingle();
+
+      if (existingAppointment) {
+        const { error: updateError } = await supabase
+          .from('appointments')
+          .update(upsertData)
+          .eq('external_event_id', event.id)
+          .eq('external_calendar_id', calendarId);
+
+        if (updateError) {
+          throw new Error(`Failed to update event: ${updateError.message}`);
+        }
+
+        console.log(`Event updated: ${event.id}`);
+      } else {
+        // INSERT - o therapist_id vem do canal do calendário (buscado uma vez por sync)
+        if (therapistId === undefined) {
+          const { data: therapistChannel } = await supabase
+            .from('google_calendar_channels')
+            .select('therapist_id')
+            .eq('calendar_id', calendarId)
+            .maybeSingle();
+
+          therapistId = therapistChannel?.therapist_id ?? null;
+        }
+
+        if (!therapistId) {
+          throw new Error(`Cannot find therapist for calendar ${calendarId}`);
+        }
+
+        const insertData = {
+          ...upsertData,
+          therapist_id: therapistId,
+          patient_id: null, // Será vinculado manualmente ou automaticamente
+          status: upsertData.status || 'scheduled',
+        };
+
+        const { error: insertError } = await supabase
+          .from('appointments')
+          .insert(insertData);
+
+        if (insertError) {
+          // Se falhar por constraint unique, pode ser race condition - tentar update
+          if (insertError.code === '23505') {
+            const { error: updateError } = await supabase
+              .from('appointments')
+              .update(upsertData)
+              .eq('external_event_id', event.id)
+              .eq('external_calendar_id', calendarId);
+
+            if (updateError) {
+              throw updateError;
+            }
+
+            console.log(`Event updated (race condition): ${event.id}`);
+          } else {
+            throw insertError;
+          }
+        } else {
+          console.log(`Event created: ${event.id}`);
+        }
+      }
+
+      result.processed++;
+
+      logSyncEvent({
+        event_id: event.id,
+        calendar_id: calendarId,
+        action: 'sync',
+        direction: 'google_to_cedro',
+        status: 'success',
+        payload: { event },
+      });
+    } catch (error) {
+      const errorMessage = error instanceof Error ? error.message : String(error);
+      console.error(`Error processing event ${event.id}:`, errorMessage);
+
+      result.errors.push({
+        eventId: event.id,
+        error: errorMessage,
+      });
+
+      logSyncEvent({
+        event_id: event.id,
+        calendar_id: calendarId,
+        action: 'sync',
+        direction: 'google_to_cedro',
+        status: 'error',
+        error_message: errorMessage,
+        payload: { event },
+      });
+    }
+  }
+
+  return result;
+}
@@ -0,0 +1,61 @@
+/**
+ * Google Calendar push notification coalescing
+ * O webhook só marca o calendário como pendente; /api/cron/process-gcal-notifications
+ * roda um sync por calendário quando as notificações param de chegar
+ * (ver db/schema/gcal_webhook_coalescing.sql)
+ */
+
+/** Calendar must be quiet this long before it is synced (debounce) */
+export const NOTIFICATION_DEBOUNCE_MS = 10 * 1000;
+
+/** ...unless it has been pending this long, so a steady stream still syncs */
+export const NOTIFICATION_MAX_WAIT_MS = 60 * 1000;
+
+/** Per-calendar lock; longer than the worker's maxDuration, so it only expires if the worker died */
+export const SYNC_LEASE_MS = 5 * 60 * 1000;
+
+/** Calendars claimed per poll */
+export const SYNC_CLAIM_LIMIT = 10;
+
+export const SYNC_CONCURRENCY = 3;
+
+/** The worker keeps polling for due calendars for this long per cron run */
+export const WORKER_BUDGET_MS = 45 * 1000;
+
+export const WORKER_POLL_INTERVAL_MS = 5 * 1000;
+
+/** Postgres interval literal for an RPC argument ("10 seconds") */
+export function toPgInterval(ms: number): string {
+  return `${Math.max(0, Math.round(ms / 1000))} seconds`;
+}
+
+/**
+ * 'sync' is the handshake Google sends right after events.watch; the sync token
+ * may be missing or stale, so the calendar gets a full sync. 'exists' (and
+ * anything else) is a plain "something changed".
+ */
+export function isFullSyncNotification(resourceState: string): boolean {
+  return resourceState === 'sync';
+}
+
+/**
+ * Same rule as cedro.claim_gcal_syncs, for status reporting: pending, not
+ * locked, and either quiet for the debounce or pending past the max wait.
+ */
+export function isSyncDue(
+  state: {
+    pending_since: string | null;
+    last_notified_at: string | null;
+    sync_locked_until?: string | null;
+  },
+  now: number = Date.now()
+): boolean {
+  if (!state.pending_since) return false;
+  if (state.sync_locked_until && Date.parse(state.sync_locked_until) >= now) return false;
+
+  const lastNotified = state.last_notified_at ? Date.parse(state.last_notified_at) : 0;
+  return (
+    lastNotified <= now - NOTIFICATION_DEBOUNCE_MS ||
+    Date.parse(state.pending_since) <= now - NOTIFICATION_MAX_WAIT_MS
+  );
+}
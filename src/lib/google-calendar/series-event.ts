@@ -0,0 +1,127 @@
+/**
+ * Google Calendar recurring event for a Cedro series
+ * O evento recorrente é criado antes de as ocorrências serem vinculadas a ele;
+ * se o vínculo falhar, o retry do job encontra o evento já criado (pelas
+ * extendedProperties privadas) em vez de criar um segundo.
+ */
+
+/**
+ * Private extended properties that identify the recurring event created for
+ * a series from a given first occurrence. A retry sees the same unlinked
+ * occurrences, so it builds the same key.
+ */
+export function seriesEventKey(
+  seriesId: string,
+  firstOccurrenceStart: string
+): Record<string, string> {
+  return {
+    cedro_series_id: seriesId,
+    cedro_series_start: new Date(firstOccurrenceStart).toISOString(),
+  };
+}
+
+/** events.list `privateExtendedProperty` filters ("key=value") */
+export function toPrivatePropertyFilters(properties: Record<string, string>): string[] {
+  return Object.keys(properties).map((key) => `${key}=${properties[key]}`);
+}
+
+/**
+ * Reuse the event left by a previous attempt when there is one, create it
+ * otherwise, then link the occurrences. Linking failures propagate (the job
+ * is retried and takes the `find` path).
+ */
+export async function ensureSeriesEvent<E extends { id: string }>(steps: {
+  find: () => Promise<E | null>;
+  create: () => Promise<E>;
+  link: (event: E) => Promise<void>;
+}): Promise<{ event: E; reused: boolean }> {
+  const existing = await steps.find();
+  const event = existing || (await steps.create());
+
+  await steps.link(event);
+
+  return { event, reused: !!existing };
+}
+
+const WEEK_MS = 7 * 24 * 60 * 60 * 1000;
+
+/** Instance start as used in Google instance IDs and EXDATE (20250310T170000Z) */
+export function toGoogleUtc(start: string): string {
+  return new Date(start).toISOString().replace(/[-:]/g, '').replace(/\.\d{3}/, '');
+}
+
+export interface SeriesRecurrencePlan<O> {
+  /** DTSTART of the recurring event */
+  first: O;
+  /** Slots from first to last, including the excluded ones */
+  count: number;
+  /** Slots with no active occurrence (cancelled), in Google UTC format */
+  exdates: string[];
+  /** Occurrences that match an instance of the recurring event */
+  onGrid: O[];
+  /** Moved occurrences (or with another duration): synced one by one */
+  offGrid: O[];
+}
+
+/**
+ * Fits the pending occurrences of a series into one WEEKLY rule. The anchor
+ * is the occurrence whose grid (every `intervalWeeks`, same time and
+ * duration) holds the most occurrences; empty slots become EXDATEs and
+ * occurrences off that grid are left out, so every linked row has a real
+ * Google instance. `occurrences` must not be empty.
+ */
+export function planSeriesRecurrence<O extends { start_at: string; end_at: string }>(
+  occurrences: O[],
+  intervalWeeks: number
+): SeriesRecurrencePlan<O> {
+  const step = Math.max(1, intervalWeeks) * WEEK_MS;
+  const rows = occurrences
+    .map((occurrence) => ({
+      occurrence,
+      start: new Date(occurrence.start_at).getTime(),
+      duration: new Date(occurrence.end_at).getTime() - new Date(occurrence.start_at).getTime(),
+    }))
+    .sort((a, b) => a.start - b.start);
+
+  let best: typeof rows = [];
+  for (const anchor of rows) {
+    const members = rows.filter(
+      (row) =>
+        row.start >= anchor.start &&
+        (row.start - anchor.start) % step === 0 &&
+        row.duration === anchor.duration
+    );
+    if (members.length > best.length) best = members;
+  }
+
+  const first = best[0];
+  const last = best[best.length - 1];
+  const count = (last.start - first.start) / step + 1;
+
+  const taken = new Set(best.map((row) => row.start));
+  const exdates: string[] = [];
+  for (let slot = 1; slot < count; slot++) {
+    const start = first.start + slot * step;
+    if (!taken.has(start)) exdates.push(toGoogleUtc(new Date(start).toISOString()));
+  }
+
+  const onGrid = new Set(best.map((row) => row.occurrence));
+
+  return {
+    first: first.occurrence,
+    count,
+    exdates,
+    onGrid: best.map((row) => row.occurrence),
+    offGrid: rows.filter((row) => !onGrid.has(row.occurrence)).map((row) => row.occurrence),
+  };
+}
+
+/** RRULE (plus EXDATE for the gaps) of the recurring event */
+export function seriesRecurrenceRules(
+  plan: Pick<SeriesRecurrencePlan<unknown>, 'count' | 'exdates'>,
+  intervalWeeks: number
+): string[] {
+  const rules = [`RRULE:FREQ=WEEKLY;INTERVAL=${intervalWeeks};COUNT=${plan.count}`];
+  if (plan.exdates.length > 0) rules.push(`EXDATE:${plan.exdates.join(',')}`);
+  return rules;
+}
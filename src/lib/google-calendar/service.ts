@@ -14,8 +14,17 @@ import type {
   GoogleCalendarWatchResponse,
   GoogleCalendarSyncError,
   CedroAppointmentForSync,
+  CedroSeriesForSync,
 } from './types';
 import { createClient } from '@supabase/supabase-js';
+import { tracedFetch } from '../tracing';
+import { logSyncEvent } from './sync-log';
+import {
+  seriesEventKey,
+  seriesRecurrenceRules,
+  toPrivatePropertyFilters,
+  type SeriesRecurrencePlan,
+} from './series-event';
 
 // Supabase client para persistir dados
 const supabase = createClient(
@@ -25,6 +34,9 @@ const supabase = createClient(
     db: {
       schema: 'cedro',
     },
+    global: {
+      fetch: tracedFetch,
+    },
   }
 );
 
@@ -216,6 +228,161 @@ export class GoogleCalendarService {
     }
   }
 
+  /**
+   * Cria um evento recorrente semanal para uma série do Cedro
+   * Uma única chamada à API no lugar de uma por ocorrência; os intervalos
+   * sem ocorrência ativa (canceladas) entram como EXDATE
+   */
+  async createRecurringEvent(
+    series: CedroSeriesForSync,
+    plan: Pick<SeriesRecurrencePlan<{ start_at: string; end_at: string }>, 'first' | 'count' | 'exdates'>,
+    calendarId: string
+  ): Promise<GoogleCalendarEvent> {
+    const { first: firstOccurrence, count } = plan;
+
+    try {
+      const calendar = getGoogleCalendar();
+
+      const eventBody: any = {
+        summary: series.summary || 'Sessão - Cedro',
+        description: series.notes || 'Criado via Cedro',
+        start: {
+          dateTime: firstOccurrence.start_at,
+          timeZone: TIMEZONE,
+        },
+        end: {
+          dateTime: firstOccurrence.end_at,
+          timeZone: TIMEZONE,
+        },
+        recurrence: seriesRecurrenceRules(plan, series.interval_weeks),
+        transparency: 'opaque',
+        extendedProperties: {
+          private: {
+            ...seriesEventKey(series.id, firstOccurrence.start_at),
+            cedro_patient_name: series.patient?.name || '',
+          },
+        },
+      };
+
+      console.log(`Creating recurring event on Google Calendar (${calendarId}):`, {
+        seriesId: series.id,
+        start: eventBody.start.dateTime,
+        count,
+        excluded: plan.exdates.length,
+      });
+
+      const response = await calendar.events.insert({
+        calendarId,
+        requestBody: eventBody,
+      });
+
+      return response.data as unknown as GoogleCalendarEvent;
+    } catch (error) {
+      await this.logSync({
+        event_id: series.id,
+        calendar_id: calendarId,
+        action: 'create_series',
+        direction: 'cedro_to_google',
+        status: 'error',
+        error_message: this.extractErrorMessage(error),
+        payload: { series, count, exdates: plan.exdates },
+      });
+
+      throw this.parseError(error);
+    }
+  }
+
+  /**
+   * Busca o evento recorrente já criado para a série a partir desta ocorrência
+   * (retry de um job cujo vínculo falhou depois do insert)
+   */
+  async findRecurringEvent(
+    seriesId: string,
+    firstOccurrenceStart: string,
+    calendarId: string
+  ): Promise<GoogleCalendarEvent | null> {
+    try {
+      const calendar = getGoogleCalendar();
+
+      const response = await calendar.events.list({
+        calendarId,
+        privateExtendedProperty: toPrivatePropertyFilters(
+          seriesEventKey(seriesId, firstOccurrenceStart)
+        ),
+        showDeleted: false,
+        singleEvents: false,
+        maxResults: 1,
+      });
+
+      const event = response.data.items?.[0];
+      return event ? (event as unknown as GoogleCalendarEvent) : null;
+    } catch (error) {
+      throw this.parseError(error);
+    }
+  }
+
+  /**
+   * Encerra um evento recorrente antes de `until` (UNTIL no RRULE)
+   * Ocorrências anteriores continuam intactas no Google
+   */
+  async truncateRecurringEvent(
+    calendarId: string,
+    eventId: string,
+    until: Date
+  ): Promise<void> {
+    try {
+      const calendar = getGoogleCalendar();
+
+      const { data: master } = await calendar.events.get({
+        calendarId,
+        eventId,
+      });
+
+      // UNTIL é inclusivo; recuar 1s para excluir a ocorrência no corte
+      const untilUtc = new Date(until.getTime() - 1000)
+        .toISOString()
+        .replace(/[-:]/g, '')
+        .replace(/\.\d{3}/, '');
+
+      const recurrence = (master.recurrence || []).map((rule) =>
+        rule.startsWith('RRULE:')
+          ? rule
+              .replace(/;(COUNT|UNTIL)=[^;]*/g, '')
+              .concat(`;UNTIL=${untilUtc}`)
+          : rule
+      );
+
+      console.log(`Truncating recurring event on Google Calendar:`, {
+        id: eventId,
+        calendarId,
+        until: untilUtc,
+      });
+
+      await calendar.events.patch({
+        calendarId,
+        eventId,
+        requestBody: { recurrence },
+      });
+    } catch (error: any) {
+      if (error.code === 410) {
+        console.log(`Recurring event already deleted on Google Calendar:`, { eventId });
+        return;
+      }
+
+      await this.logSync({
+        event_id: eventId,
+        calendar_id: calendarId,
+        action: 'truncate_series',
+        direction: 'cedro_to_google',
+        status: 'error',
+        error_message: this.extractErrorMessage(error),
+        payload: { until: until.toISOString() },
+      });
+
+      throw this.parseError(error);
+    }
+  }
+
   /**
    * Deleta evento do Google Calendar
    * Se já foi deletado (410), ignora o erro
@@ -338,7 +505,8 @@ export class GoogleCalendarService {
   async watchCalendar(
     calendarId: string,
     address: string,
-    token: string
+    token: string,
+    channelId?: string
   ): Promise<GoogleCalendarWatchResponse> {
     try {
       const calendar = getGoogleCalendar();
@@ -351,7 +519,8 @@ export class GoogleCalendarService {
       const response = await calendar.events.watch({
         calendarId,
         requestBody: {
-          id: `cedro-${calendarId}-${Date.now()}`,
+          // O webhook localiza o canal por X-Goog-Channel-ID = channel_id salvo
+          id: channelId || `cedro-${calendarId}-${Date.now()}`,
           type: 'web_hook',
           address,
           token,
@@ -447,6 +616,7 @@ export class GoogleCalendarService {
 
   /**
    * Log de operação de sincronização
+   * Enfileirado no writer em lote (sync-log.ts), não bloqueia a operação
    */
   private async logSync(log: {
     event_id?: string;
@@ -457,21 +627,15 @@ export class GoogleCalendarService {
     error_message?: string;
     payload?: any;
   }): Promise<void> {
-    try {
-      await supabase.from('calendar_sync_log').insert({
-        event_id: log.event_id,
-        calendar_id: log.calendar_id,
-        action: log.action,
-        direction: log.direction,
-        status: log.status,
-        error_message: log.error_message,
-        payload: log.payload,
-        created_at: new Date().toISOString(),
-      });
-    } catch (error) {
-      console.error('Error logging sync operation:', error);
-      // Não falhar se logging falhar
-    }
+    logSyncEvent({
+      event_id: log.event_id,
+      calendar_id: log.calendar_id,
+      action: log.action,
+      direction: log.direction,
+      status: log.status,
+      error_message: log.error_message,
+      payload: log.payload,
+    });
   }
 
   /**
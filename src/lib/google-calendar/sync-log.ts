@@ -0,0 +1,157 @@
+/**
+ * Buffered calendar_sync_log writer
+ * Enfileira as linhas de log em memória e grava em lotes (um INSERT por lote),
+ * fora do caminho de cada evento sincronizado.
+ *
+ * - Flush quando o buffer atinge SYNC_LOG_BATCH_SIZE ou após SYNC_LOG_FLUSH_MS
+ * - Rotas (webhook, crons) chamam flushSyncLog() antes de responder, já que
+ *   a instância serverless pode ser congelada depois da resposta
+ * - Buffer limitado: acima de SYNC_LOG_MAX_BUFFER as linhas mais antigas são
+ *   descartadas (log de auditoria nunca bloqueia a sincronização)
+ */
+
+import { createClient } from '@supabase/supabase-js';
+
+export const SYNC_LOG_BATCH_SIZE = 100;
+export const SYNC_LOG_FLUSH_MS = 1000;
+export const SYNC_LOG_MAX_BUFFER = 5000;
+const MAX_FLUSH_ATTEMPTS = 3;
+
+export interface SyncLogEntry {
+  event_id?: string | null;
+  calendar_id?: string | null;
+  action: string;
+  direction: 'cedro_to_google' | 'google_to_cedro' | string;
+  status: 'success' | 'error' | 'skipped' | string;
+  error_message?: string | null;
+  payload?: any;
+  created_at?: string;
+}
+
+type InsertBatch = (rows: SyncLogEntry[]) => Promise<{ error: { message: string } | null }>;
+
+export class SyncLogWriter {
+  private buffer: SyncLogEntry[] = [];
+  private timer: ReturnType<typeof setTimeout> | null = null;
+  private flushing: Promise<void> | null = null;
+  private attempts = 0;
+  dropped = 0;
+
+  constructor(
+    private insertBatch: InsertBatch,
+    private options: { batchSize?: number; flushMs?: number; maxBuffer?: number } = {}
+  ) {}
+
+  get pending(): number {
+    return this.buffer.length;
+  }
+
+  /** Enfileira uma linha; nunca lança nem espera o banco */
+  log(entry: SyncLogEntry): void {
+    const { batchSize = SYNC_LOG_BATCH_SIZE, flushMs = SYNC_LOG_FLUSH_MS } = this.options;
+
+    this.buffer.push({ ...entry, created_at: entry.created_at || new Date().toISOString() });
+    this.trim();
+
+    if (this.buffer.length >= batchSize) {
+      void this.flush();
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => {
+        this.timer = null;
+        void this.flush();
+      }, flushMs);
+    }
+  }
+
+  /** Grava tudo o que está no buffer, em lotes de batchSize */
+  async flush(): Promise<void> {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+
+    // Um flush por vez; quem chama durante um flush espera e drena o restante
+    while (this.flushing) {
+      await this.flushing;
+    }
+    if (this.buffer.length === 0) return;
+
+    this.flushing = this.drain();
+    try {
+      await this.flushing;
+    } finally {
+      this.flushing = null;
+    }
+  }
+
+  private async drain(): Promise<void> {
+    const { batchSize = SYNC_LOG_BATCH_SIZE } = this.options;
+
+    while (this.buffer.length > 0) {
+      const batch = this.buffer.splice(0, batchSize);
+
+      try {
+        const { error } = await this.insertBatch(batch);
+        if (error) throw new Error(error.message);
+        this.attempts = 0;
+      } catch (error) {
+        this.attempts++;
+        console.error('Error writing calendar_sync_log batch:', error);
+
+        if (this.attempts < MAX_FLUSH_ATTEMPTS) {
+          // Devolve o lote para a frente da fila; próxima tentativa no próximo flush
+          this.buffer.unshift(...batch);
+          this.trim();
+        } else {
+          this.dropped += batch.length;
+          this.attempts = 0;
+        }
+        return;
+      }
+    }
+  }
+
+  private trim() {
+    const { maxBuffer = SYNC_LOG_MAX_BUFFER } = this.options;
+    const excess = this.buffer.length - maxBuffer;
+    if (excess > 0) {
+      this.buffer.splice(0, excess);
+      this.dropped += excess;
+      console.warn(`calendar_sync_log buffer full: ${excess} entries dropped`);
+    }
+  }
+}
+
+let writer: SyncLogWriter | null = null;
+
+function getSyncLogWriter(): SyncLogWriter {
+  if (!writer) {
+    const supabase = createClient(
+      process.env.NEXT_PUBLIC_SUPABASE_URL!,
+      process.env.SUPABASE_SERVICE_ROLE_KEY!,
+      {
+        db: {
+          schema: 'cedro',
+        },
+      }
+    );
+    writer = new SyncLogWriter(async (rows) => await supabase.from('calendar_sync_log').insert(rows));
+  }
+  return writer;
+}
+
+/**
+ * Registra uma operação de sincronização (assíncrono, em lote)
+ */
+export function logSyncEvent(entry: SyncLogEntry): void {
+  getSyncLogWriter().log(entry);
+}
+
+/**
+ * Grava as linhas pendentes; chamar antes de responder em rotas/crons
+ */
+export async function flushSyncLog(): Promise<void> {
+  if (writer) {
+    await writer.flush();
+  }
+}
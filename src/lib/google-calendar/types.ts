@@ -110,3 +110,16 @@ export interface CedroAppointmentForSync {
   external_calendar_id?: string;
   gcal_etag?: string;
 }
+
+export interface CedroSeriesForSync {
+  id: string;
+  therapist_id: string;
+  summary?: string;
+  notes?: string;
+  interval_weeks: number;
+  external_event_id?: string;
+  external_calendar_id?: string;
+  patient?: {
+    name?: string;
+  };
+}
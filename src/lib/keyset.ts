@@ -0,0 +1,61 @@
+/**
+ * Keyset (cursor) pagination for PostgREST queries
+ *
+ * Pages continue after the last row seen, ordered by (column, id), instead
+ * of using OFFSET: each page costs the same regardless of depth and rows
+ * inserted meanwhile do not shift the pages. Used by the streaming exports
+ * and the CRM kanban columns.
+ */
+
+export interface KeysetOrder {
+  column: string
+  /** Unique tie-breaker, compared in the same direction as column */
+  idColumn: string
+  ascending: boolean
+  /** Column may be NULL: NULLs come last, after every non-null value */
+  nullable?: boolean
+}
+
+export interface KeysetCursor {
+  value: string | number | null
+  id: string
+}
+
+/** The subset of the PostgREST filter builder used for keyset paging */
+export interface KeysetQuery {
+  or(filters: string): KeysetQuery
+  is(column: string, value: null): KeysetQuery
+  gt(column: string, value: unknown): KeysetQuery
+  lt(column: string, value: unknown): KeysetQuery
+  order(column: string, options: { ascending: boolean; nullsFirst?: boolean }): KeysetQuery
+}
+
+function quoteFilterValue(value: string | number): string {
+  return `"${String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"')}"`
+}
+
+/** PostgREST or() expression for the rows after a non-null cursor */
+export function keysetFilter(order: KeysetOrder, cursor: KeysetCursor): string {
+  const op = order.ascending ? 'gt' : 'lt'
+  const value = quoteFilterValue(cursor.value as string | number)
+  const conditions = [
+    `${order.column}.${op}.${value}`,
+    `and(${order.column}.eq.${value},${order.idColumn}.${op}.${quoteFilterValue(cursor.id)})`
+  ]
+  if (order.nullable) conditions.push(`${order.column}.is.null`)
+  return conditions.join(',')
+}
+
+/** Adds the cursor condition and the (column, id) ordering to a query */
+export function applyKeyset<Q extends KeysetQuery>(query: Q, order: KeysetOrder, cursor: KeysetCursor | null): Q {
+  let next: KeysetQuery = query
+  if (cursor && cursor.value === null) {
+    // Já na faixa de NULLs (sempre no fim): só o id desempata
+    next = next.is(order.column, null)[order.ascending ? 'gt' : 'lt'](order.idColumn, cursor.id)
+  } else if (cursor) {
+    next = next.or(keysetFilter(order, cursor))
+  }
+  return next
+    .order(order.column, { ascending: order.ascending, nullsFirst: false })
+    .order(order.idColumn, { ascending: order.ascending }) as Q
+}
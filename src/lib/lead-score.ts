@@ -0,0 +1,73 @@
+/**
+ * Lead score used by the CRM pages and the leads export.
+ * Computed from the lead data (not stored), so list, kanban and export
+ * apply the same score filters.
+ */
+
+export interface LeadScoreInput {
+  source?: string
+  email?: string
+  phone?: string
+  stage?: string
+  is_christian?: boolean
+  created_at?: string
+}
+
+export function calculateLeadScore(data: LeadScoreInput): number {
+  let score = 50 // Base score
+
+  // Source scoring
+  const sourceScores: Record<string, number> = {
+    'indicacao': 20,
+    'google': 15,
+    'instagram': 8,
+    'whatsapp': 12,
+  }
+
+  if (data.source) {
+    score += sourceScores[data.source.toLowerCase()] || 5
+  }
+
+  // Email domain scoring
+  if (data.email) {
+    const domain = data.email.split('@')[1]
+    if (domain && !['gmail.com', 'hotmail.com', 'yahoo.com'].includes(domain)) {
+      score += 10 // Corporate email
+    }
+  }
+
+  // Phone number scoring
+  if (data.phone) {
+    score += 10
+  }
+
+  // Stage scoring
+  const stageScores: Record<string, number> = {
+    'lead': 0,
+    'mql': 10,
+    'sql': 20,
+    'won': 30,
+    'lost': -20
+  }
+
+  if (data.stage) {
+    score += stageScores[data.stage] || 0
+  }
+
+  // Christian qualification scoring
+  if (data.is_christian === true) {
+    score += 15
+  }
+
+  // Time-based scoring (newer leads get slight boost)
+  if (data.created_at) {
+    const createdDate = new Date(data.created_at)
+    const daysSinceCreated = Math.floor((Date.now() - createdDate.getTime()) / (1000 * 60 * 60 * 24))
+    
+    if (daysSinceCreated <= 7) {
+      score += 5 // Recent lead bonus
+    }
+  }
+
+  return Math.min(100, Math.max(0, score))
+}
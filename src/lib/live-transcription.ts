@@ -0,0 +1,175 @@
+/**
+ * Live (incremental) transcription of teleconsultation recordings
+ *
+ * The browser ships MediaRecorder timeslices while the session is running.
+ * Each chunk is appended to a per-job file on local disk (WebM timeslices are
+ * only decodable as a continuous stream), and every LIVE_SEGMENT_SECONDS of
+ * new audio is cut with ffmpeg and sent to Whisper. Segment texts are stored
+ * in cedro.recording_job_segments and stitched when the session ends, so the
+ * transcript is ready almost as soon as the recording stops.
+ *
+ * Server-only (fs + ffmpeg). Requires GROQ_API_KEY; without it the client
+ * falls back to the single upload at the end of the session.
+ */
+
+import Groq, { toFile } from 'groq-sdk'
+import { appendFile, mkdir, unlink, stat } from 'fs/promises'
+import { join } from 'path'
+import { tmpdir } from 'os'
+import { extractSegmentForWhisper } from './audio-processing'
+import { transcriptTail } from './transcript-stitching'
+import { withSpan } from './tracing'
+import type { createClient } from './supabase/server'
+
+export const LIVE_SEGMENT_SECONDS = 30
+export const LIVE_SEGMENT_OVERLAP_SECONDS = 2
+export const LIVE_TRANSCRIPTION_MODEL = process.env.LIVE_TRANSCRIPTION_MODEL || 'whisper-large-v3'
+
+const LIVE_DIR = join(tmpdir(), 'cedro-live-recordings')
+
+let groqClient: Groq | null = null
+
+export function isLiveTranscriptionEnabled(): boolean {
+  return !!process.env.GROQ_API_KEY
+}
+
+function getGroqClient(): Groq {
+  if (!groqClient) {
+    groqClient = new Groq({ apiKey: process.env.GROQ_API_KEY })
+  }
+  return groqClient
+}
+
+export function liveRecordingPath(recordingJobId: string): string {
+  return join(LIVE_DIR, `${recordingJobId}.webm`)
+}
+
+export async function appendLiveChunk(recordingJobId: string, chunk: Buffer): Promise<void> {
+  await mkdir(LIVE_DIR, { recursive: true })
+  await appendFile(liveRecordingPath(recordingJobId), chunk)
+}
+
+export async function hasLiveRecording(recordingJobId: string): Promise<boolean> {
+  try {
+    await stat(liveRecordingPath(recordingJobId))
+    return true
+  } catch {
+    return false
+  }
+}
+
+export async function removeLiveRecording(recordingJobId: string): Promise<void> {
+  try {
+    await unlink(liveRecordingPath(recordingJobId))
+  } catch (error: any) {
+    // Job sem sessão ao vivo (upload único) não tem arquivo
+    if (error?.code === 'ENOENT') return
+    console.warn('Failed to remove live recording file:', error)
+  }
+}
+
+/**
+ * Window to transcribe next: starts a little before what is already
+ * transcribed (overlap) and ends at the audio received so far.
+ * Returns null while there is not enough new audio (unless `final`).
+ */
+export function nextSegmentWindow(
+  transcribedUntil: number,
+  availableSeconds: number,
+  final: boolean = false
+): { start: number; end: number } | null {
+  const pending = availableSeconds - transcribedUntil
+  if (pending <= 0) return null
+  if (!final && pending < LIVE_SEGMENT_SECONDS) return null
+
+  return {
+    start: Math.max(0, transcribedUntil - LIVE_SEGMENT_OVERLAP_SECONDS),
+    end: availableSeconds
+  }
+}
+
+/**
+ * Cuts one window from the job's live file and transcribes it
+ */
+export async function transcribeLiveSegment(
+  recordingJobId: string,
+  window: { start: number; end: number },
+  previousText: string = ''
+): Promise<string> {
+  const audio = await extractSegmentForWhisper(
+    liveRecordingPath(recordingJobId),
+    window.start,
+    window.end - window.start
+  )
+
+  const file = await toFile(audio, `segment_${Math.round(window.start)}.mp3`)
+  const result = await withSpan('groq transcriptions.create', 'ai', () =>
+    getGroqClient().audio.transcriptions.create({
+      file,
+      model: LIVE_TRANSCRIPTION_MODEL,
+      language: 'pt',
+      prompt: transcriptTail(previousText) || undefined,
+      response_format: 'json',
+      temperature: 0
+    }),
+    { 'ai.model': LIVE_TRANSCRIPTION_MODEL }
+  )
+
+  return (result.text || '').trim()
+}
+
+type ServerSupabaseClient = ReturnType<typeof createClient>
+
+/**
+ * Transcribes the audio received since the last segment (if enough, or all
+ * of it when `final`) and stores it as the next segment.
+ * Returns the new segment text, or null when nothing was transcribed.
+ */
+export async function transcribePendingAudio(
+  supabase: ServerSupabaseClient,
+  recordingJobId: string,
+  transcribedUntil: number,
+  availableSeconds: number,
+  final: boolean = false
+): Promise<{ text: string; transcribedUntil: number } | null> {
+  const window = nextSegmentWindow(transcribedUntil, availableSeconds, final)
+  if (!window) return null
+
+  const { data: previousSegments } = await supabase
+    .schema('cedro')
+    .from('recording_job_segments')
+    .select('segment_index, text')
+    .eq('recording_job_id', recordingJobId)
+    .order('segment_index', { ascending: false })
+    .limit(1)
+
+  const previous = (previousSegments as Array<{ segment_index: number; text: string }> | null)?.[0]
+  const text = await transcribeLiveSegment(recordingJobId, window, previous?.text || '')
+
+  const { error: segmentError } = await supabase
+    .schema('cedro')
+    .from('recording_job_segments')
+    .upsert({
+      recording_job_id: recordingJobId,
+      segment_index: previous ? previous.segment_index + 1 : 0,
+      start_seconds: window.start,
+      end_seconds: window.end,
+      text
+    }, { onConflict: 'recording_job_id,segment_index' })
+
+  if (segmentError) {
+    throw new Error(`Failed to store transcript segment: ${segmentError.message}`)
+  }
+
+  const { error: jobError } = await supabase
+    .schema('cedro')
+    .from('recording_jobs')
+    .update({ live_transcribed_until: window.end, updated_at: new Date().toISOString() })
+    .eq('id', recordingJobId)
+
+  if (jobError) {
+    throw new Error(`Failed to update transcription progress: ${jobError.message}`)
+  }
+
+  return { text, transcribedUntil: window.end }
+}
@@ -0,0 +1,42 @@
+/**
+ * Log level switch
+ *
+ * LOG_LEVEL (server) / NEXT_PUBLIC_LOG_LEVEL (browser): debug | info | warn | error | silent.
+ * Defaults to `warn` in production and `debug` otherwise. Disabled levels are
+ * bound to a no-op, so debug lines on hot paths cost nothing in production;
+ * guard expensive arguments with `logger.isDebugEnabled`.
+ */
+
+export type LogLevel = 'debug' | 'info' | 'warn' | 'error' | 'silent'
+
+const LEVEL_ORDER: Record<LogLevel, number> = { debug: 10, info: 20, warn: 30, error: 40, silent: 100 }
+
+export function resolveLogLevel(value: string | undefined, nodeEnv: string | undefined): LogLevel {
+  const normalized = (value || '').toLowerCase()
+  if (normalized in LEVEL_ORDER) return normalized as LogLevel
+  return nodeEnv === 'production' ? 'warn' : 'debug'
+}
+
+const noop: (...args: any[]) => void = () => {}
+
+export function createLogger(level: LogLevel) {
+  const enabled = (target: LogLevel) => LEVEL_ORDER[target] >= LEVEL_ORDER[level]
+
+  return {
+    level,
+    isDebugEnabled: enabled('debug'),
+    debug: enabled('debug') ? console.log.bind(console) : noop,
+    info: enabled('info') ? console.info.bind(console) : noop,
+    warn: enabled('warn') ? console.warn.bind(console) : noop,
+    error: enabled('error') ? console.error.bind(console) : noop
+  }
+}
+
+export const logger = createLogger(
+  resolveLogLevel(
+    typeof window === 'undefined'
+      ? process.env.LOG_LEVEL || process.env.NEXT_PUBLIC_LOG_LEVEL
+      : process.env.NEXT_PUBLIC_LOG_LEVEL,
+    process.env.NODE_ENV
+  )
+)
@@ -0,0 +1,52 @@
+/**
+ * Pipeline stage timings (server-only)
+ *
+ * Records how long each ffmpeg stage took in cedro.pipeline_stage_timings, where
+ * cedro.pipeline_metrics() turns them into histograms for /api/metrics.
+ * Writes are fire-and-forget and skipped when the service role key is not
+ * configured: metrics never fail or slow down audio processing.
+ */
+
+import { createClient, type SupabaseClient } from '@supabase/supabase-js'
+import { withSpan } from './tracing'
+
+let client: SupabaseClient<any, any, any> | null = null
+
+function getMetricsClient(): SupabaseClient<any, any, any> | null {
+  if (!process.env.NEXT_PUBLIC_SUPABASE_URL || !process.env.SUPABASE_SERVICE_ROLE_KEY) return null
+  if (!client) {
+    client = createClient(process.env.NEXT_PUBLIC_SUPABASE_URL, process.env.SUPABASE_SERVICE_ROLE_KEY, {
+      db: { schema: 'cedro' },
+      auth: { persistSession: false }
+    })
+  }
+  return client
+}
+
+export function recordStageTiming(stage: string, durationMs: number, success: boolean = true): void {
+  const supabase = getMetricsClient()
+  if (!supabase) return
+
+  supabase
+    .from('pipeline_stage_timings')
+    .insert({ stage, duration_ms: Math.round(durationMs), success })
+    .then(({ error }) => {
+      if (error) console.warn('Failed to record stage timing:', error.message)
+    })
+}
+
+/**
+ * Runs fn and records its duration under `stage` (success or failure).
+ * Also traced as an `ffmpeg` span for the request's Server-Timing.
+ */
+export async function timeStage<T>(stage: string, fn: () => Promise<T>): Promise<T> {
+  const startedAt = Date.now()
+  try {
+    const result = await withSpan(stage, 'ffmpeg', fn)
+    recordStageTiming(stage, Date.now() - startedAt, true)
+    return result
+  } catch (error) {
+    recordStageTiming(stage, Date.now() - startedAt, false)
+    throw error
+  }
+}
@@ -0,0 +1,189 @@
+/**
+ * Minimal Ogg Opus muxer (RFC 7845)
+ *
+ * WebCodecs' AudioEncoder emits raw Opus packets; Whisper, MinIO previews and
+ * <audio> need them in a container. This writes the two header pages
+ * (OpusHead, OpusTags) and packs the audio packets into Ogg pages with 48 kHz
+ * granule positions. No dependencies, works in the browser and in workers.
+ */
+
+export interface OpusPacket {
+  data: Uint8Array
+  // Packet duration in 48 kHz samples (Opus granules are always 48 kHz)
+  samples: number
+}
+
+export interface OggOpusOptions {
+  channels: number
+  inputSampleRate: number
+  preSkip?: number
+  vendor?: string
+  serial?: number
+}
+
+// Default libopus encoder delay at 48 kHz
+export const DEFAULT_PRE_SKIP = 312
+const MAX_SEGMENTS_PER_PAGE = 255
+// Flush a page at least every ~1s of audio so seeking/streaming stays cheap
+const MAX_GRANULES_PER_PAGE = 48000
+
+const CRC_TABLE = (() => {
+  const table = new Uint32Array(256)
+  for (let i = 0; i < 256; i++) {
+    let r = i << 24
+    for (let j = 0; j < 8; j++) {
+      r = r & 0x80000000 ? (r << 1) ^ 0x04c11db7 : r << 1
+    }
+    table[i] = r >>> 0
+  }
+  return table
+})()
+
+/**
+ * Ogg CRC-32 (poly 0x04C11DB7, init 0, no reflection, no final xor)
+ */
+export function oggCrc32(bytes: Uint8Array): number {
+  let crc = 0
+  for (let i = 0; i < bytes.length; i++) {
+    crc = ((crc << 8) ^ CRC_TABLE[((crc >>> 24) ^ bytes[i]) & 0xff]) >>> 0
+  }
+  return crc >>> 0
+}
+
+/**
+ * Lacing values for one packet: 255 per full segment plus the remainder
+ * (a trailing 0 when the length is a multiple of 255)
+ */
+export function lacingValues(length: number): number[] {
+  const values: number[] = []
+  let remaining = length
+  while (remaining >= 255) {
+    values.push(255)
+    remaining -= 255
+  }
+  values.push(remaining)
+  return values
+}
+
+export function buildOggPage(
+  packets: Uint8Array[],
+  options: { granule: number; serial: number; sequence: number; bos?: boolean; eos?: boolean }
+): Uint8Array {
+  const lacing: number[] = []
+  packets.forEach((packet) => lacing.push(...lacingValues(packet.length)))
+  if (lacing.length > MAX_SEGMENTS_PER_PAGE) {
+    throw new Error('Too many segments for one Ogg page')
+  }
+
+  const bodyLength = packets.reduce((sum, packet) => sum + packet.length, 0)
+  const page = new Uint8Array(27 + lacing.length + bodyLength)
+  const view = new DataView(page.buffer)
+
+  page.set([0x4f, 0x67, 0x67, 0x53], 0) // "OggS"
+  page[4] = 0 // version
+  page[5] = (options.bos ? 0x02 : 0) | (options.eos ? 0x04 : 0)
+  view.setUint32(6, options.granule % 0x100000000, true)
+  view.setUint32(10, Math.floor(options.granule / 0x100000000), true)
+  view.setUint32(14, options.serial, true)
+  view.setUint32(18, options.sequence, true)
+  view.setUint32(22, 0, true) // CRC placeholder
+  page[26] = lacing.length
+  page.set(lacing, 27)
+
+  let offset = 27 + lacing.length
+  for (const packet of packets) {
+    page.set(packet, offset)
+    offset += packet.length
+  }
+
+  view.setUint32(22, oggCrc32(page), true)
+  return page
+}
+
+function ascii(text: string): Uint8Array {
+  return Uint8Array.from(text, (char) => char.charCodeAt(0))
+}
+
+export function buildOpusHead(channels: number, inputSampleRate: number, preSkip: number): Uint8Array {
+  const head = new Uint8Array(19)
+  const view = new DataView(head.buffer)
+  head.set(ascii('OpusHead'), 0)
+  head[8] = 1 // version
+  head[9] = channels
+  view.setUint16(10, preSkip, true)
+  view.setUint32(12, inputSampleRate, true)
+  view.setInt16(16, 0, true) // output gain
+  head[18] = 0 // mapping family (mono/stereo)
+  return head
+}
+
+export function buildOpusTags(vendor: string): Uint8Array {
+  const vendorBytes = new TextEncoder().encode(vendor)
+  const tags = new Uint8Array(8 + 4 + vendorBytes.length + 4)
+  const view = new DataView(tags.buffer)
+  tags.set(ascii('OpusTags'), 0)
+  view.setUint32(8, vendorBytes.length, true)
+  tags.set(vendorBytes, 12)
+  view.setUint32(12 + vendorBytes.length, 0, true) // no user comments
+  return tags
+}
+
+/**
+ * Muxes encoded Opus packets into a complete Ogg Opus file
+ */
+export function muxOggOpus(packets: OpusPacket[], options: OggOpusOptions): Uint8Array {
+  const serial = options.serial ?? Math.floor(Math.random() * 0xffffffff)
+  const preSkip = options.preSkip ?? DEFAULT_PRE_SKIP
+  const pages: Uint8Array[] = []
+  let sequence = 0
+
+  pages.push(buildOggPage([buildOpusHead(options.channels, options.inputSampleRate, preSkip)], {
+    granule: 0, serial, sequence: sequence++, bos: true
+  }))
+  pages.push(buildOggPage([buildOpusTags(options.vendor ?? 'cedro-webcodecs')], {
+    granule: 0, serial, sequence: sequence++
+  }))
+
+  let granule = 0
+  let pending: Uint8Array[] = []
+  let pendingSegments = 0
+  let pendingGranules = 0
+
+  const flush = (eos: boolean) => {
+    if (pending.length === 0 && !eos) return
+    pages.push(buildOggPage(pending, { granule, serial, sequence: sequence++, eos }))
+    pending = []
+    pendingSegments = 0
+    pendingGranules = 0
+  }
+
+  packets.forEach((packet, index) => {
+    const segments = lacingValues(packet.data.length).length
+    if (pendingSegments + segments > MAX_SEGMENTS_PER_PAGE) {
+      flush(false)
+    }
+
+    pending.push(packet.data)
+    pendingSegments += segments
+    pendingGranules += packet.samples
+    granule += packet.samples
+
+    const isLast = index === packets.length - 1
+    if (isLast) {
+      flush(true)
+    } else if (pendingGranules >= MAX_GRANULES_PER_PAGE) {
+      flush(false)
+    }
+  })
+
+  if (packets.length === 0) flush(true)
+
+  const total = pages.reduce((sum, page) => sum + page.length, 0)
+  const output = new Uint8Array(total)
+  let offset = 0
+  for (const page of pages) {
+    output.set(page, offset)
+    offset += page.length
+  }
+  return output
+}
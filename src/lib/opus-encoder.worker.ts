@@ -0,0 +1,100 @@
+/**
+ * Web Worker: encodes mono PCM to Ogg Opus with WebCodecs' AudioEncoder
+ *
+ * Input:  { pcm: Float32Array, sampleRate, bitrate }
+ * Output: { type: 'progress', progress } ... then { type: 'done', data: ArrayBuffer }
+ *         or { type: 'error', message }
+ *
+ * Decoding/resampling happens on the main thread (decodeAudioData and
+ * OfflineAudioContext are not available in workers); the encode + mux runs
+ * here so long files don't block the UI.
+ */
+
+import { DEFAULT_PRE_SKIP, muxOggOpus, type OpusPacket } from './ogg-opus'
+
+interface EncodeRequest {
+  pcm: Float32Array
+  sampleRate: number
+  bitrate: number
+}
+
+// Feed the encoder one second at a time
+const FEED_SECONDS = 1
+
+const ctx = self as unknown as {
+  onmessage: ((event: MessageEvent<EncodeRequest>) => void) | null
+  postMessage: (message: unknown, transfer?: Transferable[]) => void
+}
+
+ctx.onmessage = async (event) => {
+  const { pcm, sampleRate, bitrate } = event.data
+  const AudioEncoderCtor = (self as any).AudioEncoder
+  const AudioDataCtor = (self as any).AudioData
+
+  if (!AudioEncoderCtor || !AudioDataCtor) {
+    ctx.postMessage({ type: 'error', message: 'WebCodecs AudioEncoder indisponível' })
+    return
+  }
+
+  try {
+    const packets: OpusPacket[] = []
+    let preSkip = DEFAULT_PRE_SKIP
+    let encodeError: Error | null = null
+
+    const encoder = new AudioEncoderCtor({
+      output: (chunk: any, metadata?: any) => {
+        const data = new Uint8Array(chunk.byteLength)
+        chunk.copyTo(data)
+        packets.push({ data, samples: Math.round((chunk.duration ?? 20000) * 48000 / 1e6) })
+
+        // OpusHead do encoder (quando presente) traz o pre-skip real
+        const description = metadata?.decoderConfig?.description
+        if (description && description.byteLength >= 12) {
+          const bytes = description instanceof ArrayBuffer
+            ? new Uint8Array(description)
+            : new Uint8Array(description.buffer, description.byteOffset, description.byteLength)
+          preSkip = bytes[10] | (bytes[11] << 8)
+        }
+      },
+      error: (error: Error) => {
+        encodeError = error
+      }
+    })
+
+    encoder.configure({
+      codec: 'opus',
+      sampleRate,
+      numberOfChannels: 1,
+      bitrate
+    })
+
+    const frameSize = sampleRate * FEED_SECONDS
+    for (let offset = 0; offset < pcm.length; offset += frameSize) {
+      const frame = pcm.subarray(offset, Math.min(offset + frameSize, pcm.length))
+      const audioData = new AudioDataCtor({
+        format: 'f32-planar',
+        sampleRate,
+        numberOfChannels: 1,
+        numberOfFrames: frame.length,
+        timestamp: Math.round(offset / sampleRate * 1e6),
+        data: frame
+      })
+      encoder.encode(audioData)
+      audioData.close()
+
+      ctx.postMessage({ type: 'progress', progress: Math.min(offset + frameSize, pcm.length) / pcm.length })
+    }
+
+    await encoder.flush()
+    encoder.close()
+
+    if (encodeError) throw encodeError
+
+    const file = muxOggOpus(packets, { channels: 1, inputSampleRate: sampleRate, preSkip })
+    ctx.postMessage({ type: 'done', data: file.buffer }, [file.buffer])
+  } catch (error) {
+    ctx.postMessage({ type: 'error', message: error instanceof Error ? error.message : 'Erro ao codificar áudio' })
+  }
+}
+
+export {}
@@ -0,0 +1,134 @@
+/**
+ * Prometheus text exposition (format 0.0.4) for /api/metrics
+ *
+ * The numbers come pre-aggregated from cedro.pipeline_metrics(); this module
+ * only turns that snapshot into metric families.
+ */
+
+export const PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+type Labels = Record<string, string | number>
+
+export interface HistogramSnapshot {
+  buckets: Array<{ le: number; count: number }>
+  sum: number
+  count: number
+}
+
+export interface PipelineMetricsSnapshot {
+  gcal_queue: Array<{ status: string; jobs: number; retries: number; oldest_age_seconds: number | null }>
+  gcal_queue_duration_seconds: HistogramSnapshot
+  gcal_sync_log_24h: Array<{ direction: string; action: string; status: string; events: number }>
+  recording_jobs: Array<{ status: string; jobs: number }>
+  n8n_duration_seconds: HistogramSnapshot
+  stage_duration_seconds: Array<{ stage: string; failures: number; histogram: HistogramSnapshot }>
+}
+
+function escapeLabel(value: string | number): string {
+  return String(value).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"')
+}
+
+function formatLabels(labels: Labels = {}): string {
+  const pairs = Object.keys(labels).map((name) => `${name}="${escapeLabel(labels[name])}"`)
+  return pairs.length > 0 ? `{${pairs.join(',')}}` : ''
+}
+
+function formatValue(value: number): string {
+  if (value === Infinity) return '+Inf'
+  if (value === -Infinity) return '-Inf'
+  return Number.isFinite(value) ? String(value) : 'NaN'
+}
+
+export class MetricsWriter {
+  private lines: string[] = []
+  private declared = new Set<string>()
+
+  private declare(name: string, type: 'gauge' | 'counter' | 'histogram', help: string) {
+    if (this.declared.has(name)) return
+    this.declared.add(name)
+    this.lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`)
+  }
+
+  gauge(name: string, help: string, value: number, labels?: Labels): this {
+    this.declare(name, 'gauge', help)
+    this.lines.push(`${name}${formatLabels(labels)} ${formatValue(value)}`)
+    return this
+  }
+
+  histogram(name: string, help: string, histogram: HistogramSnapshot, labels: Labels = {}): this {
+    this.declare(name, 'histogram', help)
+    for (const bucket of histogram.buckets) {
+      this.lines.push(`${name}_bucket${formatLabels({ ...labels, le: bucket.le })} ${formatValue(Number(bucket.count))}`)
+    }
+    this.lines.push(`${name}_bucket${formatLabels({ ...labels, le: '+Inf' })} ${formatValue(Number(histogram.count))}`)
+    this.lines.push(`${name}_sum${formatLabels(labels)} ${formatValue(Number(histogram.sum))}`)
+    this.lines.push(`${name}_count${formatLabels(labels)} ${formatValue(Number(histogram.count))}`)
+    return this
+  }
+
+  toString(): string {
+    return this.lines.join('\n') + '\n'
+  }
+}
+
+const GCAL_QUEUE_STATUSES = ['pending', 'processing', 'completed', 'failed']
+
+export function formatPipelineMetrics(snapshot: PipelineMetricsSnapshot): string {
+  const metrics = new MetricsWriter()
+
+  // Fila Cedro → Google: sempre expõe todos os status (0 quando vazio)
+  const queue = new Map(snapshot.gcal_queue.map((row) => [row.status, row] as [string, typeof row]))
+  GCAL_QUEUE_STATUSES.forEach((status) => {
+    metrics.gauge('cedro_gcal_queue_jobs', 'Jobs in gcal_sync_queue by status', Number(queue.get(status)?.jobs || 0), { status })
+  })
+  GCAL_QUEUE_STATUSES.forEach((status) => {
+    metrics.gauge('cedro_gcal_queue_retries', 'Sum of retry_count of gcal_sync_queue jobs by status', Number(queue.get(status)?.retries || 0), { status })
+  })
+  metrics.gauge(
+    'cedro_gcal_queue_oldest_pending_age_seconds',
+    'Age of the oldest pending gcal_sync_queue job (0 when empty)',
+    Number(queue.get('pending')?.oldest_age_seconds || 0)
+  )
+  metrics.histogram(
+    'cedro_gcal_queue_duration_seconds',
+    'Time from enqueue to processing for gcal_sync_queue jobs processed in the last 24h',
+    snapshot.gcal_queue_duration_seconds
+  )
+
+  snapshot.gcal_sync_log_24h.forEach((row) => {
+    metrics.gauge(
+      'cedro_gcal_sync_events_24h',
+      'calendar_sync_log entries in the last 24h (status="error" are Google API/sync errors)',
+      Number(row.events),
+      { direction: row.direction, action: row.action, status: row.status }
+    )
+  })
+
+  snapshot.recording_jobs.forEach((row) => {
+    metrics.gauge('cedro_recording_jobs', 'recording_jobs by status', Number(row.jobs), { status: row.status })
+  })
+  metrics.histogram(
+    'cedro_n8n_duration_seconds',
+    'Time from n8n trigger to callback for recording jobs completed in the last 24h',
+    snapshot.n8n_duration_seconds
+  )
+
+  snapshot.stage_duration_seconds.forEach((row) => {
+    metrics.histogram(
+      'cedro_pipeline_stage_duration_seconds',
+      'Duration of audio pipeline stages (ffmpeg) in the last 24h',
+      row.histogram,
+      { stage: row.stage }
+    )
+  })
+  snapshot.stage_duration_seconds.forEach((row) => {
+    metrics.gauge(
+      'cedro_pipeline_stage_failures_24h',
+      'Failed audio pipeline stage runs in the last 24h',
+      Number(row.failures),
+      { stage: row.stage }
+    )
+  })
+
+  return metrics.toString()
+}
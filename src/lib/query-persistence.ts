@@ -0,0 +1,305 @@
+/**
+ * Persisted React Query cache (IndexedDB)
+ *
+ * Successful queries under an allow-listed root key are written to IndexedDB
+ * one entry per query, keyed by `v<QUERY_CACHE_VERSION>:<userId>:<queryHash>`,
+ * and hydrated back at startup so reloads/new tabs render from cache while the
+ * normal staleTime rules decide what to refetch.
+ *
+ * - Entries belong to the signed-in auth user: only theirs are hydrated, and
+ *   switching user (or signing out, from any tab) deletes everyone else's
+ *
+ * - Bump QUERY_CACHE_VERSION whenever a persisted data shape changes
+ * - Entries older than PERSIST_MAX_AGE_MS are dropped on restore
+ * - Total size is bounded by PERSIST_MAX_BYTES (oldest entries evicted first)
+ * - Clinical data (medical records, recordings) is never persisted
+ */
+
+import { hydrate, type Query, type QueryClient, type QueryKey } from '@tanstack/react-query'
+
+export const QUERY_CACHE_VERSION = 1
+export const PERSIST_MAX_BYTES = 4 * 1024 * 1024 // ~4 MB
+export const PERSIST_MAX_AGE_MS = 24 * 60 * 60 * 1000 // 24h
+
+const DB_NAME = 'cedro-query-cache'
+const STORE_NAME = 'queries'
+const WRITE_DEBOUNCE_MS = 1000
+
+/** Root query keys that are safe and useful to keep across reloads */
+const PERSISTED_ROOT_KEYS = new Set(['appointments', 'patients', 'users', 'services', 'schedules'])
+
+export interface PersistedQueryEntry {
+  key: string
+  queryKey: QueryKey
+  queryHash: string
+  state: Query['state']
+  size: number
+  savedAt: number
+}
+
+type EntryMeta = Pick<PersistedQueryEntry, 'key' | 'size' | 'savedAt'>
+
+// ============ PURE HELPERS ============
+
+export function persistKey(queryHash: string, userId: string): string {
+  return `v${QUERY_CACHE_VERSION}:${userId}:${queryHash}`
+}
+
+export function isCurrentVersionKey(key: string): boolean {
+  return key.startsWith(`v${QUERY_CACHE_VERSION}:`)
+}
+
+/** Entry of the current cache version written for `userId` */
+export function isUserKey(key: string, userId: string | null): boolean {
+  return !!userId && key.startsWith(`v${QUERY_CACHE_VERSION}:${userId}:`)
+}
+
+export function shouldPersistQuery(queryKey: QueryKey, status: string): boolean {
+  return status === 'success' && PERSISTED_ROOT_KEYS.has(String(queryKey[0]))
+}
+
+/**
+ * Picks the entries to delete: expired ones first, then the oldest until the
+ * remaining total fits in maxBytes.
+ */
+export function selectEvictions(
+  entries: EntryMeta[],
+  maxBytes: number = PERSIST_MAX_BYTES,
+  maxAgeMs: number = PERSIST_MAX_AGE_MS,
+  now: number = Date.now()
+): string[] {
+  const evicted: string[] = []
+  const alive: EntryMeta[] = []
+
+  for (const entry of entries) {
+    if (now - entry.savedAt > maxAgeMs) {
+      evicted.push(entry.key)
+    } else {
+      alive.push(entry)
+    }
+  }
+
+  let total = alive.reduce((sum, entry) => sum + entry.size, 0)
+  alive.sort((a, b) => a.savedAt - b.savedAt)
+
+  for (const entry of alive) {
+    if (total <= maxBytes) break
+    evicted.push(entry.key)
+    total -= entry.size
+  }
+
+  return evicted
+}
+
+// ============ INDEXEDDB ============
+
+function isIndexedDbAvailable(): boolean {
+  return typeof window !== 'undefined' && typeof window.indexedDB !== 'undefined'
+}
+
+let dbPromise: Promise<IDBDatabase> | null = null
+
+function openDb(): Promise<IDBDatabase> {
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve, reject) => {
+      const request = window.indexedDB.open(DB_NAME, 1)
+      request.onupgradeneeded = () => {
+        request.result.createObjectStore(STORE_NAME, { keyPath: 'key' })
+      }
+      request.onsuccess = () => resolve(request.result)
+      request.onerror = () => {
+        dbPromise = null
+        reject(request.error)
+      }
+    })
+  }
+  return dbPromise
+}
+
+function requestToPromise<T>(request: IDBRequest<T>): Promise<T> {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result)
+    request.onerror = () => reject(request.error)
+  })
+}
+
+async function withStore<T>(
+  mode: IDBTransactionMode,
+  run: (store: IDBObjectStore) => IDBRequest<T> | void
+): Promise<T | void> {
+  const db = await openDb()
+  const tx = db.transaction(STORE_NAME, mode)
+  const done = new Promise<void>((resolve, reject) => {
+    tx.oncomplete = () => resolve()
+    tx.onerror = () => reject(tx.error)
+    tx.onabort = () => reject(tx.error)
+  })
+  const request = run(tx.objectStore(STORE_NAME))
+  const result = request ? requestToPromise(request) : Promise.resolve(undefined)
+  await done
+  return result
+}
+
+// ============ PERSISTER ============
+
+const index = new Map<string, EntryMeta>()
+
+// Auth user dono das entradas; null = nada é lido nem gravado
+let cacheUserId: string | null = null
+
+async function deleteOtherUsersEntries(userId: string | null) {
+  const keys = ((await withStore('readonly', (store) => store.getAllKeys())) || []) as string[]
+  const toDelete = keys.filter((key) => !isUserKey(key, userId))
+  if (toDelete.length === 0) return
+
+  await withStore('readwrite', (store) => {
+    toDelete.forEach((key) => store.delete(key))
+  })
+}
+
+/**
+ * Sets the auth user the persisted cache belongs to (called on every auth
+ * state change). A different user, or null on sign-out, deletes the entries
+ * left by anyone else.
+ */
+export async function setPersistedQueriesUser(userId: string | null): Promise<void> {
+  if (userId === cacheUserId) return
+
+  cacheUserId = userId
+  index.clear()
+  if (!isIndexedDbAvailable()) return
+
+  try {
+    await deleteOtherUsersEntries(userId)
+  } catch (error) {
+    console.warn('Falha ao limpar cache persistido de outro usuário:', error)
+  }
+}
+
+async function evictIfNeeded() {
+  const evicted = selectEvictions(Array.from(index.values()))
+  if (evicted.length === 0) return
+
+  evicted.forEach((key) => index.delete(key))
+  await withStore('readwrite', (store) => {
+    evicted.forEach((key) => store.delete(key))
+  })
+}
+
+/**
+ * Loads the queries persisted for `userId` into the client. Entries from
+ * other users or cache versions, or older than PERSIST_MAX_AGE_MS, are
+ * deleted instead of hydrated.
+ */
+export async function restorePersistedQueries(queryClient: QueryClient, userId: string | null): Promise<void> {
+  cacheUserId = userId
+  if (!isIndexedDbAvailable()) return
+
+  try {
+    const entries = ((await withStore('readonly', (store) => store.getAll())) || []) as PersistedQueryEntry[]
+
+    const current = entries.filter((entry) => isUserKey(entry.key, userId))
+    const stale = entries.filter((entry) => !isUserKey(entry.key, userId)).map((entry) => entry.key)
+
+    current.forEach((entry) => index.set(entry.key, { key: entry.key, size: entry.size, savedAt: entry.savedAt }))
+    const evicted = new Set(selectEvictions(Array.from(index.values())))
+    evicted.forEach((key) => index.delete(key))
+
+    const toDelete = [...stale, ...Array.from(evicted)]
+    if (toDelete.length > 0) {
+      await withStore('readwrite', (store) => {
+        toDelete.forEach((key) => store.delete(key))
+      })
+    }
+
+    hydrate(queryClient, {
+      mutations: [],
+      queries: current
+        .filter((entry) => !evicted.has(entry.key))
+        .map((entry) => ({
+          queryKey: entry.queryKey,
+          queryHash: entry.queryHash,
+          state: entry.state
+        }))
+    })
+  } catch (error) {
+    console.warn('Falha ao restaurar cache persistido:', error)
+  }
+}
+
+/**
+ * Writes successful allow-listed queries to IndexedDB (debounced, batched).
+ * Returns an unsubscribe function.
+ */
+export function persistQueryClient(queryClient: QueryClient): () => void {
+  if (!isIndexedDbAvailable()) return () => {}
+
+  const pending = new Map<string, { query: Query; userId: string }>()
+  let timer: ReturnType<typeof setTimeout> | null = null
+
+  const flush = async () => {
+    timer = null
+    // Buscadas por um usuário que já saiu: não gravar
+    const queries = Array.from(pending.values()).filter(({ userId }) => userId === cacheUserId)
+    pending.clear()
+
+    const now = Date.now()
+    const entries: PersistedQueryEntry[] = []
+
+    for (const { query, userId } of queries) {
+      try {
+        const state = { ...query.state, fetchStatus: 'idle' as const, error: null, fetchFailureReason: null }
+        entries.push({
+          key: persistKey(query.queryHash, userId),
+          queryKey: query.queryKey,
+          queryHash: query.queryHash,
+          state,
+          size: JSON.stringify(state.data ?? null).length,
+          savedAt: now
+        })
+      } catch {
+        // Dados não serializáveis: não persistir
+      }
+    }
+
+    if (entries.length === 0) return
+
+    try {
+      await withStore('readwrite', (store) => {
+        entries.forEach((entry) => store.put(entry))
+      })
+      entries.forEach((entry) => index.set(entry.key, { key: entry.key, size: entry.size, savedAt: entry.savedAt }))
+      await evictIfNeeded()
+    } catch (error) {
+      console.warn('Falha ao persistir cache de queries:', error)
+    }
+  }
+
+  const unsubscribe = queryClient.getQueryCache().subscribe((event) => {
+    if (event.type !== 'updated' || event.action.type !== 'success') return
+    if (!shouldPersistQuery(event.query.queryKey, event.query.state.status)) return
+    if (!cacheUserId) return
+
+    pending.set(event.query.queryHash, { query: event.query, userId: cacheUserId })
+    if (!timer) timer = setTimeout(flush, WRITE_DEBOUNCE_MS)
+  })
+
+  return () => {
+    unsubscribe()
+    if (timer) clearTimeout(timer)
+  }
+}
+
+/**
+ * Removes every persisted query (called on sign-out)
+ */
+export async function clearPersistedQueries(): Promise<void> {
+  if (!isIndexedDbAvailable()) return
+
+  index.clear()
+  try {
+    await withStore('readwrite', (store) => store.clear())
+  } catch (error) {
+    console.warn('Falha ao limpar cache persistido:', error)
+  }
+}
@@ -0,0 +1,153 @@
+/**
+ * Realtime → React Query cache patching for appointment lists
+ *
+ * Applies a Supabase `postgres_changes` payload to one cached appointments
+ * list (APPOINTMENTS_QUERY_KEYS.list) in place of invalidating every query.
+ * When a payload cannot be applied faithfully (e.g. a patient/service name
+ * that is not in the reference caches) the caller refetches only that list.
+ */
+
+export type RealtimeEventType = 'INSERT' | 'UPDATE' | 'DELETE'
+
+export interface AppointmentRow {
+  id: string
+  therapist_id: string
+  patient_id: string | null
+  service_id: string | null
+  start_at: string
+  [column: string]: any
+}
+
+export interface EnrichedAppointmentRow extends AppointmentRow {
+  patient_name?: string
+  patient_email?: string
+  therapist_name?: string
+  service_name?: string
+}
+
+export interface AppointmentChange {
+  eventType: RealtimeEventType
+  new: Partial<AppointmentRow>
+  old: Partial<AppointmentRow>
+}
+
+/** Shape of the filter object stored in APPOINTMENTS_QUERY_KEYS.list */
+export interface AppointmentListScope {
+  startDate: string
+  endDate: string
+  therapistId?: string
+}
+
+/** Name lookups backed by the cached therapists/patients/services queries */
+export interface AppointmentNameLookup {
+  patient: (id: string) => { name: string; email?: string } | undefined
+  therapist: (id: string) => { name: string } | undefined
+  service: (id: string) => { name: string } | undefined
+}
+
+export type CachePatchResult<T> =
+  | { kind: 'patched'; data: T[] }
+  | { kind: 'unchanged' }
+  | { kind: 'refetch' }
+
+const UNCHANGED = { kind: 'unchanged' } as const
+const REFETCH = { kind: 'refetch' } as const
+
+function isInScope(row: Partial<AppointmentRow>, scope: AppointmentListScope): boolean {
+  if (!row.start_at) return false
+  if (scope.therapistId && row.therapist_id !== scope.therapistId) return false
+
+  // Same bounds as getAppointmentsWithDetails: gte(start) / lte(end)
+  const start = Date.parse(row.start_at)
+  return start >= Date.parse(scope.startDate) && start <= Date.parse(scope.endDate)
+}
+
+/**
+ * Copies joined display names onto the row, reusing the previous values when
+ * the foreign key did not change. Returns null if a name cannot be resolved.
+ */
+function enrich<T extends EnrichedAppointmentRow>(
+  row: AppointmentRow,
+  previous: T | undefined,
+  lookup: AppointmentNameLookup
+): T | null {
+  const next = { ...(previous || {}), ...row } as T
+
+  if (!previous || previous.patient_id !== row.patient_id) {
+    if (row.patient_id) {
+      const patient = lookup.patient(row.patient_id)
+      if (!patient) return null
+      next.patient_name = patient.name
+      next.patient_email = patient.email
+    } else {
+      next.patient_name = undefined
+      next.patient_email = undefined
+    }
+  }
+
+  if (!previous || previous.therapist_id !== row.therapist_id) {
+    const therapist = lookup.therapist(row.therapist_id)
+    if (!therapist) return null
+    next.therapist_name = therapist.name
+  }
+
+  if (!previous || previous.service_id !== row.service_id) {
+    if (row.service_id) {
+      const service = lookup.service(row.service_id)
+      if (!service) return null
+      next.service_name = service.name
+    } else {
+      next.service_name = undefined
+    }
+  }
+
+  return next
+}
+
+const byStart = (a: AppointmentRow, b: AppointmentRow) =>
+  Date.parse(a.start_at) - Date.parse(b.start_at)
+
+/**
+ * Applies one realtime change to one cached list.
+ */
+export function applyAppointmentChange<T extends EnrichedAppointmentRow>(
+  list: T[] | undefined,
+  scope: AppointmentListScope,
+  change: AppointmentChange,
+  lookup: AppointmentNameLookup
+): CachePatchResult<T> {
+  if (!list) return UNCHANGED
+
+  if (change.eventType === 'DELETE') {
+    const id = change.old.id
+    // Sem REPLICA IDENTITY não há id: não dá para saber qual linha sumiu
+    if (!id) return REFETCH
+    const index = list.findIndex((item) => item.id === id)
+    if (index === -1) return UNCHANGED
+    return { kind: 'patched', data: list.filter((_, i) => i !== index) }
+  }
+
+  const row = change.new
+  if (!row.id || !row.therapist_id || !row.start_at) return REFETCH
+
+  const index = list.findIndex((item) => item.id === row.id)
+  const existing = index === -1 ? undefined : list[index]
+
+  if (!isInScope(row, scope)) {
+    if (!existing) return UNCHANGED
+    return { kind: 'patched', data: list.filter((_, i) => i !== index) }
+  }
+
+  const enriched = enrich<T>(row as AppointmentRow, existing, lookup)
+  if (!enriched) return REFETCH
+
+  const data = existing
+    ? list.map((item, i) => (i === index ? enriched : item))
+    : [...list, enriched]
+
+  if (!existing || existing.start_at !== enriched.start_at) {
+    data.sort(byStart)
+  }
+
+  return { kind: 'patched', data }
+}
@@ -0,0 +1,167 @@
+/**
+ * Shared reference data (therapists and services)
+ *
+ * One client-side cache for the lists used by agenda, pacientes, financeiro,
+ * CRM and the appointments adapter, loaded from /api/reference-data.
+ * The endpoint tags each snapshot with the version bumped by triggers on
+ * cedro.users / cedro.services (db/schema/reference_data.sql): after
+ * REFERENCE_DATA_FRESH_MS the cache revalidates with If-None-Match and a 304
+ * keeps the lists already in memory.
+ *
+ * The lists depend on the user's RLS, so the ETag carries the user id and the
+ * store is cleared whenever the signed-in user changes.
+ */
+
+export interface ReferenceTherapist {
+  id: string
+  name: string
+  email: string | null
+  role: 'therapist' | 'admin'
+  is_active: boolean
+}
+
+export interface ReferenceService {
+  id: string
+  name: string
+  description: string | null
+  default_duration_min: number
+  base_price_cents: number
+  active: boolean
+}
+
+export interface ReferenceData {
+  version: string
+  therapists: ReferenceTherapist[]
+  services: ReferenceService[]
+}
+
+export const REFERENCE_DATA_FRESH_MS = 60 * 1000
+
+export function referenceDataEtag(version: string, userId: string): string {
+  return `"ref-${userId}:${version}"`
+}
+
+/**
+ * Version from an If-None-Match header written by referenceDataEtag, only
+ * when it was issued to the same user
+ */
+export function versionFromEtag(header: string | null | undefined, userId: string): string | null {
+  const match = /"ref-([^":]+):([0-9]+\.[0-9]+)"/.exec(header || '')
+  return match && match[1] === userId ? match[2] : null
+}
+
+type FetchLike = (input: string, init?: { headers?: Record<string, string> }) => Promise<{
+  status: number
+  ok: boolean
+  headers: { get(name: string): string | null }
+  json(): Promise<any>
+}>
+
+export class ReferenceDataStore {
+  private data: ReferenceData | null = null
+  private etag: string | null = null
+  private validatedAt = 0
+  private inFlight: Promise<ReferenceData> | null = null
+  private userId: string | null = null
+  // Bumped by clear(): a response for the previous user is not kept
+  private generation = 0
+
+  constructor(
+    private fetchImpl: FetchLike,
+    private url: string = '/api/reference-data',
+    private freshMs: number = REFERENCE_DATA_FRESH_MS
+  ) {}
+
+  /** Cached snapshot; revalidated (304 or new version) once it is stale */
+  get(now: number = Date.now()): Promise<ReferenceData> {
+    if (this.data && now - this.validatedAt < this.freshMs) {
+      return Promise.resolve(this.data)
+    }
+    if (!this.inFlight) {
+      const request: Promise<ReferenceData> = this.load(now).finally(() => {
+        if (this.inFlight === request) this.inFlight = null
+      })
+      this.inFlight = request
+    }
+    return this.inFlight
+  }
+
+  /** Forces the next get() to revalidate (e.g. after editing a service) */
+  invalidate(): void {
+    this.validatedAt = 0
+  }
+
+  /** Drops everything cached (sign-out) */
+  clear(): void {
+    this.data = null
+    this.etag = null
+    this.validatedAt = 0
+    this.inFlight = null
+    this.generation++
+  }
+
+  /** Clears the store when the signed-in user changes (auth state change) */
+  setUser(userId: string | null): void {
+    if (userId !== this.userId) {
+      this.userId = userId
+      this.clear()
+    }
+  }
+
+  private async load(now: number): Promise<ReferenceData> {
+    const generation = this.generation
+    const headers: Record<string, string> = {}
+    if (this.data && this.etag) headers['If-None-Match'] = this.etag
+
+    const response = await this.fetchImpl(this.url, { headers })
+
+    if (generation !== this.generation) {
+      // Usuário mudou durante a requisição: resposta descartada
+      return this.get(now)
+    }
+
+    if (response.status === 304 && this.data) {
+      this.validatedAt = now
+      return this.data
+    }
+    if (!response.ok) {
+      // Mantém a última versão conhecida se o servidor falhar
+      if (this.data) return this.data
+      const body = await response.json().catch(() => ({}))
+      throw new Error(body?.error || `Reference data request failed (${response.status})`)
+    }
+
+    const snapshot = await response.json()
+    const data: ReferenceData = {
+      version: snapshot.version,
+      therapists: snapshot.therapists || [],
+      services: snapshot.services || []
+    }
+    if (generation !== this.generation) return this.get(now)
+
+    this.data = data
+    this.etag = response.headers.get('ETag')
+    this.validatedAt = now
+    return data
+  }
+}
+
+export const referenceData = new ReferenceDataStore((input, init) => fetch(input, init))
+
+// ============ SELECTORS ============
+
+export function selectTherapists(data: ReferenceData, options: { activeOnly?: boolean } = {}): ReferenceTherapist[] {
+  return options.activeOnly ? data.therapists.filter((therapist) => therapist.is_active) : data.therapists
+}
+
+export function selectActiveServices(data: ReferenceData): ReferenceService[] {
+  return data.services.filter((service) => service.active)
+}
+
+export async function getReferenceTherapists(options: { activeOnly?: boolean } = {}): Promise<ReferenceTherapist[]> {
+  return selectTherapists(await referenceData.get(), options)
+}
+
+export async function getReferenceServices(): Promise<ReferenceService[]> {
+  return selectActiveServices(await referenceData.get())
+}
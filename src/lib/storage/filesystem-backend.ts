@@ -0,0 +1,92 @@
+import fs from 'fs'
+import { mkdir, readFile, readdir, rename, stat, unlink, utimes } from 'fs/promises'
+import path from 'path'
+import { pipeline } from 'stream/promises'
+import type { ObjectBody, StorageBackend, StoredObject } from './types'
+import { AUDIO_PREFIX } from './keys'
+
+// Local storage directory for audio files (served by /api/audio/file/[filename])
+export const LOCAL_STORAGE_DIR = path.join(process.cwd(), 'storage', 'audio')
+
+// Flat layout: `audio/<name>` is stored as `<LOCAL_STORAGE_DIR>/<name>`
+function filePath(key: string): string {
+  return path.join(LOCAL_STORAGE_DIR, path.basename(key))
+}
+
+export function createFilesystemBackend(): StorageBackend {
+  let dirReady: Promise<unknown> | null = null
+
+  const ensureDir = () => {
+    if (!dirReady) {
+      dirReady = mkdir(LOCAL_STORAGE_DIR, { recursive: true }).catch((error) => {
+        dirReady = null
+        throw error
+      })
+    }
+    return dirReady
+  }
+
+  return {
+    name: 'filesystem',
+
+    async exists(key) {
+      try {
+        await stat(filePath(key))
+        return true
+      } catch {
+        return false
+      }
+    },
+
+    async put(key, body: ObjectBody) {
+      await ensureDir()
+      // Write to a temp name and rename, so a partial upload is never served
+      const target = filePath(key)
+      const partial = `${target}.${process.pid}.${Date.now()}.partial`
+      const source = Buffer.isBuffer(body) ? [body] : body.stream
+      try {
+        await pipeline(source as any, fs.createWriteStream(partial))
+        await rename(partial, target)
+      } catch (error) {
+        await unlink(partial).catch(() => {})
+        throw error
+      }
+    },
+
+    get(key) {
+      return readFile(filePath(key))
+    },
+
+    async remove(key) {
+      await unlink(filePath(key))
+    },
+
+    async touch(key) {
+      const now = new Date()
+      await utimes(filePath(key), now, now)
+    },
+
+    async list(prefix) {
+      await ensureDir()
+      const namePrefix = prefix.startsWith(AUDIO_PREFIX) ? prefix.slice(AUDIO_PREFIX.length) : prefix
+      const names = (await readdir(LOCAL_STORAGE_DIR)).filter(
+        (name) => name.startsWith(namePrefix) && !name.endsWith('.partial')
+      )
+
+      const objects: StoredObject[] = []
+      for (const name of names) {
+        const info = await stat(path.join(LOCAL_STORAGE_DIR, name))
+        objects.push({ key: `${AUDIO_PREFIX}${name}`, size: info.size, lastModified: info.mtime })
+      }
+      return objects
+    },
+
+    publicUrl(key) {
+      return `/api/audio/file/${encodeURIComponent(path.basename(key))}`
+    },
+
+    async presign(key) {
+      return this.publicUrl(key)
+    }
+  }
+}
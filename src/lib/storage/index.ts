@@ -0,0 +1,197 @@
+/**
+ * Audio storage
+ *
+ * One API over two backends: MinIO (S3) when MINIO_ENDPOINT is configured, or
+ * the local filesystem (storage/audio, served by /api/audio/file/[filename]).
+ * AUDIO_STORAGE_BACKEND=minio|filesystem overrides the detection.
+ *
+ * Objects are content-addressed (`audio/<sha256>.<ext>`): storing bytes that
+ * are already in the bucket only costs a stat and a touch, so upload retries
+ * don't leave duplicate copies. Files on disk are hashed and uploaded as streams
+ * (multipart on MinIO) instead of being read into memory.
+ *
+ * Server-only.
+ */
+
+import { createHash } from 'crypto'
+import fs from 'fs'
+import { stat } from 'fs/promises'
+import { createMinioBackend, MINIO_BUCKET_NAME } from './minio-backend'
+import { createFilesystemBackend } from './filesystem-backend'
+import {
+  AUDIO_PREFIX,
+  audioExtension,
+  CONTENT_TYPE_BY_EXTENSION,
+  contentAddressedKey,
+  PresignedUrlCache,
+  toObjectKey,
+  type SignedUrl
+} from './keys'
+import type { StorageBackend, StoredObject } from './types'
+import { withSpan } from '../tracing'
+
+export type { StoredObject } from './types'
+export type { SignedUrl } from './keys'
+export { LOCAL_STORAGE_DIR } from './filesystem-backend'
+
+let backend: StorageBackend | null = null
+
+export function getStorageBackend(): StorageBackend {
+  if (!backend) {
+    const configured = process.env.AUDIO_STORAGE_BACKEND || (process.env.MINIO_ENDPOINT ? 'minio' : 'filesystem')
+    backend = traceBackend(configured === 'filesystem' ? createFilesystemBackend() : createMinioBackend())
+  }
+  return backend
+}
+
+/** Each backend call becomes a `storage` span (Server-Timing / traces) */
+function traceBackend(inner: StorageBackend): StorageBackend {
+  const traced = <A extends any[], T>(operation: string, fn: (key: string, ...args: A) => Promise<T>) =>
+    (key: string, ...args: A) =>
+      withSpan(`${inner.name} ${operation}`, 'storage', () => fn.call(inner, key, ...args), { 'storage.key': key })
+
+  return {
+    name: inner.name,
+    exists: traced('exists', inner.exists),
+    put: traced('put', inner.put),
+    get: traced('get', inner.get),
+    remove: traced('remove', inner.remove),
+    touch: traced('touch', inner.touch),
+    list: traced('list', inner.list),
+    publicUrl: (key) => inner.publicUrl(key),
+    presign: traced('presign', inner.presign)
+  }
+}
+
+const presignedUrls = new PresignedUrlCache()
+
+export interface StoreAudioOptions {
+  fileName: string
+  contentType?: string
+  metadata?: Record<string, string>
+}
+
+export interface StoredAudio {
+  /** Value saved in recording_jobs.audio_storage_url */
+  url: string
+  key: string
+  sha256: string
+  size: number
+  /** True when the same bytes were already stored */
+  deduplicated: boolean
+}
+
+async function hashFile(filePath: string): Promise<string> {
+  const hash = createHash('sha256')
+  await new Promise<void>((resolve, reject) => {
+    fs.createReadStream(filePath)
+      .on('data', (chunk) => hash.update(chunk))
+      .on('end', () => resolve())
+      .on('error', reject)
+  })
+  return hash.digest('hex')
+}
+
+/**
+ * Stores audio given as a buffer or as a path on local disk. Returns the
+ * existing object when the content hash is already in the bucket.
+ */
+export async function storeAudio(
+  source: Buffer | { path: string },
+  options: StoreAudioOptions
+): Promise<StoredAudio> {
+  const storage = getStorageBackend()
+
+  try {
+    const isBuffer = Buffer.isBuffer(source)
+    const sha256 = isBuffer
+      ? createHash('sha256').update(source).digest('hex')
+      : await hashFile(source.path)
+    const size = isBuffer ? source.length : (await stat(source.path)).size
+
+    const extension = audioExtension(options.fileName, options.contentType)
+    const key = contentAddressedKey(sha256, extension)
+    const url = storage.publicUrl(key)
+
+    if (await storage.exists(key)) {
+      // The object may be an old orphan: refresh its modification time so the
+      // orphan sweep's grace period covers this upload until its row exists.
+      // If it vanished in between, fall through and upload it again.
+      try {
+        await storage.touch(key)
+        return { url, key, sha256, size, deduplicated: true }
+      } catch (error) {
+        console.warn(`Could not refresh deduplicated object ${key}, uploading again:`, error)
+      }
+    }
+
+    await storage.put(
+      key,
+      isBuffer ? source : { stream: fs.createReadStream(source.path), size },
+      {
+        'Content-Type': options.contentType || CONTENT_TYPE_BY_EXTENSION[extension] || 'application/octet-stream',
+        'original-filename': encodeURIComponent(options.fileName),
+        'content-sha256': sha256,
+        ...options.metadata
+      }
+    )
+
+    return { url, key, sha256, size, deduplicated: false }
+  } catch (error) {
+    console.error(`Error storing audio file (${storage.name}):`, error)
+    throw error
+  }
+}
+
+export function objectKeyFor(urlOrKey: string): string {
+  return toObjectKey(urlOrKey, MINIO_BUCKET_NAME)
+}
+
+export async function downloadAudioFile(urlOrKey: string): Promise<Buffer> {
+  try {
+    return await getStorageBackend().get(objectKeyFor(urlOrKey))
+  } catch (error) {
+    console.error('Error downloading audio file:', error)
+    throw error
+  }
+}
+
+/**
+ * Time-limited URL for an audio object. Cached per key and reused while it is
+ * valid for at least half of `expirySeconds`; `expiresAt` is the real expiry.
+ */
+export async function getAudioUrl(urlOrKey: string, expirySeconds: number = 3600): Promise<SignedUrl> {
+  const key = objectKeyFor(urlOrKey)
+  const cached = presignedUrls.get(key, expirySeconds)
+  if (cached) return cached
+
+  try {
+    const url = await getStorageBackend().presign(key, expirySeconds)
+    const signed = { url, expiresAt: Date.now() + expirySeconds * 1000 }
+    presignedUrls.set(key, signed)
+    return signed
+  } catch (error) {
+    console.error('Error generating presigned URL:', error)
+    throw error
+  }
+}
+
+export async function deleteAudioFile(urlOrKey: string): Promise<void> {
+  const key = objectKeyFor(urlOrKey)
+  try {
+    presignedUrls.delete(key)
+    await getStorageBackend().remove(key)
+  } catch (error) {
+    console.error('Error deleting audio file:', error)
+    throw error
+  }
+}
+
+export async function listAudioFiles(prefix: string = AUDIO_PREFIX): Promise<StoredObject[]> {
+  try {
+    return await getStorageBackend().list(prefix)
+  } catch (error) {
+    console.error('Error listing audio files:', error)
+    throw error
+  }
+}
@@ -0,0 +1,120 @@
+/**
+ * Object keys and presigned URL cache for the audio storage layer
+ *
+ * Audio is content-addressed: the object key is the SHA-256 of the bytes, so
+ * a retried upload (or the same file imported twice) maps to the object that
+ * is already stored. Legacy keys (`audio/<timestamp>-<name>`) and the URLs
+ * saved in recording_jobs.audio_storage_url keep resolving through toObjectKey.
+ */
+
+export const AUDIO_PREFIX = 'audio/'
+
+const EXTENSION_BY_CONTENT_TYPE: Record<string, string> = {
+  'audio/webm': 'webm',
+  'video/webm': 'webm',
+  'audio/ogg': 'ogg',
+  'audio/opus': 'opus',
+  'audio/mpeg': 'mp3',
+  'audio/mp3': 'mp3',
+  'audio/wav': 'wav',
+  'audio/x-wav': 'wav',
+  'audio/mp4': 'm4a',
+  'audio/x-m4a': 'm4a',
+  'video/mp4': 'mp4'
+}
+
+const KNOWN_EXTENSIONS = new Set(['webm', 'ogg', 'opus', 'mp3', 'wav', 'm4a', 'mp4', 'aac', 'flac'])
+
+export const CONTENT_TYPE_BY_EXTENSION: Record<string, string> = {
+  webm: 'audio/webm',
+  ogg: 'audio/ogg',
+  opus: 'audio/ogg',
+  mp3: 'audio/mpeg',
+  wav: 'audio/wav',
+  m4a: 'audio/mp4',
+  mp4: 'audio/mp4',
+  aac: 'audio/aac',
+  flac: 'audio/flac'
+}
+
+/**
+ * File extension for a stored object: the upload's own extension when it is a
+ * known audio type, otherwise derived from the content type.
+ */
+export function audioExtension(fileName: string, contentType?: string): string {
+  const match = /\.([a-z0-9]+)$/i.exec(fileName || '')
+  const fromName = match ? match[1].toLowerCase() : ''
+  if (KNOWN_EXTENSIONS.has(fromName)) return fromName
+
+  const baseType = (contentType || '').split(';')[0].trim().toLowerCase()
+  return EXTENSION_BY_CONTENT_TYPE[baseType] || 'bin'
+}
+
+export function contentAddressedKey(sha256: string, extension: string): string {
+  return `${AUDIO_PREFIX}${sha256}.${extension}`
+}
+
+/**
+ * Normalizes what callers hold (object key, MinIO public URL, presigned URL
+ * or local `/api/audio/file/<name>` URL) into an object key.
+ */
+export function toObjectKey(urlOrKey: string, bucketName: string): string {
+  let value = urlOrKey.split('?')[0]
+
+  const localPrefix = '/api/audio/file/'
+  const localIndex = value.indexOf(localPrefix)
+  if (localIndex !== -1) {
+    return `${AUDIO_PREFIX}${decodeURIComponent(value.slice(localIndex + localPrefix.length))}`
+  }
+
+  const bucketMarker = `/${bucketName}/`
+  const bucketIndex = value.indexOf(bucketMarker)
+  if (bucketIndex !== -1) {
+    value = value.slice(bucketIndex + bucketMarker.length)
+  }
+
+  return decodeURIComponent(value.replace(/^\/+/, ''))
+}
+
+export interface SignedUrl {
+  url: string
+  expiresAt: number
+}
+
+/**
+ * Small bounded cache of presigned URLs. A cached URL is reused while it is
+ * still valid for at least half of the requested expiry, so status polling
+ * and repeated downloads don't sign a new URL on every request.
+ */
+export class PresignedUrlCache {
+  private entries = new Map<string, SignedUrl>()
+
+  constructor(private maxEntries: number = 500) {}
+
+  get(key: string, expirySeconds: number, now: number = Date.now()): SignedUrl | null {
+    const entry = this.entries.get(key)
+    if (!entry) return null
+
+    if (entry.expiresAt - now < (expirySeconds * 1000) / 2) {
+      this.entries.delete(key)
+      return null
+    }
+    return entry
+  }
+
+  set(key: string, entry: SignedUrl): void {
+    this.entries.delete(key)
+    this.entries.set(key, entry)
+
+    // Map keeps insertion order: the first key is the oldest
+    while (this.entries.size > this.maxEntries) {
+      const oldest = this.entries.keys().next().value
+      if (oldest === undefined) break
+      this.entries.delete(oldest)
+    }
+  }
+
+  delete(key: string): void {
+    this.entries.delete(key)
+  }
+}
@@ -0,0 +1,119 @@
+import { Client, CopyDestinationOptions, CopySourceOptions } from 'minio'
+import type { ObjectBody, StorageBackend, StoredObject } from './types'
+
+// Streams larger than this are uploaded as multipart (one part at a time in memory)
+const MULTIPART_PART_SIZE = 16 * 1024 * 1024
+
+export const MINIO_BUCKET_NAME = process.env.MINIO_BUCKET_NAME || 'cedro-audio'
+
+export function createMinioBackend(): StorageBackend {
+  const client = new Client({
+    endPoint: process.env.MINIO_ENDPOINT || 'localhost',
+    port: parseInt(process.env.MINIO_PORT || '9000'),
+    useSSL: process.env.MINIO_USE_SSL === 'true',
+    accessKey: process.env.MINIO_ACCESS_KEY || '',
+    secretKey: process.env.MINIO_SECRET_KEY || '',
+    partSize: MULTIPART_PART_SIZE
+  })
+
+  // Checked once per process; a failed check is retried on the next call
+  let bucketReady: Promise<void> | null = null
+
+  const ensureBucket = () => {
+    if (!bucketReady) {
+      bucketReady = (async () => {
+        const exists = await client.bucketExists(MINIO_BUCKET_NAME)
+        if (!exists) {
+          await client.makeBucket(MINIO_BUCKET_NAME, 'us-east-1')
+          console.log(`Bucket ${MINIO_BUCKET_NAME} created successfully`)
+        }
+      })().catch((error) => {
+        bucketReady = null
+        throw error
+      })
+    }
+    return bucketReady
+  }
+
+  // If MINIO_PUBLIC_URL is set (e.g. behind Nginx/Traefik), use it.
+  // Otherwise fall back to constructing from endpoint/port.
+  const publicUrlBase = process.env.MINIO_PUBLIC_URL
+    ? process.env.MINIO_PUBLIC_URL
+    : `${process.env.MINIO_USE_SSL === 'true' ? 'https' : 'http'}://${process.env.MINIO_ENDPOINT}:${process.env.MINIO_PORT}`
+
+  return {
+    name: 'minio',
+
+    async exists(key) {
+      await ensureBucket()
+      try {
+        await client.statObject(MINIO_BUCKET_NAME, key)
+        return true
+      } catch (error: any) {
+        if (error?.code === 'NotFound' || error?.code === 'NoSuchKey') return false
+        throw error
+      }
+    },
+
+    async put(key, body: ObjectBody, metadata) {
+      await ensureBucket()
+      if (Buffer.isBuffer(body)) {
+        await client.putObject(MINIO_BUCKET_NAME, key, body, body.length, metadata)
+      } else {
+        await client.putObject(MINIO_BUCKET_NAME, key, body.stream, body.size, metadata)
+      }
+    },
+
+    async get(key) {
+      const stream = await client.getObject(MINIO_BUCKET_NAME, key)
+      const chunks: Buffer[] = []
+      return new Promise((resolve, reject) => {
+        stream.on('data', (chunk) => chunks.push(chunk))
+        stream.on('end', () => resolve(Buffer.concat(chunks)))
+        stream.on('error', reject)
+      })
+    },
+
+    async remove(key) {
+      await client.removeObject(MINIO_BUCKET_NAME, key)
+    },
+
+    async touch(key) {
+      // S3 has no touch: copy the object onto itself, replacing (= keeping) its metadata
+      const info = await client.statObject(MINIO_BUCKET_NAME, key)
+      await client.copyObject(
+        new CopySourceOptions({ Bucket: MINIO_BUCKET_NAME, Object: key }),
+        new CopyDestinationOptions({
+          Bucket: MINIO_BUCKET_NAME,
+          Object: key,
+          MetadataDirective: 'REPLACE',
+          UserMetadata: info.metaData
+        })
+      )
+    },
+
+    async list(prefix) {
+      await ensureBucket()
+      const objects: StoredObject[] = []
+      const stream = client.listObjects(MINIO_BUCKET_NAME, prefix, true)
+
+      return new Promise((resolve, reject) => {
+        stream.on('data', (obj) => {
+          if (obj.name) {
+            objects.push({ key: obj.name, size: obj.size || 0, lastModified: obj.lastModified || null })
+          }
+        })
+        stream.on('end', () => resolve(objects))
+        stream.on('error', reject)
+      })
+    },
+
+    publicUrl(key) {
+      return `${publicUrlBase}/${MINIO_BUCKET_NAME}/${key}`
+    },
+
+    presign(key, expirySeconds) {
+      return client.presignedGetObject(MINIO_BUCKET_NAME, key, expirySeconds)
+    }
+  }
+}
@@ -0,0 +1,27 @@
+import type { Readable } from 'stream'
+
+export interface StoredObject {
+  key: string
+  size: number
+  lastModified: Date | null
+}
+
+/** Bytes to store: an in-memory buffer or a stream of known size */
+export type ObjectBody = Buffer | { stream: Readable; size: number }
+
+/**
+ * Operations every audio storage backend implements. Keys are always
+ * `audio/...` object keys (see keys.ts); backends map them to their layout.
+ */
+export interface StorageBackend {
+  readonly name: 'minio' | 'filesystem'
+  exists(key: string): Promise<boolean>
+  put(key: string, body: ObjectBody, metadata: Record<string, string>): Promise<void>
+  get(key: string): Promise<Buffer>
+  remove(key: string): Promise<void>
+  /** Refreshes the object's modification time (keeps it out of the orphan sweep) */
+  touch(key: string): Promise<void>
+  list(prefix: string): Promise<StoredObject[]>
+  publicUrl(key: string): string
+  presign(key: string, expirySeconds: number): Promise<string>
+}
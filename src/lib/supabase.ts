@@ -1,9 +1,14 @@
 import { createClient as createSupabaseClient } from '@supabase/supabase-js'
+import { createBrowserClient } from '@supabase/ssr'
+import { logger } from './logger'
+import { createTracedFetch } from './tracing'
 
 const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL!
 const supabaseAnonKey = process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!
 
-export const supabase = createSupabaseClient(supabaseUrl, supabaseAnonKey, {
+// Sessão em cookies (não em localStorage): o middleware e os Server
+// Components leem a mesma sessão do navegador
+export const supabase = createBrowserClient(supabaseUrl, supabaseAnonKey, {
   auth: {
     persistSession: true,
     autoRefreshToken: true,
@@ -14,8 +19,8 @@ export const supabase = createSupabaseClient(supabaseUrl, supabaseAnonKey, {
     headers: {
       'x-client-info': 'cedro-so@1.0.0',
     },
-    fetch: (url, options = {}) => {
-      console.log('🌐 Supabase fetch:', url)
+    fetch: createTracedFetch((url, options = {}) => {
+      logger.debug('Supabase fetch:', url)
       return fetch(url, {
         ...options,
         signal: AbortSignal.timeout(30000), // 30 second timeout (increased from 10s)
@@ -23,7 +28,7 @@ export const supabase = createSupabaseClient(supabaseUrl, supabaseAnonKey, {
         console.error('❌ Supabase fetch error:', error)
         throw error
       })
-    }
+    })
   },
   db: {
     schema: 'cedro',
@@ -37,7 +42,12 @@ export const supabase = createSupabaseClient(supabaseUrl, supabaseAnonKey, {
 })
 
 // Export a function to create new client instances
+// No navegador devolve o cliente compartilhado (uma sessão, um GoTrueClient);
+// no servidor cria um por chamada, ou seja, por requisição
 export function createClient() {
+  if (typeof window !== 'undefined') {
+    return supabase
+  }
   return createSupabaseClient(supabaseUrl, supabaseAnonKey, {
     auth: {
       persistSession: true,
@@ -1,6 +1,8 @@
 import { createServerClient } from '@supabase/ssr'
 import { cookies } from 'next/headers'
 import { Database } from '../supabase'
+import { tracedFetch } from '../tracing'
+import { claimsFromJwtPayload, SessionCache, type CedroClaims } from '../auth-claims'
 
 export function createClient() {
   const cookieStore = cookies()
@@ -25,6 +27,94 @@ export function createClient() {
           }
         },
       },
+      global: {
+        fetch: tracedFetch,
+      },
     }
   )
-}
\ No newline at end of file
+}
+
+// Claims verificadas por access token: com chaves assimétricas o getClaims()
+// já valida localmente (JWKS em cache); com HS256 ele consulta o Auth, então o
+// cache evita repetir a chamada enquanto o token for válido
+const verifiedClaims = new SessionCache<CedroClaims | null>()
+
+/**
+ * Cedro id and role of the request's user, read from the verified access
+ * token (cedro.custom_access_token_hook). Null when signed out or when the
+ * token has no Cedro claims.
+ */
+export async function getServerCedroClaims(
+  supabase: ReturnType<typeof createClient> = createClient()
+): Promise<CedroClaims | null> {
+  const { data: { session } } = await supabase.auth.getSession()
+  const token = session?.access_token
+  if (!token) {
+    return null
+  }
+
+  const expiresAt = (session.expires_at || 0) * 1000
+  return verifiedClaims.get(
+    token,
+    async () => {
+      const { data, error } = await supabase.auth.getClaims(token)
+      if (error || !data) {
+        throw error || new Error('Invalid access token')
+      }
+      return claimsFromJwtPayload(data.claims)
+    },
+    { owner: session.user.id, expiresAt }
+  ).catch(() => null)
+}
+
+/**
+ * Drops cached claims (of one auth user id, or all); tokens issued after a
+ * role change already carry the new role
+ */
+export function invalidateServerClaims(authUserId?: string): void {
+  verifiedClaims.invalidate(authUserId)
+}
+
+/**
+ * Cedro id and role of the request's user. Uses the token claims when the
+ * access token hook is enabled; otherwise validates the session with the
+ * Auth server and reads the cedro.users row (by id, then by email, like
+ * mapAuthUserToCedroUser). Null when signed out or without a Cedro user, so
+ * callers fail closed.
+ */
+export async function getServerCedroUser(
+  supabase: ReturnType<typeof createClient> = createClient()
+): Promise<CedroClaims | null> {
+  const claims = await getServerCedroClaims(supabase)
+  if (claims) {
+    return claims
+  }
+
+  const { data: { user } } = await supabase.auth.getUser()
+  if (!user) {
+    return null
+  }
+
+  const findUser = (column: 'id' | 'email', value: string) =>
+    supabase
+      .schema('cedro')
+      .from('users')
+      .select('id, email, role')
+      .eq(column, value)
+      .maybeSingle()
+
+  let { data: row } = await findUser('id', user.id)
+  if (!row && user.email) {
+    ({ data: row } = await findUser('email', user.email))
+  }
+  if (!row) {
+    return null
+  }
+
+  return claimsFromJwtPayload({
+    sub: user.id,
+    email: (row as any).email ?? user.email,
+    cedro_user_id: (row as any).id,
+    cedro_role: (row as any).role
+  })
+}
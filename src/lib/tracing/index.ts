@@ -0,0 +1,235 @@
+/**
+ * Lightweight tracing (browser + server)
+ *
+ * Spans wrap calls to external systems (Supabase, Google, storage, ffmpeg,
+ * n8n, Whisper). Finished spans go to the configured exporters and, on the
+ * server, are collected per request for the `Server-Timing` header
+ * (see ./server.ts, which also provides the async context).
+ *
+ * TRACE_EXPORTER / NEXT_PUBLIC_TRACE_EXPORTER: comma list of `console`,
+ * `otlp-file` (server only). Empty = spans are only used for Server-Timing.
+ */
+
+export type SpanKind = 'server' | 'db' | 'google' | 'storage' | 'ffmpeg' | 'n8n' | 'ai' | 'http' | 'internal'
+
+export type SpanAttributes = Record<string, string | number | boolean | undefined>
+
+export interface FinishedSpan {
+  name: string
+  kind: SpanKind
+  traceId: string
+  spanId: string
+  parentSpanId?: string
+  startTime: number // epoch ms
+  durationMs: number
+  attributes: SpanAttributes
+  error?: string
+}
+
+export interface SpanExporter {
+  export(span: FinishedSpan): void
+}
+
+/** Spans of the current request, collected for Server-Timing */
+export interface TraceState {
+  traceId: string
+  spans: FinishedSpan[]
+}
+
+export interface SpanContext {
+  trace: TraceState
+  spanId: string
+}
+
+export interface ContextManager {
+  active(): SpanContext | undefined
+  with<T>(context: SpanContext, fn: () => T): T
+}
+
+const noopContextManager: ContextManager = {
+  active: () => undefined,
+  with: (_context, fn) => fn()
+}
+
+let contextManager: ContextManager = noopContextManager
+const exporters: SpanExporter[] = []
+
+export function setContextManager(manager: ContextManager): void {
+  contextManager = manager
+}
+
+export function addSpanExporter(exporter: SpanExporter): void {
+  exporters.push(exporter)
+}
+
+export function configuredExporters(): string[] {
+  const value = typeof window === 'undefined'
+    ? process.env.TRACE_EXPORTER || ''
+    : process.env.NEXT_PUBLIC_TRACE_EXPORTER || ''
+  return value.split(',').map((name) => name.trim()).filter(Boolean)
+}
+
+export const consoleSpanExporter: SpanExporter = {
+  export(span) {
+    const error = span.error ? ` error=${JSON.stringify(span.error)}` : ''
+    console.log(`[trace] ${span.kind} ${span.name} ${span.durationMs.toFixed(1)}ms`, span.attributes, error)
+  }
+}
+
+if (configuredExporters().indexOf('console') !== -1) {
+  addSpanExporter(consoleSpanExporter)
+}
+
+function randomHex(bytes: number): string {
+  const values = new Uint8Array(bytes)
+  if (typeof globalThis.crypto?.getRandomValues === 'function') {
+    globalThis.crypto.getRandomValues(values)
+  } else {
+    for (let i = 0; i < bytes; i++) values[i] = Math.floor(Math.random() * 256)
+  }
+  return Array.from(values, (value) => value.toString(16).padStart(2, '0')).join('')
+}
+
+export const newTraceId = () => randomHex(16)
+const newSpanId = () => randomHex(8)
+
+const now = () => (typeof performance !== 'undefined' ? performance.now() : Date.now())
+
+export class Span {
+  readonly spanId = newSpanId()
+  readonly traceId: string
+  readonly parentSpanId?: string
+  private readonly startedAt = now()
+  private readonly startTime = Date.now()
+  private readonly trace?: TraceState
+  private error?: string
+  private ended = false
+
+  constructor(
+    readonly name: string,
+    readonly kind: SpanKind,
+    private attributes: SpanAttributes = {},
+    parent: SpanContext | undefined = contextManager.active()
+  ) {
+    this.trace = parent?.trace
+    this.traceId = parent?.trace.traceId || newTraceId()
+    this.parentSpanId = parent?.spanId || undefined
+  }
+
+  get context(): SpanContext {
+    return { trace: this.trace || { traceId: this.traceId, spans: [] }, spanId: this.spanId }
+  }
+
+  setAttribute(name: string, value: string | number | boolean | undefined): this {
+    this.attributes[name] = value
+    return this
+  }
+
+  recordError(error: unknown): this {
+    this.error = error instanceof Error ? error.message : String((error as any)?.message || error)
+    return this
+  }
+
+  end(): FinishedSpan | null {
+    if (this.ended) return null
+    this.ended = true
+
+    const finished: FinishedSpan = {
+      name: this.name,
+      kind: this.kind,
+      traceId: this.traceId,
+      spanId: this.spanId,
+      parentSpanId: this.parentSpanId,
+      startTime: this.startTime,
+      durationMs: now() - this.startedAt,
+      attributes: this.attributes,
+      error: this.error
+    }
+
+    this.trace?.spans.push(finished)
+    for (const exporter of exporters) {
+      try {
+        exporter.export(finished)
+      } catch {
+        // Exportação nunca derruba a operação medida
+      }
+    }
+    return finished
+  }
+}
+
+export function startSpan(name: string, kind: SpanKind, attributes?: SpanAttributes): Span {
+  return new Span(name, kind, attributes)
+}
+
+/**
+ * Runs fn inside a span; nested spans started by fn become its children.
+ */
+export async function withSpan<T>(
+  name: string,
+  kind: SpanKind,
+  fn: (span: Span) => Promise<T>,
+  attributes?: SpanAttributes
+): Promise<T> {
+  const span = startSpan(name, kind, attributes)
+  try {
+    return await contextManager.with(span.context, () => fn(span))
+  } catch (error) {
+    span.recordError(error)
+    throw error
+  } finally {
+    span.end()
+  }
+}
+
+/** `GET appointments_with_details` from a PostgREST/RPC URL */
+export function describeSupabaseRequest(url: string, method: string = 'GET'): string {
+  const path = url.split('?')[0]
+  const match = /\/(rest|auth|storage|functions)\/v1\/(.*)$/.exec(path)
+  if (!match) return method
+  const target = match[1] === 'rest' ? match[2] : `${match[1]}/${match[2]}`
+  return `${method} ${target}`
+}
+
+/**
+ * fetch wrapper for Supabase clients (`global.fetch`): one db span per request.
+ */
+export function createTracedFetch(
+  baseFetch: (input: any, init?: any) => Promise<Response> = (input, init) => fetch(input, init)
+) {
+  return async (input: any, init: any = {}): Promise<Response> => {
+    const url = typeof input === 'string' ? input : input?.url || String(input)
+    const method = (init.method || 'GET').toUpperCase()
+
+    return withSpan(`supabase ${describeSupabaseRequest(url, method)}`, 'db', async (span) => {
+      const response = await baseFetch(input, init)
+      span.setAttribute('http.status_code', response.status)
+      if (!response.ok) span.recordError(`HTTP ${response.status}`)
+      return response
+    })
+  }
+}
+
+export const tracedFetch = createTracedFetch()
+
+// ============ SERVER-TIMING ============
+
+const SERVER_TIMING_KINDS: SpanKind[] = ['db', 'google', 'storage', 'ffmpeg', 'n8n', 'ai', 'http']
+
+/**
+ * Server-Timing header value: time and call count per kind of external call,
+ * plus the handler total.
+ */
+export function formatServerTiming(spans: FinishedSpan[], totalMs: number): string {
+  const entries: string[] = []
+
+  SERVER_TIMING_KINDS.forEach((kind) => {
+    const ofKind = spans.filter((span) => span.kind === kind)
+    if (ofKind.length === 0) return
+    const duration = ofKind.reduce((sum, span) => sum + span.durationMs, 0)
+    entries.push(`${kind};dur=${duration.toFixed(1)};desc="${ofKind.length} call${ofKind.length === 1 ? '' : 's'}"`)
+  })
+
+  entries.push(`total;dur=${totalMs.toFixed(1)}`)
+  return entries.join(', ')
+}
@@ -0,0 +1,165 @@
+/**
+ * Server-side tracing (Node runtime only)
+ *
+ * - AsyncLocalStorage keeps the active span across awaits, so spans started
+ *   in data modules (Supabase fetch, Google, storage, ffmpeg) attach to the
+ *   route span without passing a context around
+ * - `otlp-file` exporter: OTLP/JSON lines appended to TRACE_FILE
+ *   (default .traces/otlp-spans.jsonl), importable by any OTLP collector
+ * - withRouteTracing(): one server span per request and a Server-Timing
+ *   header (outside production, or with SERVER_TIMING=true)
+ */
+
+import { AsyncLocalStorage } from 'async_hooks'
+import { promises as fs } from 'fs'
+import path from 'path'
+import {
+  addSpanExporter,
+  configuredExporters,
+  formatServerTiming,
+  newTraceId,
+  setContextManager,
+  Span,
+  type FinishedSpan,
+  type SpanContext,
+  type SpanExporter
+} from './index'
+
+const storage = new AsyncLocalStorage<SpanContext>()
+
+setContextManager({
+  active: () => storage.getStore(),
+  with: (context, fn) => storage.run(context, fn)
+})
+
+// ============ OTLP FILE EXPORTER ============
+
+const TRACE_FILE = process.env.TRACE_FILE || path.join(process.cwd(), '.traces', 'otlp-spans.jsonl')
+const OTLP_FLUSH_MS = 2000
+const OTLP_MAX_BATCH = 200
+
+const OTLP_STATUS_OK = 1
+const OTLP_STATUS_ERROR = 2
+// SPAN_KIND_INTERNAL / SERVER / CLIENT
+const otlpSpanKind = (span: FinishedSpan) => (span.kind === 'server' ? 2 : span.kind === 'internal' ? 1 : 3)
+
+function toOtlpAttributes(attributes: Record<string, unknown>) {
+  return Object.keys(attributes)
+    .filter((key) => attributes[key] !== undefined)
+    .map((key) => {
+      const value = attributes[key]
+      if (typeof value === 'number') {
+        return { key, value: Number.isInteger(value) ? { intValue: String(value) } : { doubleValue: value } }
+      }
+      if (typeof value === 'boolean') return { key, value: { boolValue: value } }
+      return { key, value: { stringValue: String(value) } }
+    })
+}
+
+const toNanos = (ms: number) => String(Math.round(ms * 1e6))
+
+export function toOtlpJson(spans: FinishedSpan[]) {
+  return {
+    resourceSpans: [{
+      resource: { attributes: toOtlpAttributes({ 'service.name': 'cedro-so' }) },
+      scopeSpans: [{
+        scope: { name: 'cedro-so/tracing' },
+        spans: spans.map((span) => ({
+          traceId: span.traceId,
+          spanId: span.spanId,
+          parentSpanId: span.parentSpanId,
+          name: span.name,
+          kind: otlpSpanKind(span),
+          startTimeUnixNano: toNanos(span.startTime),
+          endTimeUnixNano: toNanos(span.startTime + span.durationMs),
+          attributes: toOtlpAttributes({ ...span.attributes, 'cedro.span_kind': span.kind }),
+          status: span.error
+            ? { code: OTLP_STATUS_ERROR, message: span.error }
+            : { code: OTLP_STATUS_OK }
+        }))
+      }]
+    }]
+  }
+}
+
+class OtlpFileExporter implements SpanExporter {
+  private buffer: FinishedSpan[] = []
+  private timer: ReturnType<typeof setTimeout> | null = null
+  private writing: Promise<void> = Promise.resolve()
+
+  constructor(private filePath: string) {}
+
+  export(span: FinishedSpan) {
+    this.buffer.push(span)
+    if (this.buffer.length >= OTLP_MAX_BATCH) {
+      this.flush()
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => this.flush(), OTLP_FLUSH_MS)
+    }
+  }
+
+  flush(): Promise<void> {
+    if (this.timer) {
+      clearTimeout(this.timer)
+      this.timer = null
+    }
+    if (this.buffer.length === 0) return this.writing
+
+    const batch = this.buffer.splice(0, this.buffer.length)
+    const line = JSON.stringify(toOtlpJson(batch)) + '\n'
+
+    this.writing = this.writing
+      .then(async () => {
+        await fs.mkdir(path.dirname(this.filePath), { recursive: true })
+        await fs.appendFile(this.filePath, line)
+      })
+      .catch((error) => {
+        console.warn('Failed to write trace file:', error?.message || error)
+      })
+    return this.writing
+  }
+}
+
+if (configuredExporters().indexOf('otlp-file') !== -1) {
+  addSpanExporter(new OtlpFileExporter(TRACE_FILE))
+}
+
+// ============ ROUTE TRACING ============
+
+const SERVER_TIMING_ENABLED = process.env.NODE_ENV !== 'production' || process.env.SERVER_TIMING === 'true'
+
+type RouteHandler<R extends Request, A extends any[]> = (request: R, ...args: A) => Promise<Response>
+
+/**
+ * Wraps a route handler in a server span and adds `Server-Timing`
+ * (db, google, storage, ffmpeg, n8n, ai, total) to its response.
+ */
+export function withRouteTracing<R extends Request, A extends any[]>(
+  name: string,
+  handler: RouteHandler<R, A>
+): RouteHandler<R, A> {
+  return async (request: R, ...args: A) => {
+    const trace = { traceId: newTraceId(), spans: [] as FinishedSpan[] }
+    const span = new Span(name, 'server', { 'http.method': request.method }, { trace, spanId: '' })
+    const startedAt = Date.now()
+
+    try {
+      const response = await storage.run(span.context, () => handler(request, ...args))
+      span.setAttribute('http.status_code', response.status)
+
+      if (SERVER_TIMING_ENABLED) {
+        try {
+          response.headers.set('Server-Timing', formatServerTiming(trace.spans, Date.now() - startedAt))
+        } catch {
+          // Headers imutáveis (ex.: Response.redirect): segue sem Server-Timing
+        }
+      }
+      return response
+    } catch (error) {
+      span.recordError(error)
+      throw error
+    } finally {
+      span.end()
+    }
+  }
+}
@@ -0,0 +1,69 @@
+/**
+ * Stitching of incrementally transcribed audio segments
+ *
+ * Live recordings are transcribed in fixed windows that overlap by a couple
+ * of seconds, so a word cut at a window boundary is heard whole by one of
+ * the two requests. The overlap makes the seam appear twice; stitching drops
+ * the longest run of words at the start of the next segment that repeats
+ * the end of the text so far.
+ */
+
+export const MAX_OVERLAP_WORDS = 12
+
+function normalizeWord(word: string): string {
+  return word
+    .toLowerCase()
+    .normalize('NFD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .replace(/[^\p{L}\p{N}]/gu, '')
+}
+
+/**
+ * Number of leading words of `next` that repeat the trailing words of
+ * `previous` (compared ignoring case, accents and punctuation).
+ */
+export function findOverlap(previous: string, next: string, maxWords: number = MAX_OVERLAP_WORDS): number {
+  const prevWords = previous.trim().split(/\s+/).filter(Boolean).map(normalizeWord)
+  const nextWords = next.trim().split(/\s+/).filter(Boolean).map(normalizeWord)
+  const limit = Math.min(maxWords, prevWords.length, nextWords.length)
+
+  for (let size = limit; size > 0; size--) {
+    let matches = true
+    for (let i = 0; i < size; i++) {
+      if (prevWords[prevWords.length - size + i] !== nextWords[i]) {
+        matches = false
+        break
+      }
+    }
+    if (matches) return size
+  }
+
+  return 0
+}
+
+export function stitchTranscript(previous: string, next: string, maxWords: number = MAX_OVERLAP_WORDS): string {
+  const prev = previous.trim()
+  const addition = next.trim()
+  if (!prev) return addition
+  if (!addition) return prev
+
+  const overlap = findOverlap(prev, addition, maxWords)
+  const remaining = addition.split(/\s+/).slice(overlap).join(' ')
+
+  return remaining ? `${prev} ${remaining}` : prev
+}
+
+/**
+ * Joins segment texts in order
+ */
+export function stitchSegments(segments: string[], maxWords: number = MAX_OVERLAP_WORDS): string {
+  return segments.reduce((text, segment) => stitchTranscript(text, segment, maxWords), '')
+}
+
+/**
+ * Last words of the transcript, passed as the prompt of the next segment so
+ * the model keeps names and context across windows
+ */
+export function transcriptTail(text: string, words: number = 40): string {
+  return text.trim().split(/\s+/).slice(-words).join(' ')
+}
@@ -0,0 +1,60 @@
+/**
+ * Layout math for virtualized lists whose rows have different heights
+ * (e.g. chat messages). Heights are measured after render and keyed by item
+ * key, so prepending items does not invalidate what was already measured;
+ * rows not measured yet use the estimate.
+ */
+
+export interface VirtualLayout {
+  /** offsets[i] = top of item i; offsets[count] = total height */
+  offsets: number[]
+  totalHeight: number
+}
+
+export interface VisibleRange {
+  start: number
+  /** Inclusive; -1 when there are no items */
+  end: number
+}
+
+export function buildLayout(keys: string[], heights: Map<string, number>, estimate: number): VirtualLayout {
+  const offsets = new Array<number>(keys.length + 1)
+  offsets[0] = 0
+  for (let i = 0; i < keys.length; i++) {
+    const height = heights.get(keys[i])
+    offsets[i + 1] = offsets[i] + (height === undefined ? estimate : height)
+  }
+  return { offsets, totalHeight: offsets[keys.length] }
+}
+
+/** Index of the item containing `position` (binary search over offsets) */
+export function indexAtOffset(offsets: number[], position: number): number {
+  const count = offsets.length - 1
+  if (count <= 0) return 0
+
+  let low = 0
+  let high = count - 1
+  while (low < high) {
+    const mid = (low + high + 1) >> 1
+    if (offsets[mid] <= position) low = mid
+    else high = mid - 1
+  }
+  return low
+}
+
+export function findVisibleRange(
+  layout: VirtualLayout,
+  scrollTop: number,
+  viewportHeight: number,
+  overscan: number = 5
+): VisibleRange {
+  const count = layout.offsets.length - 1
+  if (count <= 0) return { start: 0, end: -1 }
+
+  const first = indexAtOffset(layout.offsets, Math.max(0, scrollTop))
+  const last = indexAtOffset(layout.offsets, scrollTop + viewportHeight)
+  return {
+    start: Math.max(0, first - overscan),
+    end: Math.min(count - 1, last + overscan)
+  }
+}
@@ -0,0 +1,68 @@
+import { createServerClient } from '@supabase/ssr'
+import { NextResponse, type NextRequest } from 'next/server'
+
+// Páginas abertas sem sessão
+const PUBLIC_PATHS = ['/login']
+
+/**
+ * Session check for every page, before anything renders: refreshes the
+ * Supabase session cookies and redirects signed-out users to /login (and
+ * signed-in users away from it). Pages can then render on the server
+ * without waiting for the client to confirm the session.
+ * API routes are excluded; they check auth themselves.
+ */
+export async function middleware(request: NextRequest) {
+  let response = NextResponse.next({ request })
+
+  const supabase = createServerClient(
+    process.env.NEXT_PUBLIC_SUPABASE_URL!,
+    process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!,
+    {
+      cookies: {
+        getAll() {
+          return request.cookies.getAll()
+        },
+        setAll(cookiesToSet) {
+          cookiesToSet.forEach(({ name, value }) => request.cookies.set(name, value))
+          response = NextResponse.next({ request })
+          cookiesToSet.forEach(({ name, value, options }) =>
+            response.cookies.set(name, value, options)
+          )
+        },
+      },
+    }
+  )
+
+  // getClaims valida o token (localmente com chaves assimétricas) e renova a
+  // sessão expirada; getSession sozinho confiaria no cookie sem verificar
+  const { data } = await supabase.auth.getClaims()
+  const signedIn = !!data?.claims
+
+  const { pathname } = request.nextUrl
+  const isPublic = PUBLIC_PATHS.some((path) => pathname === path || pathname.startsWith(`${path}/`))
+
+  if (!signedIn && !isPublic) {
+    return redirectWithCookies(request, response, '/login')
+  }
+  if (signedIn && (isPublic || pathname === '/')) {
+    return redirectWithCookies(request, response, '/dashboard')
+  }
+
+  return response
+}
+
+// Mantém os cookies de sessão renovados também no redirecionamento
+function redirectWithCookies(request: NextRequest, response: NextResponse, pathname: string) {
+  const url = request.nextUrl.clone()
+  url.pathname = pathname
+  url.search = ''
+  const redirect = NextResponse.redirect(url)
+  response.cookies.getAll().forEach((cookie) => redirect.cookies.set(cookie))
+  return redirect
+}
+
+export const config = {
+  matcher: [
+    '/((?!api|_next/static|_next/image|favicon.ico|.*\\.(?:svg|png|jpg|jpeg|gif|webp|ico|js|css|map|txt|woff2?)$).*)',
+  ],
+}
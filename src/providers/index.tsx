@@ -1,8 +1,14 @@
 'use client'
 
+import dynamic from 'next/dynamic'
 import { QueryProvider } from './query-provider'
 import { SupabaseProvider } from './supabase-provider'
-import { Toaster } from '@/components/ui/toaster'
+
+// Não crítico para a primeira pintura: carregado depois da hidratação.
+// O estado dos toasts fica no módulo de use-toast, então nada se perde antes.
+const Toaster = dynamic(() => import('@/components/ui/toaster').then((module) => module.Toaster), {
+  ssr: false
+})
 
 export function Providers({ children }: { children: React.ReactNode }) {
   return (
@@ -1,8 +1,18 @@
 'use client'
 
-import { QueryClient, QueryClientProvider } from '@tanstack/react-query'
-import { ReactQueryDevtools } from '@tanstack/react-query-devtools'
-import { useState } from 'react'
+import { IsRestoringProvider, QueryClient, QueryClientProvider } from '@tanstack/react-query'
+import dynamic from 'next/dynamic'
+import { useEffect, useState } from 'react'
+import { persistQueryClient, restorePersistedQueries } from '@/lib/query-persistence'
+import { supabase } from '@/lib/supabase'
+
+// Devtools só em desenvolvimento e fora do bundle principal
+const ReactQueryDevtools = process.env.NODE_ENV === 'development'
+  ? dynamic(() => import('@tanstack/react-query-devtools').then((module) => module.ReactQueryDevtools), { ssr: false })
+  : (_props: { initialIsOpen?: boolean }) => null
+
+// Não segurar a UI por mais que isso esperando o IndexedDB
+const RESTORE_TIMEOUT_MS = 1500
 
 export function QueryProvider({ children }: { children: React.ReactNode }) {
   const [queryClient] = useState(
@@ -34,9 +44,38 @@ export function QueryProvider({ children }: { children: React.ReactNode }) {
       })
   )
 
+  // Hidratar cache persistido (IndexedDB) antes das queries buscarem na rede
+  const [isRestoring, setIsRestoring] = useState(true)
+
+  useEffect(() => {
+    let unsubscribe = () => {}
+    let cancelled = false
+
+    const timeout = setTimeout(() => setIsRestoring(false), RESTORE_TIMEOUT_MS)
+
+    // Só as entradas do usuário da sessão local são hidratadas
+    supabase.auth.getSession()
+      .then(({ data }) => data.session?.user?.id ?? null, () => null)
+      .then((userId) => restorePersistedQueries(queryClient, userId))
+      .finally(() => {
+        clearTimeout(timeout)
+        if (cancelled) return
+        unsubscribe = persistQueryClient(queryClient)
+        setIsRestoring(false)
+      })
+
+    return () => {
+      cancelled = true
+      clearTimeout(timeout)
+      unsubscribe()
+    }
+  }, [queryClient])
+
   return (
     <QueryClientProvider client={queryClient}>
-      {children}
+      <IsRestoringProvider value={isRestoring}>
+        {children}
+      </IsRestoringProvider>
       <ReactQueryDevtools initialIsOpen={false} />
     </QueryClientProvider>
   )
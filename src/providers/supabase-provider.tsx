@@ -4,9 +4,12 @@ import { createContext, useContext, useEffect, useState } from 'react'
 import { User, Session } from '@supabase/supabase-js'
 import { useRouter } from 'next/navigation'
 import { supabase } from '@/lib/supabase'
-import { CedroUser, mapAuthUserToCedroUser } from '@/lib/auth'
+import { logger } from '@/lib/logger'
+import { CedroUser, getCedroUserForSession, invalidateCedroUserCache } from '@/lib/auth'
 import { useAuthInterceptor } from '@/hooks/use-auth-interceptor'
 import { useRealtimeAppointments } from '@/hooks/use-realtime-appointments'
+import { clearPersistedQueries, setPersistedQueriesUser } from '@/lib/query-persistence'
+import { referenceData } from '@/lib/reference-data'
 
 type SupabaseContextType = {
   user: User | null
@@ -25,41 +28,16 @@ export function SupabaseProvider({ children }: { children: React.ReactNode }) {
   const [loading, setLoading] = useState(true)
   const router = useRouter()
   
-  // Lock to prevent concurrent mapAuthUserToCedroUser executions
-  const [isMapping, setIsMapping] = useState(false)
-
-  // Helper function to safely map user with lock
-  const safeMapAuthUserToCedroUser = async (authUser: User): Promise<CedroUser | null> => {
-    if (isMapping) {
-      console.log('⚠️ mapAuthUserToCedroUser already in progress, skipping...')
-      return null
-    }
-
-    setIsMapping(true)
-    try {
-      console.log('🔒 Acquiring lock for mapAuthUserToCedroUser...')
-      const result = await mapAuthUserToCedroUser(authUser)
-      console.log('🔓 Releasing lock for mapAuthUserToCedroUser')
-      return result
-    } catch (error) {
-      console.error('❌ Error in safeMapAuthUserToCedroUser:', error)
-      return null
-    } finally {
-      setIsMapping(false)
-    }
-  }
-
   // Debug logging
   useEffect(() => {
-    console.log('🔍 SupabaseProvider state:', {
+    logger.debug('🔍 SupabaseProvider state:', {
       user: user?.id,
       session: !!session,
       cedroUser: cedroUser?.id,
       loading,
-      isMapping,
       timestamp: new Date().toISOString()
     })
-  }, [user, session, cedroUser, loading, isMapping])
+  }, [user, session, cedroUser, loading])
 
   // Ativar interceptador de autenticação
   const { handleAuthError } = useAuthInterceptor()
@@ -70,8 +48,11 @@ export function SupabaseProvider({ children }: { children: React.ReactNode }) {
 
   // Function to handle JWT expiration
   const handleJWTExpired = async () => {
-    console.log('🔄 JWT expired, forcing logout...')
+    logger.debug('🔄 JWT expired, forcing logout...')
     await supabase.auth.signOut()
+    invalidateCedroUserCache()
+    referenceData.clear()
+    await clearPersistedQueries()
     setSession(null)
     setUser(null)
     setCedroUser(null)
@@ -84,9 +65,9 @@ export function SupabaseProvider({ children }: { children: React.ReactNode }) {
 
     // Get initial session
     const getInitialSession = async () => {
-      console.log('🚀 Starting getInitialSession...')
+      logger.debug('🚀 Starting getInitialSession...')
       try {
-        console.log('📡 Calling supabase.auth.getSession()...')
+        logger.debug('📡 Calling supabase.auth.getSession()...')
 
         // Reduced timeout to 10 seconds for better UX
         const timeoutPromise = new Promise((_, reject) => {
@@ -96,10 +77,10 @@ export function SupabaseProvider({ children }: { children: React.ReactNode }) {
         const sessionPromise = supabase.auth.getSession()
 
         const { data: { session }, error } = await Promise.race([sessionPromise, timeoutPromise]) as any
-        console.log('📡 getSession result:', { session: !!session, error: !!error })
+        logger.debug('📡 getSession result:', { session: !!session, error: !!error })
 
         if (!isMounted) {
-          console.log('⚠️ Component unmounted, returning early')
+          logger.debug('⚠️ Component unmounted, returning early')
           return
         }
 
@@ -112,25 +93,29 @@ export function SupabaseProvider({ children }: { children: React.ReactNode }) {
           return
         }
 
-        console.log('✅ Setting session and user state...')
+        logger.debug('✅ Setting session and user state...')
         setSession(session)
         setUser(session?.user ?? null)
+        // Listas de referência dependem do RLS do usuário
+        referenceData.setUser(session?.user?.id ?? null)
+        // Cache persistido: troca de usuário ou logout (inclusive em outra aba) apaga o do anterior
+        setPersistedQueriesUser(session?.user?.id ?? null)
         
         // CRITICAL CHANGE: Stop loading immediately after getting auth session
         // Don't wait for cedroUser profile to load before showing UI
         setLoading(false)
 
         if (session?.user) {
-          console.log('👤 User found, mapping to CedroUser in background...')
-          // Load profile in background
-          safeMapAuthUserToCedroUser(session.user).then(mappedUser => {
+          logger.debug('👤 User found, mapping to CedroUser in background...')
+          // Load profile in background (cached per user + role claim)
+          getCedroUserForSession(session).then(mappedUser => {
              if (isMounted) {
-                console.log('🔄 Setting cedroUser state (async):', mappedUser ? 'with user data' : 'to null')
+                logger.debug('🔄 Setting cedroUser state (async):', mappedUser ? 'with user data' : 'to null')
                 setCedroUser(mappedUser)
              }
           })
         } else {
-          console.log('👤 No user in session')
+          logger.debug('👤 No user in session')
           setCedroUser(null)
         }
 
@@ -139,7 +124,7 @@ export function SupabaseProvider({ children }: { children: React.ReactNode }) {
 
         // Emergency fallback - if Supabase is completely unresponsive
         if (error instanceof Error && error.message?.includes('timeout')) {
-          console.log('⚠️ Supabase timeout detected - using emergency fallback')
+          logger.debug('⚠️ Supabase timeout detected - using emergency fallback')
           if (typeof window !== 'undefined') {
              // Instead of redirecting immediately, just clear state and let UI decide
              setSession(null)
@@ -171,10 +156,13 @@ export function SupabaseProvider({ children }: { children: React.ReactNode }) {
           clearTimeout(authStateChangeTimeout)
         }
 
-        console.log('🔐 Auth state change event:', event, 'user:', session?.user?.id)
+        logger.debug('🔐 Auth state change event:', event, 'user:', session?.user?.id)
 
         setSession(session)
         setUser(session?.user ?? null)
+        referenceData.setUser(session?.user?.id ?? null)
+        // Cache persistido: troca de usuário ou logout (inclusive em outra aba) apaga o do anterior
+        setPersistedQueriesUser(session?.user?.id ?? null)
         
         // Unblock UI immediately on auth change too
         if (event !== 'INITIAL_SESSION') { // INITIAL_SESSION is handled by getInitialSession
@@ -182,15 +170,16 @@ export function SupabaseProvider({ children }: { children: React.ReactNode }) {
         }
 
         if (session?.user) {
-          console.log('🔄 Auth state change - mapping user to CedroUser (background)...')
-          safeMapAuthUserToCedroUser(session.user).then(mappedUser => {
+          logger.debug('🔄 Auth state change - mapping user to CedroUser (background)...')
+          getCedroUserForSession(session).then(mappedUser => {
              if (isMounted) {
-               console.log('🔄 Auth state change - setting cedroUser state (async):', mappedUser ? 'with user data' : 'to null')
+               logger.debug('🔄 Auth state change - setting cedroUser state (async):', mappedUser ? 'with user data' : 'to null')
                setCedroUser(mappedUser)
              }
           })
         } else {
-          console.log('👤 No user in auth state change')
+          logger.debug('👤 No user in auth state change')
+          invalidateCedroUserCache()
           setCedroUser(null)
           // Ensure loading is false if logged out
           setLoading(false)
@@ -209,6 +198,10 @@ export function SupabaseProvider({ children }: { children: React.ReactNode }) {
 
   const signOut = async () => {
     await supabase.auth.signOut()
+    // Cache persistido é por dispositivo: não deixar dados para o próximo usuário
+    await clearPersistedQueries()
+    invalidateCedroUserCache()
+    referenceData.clear()
     setCedroUser(null)
   }
 